@@ -0,0 +1,93 @@
+import { useEffect, useState } from 'react';
+import { useQueryClient } from '@tanstack/react-query';
+import { liveApi } from '@/services/api';
+import type { Account, BalanceUpdate, DashboardSummary, Transaction } from '@/types';
+
+/**
+ * Подписка на изменения балансов через API Gateway
+ *
+ * Проведенные транзакции обновляют кэш счетов, последних транзакций
+ * и сводки главной панели без повторных запросов. При переподключении и пропуске сообщений
+ * (resync) данные перечитываются. Возвращает состояние подключения:
+ * пока его нет, страница может опрашивать API сама.
+ */
+export function useLiveBalances(): boolean {
+  const queryClient = useQueryClient();
+  const [connected, setConnected] = useState(false);
+
+  useEffect(() => {
+    const token = localStorage.getItem('token');
+    if (!token || typeof EventSource === 'undefined') {
+      return;
+    }
+
+    const source = new EventSource(liveApi.balancesUrl(token));
+    let reconnect = false;
+
+    const resync = () => {
+      queryClient.invalidateQueries({ queryKey: ['accounts'] });
+      queryClient.invalidateQueries({ queryKey: ['transactions'] });
+      queryClient.invalidateQueries({ queryKey: ['dashboard'] });
+    };
+
+    source.addEventListener('ready', () => {
+      // Первое подключение: данные только что загружены страницей
+      if (reconnect) {
+        resync();
+      }
+      reconnect = true;
+      setConnected(true);
+    });
+
+    source.addEventListener('resync', resync);
+
+    source.addEventListener('balances', (event) => {
+      const update: BalanceUpdate = JSON.parse((event as MessageEvent).data);
+      if (!update.transaction) {
+        resync();
+        return;
+      }
+      const balances = new Map(update.accounts.map((account) => [account.id, Number(account.balance)]));
+      const transaction = { ...update.transaction, amount: Number(update.transaction.amount) };
+
+      queryClient.setQueryData<Account[]>(['accounts'], (accounts) =>
+        accounts?.map((account) =>
+          balances.has(account.id) ? { ...account, balance: balances.get(account.id)! } : account
+        )
+      );
+      queryClient.setQueryData<Transaction[]>(['transactions', 'recent'], (transactions) =>
+        transactions && [transaction, ...transactions.filter((item) => item.id !== transaction.id)]
+      );
+      queryClient.setQueryData<DashboardSummary>(['dashboard', 'summary'], (summary) => {
+        if (!summary) {
+          return summary;
+        }
+        const accounts = summary.accounts.map((account) =>
+          balances.has(account.id) ? { ...account, balance: balances.get(account.id)! } : account
+        );
+        // Транзакция задним числом не входит в период сводки
+        const inPeriod = new Date(transaction.date) >= new Date(summary.period_start);
+        const amount = (type: string) => (inPeriod && transaction.type === type ? transaction.amount : 0);
+        return {
+          ...summary,
+          accounts,
+          total_balance: accounts.reduce((sum, account) => sum + Number(account.balance), 0),
+          income: Number(summary.income) + amount('income'),
+          expense: Number(summary.expense) + amount('expense'),
+          recent_transactions: [
+            transaction,
+            ...summary.recent_transactions.filter((item) => item.id !== transaction.id),
+          ],
+        };
+      });
+    });
+
+    source.onerror = () => setConnected(false);
+
+    return () => source.close();
+  }, [queryClient]);
+
+  return connected;
+}
+
+export default useLiveBalances;
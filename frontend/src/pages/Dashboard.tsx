@@ -11,9 +11,12 @@ import {
   Plus
 } from 'lucide-react';
 import { Link } from 'react-router-dom';
-import { accountsApi, transactionsApi, cryptoApi } from '@/services/api';
+import { dashboardApi } from '@/services/api';
+import { useLiveBalances } from '@/hooks/useLiveBalances';
 import { formatCurrency, formatNumber, formatDate } from '@/utils';
-import type { Account, Transaction } from '@/types';
+import type { DashboardSummary, Transaction } from '@/types';
+
+type DashboardAccount = DashboardSummary['accounts'][number];
 
 interface StatsCardProps {
   title: string;
@@ -54,7 +57,7 @@ function StatsCard({ title, value, icon: Icon, trend, color }: StatsCardProps) {
   );
 }
 
-function AccountCard({ account }: { account: Account }) {
+function AccountCard({ account }: { account: DashboardAccount }) {
   return (
     <div className="bg-white rounded-lg shadow p-4">
       <div className="flex items-center justify-between">
@@ -138,33 +141,28 @@ function TransactionRow({ transaction }: { transaction: Transaction }) {
 }
 
 export default function Dashboard() {
-  const { data: accounts = [] } = useQuery({
-    queryKey: ['accounts'],
-    queryFn: accountsApi.getAll,
-  });
+  // Балансы и транзакции обновляются сервером; без подключения — опрос
+  const live = useLiveBalances();
 
-  const { data: transactions = [] } = useQuery({
-    queryKey: ['transactions', 'recent'],
-    queryFn: () => transactionsApi.getAll(),
+  // Все данные панели одним запросом
+  const { data: summary } = useQuery({
+    queryKey: ['dashboard', 'summary'],
+    queryFn: dashboardApi.getSummary,
+    refetchInterval: live ? false : 60 * 1000,
+    refetchOnWindowFocus: !live,
   });
 
-  const { data: cryptoRates } = useQuery({
-    queryKey: ['crypto-rates'],
-    queryFn: cryptoApi.getRates,
-    refetchInterval: 5 * 60 * 1000, // Обновляем каждые 5 минут
-  });
-
-  // Подсчет статистики
-  const totalBalance = accounts.reduce((sum, account) => sum + account.balance, 0);
-  const recentTransactions = transactions.slice(0, 5);
-  
-  const monthlyIncome = transactions
-    .filter(t => t.type === 'income' && new Date(t.date) > new Date(Date.now() - 30 * 24 * 60 * 60 * 1000))
-    .reduce((sum, t) => sum + t.amount, 0);
-    
-  const monthlyExpenses = transactions
-    .filter(t => t.type === 'expense' && new Date(t.date) > new Date(Date.now() - 30 * 24 * 60 * 60 * 1000))
-    .reduce((sum, t) => sum + t.amount, 0);
+  const accounts = summary?.accounts ?? [];
+  const recentTransactions = (summary?.recent_transactions ?? []).slice(0, 5);
+  const totalBalance = Number(summary?.total_balance ?? 0);
+  const monthlyIncome = Number(summary?.income ?? 0);
+  const monthlyExpenses = Number(summary?.expense ?? 0);
+  const cryptoRates = summary && {
+    rates: {
+      TRX: Number(summary.rates.TRX ?? 0),
+      USDT: Number(summary.rates.USDT ?? 0),
+    },
+  };
 
   const cryptoAccounts = accounts.filter(account => account.type === 'crypto');
 
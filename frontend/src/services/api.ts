@@ -14,9 +14,11 @@ import type {
   CryptoTransaction,
   CryptoTransactionDetail,
   CryptoRates,
+  DashboardSummary,
 } from '@/types';
 
 const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8001';
+const GATEWAY_URL = import.meta.env.VITE_GATEWAY_URL || 'http://localhost:8000';
 
 // Создаем экземпляр axios
 const api = axios.create({
@@ -249,4 +251,19 @@ export const cryptoApi = {
   },
 };
 
+// Dashboard API
+export const dashboardApi = {
+  getSummary: async (): Promise<DashboardSummary> => {
+    const response = await api.get('/api/dashboard/summary');
+    return response.data;
+  },
+};
+
+// Live API (Server-Sent Events через API Gateway)
+export const liveApi = {
+  // EventSource не передает заголовки, токен идет параметром
+  balancesUrl: (token: string): string =>
+    `${GATEWAY_URL}/api/live/balances?token=${encodeURIComponent(token)}`,
+};
+
 export default api;
@@ -86,10 +86,46 @@ export interface Transaction {
   project_id: number | null;
   category_id: number | null;
   counterparty_id: number | null;
+  reversal_of_id?: number | null;
+  reversed_at?: string | null;
   created_at: string;
   updated_at: string | null;
 }
 
+// Сводка главной панели
+export interface DashboardProject {
+  project_id: number;
+  name: string;
+  income: number;
+  expense: number;
+  profit: number;
+  transaction_count: number;
+}
+
+export interface DashboardSummary {
+  generated_at: string;
+  currency: string;
+  period_start: string;
+  total_balance: number;
+  income: number;
+  expense: number;
+  accounts: Pick<Account, 'id' | 'name' | 'type' | 'currency' | 'balance'>[];
+  recent_transactions: Transaction[];
+  projects: DashboardProject[];
+  rates: Record<string, number>;
+}
+
+// Живые обновления балансов (SSE через API Gateway)
+export interface BalanceUpdate {
+  // null — массовое изменение, данные перечитываются целиком
+  transaction: Transaction | null;
+  accounts: {
+    id: number;
+    delta: string;
+    balance: string;
+  }[];
+}
+
 export interface TransactionEntry {
   id: number;
   account_id: number;
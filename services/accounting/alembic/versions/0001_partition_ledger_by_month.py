@@ -0,0 +1,180 @@
+"""Monthly range partitioning of transactions and transaction_entries
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 12:00:00
+
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+from sqlmodel import SQLModel
+
+from app.core.config import settings
+from app.services.partitions import add_months, month_start, next_month, partition_name
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# Таблица -> (ключ секционирования, внешние ключи, индексы)
+LEDGER_TABLES = {
+    "transactions": (
+        "date",
+        {
+            "project_id": "projects",
+            "category_id": "categories",
+            "counterparty_id": "counterparties",
+        },
+        {
+            "ix_transactions_date": "date",
+            "ix_transactions_project_id_date": "project_id, date",
+            "ix_transactions_category_id_date": "category_id, date",
+            "ix_transactions_counterparty_id": "counterparty_id",
+        },
+    ),
+    "transaction_entries": (
+        "transaction_date",
+        {"account_id": "accounts"},
+        {
+            "ix_transaction_entries_transaction_id": "transaction_id",
+            "ix_transaction_entries_account_id_transaction_date": "account_id, transaction_date",
+        },
+    ),
+}
+
+
+def _months(bind, table: str, key: str) -> list:
+    """Месяцы с данными в таблице и секции, создаваемые заранее"""
+    first, last = bind.execute(sa.text(f'SELECT min("{key}"), max("{key}") FROM "{table}"')).one()
+    current = month_start(date.today())
+    month = month_start(first) if first else current
+    end = max(month_start(last) if last else current, add_months(current, settings.PARTITION_PREMAKE_MONTHS))
+    months = []
+    while month <= end:
+        months.append(month)
+        month = next_month(month)
+    return months
+
+
+def _drop_transaction_foreign_keys(bind) -> None:
+    """Внешние ключи на transactions.id несовместимы с секционированием по дате"""
+    rows = bind.execute(sa.text("""
+        SELECT conrelid::regclass::text, conname
+        FROM pg_constraint
+        WHERE contype = 'f' AND confrelid = 'public.transactions'::regclass
+    """)).all()
+    for table, constraint in rows:
+        op.execute(f'ALTER TABLE {table} DROP CONSTRAINT "{constraint}"')
+
+
+def _partition_table(bind, table: str) -> None:
+    key, foreign_keys, indexes = LEDGER_TABLES[table]
+    old = f"{table}_unpartitioned"
+    sequence = bind.execute(sa.text(f"SELECT pg_get_serial_sequence('{table}', 'id')")).scalar()
+
+    op.execute(f"ALTER SEQUENCE {sequence} OWNED BY NONE")
+    op.execute(f'ALTER TABLE "{table}" RENAME TO "{old}"')
+    op.execute(f'ALTER TABLE "{old}" RENAME CONSTRAINT "{table}_pkey" TO "{old}_pkey"')
+
+    op.execute(
+        f'CREATE TABLE "{table}" (LIKE "{old}" INCLUDING DEFAULTS) '
+        f'PARTITION BY RANGE ("{key}")'
+    )
+    op.execute(f'ALTER TABLE "{table}" ADD CONSTRAINT "{table}_pkey" PRIMARY KEY (id, "{key}")')
+    for column, referenced in foreign_keys.items():
+        op.execute(
+            f'ALTER TABLE "{table}" ADD FOREIGN KEY ("{column}") REFERENCES "{referenced}" (id)'
+        )
+    for name, columns in indexes.items():
+        op.execute(f'CREATE INDEX "{name}" ON "{table}" ({columns})')
+
+    op.execute(f'CREATE TABLE "{table}_default" PARTITION OF "{table}" DEFAULT')
+    for month in _months(bind, old, key):
+        op.execute(
+            f'CREATE TABLE "{partition_name(table, month)}" PARTITION OF "{table}" '
+            f"FOR VALUES FROM ('{month}') TO ('{next_month(month)}')"
+        )
+
+    op.execute(f'INSERT INTO "{table}" SELECT * FROM "{old}"')
+    op.execute(f'DROP TABLE "{old}"')
+    op.execute(f'ALTER SEQUENCE {sequence} OWNED BY "{table}".id')
+    op.execute(f'ANALYZE "{table}"')
+
+
+def _unpartition_table(bind, table: str) -> None:
+    key, foreign_keys, indexes = LEDGER_TABLES[table]
+    old = f"{table}_partitioned"
+    sequence = bind.execute(sa.text(f"SELECT pg_get_serial_sequence('{table}', 'id')")).scalar()
+
+    op.execute(f"ALTER SEQUENCE {sequence} OWNED BY NONE")
+    op.execute(f'ALTER TABLE "{table}" RENAME TO "{old}"')
+    op.execute(f'ALTER TABLE "{old}" RENAME CONSTRAINT "{table}_pkey" TO "{old}_pkey"')
+    for name in indexes:
+        op.execute(f'ALTER INDEX "{name}" RENAME TO "{name}_partitioned"')
+
+    op.execute(f'CREATE TABLE "{table}" (LIKE "{old}" INCLUDING DEFAULTS)')
+    op.execute(f'ALTER TABLE "{table}" ADD CONSTRAINT "{table}_pkey" PRIMARY KEY (id)')
+    for column, referenced in foreign_keys.items():
+        op.execute(
+            f'ALTER TABLE "{table}" ADD FOREIGN KEY ("{column}") REFERENCES "{referenced}" (id)'
+        )
+    for name, columns in indexes.items():
+        op.execute(f'CREATE INDEX "{name}" ON "{table}" ({columns})')
+
+    op.execute(f'INSERT INTO "{table}" SELECT * FROM "{old}"')
+    op.execute(f'DROP TABLE "{old}" CASCADE')
+    op.execute(f'ALTER SEQUENCE {sequence} OWNED BY "{table}".id')
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+
+    # Базовая схема для новой базы (существующие таблицы не затрагиваются)
+    import app.models  # noqa: F401
+    SQLModel.metadata.create_all(bind)
+
+    if bind.dialect.name != "postgresql":
+        return
+
+    # Ключ секционирования проводок — дата транзакции
+    op.execute(
+        "ALTER TABLE transaction_entries ADD COLUMN IF NOT EXISTS transaction_date TIMESTAMP"
+    )
+    op.execute("""
+        UPDATE transaction_entries AS e
+        SET transaction_date = t.date
+        FROM transactions AS t
+        WHERE t.id = e.transaction_id AND e.transaction_date IS NULL
+    """)
+
+    _drop_transaction_foreign_keys(bind)
+    _partition_table(bind, "transactions")
+    _partition_table(bind, "transaction_entries")
+
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_crypto_transaction_details_transaction_id "
+        "ON crypto_transaction_details (transaction_id)"
+    )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    # Архивные секции (схема archive) в обратное преобразование не входят
+    _unpartition_table(bind, "transaction_entries")
+    _unpartition_table(bind, "transactions")
+
+    op.execute(
+        "ALTER TABLE transaction_entries ADD FOREIGN KEY (transaction_id) "
+        "REFERENCES transactions (id)"
+    )
+    op.execute(
+        "ALTER TABLE crypto_transaction_details ADD FOREIGN KEY (transaction_id) "
+        "REFERENCES transactions (id)"
+    )
@@ -0,0 +1,53 @@
+"""Trigram (pg_trgm) GIN indexes for ledger text search
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 15:00:00
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+# Индекс -> (таблица, колонка). Индексы секционированных таблиц
+# создаются на родительской таблице и наследуются секциями,
+# в том числе создаваемыми PartitionManager позже.
+TRIGRAM_INDEXES = {
+    "ix_transactions_description_trgm": ("transactions", "description"),
+    "ix_transaction_entries_description_trgm": ("transaction_entries", "description"),
+    "ix_counterparties_name_trgm": ("counterparties", "name"),
+    "ix_accounts_name_trgm": ("accounts", "name"),
+    "ix_crypto_transaction_details_wallet_from_trgm": ("crypto_transaction_details", "wallet_from"),
+    "ix_crypto_transaction_details_wallet_to_trgm": ("crypto_transaction_details", "wallet_to"),
+}
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, (table, column) in TRIGRAM_INDEXES.items():
+        op.execute(
+            f'CREATE INDEX IF NOT EXISTS "{name}" ON "{table}" '
+            f'USING gin ("{column}" gin_trgm_ops)'
+        )
+    # Поиск криптотранзакции по префиксу хеша
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_crypto_transaction_details_tx_hash "
+        "ON crypto_transaction_details (tx_hash text_pattern_ops)"
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.execute("DROP INDEX IF EXISTS ix_crypto_transaction_details_tx_hash")
+    for name in TRIGRAM_INDEXES:
+        op.execute(f'DROP INDEX IF EXISTS "{name}"')
+    # Расширение остается: им могут пользоваться другие сервисы базы
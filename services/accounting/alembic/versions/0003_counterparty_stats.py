@@ -0,0 +1,31 @@
+"""Precomputed per-counterparty turnover statistics
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 16:00:00
+
+"""
+from alembic import op
+from sqlmodel import Session
+
+from app.models.counterparties import CounterpartyStats
+from app.services.counterparty_stats import CounterpartyStatsService
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    CounterpartyStats.__table__.create(bind, checkfirst=True)
+
+    # Начальные обороты по уже проведенным транзакциям (сессия
+    # работает внутри транзакции миграции)
+    CounterpartyStatsService(Session(bind=bind)).rebuild()
+
+
+def downgrade() -> None:
+    CounterpartyStats.__table__.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,48 @@
+"""Storno links between reversal and original transactions
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 17:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+# Таблица -> новые колонки. В PostgreSQL колонки секционированной
+# таблицы добавляются на родительской и появляются во всех секциях
+COLUMNS = {
+    "transactions": [
+        sa.Column("reversal_of_id", sa.Integer(), nullable=True),
+        sa.Column("reversed_at", sa.DateTime(), nullable=True),
+    ],
+    "transaction_entries": [
+        sa.Column("reversal_of_id", sa.Integer(), nullable=True),
+    ],
+}
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for table, columns in COLUMNS.items():
+        # В новой базе колонки уже созданы по моделям (миграция 0001)
+        existing = {column["name"] for column in inspector.get_columns(table)}
+        for column in columns:
+            if column.name not in existing:
+                op.add_column(table, column)
+
+    indexes = {index["name"] for index in inspector.get_indexes("transactions")}
+    if "ix_transactions_reversal_of_id" not in indexes:
+        op.create_index("ix_transactions_reversal_of_id", "transactions", ["reversal_of_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_transactions_reversal_of_id", table_name="transactions")
+    for table, columns in COLUMNS.items():
+        for column in columns:
+            op.drop_column(table, column.name)
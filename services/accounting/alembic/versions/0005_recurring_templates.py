@@ -0,0 +1,28 @@
+"""Recurring transaction templates and posted occurrences
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 18:00:00
+
+"""
+from alembic import op
+
+from app.models.recurring import RecurringOccurrence, RecurringTemplate
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    RecurringTemplate.__table__.create(bind, checkfirst=True)
+    RecurringOccurrence.__table__.create(bind, checkfirst=True)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    RecurringOccurrence.__table__.drop(bind, checkfirst=True)
+    RecurringTemplate.__table__.drop(bind, checkfirst=True)
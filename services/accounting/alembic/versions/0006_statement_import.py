@@ -0,0 +1,30 @@
+"""Statement import rules, imports and review queue
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 20:00:00
+
+"""
+from alembic import op
+
+from app.models.statements import ImportRule, StatementImport, StatementLine
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    ImportRule.__table__.create(bind, checkfirst=True)
+    StatementImport.__table__.create(bind, checkfirst=True)
+    StatementLine.__table__.create(bind, checkfirst=True)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    StatementLine.__table__.drop(bind, checkfirst=True)
+    StatementImport.__table__.drop(bind, checkfirst=True)
+    ImportRule.__table__.drop(bind, checkfirst=True)
@@ -0,0 +1,28 @@
+"""Closed periods and per-account month-end balance checkpoints
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 22:00:00
+
+"""
+from alembic import op
+
+from app.models.periods import BalanceCheckpoint, ClosedPeriod
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    ClosedPeriod.__table__.create(bind, checkfirst=True)
+    BalanceCheckpoint.__table__.create(bind, checkfirst=True)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    BalanceCheckpoint.__table__.drop(bind, checkfirst=True)
+    ClosedPeriod.__table__.drop(bind, checkfirst=True)
@@ -0,0 +1,46 @@
+"""Per-project spend counters and budget threshold alerts
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 23:00:00
+
+"""
+from datetime import datetime
+from decimal import Decimal
+
+from alembic import op
+from sqlmodel import Session
+
+from app.models.projects import BudgetAlert, BudgetAlertRule, ProjectSpend
+from app.services.budgets import ProjectBudgetService
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    ProjectSpend.__table__.create(bind, checkfirst=True)
+    BudgetAlertRule.__table__.create(bind, checkfirst=True)
+    BudgetAlert.__table__.create(bind, checkfirst=True)
+
+    # Общие пороги по умолчанию: 80% и 100% бюджета
+    now = datetime.utcnow()
+    op.bulk_insert(BudgetAlertRule.__table__, [
+        {"threshold_pct": Decimal(pct), "project_id": None, "is_active": True, "created_at": now}
+        for pct in ("80", "100")
+    ])
+
+    # Начальные расходы по уже проведенным транзакциям (сессия
+    # работает внутри транзакции миграции)
+    ProjectBudgetService(Session(bind=bind)).rebuild()
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    BudgetAlert.__table__.drop(bind, checkfirst=True)
+    BudgetAlertRule.__table__.drop(bind, checkfirst=True)
+    ProjectSpend.__table__.drop(bind, checkfirst=True)
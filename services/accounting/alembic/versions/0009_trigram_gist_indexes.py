@@ -0,0 +1,48 @@
+"""Replace trigram GIN indexes with GiST for ranked (KNN) search
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-20 10:00:00
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+# GIN-индекс не отдает строки в порядке похожести, поэтому поиск
+# оценивал и сортировал все совпадения частого слова. GiST
+# поддерживает те же условия (<%, ILIKE) и упорядочение по
+# расстоянию <<->: лучшие совпадения читаются из индекса первыми.
+# Индекс -> (таблица, колонка), имена — как в миграции 0002.
+TRIGRAM_INDEXES = {
+    "ix_transactions_description_trgm": ("transactions", "description"),
+    "ix_transaction_entries_description_trgm": ("transaction_entries", "description"),
+    "ix_counterparties_name_trgm": ("counterparties", "name"),
+    "ix_accounts_name_trgm": ("accounts", "name"),
+    "ix_crypto_transaction_details_wallet_from_trgm": ("crypto_transaction_details", "wallet_from"),
+    "ix_crypto_transaction_details_wallet_to_trgm": ("crypto_transaction_details", "wallet_to"),
+}
+
+
+def _recreate(method: str, opclass: str) -> None:
+    for name, (table, column) in TRIGRAM_INDEXES.items():
+        op.execute(f'DROP INDEX IF EXISTS "{name}"')
+        op.execute(
+            f'CREATE INDEX "{name}" ON "{table}" USING {method} ("{column}" {opclass})'
+        )
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    _recreate("gist", "gist_trgm_ops")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    _recreate("gin", "gin_trgm_ops")
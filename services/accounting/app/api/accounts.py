@@ -6,10 +6,13 @@ from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlmodel import Session, select
 
-from app.core.database import get_session
+from app.core.database import get_read_session, get_session
 from app.core.auth import current_active_user
+from app.core.responses import rows_response, schema_columns
 from app.models.users import User
 from app.models.accounts import Account, AccountCreate, AccountUpdate, AccountRead
+from app.models.changes import ChangeEntity, ChangeOperation
+from app.services.changes import record_change
 
 router = APIRouter()
 
@@ -17,18 +20,17 @@ router = APIRouter()
 def get_accounts(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_session),
+    db: Session = Depends(get_read_session),
     user: User = Depends(current_active_user)
 ):
     """Получение списка счетов"""
-    statement = select(Account).offset(skip).limit(limit)
-    accounts = db.exec(statement).all()
-    return accounts
+    statement = select(*schema_columns(Account, AccountRead)).offset(skip).limit(limit)
+    return rows_response(db.execute(statement).mappings())
 
 @router.get("/{account_id}", response_model=AccountRead)
 def get_account(
     account_id: int,
-    db: Session = Depends(get_session),
+    db: Session = Depends(get_read_session),
     user: User = Depends(current_active_user)
 ):
     """Получение счета по ID"""
@@ -49,6 +51,11 @@ def create_account(
     """Создание нового счета"""
     account = Account(**account_data.model_dump())
     db.add(account)
+    db.flush()
+    record_change(
+        db, ChangeEntity.ACCOUNT, account.id, ChangeOperation.INSERT,
+        AccountRead.model_validate(account).model_dump(mode="json")
+    )
     db.commit()
     db.refresh(account)
     return account
@@ -72,6 +79,10 @@ def update_account(
         setattr(account, field, value)
     
     db.add(account)
+    record_change(
+        db, ChangeEntity.ACCOUNT, account.id, ChangeOperation.UPDATE,
+        AccountRead.model_validate(account).model_dump(mode="json")
+    )
     db.commit()
     db.refresh(account)
     return account
@@ -91,5 +102,6 @@ def delete_account(
         )
     
     db.delete(account)
+    record_change(db, ChangeEntity.ACCOUNT, account_id, ChangeOperation.DELETE)
     db.commit()
     return {"message": "Account deleted successfully"}
@@ -0,0 +1,95 @@
+"""
+API роуты бюджетов проектов
+"""
+
+from decimal import Decimal
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlmodel import Session, select
+
+from app.core.database import get_read_session, get_session
+from app.core.auth import current_active_user
+from app.models.users import User
+from app.models.projects import (
+    BudgetAlert, BudgetAlertRead, BudgetAlertRule, BudgetAlertRuleCreate, BudgetAlertRuleRead,
+    ProjectStatus
+)
+from app.schemas.budgets import BudgetOverview
+from app.services.budgets import ProjectBudgetService
+
+router = APIRouter()
+
+
+@router.get("/", response_model=BudgetOverview)
+def get_budget_overview(
+    status: Optional[ProjectStatus] = None,
+    min_used_pct: Optional[Decimal] = Query(None, ge=0),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    db: Session = Depends(get_read_session),
+    user: User = Depends(current_active_user)
+):
+    """
+    Расходы проектов относительно бюджета
+
+    Читается из таблицы project_spend, которая обновляется при
+    проведении, без сканирования транзакций.
+    """
+    return ProjectBudgetService(db).overview(status, min_used_pct, skip, limit)
+
+
+@router.get("/rules", response_model=List[BudgetAlertRuleRead])
+def get_alert_rules(
+    project_id: Optional[int] = None,
+    db: Session = Depends(get_read_session),
+    user: User = Depends(current_active_user)
+):
+    """Пороги бюджета: общие и проекта project_id"""
+    statement = select(BudgetAlertRule)
+    if project_id:
+        statement = statement.where(BudgetAlertRule.project_id == project_id)
+    return db.exec(statement.order_by(BudgetAlertRule.threshold_pct)).all()
+
+
+@router.post("/rules", response_model=BudgetAlertRuleRead)
+def create_alert_rule(
+    rule_data: BudgetAlertRuleCreate,
+    db: Session = Depends(get_session),
+    user: User = Depends(current_active_user)
+):
+    """Создание порога (без project_id — для всех проектов)"""
+    return ProjectBudgetService(db).create_rule(rule_data)
+
+
+@router.delete("/rules/{rule_id}")
+def delete_alert_rule(
+    rule_id: int,
+    db: Session = Depends(get_session),
+    user: User = Depends(current_active_user)
+):
+    """Удаление порога"""
+    rule = db.get(BudgetAlertRule, rule_id)
+    if not rule:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Budget alert rule not found"
+        )
+    db.delete(rule)
+    db.commit()
+    return {"message": "Budget alert rule deleted successfully"}
+
+
+@router.get("/alerts", response_model=List[BudgetAlertRead])
+def get_alerts(
+    project_id: Optional[int] = None,
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_read_session),
+    user: User = Depends(current_active_user)
+):
+    """События пересечения порогов, последние первыми"""
+    statement = select(BudgetAlert)
+    if project_id:
+        statement = statement.where(BudgetAlert.project_id == project_id)
+    statement = statement.order_by(BudgetAlert.id.desc()).offset(skip).limit(limit)
+    return db.exec(statement).all()
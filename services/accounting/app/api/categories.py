@@ -6,10 +6,13 @@ from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlmodel import Session, select
 
-from app.core.database import get_session
+from app.core.database import get_read_session, get_session
 from app.core.auth import current_active_user
 from app.models.users import User
-from app.models.categories import Category, CategoryCreate, CategoryUpdate, CategoryRead
+from app.models.categories import (
+    Category, CategoryCreate, CategoryUpdate, CategoryRead, CategoryTreeNode
+)
+from app.services.categories import CategoryTreeService, invalidate_category_tree
 
 router = APIRouter()
 
@@ -17,7 +20,7 @@ router = APIRouter()
 def get_categories(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_session),
+    db: Session = Depends(get_read_session),
     user: User = Depends(current_active_user)
 ):
     """Получение списка категорий"""
@@ -25,10 +28,18 @@ def get_categories(
     categories = db.exec(statement).all()
     return categories
 
+@router.get("/tree", response_model=List[CategoryTreeNode])
+def get_category_tree(
+    db: Session = Depends(get_session),
+    user: User = Depends(current_active_user)
+):
+    """Дерево категорий для выбора в интерфейсе (кэшируется в памяти)"""
+    return CategoryTreeService(db).get_tree()
+
 @router.get("/{category_id}", response_model=CategoryRead)
 def get_category(
     category_id: int,
-    db: Session = Depends(get_session),
+    db: Session = Depends(get_read_session),
     user: User = Depends(current_active_user)
 ):
     """Получение категории по ID"""
@@ -47,10 +58,16 @@ def create_category(
     user: User = Depends(current_active_user)
 ):
     """Создание новой категории"""
+    tree = CategoryTreeService(db)
+    tree.validate_parent(category_data.parent_id)
+    
     category = Category(**category_data.model_dump())
     db.add(category)
+    db.flush()
+    tree.add_node(category)
     db.commit()
     db.refresh(category)
+    invalidate_category_tree()
     return category
 
 @router.put("/{category_id}", response_model=CategoryRead)
@@ -68,12 +85,21 @@ def update_category(
             detail="Category not found"
         )
     
-    for field, value in category_data.model_dump(exclude_unset=True).items():
+    changes = category_data.model_dump(exclude_unset=True)
+    
+    # Перенос в другое место дерева
+    if "parent_id" in changes and changes["parent_id"] != category.parent_id:
+        tree = CategoryTreeService(db)
+        tree.validate_parent(changes["parent_id"], category.id)
+        tree.move_node(category, changes["parent_id"])
+    
+    for field, value in changes.items():
         setattr(category, field, value)
     
     db.add(category)
     db.commit()
     db.refresh(category)
+    invalidate_category_tree()
     return category
 
 @router.delete("/{category_id}")
@@ -90,6 +116,8 @@ def delete_category(
             detail="Category not found"
         )
     
+    CategoryTreeService(db).remove_node(category)
     db.delete(category)
     db.commit()
+    invalidate_category_tree()
     return {"message": "Category deleted successfully"}
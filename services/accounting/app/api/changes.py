@@ -0,0 +1,49 @@
+"""
+API роуты ленты изменений книги
+"""
+
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, Query, Request
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
+from app.core.auth import current_active_user
+from app.models.changes import ChangeFeed
+from app.models.users import User
+from app.services.changes import stream_changes, wait_for_changes
+
+router = APIRouter()
+
+
+@router.get("", response_model=ChangeFeed)
+async def get_changes(
+    since: int = Query(0, ge=0, description="Курсор последнего полученного изменения"),
+    limit: int = Query(500, ge=1, le=5000),
+    wait: int = Query(0, ge=0, description="Ожидание новых изменений, секунд (длинный опрос)"),
+    user: User = Depends(current_active_user)
+):
+    """
+    Изменения транзакций и счетов после курсора since
+
+    Клиент хранит cursor из ответа и передает его в следующем
+    запросе. С wait > 0 ответ задерживается до появления изменений
+    (не дольше CHANGE_FEED_MAX_WAIT). 410 — курсор старше хранимой
+    ленты, нужна полная синхронизация.
+    """
+    return await wait_for_changes(since, limit, min(wait, settings.CHANGE_FEED_MAX_WAIT))
+
+
+@router.get("/stream")
+async def stream(
+    request: Request,
+    since: Optional[int] = Query(None, ge=0),
+    last_event_id: Optional[int] = Header(None),
+    user: User = Depends(current_active_user)
+):
+    """Поток изменений (Server-Sent Events) с курсора since или Last-Event-ID"""
+    cursor = since if since is not None else (last_event_id or 0)
+    return StreamingResponse(
+        stream_changes(request, cursor),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -2,14 +2,22 @@
 API роуты для управления контрагентами
 """
 
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlmodel import Session, select
 
-from app.core.database import get_session
+from app.core.database import get_read_session, get_session
 from app.core.auth import current_active_user
 from app.models.users import User
-from app.models.counterparties import Counterparty, CounterpartyCreate, CounterpartyUpdate, CounterpartyRead
+from app.models.counterparties import (
+    Counterparty, CounterpartyStats, CounterpartyType, CounterpartyCreate, CounterpartyUpdate,
+    CounterpartyRead
+)
+from app.schemas.counterparties import (
+    CounterpartyLeaderboard, CounterpartyStatsRead, CounterpartyStatsSort
+)
+from app.services.counterparty_stats import CounterpartyStatsService
 
 router = APIRouter()
 
@@ -17,7 +25,7 @@ router = APIRouter()
 def get_counterparties(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_session),
+    db: Session = Depends(get_read_session),
     user: User = Depends(current_active_user)
 ):
     """Получение списка контрагентов"""
@@ -25,10 +33,42 @@ def get_counterparties(
     counterparties = db.exec(statement).all()
     return counterparties
 
+@router.get("/leaderboard", response_model=CounterpartyLeaderboard)
+def get_counterparty_leaderboard(
+    sort: CounterpartyStatsSort = CounterpartyStatsSort.TURNOVER,
+    descending: bool = True,
+    type: Optional[CounterpartyType] = None,
+    active_only: bool = False,
+    active_since: Optional[datetime] = None,
+    min_transactions: int = Query(0, ge=0),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_read_session),
+    user: User = Depends(current_active_user)
+):
+    """
+    Рейтинг контрагентов по оборотам
+
+    Читается из предрасчитанной таблицы counterparty_stats без
+    сканирования транзакций.
+    """
+    return CounterpartyStatsService(db).leaderboard(
+        sort, descending, type, active_only, active_since, min_transactions, skip, limit
+    )
+
+@router.get("/{counterparty_id}/stats", response_model=CounterpartyStatsRead)
+def get_counterparty_stats(
+    counterparty_id: int,
+    db: Session = Depends(get_read_session),
+    user: User = Depends(current_active_user)
+):
+    """Оплачено, получено, количество транзакций и последняя активность контрагента"""
+    return CounterpartyStatsService(db).get(counterparty_id)
+
 @router.get("/{counterparty_id}", response_model=CounterpartyRead)
 def get_counterparty(
     counterparty_id: int,
-    db: Session = Depends(get_session),
+    db: Session = Depends(get_read_session),
     user: User = Depends(current_active_user)
 ):
     """Получение контрагента по ID"""
@@ -90,6 +130,9 @@ def delete_counterparty(
             detail="Counterparty not found"
         )
     
+    stats = db.get(CounterpartyStats, counterparty_id)
+    if stats:
+        db.delete(stats)
     db.delete(counterparty)
     db.commit()
     return {"message": "Counterparty deleted successfully"}
@@ -8,7 +8,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlmodel import Session
 from pydantic import BaseModel
 
-from app.core.database import get_session
+from app.core.database import get_read_session, get_session
 from app.core.auth import current_active_user
 from app.models.users import User
 from app.models.transactions import TransactionRead, CryptoTransactionDetail
@@ -157,7 +157,7 @@ async def validate_tron_transaction(
 @router.get("/transactions/{transaction_id}/details")
 def get_crypto_transaction_details(
     transaction_id: int,
-    db: Session = Depends(get_session),
+    db: Session = Depends(get_read_session),
     user: User = Depends(current_active_user)
 ):
     """Получение деталей криптовалютной транзакции"""
@@ -187,7 +187,7 @@ def get_crypto_transaction_details(
 @router.get("/accounts/{account_id}/summary")
 def get_crypto_account_summary(
     account_id: int,
-    db: Session = Depends(get_session),
+    db: Session = Depends(get_read_session),
     user: User = Depends(current_active_user)
 ):
     """Получение сводки по криптовалютному счету"""
@@ -0,0 +1,60 @@
+"""
+API роуты для курсов валют
+"""
+
+from datetime import date
+from typing import List, Optional
+from fastapi import APIRouter, Depends
+from sqlmodel import Session
+
+from app.core.database import get_read_session, get_session
+from app.core.auth import current_active_user
+from app.models.currencies import ExchangeRateCreate, ExchangeRateRead
+from app.models.users import User
+from app.services.crypto import CryptoService
+from app.services.currency import CurrencyService
+
+router = APIRouter()
+
+
+@router.get("/rates", response_model=List[ExchangeRateRead])
+def get_rates(
+    currency: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_read_session),
+    user: User = Depends(current_active_user)
+):
+    """История курсов валют к USD"""
+    return CurrencyService(db).list_rates(currency, start, end, skip, limit)
+
+
+@router.post("/rates", response_model=ExchangeRateRead)
+def set_rate(
+    rate_data: ExchangeRateCreate,
+    db: Session = Depends(get_session),
+    user: User = Depends(current_active_user)
+):
+    """Установка курса валюты, действующего с указанной даты"""
+    return CurrencyService(db).set_rate(rate_data)
+
+
+@router.post("/rates/sync", response_model=List[ExchangeRateRead])
+async def sync_rates(
+    db: Session = Depends(get_session),
+    user: User = Depends(current_active_user)
+):
+    """Сохранение текущих курсов криптовалют как курсов на сегодня"""
+    rates = await CryptoService(db).update_crypto_rates()
+    service = CurrencyService(db)
+    return [
+        service.set_rate(ExchangeRateCreate(
+            currency=currency,
+            rate_to_usd=rate,
+            effective_date=date.today(),
+            source="coingecko",
+        ))
+        for currency, rate in rates.items()
+    ]
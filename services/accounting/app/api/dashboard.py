@@ -0,0 +1,23 @@
+"""
+API роуты главной панели
+"""
+
+from fastapi import APIRouter, Depends
+from sqlmodel import Session
+
+from app.core.database import get_read_session
+from app.core.auth import current_active_user
+from app.models.users import User
+from app.schemas.dashboard import DashboardSummary
+from app.services.dashboard import DashboardService
+
+router = APIRouter()
+
+
+@router.get("/summary", response_model=DashboardSummary)
+async def get_dashboard_summary(
+    db: Session = Depends(get_read_session),
+    user: User = Depends(current_active_user)
+):
+    """Счета, последние транзакции, итоги проектов за период и курсы одним ответом"""
+    return await DashboardService(db).summary(user.id)
@@ -0,0 +1,32 @@
+"""
+API роуты проверки целостности книги
+"""
+
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from sqlmodel import Session
+
+from app.core.database import get_session
+from app.core.auth import current_active_user
+from app.models.users import User
+from app.schemas.integrity import IntegrityReport
+from app.services.integrity import LedgerIntegrityService
+
+router = APIRouter()
+
+
+@router.post("/verify", response_model=IntegrityReport)
+def verify_ledger(
+    repair: bool = False,
+    workers: Optional[int] = Query(None, ge=1, le=32),
+    db: Session = Depends(get_session),
+    user: User = Depends(current_active_user)
+):
+    """
+    Проверка книги: балансы счетов против суммы проводок и двойная
+    запись в каждой транзакции
+
+    При repair=true расхождения балансов исправляются по проводкам;
+    нарушения в транзакциях только сообщаются.
+    """
+    return LedgerIntegrityService(db).verify(repair=repair, workers=workers)
@@ -0,0 +1,95 @@
+"""
+API роуты закрытия периодов
+"""
+
+from datetime import date, datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends
+from sqlmodel import Session, select
+
+from app.core.database import get_read_session, get_session
+from app.core.auth import current_active_user
+from app.models.users import User
+from app.models.periods import (
+    AccountBalanceAt, BalanceCheckpoint, BalanceCheckpointRead, ClosedPeriod, ClosedPeriodRead,
+    PeriodCloseRequest
+)
+from app.services.periods import PeriodService
+
+router = APIRouter()
+
+
+@router.get("/", response_model=List[ClosedPeriodRead])
+def get_closed_periods(
+    db: Session = Depends(get_read_session),
+    user: User = Depends(current_active_user)
+):
+    """Закрытые месяцы, последние первыми"""
+    return db.exec(select(ClosedPeriod).order_by(ClosedPeriod.month.desc())).all()
+
+
+@router.post("/close", response_model=List[ClosedPeriodRead])
+def close_periods(
+    close_data: PeriodCloseRequest,
+    db: Session = Depends(get_session),
+    user: User = Depends(current_active_user)
+):
+    """
+    Закрытие месяцев по month включительно
+
+    Для каждого счета сохраняется баланс на конец каждого закрываемого
+    месяца; проводки с датой в закрытых месяцах больше не принимаются.
+    """
+    return PeriodService(db).close(close_data.month, user.id)
+
+
+@router.post("/reopen")
+def reopen_periods(
+    month: date,
+    db: Session = Depends(get_session),
+    user: User = Depends(current_active_user)
+):
+    """Открытие месяца и всех последующих закрытых месяцев"""
+    return {"reopened": PeriodService(db).reopen(month)}
+
+
+@router.get("/checkpoints", response_model=List[BalanceCheckpointRead])
+def get_checkpoints(
+    account_id: Optional[int] = None,
+    month: Optional[date] = None,
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_read_session),
+    user: User = Depends(current_active_user)
+):
+    """Балансы и обороты счетов на конец закрытых месяцев"""
+    statement = select(BalanceCheckpoint)
+    if account_id:
+        statement = statement.where(BalanceCheckpoint.account_id == account_id)
+    if month:
+        statement = statement.where(BalanceCheckpoint.month == month.replace(day=1))
+    statement = statement.order_by(
+        BalanceCheckpoint.month.desc(), BalanceCheckpoint.account_id
+    ).offset(skip).limit(limit)
+    return db.exec(statement).all()
+
+
+@router.get("/balances", response_model=List[AccountBalanceAt])
+def get_balances_as_of(
+    at: datetime,
+    db: Session = Depends(get_read_session),
+    user: User = Depends(current_active_user)
+):
+    """Балансы всех счетов на момент at (включительно)"""
+    return PeriodService(db).balances_as_of(at)
+
+
+@router.get("/balances/{account_id}", response_model=AccountBalanceAt)
+def get_balance_as_of(
+    account_id: int,
+    at: datetime,
+    db: Session = Depends(get_read_session),
+    user: User = Depends(current_active_user)
+):
+    """Баланс счета на момент at (включительно)"""
+    return PeriodService(db).balance_as_of(account_id, at)
@@ -4,12 +4,18 @@ API роуты для управления проектами
 
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import delete
 from sqlmodel import Session, select
 
-from app.core.database import get_session
+from app.core.database import get_read_session, get_session
 from app.core.auth import current_active_user
+from app.core.cache import LEDGER_DATASET, bump_data_version
 from app.models.users import User
-from app.models.projects import Project, ProjectCreate, ProjectUpdate, ProjectRead
+from app.models.projects import (
+    Project, ProjectCreate, ProjectUpdate, ProjectRead,
+    ProjectCampaign, ProjectCampaignCreate, ProjectCampaignRead,
+    BudgetAlert, BudgetAlertRule, ProjectSpend
+)
 
 router = APIRouter()
 
@@ -17,7 +23,7 @@ router = APIRouter()
 def get_projects(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_session),
+    db: Session = Depends(get_read_session),
     user: User = Depends(current_active_user)
 ):
     """Получение списка проектов"""
@@ -28,7 +34,7 @@ def get_projects(
 @router.get("/{project_id}", response_model=ProjectRead)
 def get_project(
     project_id: int,
-    db: Session = Depends(get_session),
+    db: Session = Depends(get_read_session),
     user: User = Depends(current_active_user)
 ):
     """Получение проекта по ID"""
@@ -51,6 +57,8 @@ def create_project(
     db.add(project)
     db.commit()
     db.refresh(project)
+    # Отчеты по проектам перечисляют все проекты
+    bump_data_version(LEDGER_DATASET)
     return project
 
 @router.put("/{project_id}", response_model=ProjectRead)
@@ -74,6 +82,7 @@ def update_project(
     db.add(project)
     db.commit()
     db.refresh(project)
+    bump_data_version(LEDGER_DATASET)
     return project
 
 @router.delete("/{project_id}")
@@ -90,6 +99,74 @@ def delete_project(
             detail="Project not found"
         )
     
+    # Привязки кампаний, расходы, пороги и события бюджета удаляются
+    # вместе с проектом
+    db.execute(delete(ProjectCampaign).where(ProjectCampaign.project_id == project_id))
+    db.execute(delete(ProjectSpend).where(ProjectSpend.project_id == project_id))
+    db.execute(delete(BudgetAlertRule).where(BudgetAlertRule.project_id == project_id))
+    db.execute(delete(BudgetAlert).where(BudgetAlert.project_id == project_id))
     db.delete(project)
     db.commit()
+    bump_data_version(LEDGER_DATASET)
     return {"message": "Project deleted successfully"}
+
+@router.get("/{project_id}/campaigns", response_model=List[ProjectCampaignRead])
+def get_project_campaigns(
+    project_id: int,
+    db: Session = Depends(get_read_session),
+    user: User = Depends(current_active_user)
+):
+    """Кампании аналитики трафика, привязанные к проекту"""
+    statement = select(ProjectCampaign).where(ProjectCampaign.project_id == project_id)
+    return db.exec(statement).all()
+
+@router.post("/{project_id}/campaigns", response_model=ProjectCampaignRead)
+def add_project_campaign(
+    project_id: int,
+    campaign_data: ProjectCampaignCreate,
+    db: Session = Depends(get_session),
+    user: User = Depends(current_active_user)
+):
+    """Привязка кампании к проекту"""
+    if not db.get(Project, project_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    
+    existing = db.exec(
+        select(ProjectCampaign).where(ProjectCampaign.campaign == campaign_data.campaign)
+    ).first()
+    if existing:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Campaign is already linked to project {existing.project_id}"
+        )
+    
+    link = ProjectCampaign(project_id=project_id, campaign=campaign_data.campaign)
+    db.add(link)
+    db.commit()
+    db.refresh(link)
+    # Привязка кампаний меняет отчеты по проектам
+    bump_data_version(LEDGER_DATASET)
+    return link
+
+@router.delete("/{project_id}/campaigns/{campaign_id}")
+def delete_project_campaign(
+    project_id: int,
+    campaign_id: int,
+    db: Session = Depends(get_session),
+    user: User = Depends(current_active_user)
+):
+    """Отвязка кампании от проекта"""
+    link = db.get(ProjectCampaign, campaign_id)
+    if not link or link.project_id != project_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project campaign not found"
+        )
+    
+    db.delete(link)
+    db.commit()
+    bump_data_version(LEDGER_DATASET)
+    return {"message": "Campaign unlinked successfully"}
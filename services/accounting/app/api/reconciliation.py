@@ -0,0 +1,35 @@
+"""
+API роуты для сверки расходов на трафик с бухгалтерией
+"""
+
+from datetime import date
+from decimal import Decimal
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from sqlmodel import Session
+
+from app.core.database import get_read_session
+from app.core.auth import current_active_user
+from app.models.users import User
+from app.schemas.reconciliation import ReconciliationReport
+from app.services.reconciliation import ReconciliationService
+
+router = APIRouter()
+
+
+@router.get("/spend", response_model=ReconciliationReport)
+async def reconcile_spend(
+    start: date,
+    end: date,
+    project_id: Optional[int] = None,
+    amount_tolerance: Decimal = Query(Decimal("1"), ge=0),
+    amount_tolerance_pct: Decimal = Query(Decimal("0.01"), ge=0, le=1),
+    date_tolerance_days: int = Query(1, ge=0, le=31),
+    db: Session = Depends(get_read_session),
+    user: User = Depends(current_active_user)
+):
+    """Сверка дневного расхода из аналитики трафика с расходными транзакциями проектов"""
+    service = ReconciliationService(db)
+    return await service.reconcile(
+        start, end, project_id, amount_tolerance, amount_tolerance_pct, date_tolerance_days
+    )
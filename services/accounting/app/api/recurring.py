@@ -0,0 +1,119 @@
+"""
+API роуты шаблонов повторяющихся транзакций
+"""
+
+from datetime import datetime
+from typing import List
+from fastapi import APIRouter, Depends, Query
+from sqlmodel import Session, select
+
+from app.core.database import get_read_session, get_session
+from app.core.auth import current_active_user
+from app.models.users import User
+from app.models.recurring import (
+    RecurringOccurrence, RecurringOccurrenceRead, RecurringTemplate, RecurringTemplateCreate,
+    RecurringTemplateRead, RecurringTemplateUpdate
+)
+from app.services.recurring import RecurringService
+
+router = APIRouter()
+
+
+@router.get("/", response_model=List[RecurringTemplateRead])
+def get_templates(
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_read_session),
+    user: User = Depends(current_active_user)
+):
+    """Получение списка шаблонов"""
+    statement = select(RecurringTemplate).order_by(RecurringTemplate.id).offset(skip).limit(limit)
+    return db.exec(statement).all()
+
+
+@router.post("/", response_model=RecurringTemplateRead)
+def create_template(
+    template_data: RecurringTemplateCreate,
+    db: Session = Depends(get_session),
+    user: User = Depends(current_active_user)
+):
+    """
+    Создание шаблона
+
+    schedule — cron-выражение в UTC, например "0 9 1 * *" (1-го числа
+    в 09:00). Сумма фиксированная (amount) или по формуле (formula),
+    например "amount * days_in_month / 30".
+    """
+    return RecurringService(db).create_template(template_data)
+
+
+@router.post("/run")
+def run_templates(
+    db: Session = Depends(get_session),
+    user: User = Depends(current_active_user)
+):
+    """Проведение наступивших наступлений сейчас, не дожидаясь планировщика"""
+    return RecurringService(db).run()
+
+
+@router.get("/{template_id}", response_model=RecurringTemplateRead)
+def get_template(
+    template_id: int,
+    db: Session = Depends(get_read_session),
+    user: User = Depends(current_active_user)
+):
+    """Получение шаблона по ID"""
+    return RecurringService(db).get_template(template_id)
+
+
+@router.put("/{template_id}", response_model=RecurringTemplateRead)
+def update_template(
+    template_id: int,
+    template_data: RecurringTemplateUpdate,
+    db: Session = Depends(get_session),
+    user: User = Depends(current_active_user)
+):
+    """Обновление шаблона"""
+    return RecurringService(db).update_template(template_id, template_data)
+
+
+@router.delete("/{template_id}")
+def deactivate_template(
+    template_id: int,
+    db: Session = Depends(get_session),
+    user: User = Depends(current_active_user)
+):
+    """Отключение шаблона (проведенные транзакции и история сохраняются)"""
+    RecurringService(db).update_template(template_id, RecurringTemplateUpdate(is_active=False))
+    return {"message": "Recurring template deactivated"}
+
+
+@router.get("/{template_id}/preview", response_model=List[datetime])
+def preview_template(
+    template_id: int,
+    count: int = Query(12, ge=1, le=100),
+    db: Session = Depends(get_read_session),
+    user: User = Depends(current_active_user)
+):
+    """Ближайшие наступления по расписанию"""
+    return RecurringService(db).preview(template_id, count)
+
+
+@router.get("/{template_id}/occurrences", response_model=List[RecurringOccurrenceRead])
+def get_occurrences(
+    template_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_read_session),
+    user: User = Depends(current_active_user)
+):
+    """Проведенные наступления шаблона, новые первыми"""
+    RecurringService(db).get_template(template_id)
+    statement = (
+        select(RecurringOccurrence)
+        .where(RecurringOccurrence.template_id == template_id)
+        .order_by(RecurringOccurrence.occurrence_at.desc())
+        .offset(skip)
+        .limit(limit)
+    )
+    return db.exec(statement).all()
@@ -0,0 +1,56 @@
+"""
+API роуты для отчетов
+"""
+
+from datetime import date
+from typing import Optional
+from fastapi import APIRouter, Depends
+from sqlmodel import Session
+
+from app.core.database import get_read_session
+from app.core.auth import current_active_user
+from app.models.transactions import TransactionType
+from app.models.users import User
+from app.schemas.reports import CategoryRollupReport, ProjectRoiReport
+from app.services.reports import ReportService
+
+router = APIRouter()
+
+
+@router.get("/projects/roi", response_model=ProjectRoiReport)
+async def get_projects_roi(
+    start: date,
+    end: date,
+    currency: Optional[str] = None,
+    db: Session = Depends(get_read_session),
+    user: User = Depends(current_active_user)
+):
+    """P&L и ROI всех проектов за период"""
+    return await ReportService(db).project_roi(start, end, currency=currency)
+
+
+@router.get("/projects/{project_id}/roi", response_model=ProjectRoiReport)
+async def get_project_roi(
+    project_id: int,
+    start: date,
+    end: date,
+    currency: Optional[str] = None,
+    db: Session = Depends(get_read_session),
+    user: User = Depends(current_active_user)
+):
+    """P&L и ROI проекта за период"""
+    return await ReportService(db).project_roi(start, end, project_id, currency)
+
+
+@router.get("/categories/rollup", response_model=CategoryRollupReport)
+def get_category_rollup(
+    start: date,
+    end: date,
+    root_id: Optional[int] = None,
+    type: Optional[TransactionType] = None,
+    currency: Optional[str] = None,
+    db: Session = Depends(get_read_session),
+    user: User = Depends(current_active_user)
+):
+    """Суммы по категориям с учетом всех подкатегорий"""
+    return ReportService(db).category_rollup(start, end, root_id, type, currency)
@@ -0,0 +1,46 @@
+"""
+API роуты поиска по книге
+"""
+
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlmodel import Session
+
+from app.core.database import get_read_session
+from app.core.auth import current_active_user
+from app.models.users import User
+from app.schemas.search import SearchResults, Suggestion
+from app.services.search import SearchService
+
+router = APIRouter()
+
+
+@router.get("", response_model=SearchResults)
+def search(
+    q: str = Query(..., min_length=2, max_length=200),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_read_session),
+    user: User = Depends(current_active_user)
+):
+    """
+    Поиск транзакций (описание, проводки, контрагент, кошелек),
+    контрагентов и счетов
+
+    Период [start, end) ограничивает просматриваемые секции книги.
+    """
+    return SearchService(db).search(q, start, end, limit)
+
+
+@router.get("/autocomplete", response_model=List[Suggestion])
+def autocomplete(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_read_session),
+    user: User = Depends(current_active_user)
+):
+    """Автодополнение по префиксу: контрагенты, счета, частые описания"""
+    return SearchService(db).autocomplete(q, limit)
@@ -0,0 +1,173 @@
+"""
+API роуты импорта выписок
+"""
+
+from typing import List, Optional
+from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status
+from sqlmodel import Session, select
+
+from app.core.database import get_read_session, get_session
+from app.core.auth import current_active_user
+from app.models.users import User
+from app.models.transactions import TransactionRead
+from app.models.statements import (
+    ImportRule, ImportRuleCreate, ImportRuleRead, ImportRuleUpdate, StatementColumns,
+    StatementImport, StatementImportRead, StatementLine, StatementLineRead, StatementLineStatus,
+    StatementLinesPost
+)
+from app.services.statements import StatementService
+
+router = APIRouter()
+
+
+@router.get("/rules", response_model=List[ImportRuleRead])
+def get_rules(
+    db: Session = Depends(get_read_session),
+    user: User = Depends(current_active_user)
+):
+    """Получение правил в порядке применения"""
+    statement = select(ImportRule).order_by(ImportRule.priority, ImportRule.id)
+    return db.exec(statement).all()
+
+
+@router.post("/rules", response_model=ImportRuleRead)
+def create_rule(
+    rule_data: ImportRuleCreate,
+    db: Session = Depends(get_session),
+    user: User = Depends(current_active_user)
+):
+    """
+    Создание правила
+
+    pattern — подстрока описания без учета регистра или регулярное
+    выражение (is_regex). Незаданные условия не проверяются.
+    """
+    return StatementService(db).create_rule(rule_data)
+
+
+@router.put("/rules/{rule_id}", response_model=ImportRuleRead)
+def update_rule(
+    rule_id: int,
+    rule_data: ImportRuleUpdate,
+    db: Session = Depends(get_session),
+    user: User = Depends(current_active_user)
+):
+    """Обновление правила"""
+    return StatementService(db).update_rule(rule_id, rule_data)
+
+
+@router.delete("/rules/{rule_id}")
+def delete_rule(
+    rule_id: int,
+    db: Session = Depends(get_session),
+    user: User = Depends(current_active_user)
+):
+    """Удаление правила"""
+    rule = StatementService(db).get_rule(rule_id)
+    db.delete(rule)
+    db.commit()
+    return {"message": "Import rule deleted successfully"}
+
+
+@router.post("/import", response_model=StatementImportRead)
+def import_statement(
+    file: UploadFile = File(...),
+    bank_account_id: int = Form(...),
+    income_account_id: int = Form(...),
+    expense_account_id: int = Form(...),
+    date_column: str = Form("date"),
+    description_column: str = Form("description"),
+    amount_column: str = Form("amount"),
+    outflow_column: Optional[str] = Form(None),
+    wallet_column: Optional[str] = Form(None),
+    delimiter: str = Form(","),
+    date_format: Optional[str] = Form(None),
+    decimal_comma: bool = Form(False),
+    db: Session = Depends(get_session),
+    user: User = Depends(current_active_user)
+):
+    """
+    Импорт CSV выписки
+
+    Строки с совпавшим правилом проводятся на счет выписки
+    (bank_account_id) и счет доходов или расходов, остальные — в
+    очередь разбора.
+    """
+    columns = StatementColumns(
+        date_column=date_column,
+        description_column=description_column,
+        amount_column=amount_column,
+        outflow_column=outflow_column or None,
+        wallet_column=wallet_column or None,
+        delimiter=delimiter,
+        date_format=date_format or None,
+        decimal_comma=decimal_comma,
+    )
+    return StatementService(db).import_statement(
+        file, bank_account_id, income_account_id, expense_account_id, columns
+    )
+
+
+@router.get("/imports", response_model=List[StatementImportRead])
+def get_imports(
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_read_session),
+    user: User = Depends(current_active_user)
+):
+    """Получение импортов, новые первыми"""
+    statement = select(StatementImport).order_by(StatementImport.id.desc()).offset(skip).limit(limit)
+    return db.exec(statement).all()
+
+
+@router.get("/imports/{import_id}", response_model=StatementImportRead)
+def get_import(
+    import_id: int,
+    db: Session = Depends(get_read_session),
+    user: User = Depends(current_active_user)
+):
+    """Получение импорта по ID"""
+    statement_import = db.get(StatementImport, import_id)
+    if not statement_import:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Statement import not found"
+        )
+    return statement_import
+
+
+@router.get("/review", response_model=List[StatementLineRead])
+def get_review_queue(
+    import_id: Optional[int] = None,
+    line_status: StatementLineStatus = StatementLineStatus.PENDING,
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_read_session),
+    user: User = Depends(current_active_user)
+):
+    """Очередь разбора: строки без совпавшего правила или с ошибкой"""
+    statement = select(StatementLine).where(StatementLine.status == line_status)
+    if import_id:
+        statement = statement.where(StatementLine.import_id == import_id)
+    statement = statement.order_by(StatementLine.id).offset(skip).limit(limit)
+    return db.exec(statement).all()
+
+
+@router.post("/review/post", response_model=List[TransactionRead])
+def post_review_lines(
+    lines_data: StatementLinesPost,
+    db: Session = Depends(get_session),
+    user: User = Depends(current_active_user)
+):
+    """Проведение строк очереди с одинаковыми категорией, контрагентом и проектом"""
+    return StatementService(db).post_lines(lines_data)
+
+
+@router.post("/review/dismiss")
+def dismiss_review_lines(
+    line_ids: List[int],
+    db: Session = Depends(get_session),
+    user: User = Depends(current_active_user)
+):
+    """Исключение строк из очереди без проведения"""
+    return {"dismissed": StatementService(db).dismiss_lines(line_ids)}
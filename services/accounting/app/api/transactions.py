@@ -5,17 +5,23 @@ API роуты для управления транзакциями
 from decimal import Decimal
 from datetime import datetime
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import delete, func
 from sqlmodel import Session, select
 
-from app.core.database import get_session
+from app.core.database import get_read_session, get_session
 from app.core.auth import current_active_user
+from app.core.cache import LEDGER_DATASET, bump_data_version
+from app.core.responses import rows_response, schema_columns
 from app.models.users import User
 from app.models.transactions import (
     Transaction, TransactionEntry, TransactionCreate, TransactionRead,
     TransactionType
 )
 from app.models.accounts import Account
+from app.models.changes import ChangeEntity, ChangeOperation
+from app.services.changes import record_change
+from app.services.search import SearchService
 from app.services.transactions import TransactionService
 from pydantic import BaseModel
 
@@ -77,6 +83,25 @@ class ComplexTransactionCreate(BaseModel):
 router = APIRouter()
 
 
+class ReversalCreate(BaseModel):
+    """Схема для сторно транзакции"""
+    date: Optional[datetime] = None
+
+
+class BulkReversalCreate(BaseModel):
+    """Схема для массового сторно: отбор транзакций (хотя бы одно условие)"""
+    transaction_ids: Optional[List[int]] = None
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+    type: Optional[TransactionType] = None
+    project_id: Optional[int] = None
+    category_id: Optional[int] = None
+    counterparty_id: Optional[int] = None
+    date: Optional[datetime] = None  # дата сторно
+
+
 @router.get("/", response_model=List[TransactionRead])
 def get_transactions(
     skip: int = 0,
@@ -84,28 +109,43 @@ def get_transactions(
     type: Optional[TransactionType] = None,
     project_id: Optional[int] = None,
     category_id: Optional[int] = None,
-    db: Session = Depends(get_session),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    q: Optional[str] = Query(None, min_length=2, max_length=200),
+    db: Session = Depends(get_read_session),
     user: User = Depends(current_active_user)
 ):
-    """Получение списка транзакций"""
-    statement = select(Transaction)
+    """
+    Получение списка транзакций
+    
+    Период [start, end) ограничивает просмотр месячными секциями
+    таблицы транзакций, попадающими в него. q — фильтр по описанию
+    (триграммный индекс, см. /api/search).
+    """
+    # Строки запроса сразу в JSON, без ORM-объектов и валидации схемы
+    statement = select(*schema_columns(Transaction, TransactionRead))
     
+    if start:
+        statement = statement.where(Transaction.date >= start)
+    if end:
+        statement = statement.where(Transaction.date < end)
     if type:
         statement = statement.where(Transaction.type == type)
     if project_id:
         statement = statement.where(Transaction.project_id == project_id)
     if category_id:
         statement = statement.where(Transaction.category_id == category_id)
+    if q:
+        statement = statement.where(SearchService(db).match(Transaction.description, q))
     
     statement = statement.offset(skip).limit(limit).order_by(Transaction.date.desc())
-    transactions = db.exec(statement).all()
-    return transactions
+    return rows_response(db.execute(statement).mappings())
 
 
 @router.get("/{transaction_id}", response_model=TransactionRead)
 def get_transaction(
     transaction_id: int,
-    db: Session = Depends(get_session),
+    db: Session = Depends(get_read_session),
     user: User = Depends(current_active_user)
 ):
     """Получение транзакции по ID"""
@@ -124,7 +164,7 @@ def get_transaction(
 @router.get("/{transaction_id}/entries", response_model=List[dict])
 def get_transaction_entries(
     transaction_id: int,
-    db: Session = Depends(get_session),
+    db: Session = Depends(get_read_session),
     user: User = Depends(current_active_user)
 ):
     """Получение проводок транзакции"""
@@ -136,24 +176,25 @@ def get_transaction_entries(
             detail="Transaction not found"
         )
     
-    # Получаем проводки
-    statement = select(TransactionEntry).where(TransactionEntry.transaction_id == transaction_id)
-    entries = db.exec(statement).all()
-    
-    # Возвращаем проводки с информацией о счетах
-    result = []
-    for entry in entries:
-        account = db.get(Account, entry.account_id)
-        result.append({
-            "id": entry.id,
-            "account_id": entry.account_id,
-            "account_name": account.name if account else "Unknown",
-            "amount": entry.amount,
-            "direction": entry.direction,
-            "description": entry.description
-        })
-    
-    return result
+    # Проводки с названиями счетов одним запросом
+    # (условие по дате выбирает одну секцию)
+    statement = (
+        select(
+            TransactionEntry.id,
+            TransactionEntry.account_id,
+            func.coalesce(Account.name, "Unknown").label("account_name"),
+            TransactionEntry.amount,
+            TransactionEntry.direction,
+            TransactionEntry.description,
+        )
+        .outerjoin(Account, Account.id == TransactionEntry.account_id)
+        .where(
+            TransactionEntry.transaction_id == transaction_id,
+            TransactionEntry.transaction_date == transaction.date
+        )
+        .order_by(TransactionEntry.id)
+    )
+    return rows_response(db.execute(statement).mappings())
 
 
 @router.post("/income", response_model=TransactionRead)
@@ -252,10 +293,63 @@ def create_complex_transaction(
     return transaction
 
 
+@router.post("/reverse")
+def reverse_transactions(
+    reversal_data: BulkReversalCreate,
+    db: Session = Depends(get_session),
+    user: User = Depends(current_active_user)
+):
+    """
+    Массовое сторно проведенных транзакций по условиям отбора
+    
+    Например, все транзакции ошибочного импорта: created_from и
+    created_to ограничивают время загрузки, start и end — период
+    дат транзакций.
+    """
+    filters = reversal_data.model_dump(exclude={"date"}, exclude_none=True)
+    if not filters:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="At least one filter is required"
+        )
+    
+    conditions = []
+    if reversal_data.transaction_ids is not None:
+        conditions.append(Transaction.id.in_(reversal_data.transaction_ids))
+    if reversal_data.start:
+        conditions.append(Transaction.date >= reversal_data.start)
+    if reversal_data.end:
+        conditions.append(Transaction.date < reversal_data.end)
+    if reversal_data.created_from:
+        conditions.append(Transaction.created_at >= reversal_data.created_from)
+    if reversal_data.created_to:
+        conditions.append(Transaction.created_at < reversal_data.created_to)
+    for field in ("type", "project_id", "category_id", "counterparty_id"):
+        value = getattr(reversal_data, field)
+        if value is not None:
+            conditions.append(getattr(Transaction, field) == value)
+    
+    return TransactionService(db).reverse_transactions(conditions, reversal_data.date)
+
+
+@router.post("/{transaction_id}/reverse", response_model=TransactionRead)
+def reverse_transaction(
+    transaction_id: int,
+    reversal_data: Optional[ReversalCreate] = None,
+    db: Session = Depends(get_session),
+    user: User = Depends(current_active_user)
+):
+    """Сторно проведенной транзакции зеркальными проводками"""
+    service = TransactionService(db)
+    return service.reverse_transaction(
+        transaction_id, reversal_data.date if reversal_data else None
+    )
+
+
 @router.get("/accounts/{account_id}/balance")
 def get_account_balance(
     account_id: int,
-    db: Session = Depends(get_session),
+    db: Session = Depends(get_read_session),
     user: User = Depends(current_active_user)
 ):
     """Получение текущего баланса счета"""
@@ -274,7 +368,7 @@ def delete_transaction(
     db: Session = Depends(get_session),
     user: User = Depends(current_active_user)
 ):
-    """Удаление транзакции (только в статусе DRAFT)"""
+    """Удаление транзакции (только в статусе DRAFT, проведенные сторнируются)"""
     transaction = db.get(Transaction, transaction_id)
     if not transaction:
         raise HTTPException(
@@ -288,16 +382,15 @@ def delete_transaction(
             detail="Only draft transactions can be deleted"
         )
     
-    # Удаляем связанные проводки
-    entries_statement = select(TransactionEntry).where(
-        TransactionEntry.transaction_id == transaction_id
-    )
-    entries = db.exec(entries_statement).all()
-    
-    for entry in entries:
-        db.delete(entry)
+    # Удаляем связанные проводки одним запросом
+    db.execute(delete(TransactionEntry).where(
+        TransactionEntry.transaction_id == transaction_id,
+        TransactionEntry.transaction_date == transaction.date
+    ))
     
     db.delete(transaction)
+    record_change(db, ChangeEntity.TRANSACTION, transaction_id, ChangeOperation.DELETE)
     db.commit()
+    bump_data_version(LEDGER_DATASET)
     
     return {"message": "Transaction deleted successfully"}
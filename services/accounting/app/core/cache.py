@@ -0,0 +1,102 @@
+"""
+Кэш результатов отчетов в Redis с версионированием данных
+"""
+
+import hashlib
+import json
+import logging
+from typing import Any, Dict, Optional, Sequence
+
+import redis
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Наборы данных, версии которых учитываются в ключах кэша. Ключи
+# data_version:* общие для сервисов: версию events увеличивает
+# импорт в Traffic Analytics Service.
+LEDGER_DATASET = "ledger"
+EVENTS_DATASET = "events"
+CATEGORIES_DATASET = "categories"
+RATES_DATASET = "rates"
+
+_client: Optional[redis.Redis] = None
+
+
+def get_redis() -> redis.Redis:
+    """Общий клиент Redis"""
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=settings.CACHE_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.CACHE_SOCKET_TIMEOUT,
+        )
+    return _client
+
+
+def version_key(dataset: str) -> str:
+    """Ключ счетчика версии набора данных"""
+    return f"data_version:{dataset}"
+
+
+def get_data_version(dataset: str) -> Optional[int]:
+    """Текущая версия набора данных, None если Redis недоступен"""
+    try:
+        value = get_redis().get(version_key(dataset))
+    except redis.RedisError as e:
+        logger.warning(f"Failed to read data version for {dataset}: {e}")
+        return None
+    return int(value or 0)
+
+
+def bump_data_version(dataset: str) -> None:
+    """Увеличение версии набора данных (инвалидация зависящих от него результатов)"""
+    try:
+        get_redis().incr(version_key(dataset))
+    except redis.RedisError as e:
+        logger.warning(f"Failed to bump data version for {dataset}: {e}")
+
+
+def versioned_key(namespace: str, datasets: Sequence[str], params: Dict[str, Any]) -> Optional[str]:
+    """
+    Ключ кэша по нормализованным параметрам и версиям наборов данных
+
+    Returns:
+        None, если Redis недоступен
+    """
+    try:
+        versions = get_redis().mget([version_key(dataset) for dataset in datasets])
+    except redis.RedisError as e:
+        logger.warning(f"Cache lookup failed: {e}")
+        return None
+
+    version = ".".join(
+        f"{dataset}{int(value or 0)}" for dataset, value in zip(datasets, versions)
+    )
+    normalized = json.dumps(params, sort_keys=True, separators=(",", ":"), default=str)
+    digest = hashlib.sha256(normalized.encode()).hexdigest()
+    return f"cache:{namespace}:{version}:{digest}"
+
+
+def cache_get(key: Optional[str]) -> Any:
+    """Значение из кэша или None"""
+    if key is None:
+        return None
+    try:
+        hit = get_redis().get(key)
+    except redis.RedisError as e:
+        logger.warning(f"Cache lookup failed: {e}")
+        return None
+    return json.loads(hit) if hit is not None else None
+
+
+def cache_set(key: Optional[str], value: Any, ttl: Optional[int] = None) -> None:
+    """Сохранение JSON-совместимого значения в кэш"""
+    if key is None:
+        return
+    try:
+        get_redis().set(key, json.dumps(value), ex=ttl or settings.CACHE_TTL)
+    except redis.RedisError as e:
+        logger.warning(f"Cache store failed: {e}")
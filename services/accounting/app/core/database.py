@@ -3,10 +3,13 @@
 """
 
 from typing import AsyncGenerator
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
 from sqlmodel import SQLModel, create_engine, Session
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.core.replica import READ_METHODS, mark_write, use_replica
 
 # Создание синхронного движка базы данных (для создания таблиц)
 engine = create_engine(
@@ -16,13 +19,27 @@ engine = create_engine(
     pool_recycle=300,     # Переподключение каждые 5 минут
 )
 
+# Реплика для маршрутов только для чтения (необязательна)
+replica_engine = None
+if settings.DATABASE_REPLICA_URL:
+    replica_engine = create_engine(
+        settings.DATABASE_REPLICA_URL,
+        echo=settings.DEBUG,
+        pool_pre_ping=True,
+        pool_recycle=300,
+    )
+
 # Создание синхронного SessionLocal для создания сессий
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-# Создание асинхронного движка для FastAPI-Users
-async_database_url = settings.DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://")
-async_engine = create_async_engine(async_database_url, echo=settings.DEBUG)
-async_session_maker = sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+# Создание асинхронного движка для FastAPI-Users (только PostgreSQL:
+# с SQLite, например в бенчмарках, используется только синхронный движок)
+async_engine = None
+async_session_maker = None
+if settings.DATABASE_URL.startswith("postgresql://"):
+    async_database_url = settings.DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://")
+    async_engine = create_async_engine(async_database_url, echo=settings.DEBUG)
+    async_session_maker = sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
 
 
 def get_session():
@@ -31,6 +48,36 @@ def get_session():
         yield session
 
 
+def get_read_session(request: Request):
+    """
+    Сессия для маршрутов только для чтения
+
+    Запрос идет на реплику, если она настроена, клиент не делал
+    записей в последние REPLICA_STICKY_SECONDS и отставание реплики
+    не превышает REPLICA_MAX_LAG_SECONDS; иначе — на основную БД.
+    Сессия реплики помечена в session.info["replica"].
+    """
+    if replica_engine is not None and use_replica(request, replica_engine):
+        with Session(replica_engine, info={"replica": True}) as session:
+            yield session
+        return
+
+    with Session(engine) as session:
+        yield session
+
+
+async def track_writes(request: Request, call_next):
+    """Middleware: отметка успешных изменяющих запросов для маршрутизации чтения"""
+    response = await call_next(request)
+    if (
+        replica_engine is not None
+        and request.method not in READ_METHODS
+        and response.status_code < 400
+    ):
+        await run_in_threadpool(mark_write, request)
+    return response
+
+
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     """Получение асинхронной сессии базы данных"""
     async with async_session_maker() as session:
@@ -0,0 +1,31 @@
+"""
+Публикация живых обновлений в Redis pub/sub
+
+Сообщения читает API Gateway и рассылает подключенным клиентам
+(Server-Sent Events), поэтому рабочие процессы сервиса не хранят
+подключений и масштабируются независимо от числа клиентов.
+"""
+
+import json
+import logging
+from typing import Any, Dict
+
+import redis
+
+from app.core.cache import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Канал изменений балансов: общий для сервиса и API Gateway
+BALANCES_CHANNEL = "live:balances"
+
+# Канал событий пересечения порогов бюджета проектов
+BUDGETS_CHANNEL = "live:budgets"
+
+
+def publish(channel: str, payload: Dict[str, Any]) -> None:
+    """Публикация сообщения; недоступный Redis не влияет на запрос"""
+    try:
+        get_redis().publish(channel, json.dumps(payload, default=str))
+    except redis.RedisError as e:
+        logger.warning(f"Failed to publish to {channel}: {e}")
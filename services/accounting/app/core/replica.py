@@ -0,0 +1,118 @@
+"""
+Маршрутизация чтения на реплику: отставание и привязка после записи
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+import redis
+from fastapi import Request
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from app.core.cache import get_redis
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Методы, не изменяющие данные
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+LAG_SQL = """
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+# Проверка доступности реплик без отставания WAL (локальные базы)
+LOCAL_LAG_SQL = "SELECT 0"
+
+# Отметки записи в памяти процесса, если Redis недоступен
+_local_writes: Dict[str, float] = {}
+_lag_lock = threading.Lock()
+_lag: Optional[float] = None
+_lag_checked_at = 0.0
+
+
+def client_key(request: Request) -> str:
+    """Клиент для привязки: токен авторизации, иначе адрес"""
+    credentials = request.headers.get("authorization")
+    if not credentials:
+        credentials = request.client.host if request.client else "anonymous"
+    return hashlib.sha256(credentials.encode()).hexdigest()[:32]
+
+
+def _sticky_key(key: str) -> str:
+    return f"replica_sticky:{key}"
+
+
+def mark_write(request: Request) -> None:
+    """
+    Отметка записи клиента
+
+    В течение REPLICA_STICKY_SECONDS его чтения идут с основной БД
+    и видят собственные изменения, даже если реплика еще не догнала.
+    Отметка хранится в Redis (общая для процессов сервиса)
+    и дублируется в памяти процесса.
+    """
+    key = client_key(request)
+    now = time.monotonic()
+    _local_writes[key] = now + settings.REPLICA_STICKY_SECONDS
+    if len(_local_writes) > 10_000:
+        for stale in [k for k, until in _local_writes.items() if until < now]:
+            _local_writes.pop(stale, None)
+
+    try:
+        get_redis().set(_sticky_key(key), 1, ex=settings.REPLICA_STICKY_SECONDS)
+    except redis.RedisError as e:
+        logger.warning(f"Failed to store replica stickiness: {e}")
+
+
+def recently_wrote(request: Request) -> bool:
+    """Была ли запись клиента в пределах окна привязки"""
+    key = client_key(request)
+    if _local_writes.get(key, 0) > time.monotonic():
+        return True
+    try:
+        return bool(get_redis().exists(_sticky_key(key)))
+    except redis.RedisError:
+        # Без Redis записи в других процессах не видны: читаем с основной БД
+        return True
+
+
+def replica_lag(replica: Engine) -> Optional[float]:
+    """
+    Отставание реплики в секундах, None если реплика недоступна
+
+    Значение проверяется не чаще REPLICA_LAG_CHECK_INTERVAL.
+    Для не-PostgreSQL реплик (локальные базы) проверяется только
+    доступность, отставание 0.
+    """
+    global _lag, _lag_checked_at
+    now = time.monotonic()
+    if now - _lag_checked_at < settings.REPLICA_LAG_CHECK_INTERVAL:
+        return _lag
+
+    with _lag_lock:
+        if now - _lag_checked_at < settings.REPLICA_LAG_CHECK_INTERVAL:
+            return _lag
+        try:
+            query = LAG_SQL if replica.dialect.name == "postgresql" else LOCAL_LAG_SQL
+            with replica.connect() as connection:
+                _lag = float(connection.execute(text(query)).scalar() or 0)
+        except Exception as e:
+            logger.warning(f"Replica lag check failed: {e}")
+            _lag = None
+        _lag_checked_at = now
+    return _lag
+
+
+def use_replica(request: Request, replica: Engine) -> bool:
+    """Чтение с реплики: клиент не писал недавно и реплика не отстала"""
+    if recently_wrote(request):
+        return False
+    lag = replica_lag(replica)
+    return lag is not None and lag <= settings.REPLICA_MAX_LAG_SECONDS
@@ -0,0 +1,52 @@
+"""
+Быстрая сериализация ответов (orjson)
+"""
+
+from decimal import Decimal
+from typing import Any, Iterable, List, Mapping, Type
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+def _default(value: Any) -> Any:
+    """Типы, которые orjson не сериализует сам"""
+    if isinstance(value, Decimal):
+        # Точное значение строкой, как в схемах Pydantic
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class LedgerJSONResponse(JSONResponse):
+    """
+    JSON-ответ через orjson
+
+    Decimal кодируется строкой без потери точности, datetime и Enum —
+    так же, как стандартный ответ FastAPI, поэтому формат ответов
+    не меняется.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def rows_response(rows: Iterable[Mapping[str, Any]]) -> LedgerJSONResponse:
+    """
+    Ответ списком строк запроса без ORM-объектов и валидации схем
+
+    Для списков, где колонки запроса совпадают с полями схемы
+    ответа (response_model остается для документации).
+    """
+    return LedgerJSONResponse([dict(row) for row in rows])
+
+
+def schema_columns(model: Type, schema: Type[BaseModel]) -> List[Any]:
+    """Колонки модели для полей схемы ответа (в порядке схемы)"""
+    return [getattr(model, name).label(name) for name in schema.model_fields]
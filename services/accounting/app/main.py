@@ -6,14 +6,27 @@ TW Accounting Service
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
+from sqlmodel import Session
 
 from app.core.config import settings
-from app.core.database import engine
+from app.core.database import engine, track_writes
+from app.core.responses import LedgerJSONResponse
 from app.models import Base
+from app.services.categories import CategoryTreeService
+from app.services.changes import ChangeFeedService
+from app.services.partitions import PartitionManager
+from app.services.recurring import start_scheduler
 
 # Создание таблиц
 Base.create_all(bind=engine)
 
+# Таблица замыкания для категорий, созданных до ее появления
+# и месячные секции книги на ближайшие месяцы; очистка старой ленты изменений
+with Session(engine) as session:
+    CategoryTreeService(session).ensure_closure()
+    PartitionManager(session).ensure_partitions()
+    ChangeFeedService(session).prune()
+
 # Создание FastAPI приложения
 app = FastAPI(
     title="TW Accounting Service",
@@ -21,6 +34,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=LedgerJSONResponse,
 )
 
 # Настройка CORS
@@ -38,6 +52,21 @@ app.add_middleware(
     allowed_hosts=settings.ALLOWED_HOSTS
 )
 
+# Привязка чтения к основной БД после записи клиента
+app.middleware("http")(track_writes)
+
+# Планировщик повторяющихся транзакций
+@app.on_event("startup")
+def start_recurring_scheduler():
+    if settings.RECURRING_SCHEDULER_ENABLED:
+        app.state.recurring_scheduler = start_scheduler()
+
+@app.on_event("shutdown")
+def stop_recurring_scheduler():
+    scheduler = getattr(app.state, "recurring_scheduler", None)
+    if scheduler:
+        scheduler.shutdown(wait=False)
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():
@@ -59,7 +88,7 @@ async def root():
     }
 
 # Импорт API роутов
-from app.api import auth, accounts, projects, categories, counterparties, transactions, crypto
+from app.api import auth, accounts, projects, categories, counterparties, transactions, crypto, currencies, reconciliation, reports, changes, dashboard, search, recurring, statements, integrity, periods, budgets
 
 # Включение роутов
 app.include_router(auth.router, prefix="/api", tags=["authentication"])
@@ -69,3 +98,14 @@ app.include_router(categories.router, prefix="/api/categories", tags=["categorie
 app.include_router(counterparties.router, prefix="/api/counterparties", tags=["counterparties"])
 app.include_router(transactions.router, prefix="/api/transactions", tags=["transactions"])
 app.include_router(crypto.router, prefix="/api/crypto", tags=["cryptocurrency"])
+app.include_router(currencies.router, prefix="/api/currencies", tags=["currencies"])
+app.include_router(reconciliation.router, prefix="/api/reconciliation", tags=["reconciliation"])
+app.include_router(reports.router, prefix="/api/reports", tags=["reports"])
+app.include_router(changes.router, prefix="/api/changes", tags=["changes"])
+app.include_router(dashboard.router, prefix="/api/dashboard", tags=["dashboard"])
+app.include_router(search.router, prefix="/api/search", tags=["search"])
+app.include_router(recurring.router, prefix="/api/recurring", tags=["recurring"])
+app.include_router(statements.router, prefix="/api/statements", tags=["statements"])
+app.include_router(integrity.router, prefix="/api/integrity", tags=["integrity"])
+app.include_router(periods.router, prefix="/api/periods", tags=["periods"])
+app.include_router(budgets.router, prefix="/api/budgets", tags=["budgets"])
@@ -4,9 +4,37 @@ from sqlmodel import SQLModel
 from app.models.base import BaseModel, TimestampMixin
 from app.models.users import User, UserCreate, UserUpdate, UserRead
 from app.models.accounts import Account, AccountType, AccountCreate, AccountUpdate, AccountRead
-from app.models.projects import Project, ProjectStatus, ProjectCreate, ProjectUpdate, ProjectRead
-from app.models.categories import Category, CategoryType, CategoryCreate, CategoryUpdate, CategoryRead
-from app.models.counterparties import Counterparty, CounterpartyType, CounterpartyCreate, CounterpartyUpdate, CounterpartyRead
+from app.models.projects import (
+    Project, ProjectStatus, ProjectCreate, ProjectUpdate, ProjectRead,
+    ProjectCampaign, ProjectCampaignCreate, ProjectCampaignRead,
+    ProjectSpend, BudgetAlertRule, BudgetAlert, BudgetAlertRuleCreate, BudgetAlertRuleRead,
+    BudgetAlertRead
+)
+from app.models.categories import (
+    Category, CategoryType, CategoryClosure, CategoryCreate, CategoryUpdate, CategoryRead,
+    CategoryTreeNode
+)
+from app.models.counterparties import (
+    Counterparty, CounterpartyType, CounterpartyStats, CounterpartyCreate, CounterpartyUpdate,
+    CounterpartyRead
+)
+from app.models.changes import (
+    ChangeLogEntry, ChangeEntity, ChangeOperation, ChangeRead, ChangeFeed
+)
+from app.models.recurring import (
+    RecurringTemplate, RecurringOccurrence, RecurringAmountMode, RecurringTemplateCreate,
+    RecurringTemplateUpdate, RecurringTemplateRead, RecurringOccurrenceRead
+)
+from app.models.statements import (
+    ImportRule, StatementImport, StatementImportStatus, StatementLine, StatementLineStatus,
+    ImportRuleCreate, ImportRuleUpdate, ImportRuleRead, StatementColumns, StatementImportRead,
+    StatementLineRead, StatementLinesPost
+)
+from app.models.periods import (
+    ClosedPeriod, BalanceCheckpoint, PeriodCloseRequest, ClosedPeriodRead, BalanceCheckpointRead,
+    AccountBalanceAt
+)
+from app.models.currencies import ExchangeRate, ExchangeRateCreate, ExchangeRateRead
 from app.models.transactions import (
     Transaction, TransactionEntry, CryptoTransactionDetail,
     TransactionType, TransactionStatus,
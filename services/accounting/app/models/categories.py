@@ -35,6 +35,24 @@ class Category(BaseModel, table=True):
     # transactions: List["Transaction"] = Relationship(back_populates="category")
 
 
+class CategoryClosure(SQLModel, table=True):
+    """
+    Таблица замыкания дерева категорий
+
+    Для каждой категории хранит все пары (предок, потомок), включая
+    саму категорию с depth = 0, поэтому поддерево выбирается одним
+    соединением без рекурсии.
+    """
+    
+    __tablename__ = "category_closure"
+    
+    ancestor_id: int = Field(foreign_key="categories.id", primary_key=True, description="Предок")
+    descendant_id: int = Field(
+        foreign_key="categories.id", primary_key=True, index=True, description="Потомок"
+    )
+    depth: int = Field(description="Расстояние от предка до потомка")
+
+
 class CategoryCreate(SQLModel):
     """Схема для создания категории"""
     name: str
@@ -68,3 +86,14 @@ class CategoryRead(SQLModel):
     icon: Optional[str]
     created_at: datetime
     updated_at: Optional[datetime]
+
+
+class CategoryTreeNode(SQLModel):
+    """Узел дерева категорий для выбора в интерфейсе"""
+    id: int
+    name: str
+    type: CategoryType
+    is_active: bool
+    color: Optional[str]
+    icon: Optional[str]
+    children: List["CategoryTreeNode"] = []
@@ -0,0 +1,60 @@
+"""
+Модели ленты изменений книги
+"""
+
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, List, Optional
+from sqlalchemy import JSON, BigInteger, Column, Integer
+from sqlmodel import SQLModel, Field
+
+
+class ChangeEntity(str, Enum):
+    """Сущности, изменения которых попадают в ленту"""
+    TRANSACTION = "transaction"
+    ACCOUNT = "account"
+
+
+class ChangeOperation(str, Enum):
+    """Виды изменений"""
+    INSERT = "insert"
+    UPDATE = "update"
+    DELETE = "delete"
+
+
+class ChangeLogEntry(SQLModel, table=True):
+    """Запись ленты изменений (только добавление, упорядочена по seq)"""
+
+    __tablename__ = "change_log"
+
+    seq: Optional[int] = Field(
+        default=None,
+        sa_column=Column(
+            BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True
+        ),
+        description="Курсор ленты",
+    )
+    entity: ChangeEntity = Field(description="Сущность")
+    entity_id: int = Field(description="ID сущности")
+    operation: ChangeOperation = Field(description="Вид изменения")
+    data: Optional[Dict[str, Any]] = Field(
+        default=None, sa_column=Column(JSON), description="Измененные поля"
+    )
+    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+
+
+class ChangeRead(SQLModel):
+    """Схема для чтения изменения"""
+    seq: int
+    entity: ChangeEntity
+    entity_id: int
+    operation: ChangeOperation
+    data: Optional[Dict[str, Any]]
+    created_at: datetime
+
+
+class ChangeFeed(SQLModel):
+    """Страница ленты изменений"""
+    changes: List[ChangeRead]
+    cursor: int  # передается в since следующего запроса
+    has_more: bool
@@ -3,6 +3,7 @@
 """
 
 from datetime import datetime
+from decimal import Decimal
 from enum import Enum
 from typing import Optional, List
 from sqlmodel import SQLModel, Field, Relationship
@@ -37,6 +38,27 @@ class Counterparty(BaseModel, table=True):
     # invoices: List["Invoice"] = Relationship(back_populates="counterparty")
 
 
+class CounterpartyStats(SQLModel, table=True):
+    """
+    Обороты контрагента по проведенным транзакциям
+
+    Обновляется в той же транзакции БД, что и проводки
+    (CounterpartyStatsService.apply), поэтому страницы и рейтинги
+    контрагентов не сканируют таблицу транзакций.
+    """
+    
+    __tablename__ = "counterparty_stats"
+    
+    counterparty_id: int = Field(foreign_key="counterparties.id", primary_key=True)
+    total_paid: Decimal = Field(default=Decimal("0"), description="Оплачено контрагенту (расходы)")
+    total_received: Decimal = Field(default=Decimal("0"), description="Получено от контрагента (доходы)")
+    transaction_count: int = Field(default=0, description="Количество транзакций")
+    first_activity_at: Optional[datetime] = Field(default=None, description="Дата первой транзакции")
+    last_activity_at: Optional[datetime] = Field(
+        default=None, index=True, description="Дата последней транзакции"
+    )
+
+
 class CounterpartyCreate(SQLModel):
     """Схема для создания контрагента"""
     name: str
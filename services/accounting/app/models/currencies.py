@@ -0,0 +1,43 @@
+"""
+Модели для курсов валют
+"""
+
+from decimal import Decimal
+from datetime import date, datetime
+from typing import Optional
+from sqlalchemy import Column, Numeric, UniqueConstraint
+from sqlmodel import SQLModel, Field
+from app.models.base import BaseModel
+
+
+class ExchangeRate(BaseModel, table=True):
+    """Курс валюты к USD, действующий с указанной даты до следующего курса"""
+    
+    __tablename__ = "exchange_rates"
+    __table_args__ = (UniqueConstraint("currency", "effective_date"),)
+    
+    currency: str = Field(max_length=10, index=True, description="Валюта")
+    rate_to_usd: Decimal = Field(
+        sa_column=Column(Numeric(28, 12), nullable=False),
+        description="Стоимость единицы валюты в USD",
+    )
+    effective_date: date = Field(description="Дата начала действия курса")
+    source: Optional[str] = Field(default=None, max_length=50, description="Источник курса")
+
+
+class ExchangeRateCreate(SQLModel):
+    """Схема для создания курса"""
+    currency: str
+    rate_to_usd: Decimal = Field(gt=0)
+    effective_date: date
+    source: Optional[str] = None
+
+
+class ExchangeRateRead(SQLModel):
+    """Схема для чтения курса"""
+    id: int
+    currency: str
+    rate_to_usd: Decimal
+    effective_date: date
+    source: Optional[str]
+    created_at: datetime
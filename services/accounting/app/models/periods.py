@@ -0,0 +1,69 @@
+"""
+Модели закрытия периодов
+"""
+
+from decimal import Decimal
+from datetime import date, datetime
+from typing import Optional
+from sqlmodel import SQLModel, Field
+
+
+class ClosedPeriod(SQLModel, table=True):
+    """
+    Закрытый месяц
+
+    Закрытые месяцы идут подряд от начала книги: закрытие месяца
+    закрывает и все предыдущие. Проводки с датой в закрытом месяце
+    не принимаются, исправления проводятся сторно в открытом периоде.
+    """
+
+    __tablename__ = "closed_periods"
+
+    month: date = Field(primary_key=True, description="Первый день месяца")
+    closed_at: datetime = Field(default_factory=datetime.utcnow, description="Время закрытия")
+    closed_by: Optional[int] = Field(default=None, description="ID пользователя")
+
+
+class BalanceCheckpoint(SQLModel, table=True):
+    """Баланс счета на конец закрытого месяца (сумма проводок до начала следующего)"""
+
+    __tablename__ = "balance_checkpoints"
+
+    # Порядок ключа (счет, месяц) обслуживает поиск последней точки счета
+    account_id: int = Field(primary_key=True, foreign_key="accounts.id", description="ID счета")
+    month: date = Field(
+        primary_key=True, foreign_key="closed_periods.month", description="Первый день месяца"
+    )
+    balance: Decimal = Field(description="Баланс на конец месяца")
+    debit: Decimal = Field(default=Decimal("0"), description="Дебетовый оборот за месяц")
+    credit: Decimal = Field(default=Decimal("0"), description="Кредитовый оборот за месяц")
+
+
+# Схемы для API
+class PeriodCloseRequest(SQLModel):
+    """Схема для закрытия периода: закрываются все месяцы по month включительно"""
+    month: date
+
+
+class ClosedPeriodRead(SQLModel):
+    """Схема для чтения закрытого месяца"""
+    month: date
+    closed_at: datetime
+    closed_by: Optional[int]
+
+
+class BalanceCheckpointRead(SQLModel):
+    """Схема для чтения баланса на конец месяца"""
+    month: date
+    account_id: int
+    balance: Decimal
+    debit: Decimal
+    credit: Decimal
+
+
+class AccountBalanceAt(SQLModel):
+    """Баланс счета на момент времени"""
+    account_id: int
+    at: datetime
+    balance: Decimal
+    checkpoint: Optional[date]  # месяц контрольной точки, от которой суммирован хвост
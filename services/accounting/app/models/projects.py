@@ -2,6 +2,7 @@
 Модели для проектов
 """
 
+from decimal import Decimal
 from datetime import datetime
 from enum import Enum
 from typing import Optional, List
@@ -34,6 +35,55 @@ class Project(BaseModel, table=True):
     # transactions: List["Transaction"] = Relationship(back_populates="project")
 
 
+class ProjectSpend(SQLModel, table=True):
+    """
+    Расходы проекта по проведенным транзакциям
+
+    Обновляется в той же транзакции БД, что и проводки
+    (ProjectBudgetService.apply), поэтому сравнение с бюджетом не
+    сканирует расходы проекта.
+    """
+    
+    __tablename__ = "project_spend"
+    
+    project_id: int = Field(foreign_key="projects.id", primary_key=True)
+    spent: Decimal = Field(default=Decimal("0"), description="Сумма расходов (сторно — с минусом)")
+    transaction_count: int = Field(default=0, description="Количество расходных транзакций")
+    last_expense_at: Optional[datetime] = Field(default=None, description="Дата последнего расхода")
+
+
+class BudgetAlertRule(BaseModel, table=True):
+    """Порог бюджета в процентах: для проекта или для всех проектов (project_id пуст)"""
+    
+    __tablename__ = "budget_alert_rules"
+    
+    threshold_pct: Decimal = Field(description="Порог, % бюджета")
+    project_id: Optional[int] = Field(
+        default=None, foreign_key="projects.id", index=True, description="ID проекта"
+    )
+    is_active: bool = Field(default=True, description="Активно ли правило")
+
+
+class BudgetAlert(SQLModel, table=True):
+    """
+    Событие пересечения порога бюджета
+
+    Записывается вместе с проводкой, которая пересекла порог снизу
+    вверх; после фиксации публикуется в канал live:budgets.
+    """
+    
+    __tablename__ = "budget_alerts"
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    project_id: int = Field(foreign_key="projects.id", index=True, description="ID проекта")
+    rule_id: Optional[int] = Field(default=None, description="ID правила")
+    threshold_pct: Decimal = Field(description="Пересеченный порог, %")
+    budget: Decimal = Field(description="Бюджет проекта")
+    spent: Decimal = Field(description="Расходы после проведения")
+    transaction_id: Optional[int] = Field(default=None, description="ID транзакции, пересекшей порог")
+    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+
+
 class ProjectCreate(SQLModel):
     """Схема для создания проекта"""
     name: str
@@ -67,3 +117,52 @@ class ProjectRead(SQLModel):
     budget: Optional[float]
     created_at: datetime
     updated_at: Optional[datetime]
+
+
+class ProjectCampaign(BaseModel, table=True):
+    """Привязка кампании из аналитики трафика к проекту"""
+    
+    __tablename__ = "project_campaigns"
+    
+    project_id: int = Field(foreign_key="projects.id", index=True, description="ID проекта")
+    campaign: str = Field(max_length=255, unique=True, description="Кампания в аналитике трафика")
+
+
+class ProjectCampaignCreate(SQLModel):
+    """Схема для привязки кампании"""
+    campaign: str
+
+
+class ProjectCampaignRead(SQLModel):
+    """Схема для чтения привязки кампании"""
+    id: int
+    project_id: int
+    campaign: str
+    created_at: datetime
+
+
+class BudgetAlertRuleCreate(SQLModel):
+    """Схема для создания порога"""
+    threshold_pct: Decimal
+    project_id: Optional[int] = None
+
+
+class BudgetAlertRuleRead(SQLModel):
+    """Схема для чтения порога"""
+    id: int
+    threshold_pct: Decimal
+    project_id: Optional[int]
+    is_active: bool
+    created_at: datetime
+
+
+class BudgetAlertRead(SQLModel):
+    """Схема для чтения события порога"""
+    id: int
+    project_id: int
+    rule_id: Optional[int]
+    threshold_pct: Decimal
+    budget: Decimal
+    spent: Decimal
+    transaction_id: Optional[int]
+    created_at: datetime
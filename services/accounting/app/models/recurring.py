@@ -0,0 +1,145 @@
+"""
+Модели шаблонов повторяющихся транзакций
+"""
+
+from decimal import Decimal
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+from sqlalchemy import UniqueConstraint
+from sqlmodel import SQLModel, Field
+from app.models.base import BaseModel
+from app.models.transactions import TransactionType
+
+
+class RecurringAmountMode(str, Enum):
+    """Способ определения суммы"""
+    FIXED = "fixed"
+    FORMULA = "formula"
+
+
+class RecurringTemplate(BaseModel, table=True):
+    """
+    Шаблон повторяющейся транзакции
+
+    Расписание — cron-выражение из пяти полей (минута, час, день
+    месяца, месяц, день недели) в UTC. next_occurrence_at — ближайшее
+    еще не проведенное наступление, по нему планировщик выбирает
+    шаблоны к проведению.
+    """
+
+    __tablename__ = "recurring_templates"
+
+    name: str = Field(max_length=255, description="Название шаблона")
+    description: str = Field(max_length=400, description="Описание создаваемых транзакций")
+    type: TransactionType = Field(description="Тип транзакции")
+    schedule: str = Field(max_length=100, description="Cron-расписание (UTC)")
+    amount_mode: RecurringAmountMode = Field(default=RecurringAmountMode.FIXED, description="Способ расчета суммы")
+    amount: Optional[Decimal] = Field(default=None, description="Фиксированная сумма или база формулы")
+    formula: Optional[str] = Field(default=None, max_length=500, description="Формула суммы")
+
+    # Проводки: дебет и кредит счетов
+    debit_account_id: int = Field(foreign_key="accounts.id", description="Счет дебета")
+    credit_account_id: int = Field(foreign_key="accounts.id", description="Счет кредита")
+
+    project_id: Optional[int] = Field(default=None, foreign_key="projects.id", description="ID проекта")
+    category_id: Optional[int] = Field(default=None, foreign_key="categories.id", description="ID категории")
+    counterparty_id: Optional[int] = Field(default=None, foreign_key="counterparties.id", description="ID контрагента")
+
+    start_at: datetime = Field(default_factory=datetime.utcnow, description="Начало действия")
+    end_at: Optional[datetime] = Field(default=None, description="Окончание действия")
+    is_active: bool = Field(default=True, description="Активен ли шаблон")
+    last_occurrence_at: Optional[datetime] = Field(default=None, description="Последнее проведенное наступление")
+    next_occurrence_at: Optional[datetime] = Field(
+        default=None, index=True, description="Ближайшее непроведенное наступление"
+    )
+
+
+class RecurringOccurrence(SQLModel, table=True):
+    """
+    Проведенное наступление шаблона
+
+    Уникальность (шаблон, время наступления) делает проведение
+    идемпотентным: повторный запуск после сбоя не создаст транзакцию
+    второй раз.
+    """
+
+    __tablename__ = "recurring_occurrences"
+    __table_args__ = (UniqueConstraint("template_id", "occurrence_at"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    template_id: int = Field(foreign_key="recurring_templates.id", description="ID шаблона")
+    occurrence_at: datetime = Field(description="Время наступления по расписанию")
+    transaction_id: Optional[int] = Field(default=None, description="ID созданной транзакции")
+    amount: Decimal = Field(description="Сумма проведенной транзакции")
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+# Схемы для API
+class RecurringTemplateCreate(SQLModel):
+    """Схема для создания шаблона"""
+    name: str
+    description: str
+    type: TransactionType
+    schedule: str
+    amount_mode: RecurringAmountMode = RecurringAmountMode.FIXED
+    amount: Optional[Decimal] = None
+    formula: Optional[str] = None
+    debit_account_id: int
+    credit_account_id: int
+    project_id: Optional[int] = None
+    category_id: Optional[int] = None
+    counterparty_id: Optional[int] = None
+    start_at: Optional[datetime] = None
+    end_at: Optional[datetime] = None
+
+
+class RecurringTemplateUpdate(SQLModel):
+    """Схема для обновления шаблона"""
+    name: Optional[str] = None
+    description: Optional[str] = None
+    schedule: Optional[str] = None
+    amount_mode: Optional[RecurringAmountMode] = None
+    amount: Optional[Decimal] = None
+    formula: Optional[str] = None
+    debit_account_id: Optional[int] = None
+    credit_account_id: Optional[int] = None
+    project_id: Optional[int] = None
+    category_id: Optional[int] = None
+    counterparty_id: Optional[int] = None
+    end_at: Optional[datetime] = None
+    is_active: Optional[bool] = None
+
+
+class RecurringTemplateRead(SQLModel):
+    """Схема для чтения шаблона"""
+    id: int
+    name: str
+    description: str
+    type: TransactionType
+    schedule: str
+    amount_mode: RecurringAmountMode
+    amount: Optional[Decimal]
+    formula: Optional[str]
+    debit_account_id: int
+    credit_account_id: int
+    project_id: Optional[int]
+    category_id: Optional[int]
+    counterparty_id: Optional[int]
+    start_at: datetime
+    end_at: Optional[datetime]
+    is_active: bool
+    last_occurrence_at: Optional[datetime]
+    next_occurrence_at: Optional[datetime]
+    created_at: datetime
+    updated_at: Optional[datetime]
+
+
+class RecurringOccurrenceRead(SQLModel):
+    """Схема для чтения наступления"""
+    id: int
+    template_id: int
+    occurrence_at: datetime
+    transaction_id: Optional[int]
+    amount: Decimal
+    created_at: datetime
@@ -0,0 +1,198 @@
+"""
+Модели импорта банковских и биржевых выписок
+"""
+
+from decimal import Decimal
+from datetime import datetime
+from enum import Enum
+from typing import List, Optional
+from sqlmodel import SQLModel, Field
+from app.models.base import BaseModel
+
+
+class ImportRule(BaseModel, table=True):
+    """
+    Правило автокатегоризации строк выписки
+
+    Условия (все заданные должны выполняться): подстрока или
+    регулярное выражение в описании, диапазон суммы, направление,
+    адрес кошелька. Из совпавших правил применяется правило
+    с наименьшим priority.
+    """
+
+    __tablename__ = "import_rules"
+
+    name: str = Field(max_length=255, description="Название правила")
+    priority: int = Field(default=100, description="Порядок применения (меньше — раньше)")
+    is_active: bool = Field(default=True, description="Активно ли правило")
+
+    pattern: Optional[str] = Field(default=None, max_length=500, description="Подстрока или регулярное выражение")
+    is_regex: bool = Field(default=False, description="pattern — регулярное выражение")
+    amount_min: Optional[Decimal] = Field(default=None, description="Минимальная сумма (по модулю)")
+    amount_max: Optional[Decimal] = Field(default=None, description="Максимальная сумма (по модулю)")
+    direction: Optional[str] = Field(default=None, max_length=10, description="income или expense")
+    wallet: Optional[str] = Field(default=None, max_length=255, description="Адрес кошелька")
+
+    # Что назначается совпавшей строке
+    category_id: Optional[int] = Field(default=None, foreign_key="categories.id", description="ID категории")
+    counterparty_id: Optional[int] = Field(default=None, foreign_key="counterparties.id", description="ID контрагента")
+    project_id: Optional[int] = Field(default=None, foreign_key="projects.id", description="ID проекта")
+    account_id: Optional[int] = Field(
+        default=None, foreign_key="accounts.id", description="Счет доходов или расходов вместо счета импорта"
+    )
+
+
+class StatementImportStatus(str, Enum):
+    """Статусы импорта выписки"""
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class StatementImport(BaseModel, table=True):
+    """Загруженная выписка и итоги ее обработки"""
+
+    __tablename__ = "statement_imports"
+
+    filename: str = Field(max_length=255, description="Имя файла")
+    file_hash: str = Field(max_length=64, index=True, description="SHA-256 содержимого")
+    bank_account_id: int = Field(foreign_key="accounts.id", description="Счет выписки")
+    income_account_id: int = Field(foreign_key="accounts.id", description="Счет доходов по умолчанию")
+    expense_account_id: int = Field(foreign_key="accounts.id", description="Счет расходов по умолчанию")
+    status: StatementImportStatus = Field(default=StatementImportStatus.RUNNING, description="Статус")
+    lines_total: int = Field(default=0, description="Обработано строк")
+    lines_posted: int = Field(default=0, description="Проведено по правилам")
+    lines_queued: int = Field(default=0, description="Отправлено на разбор")
+    error: Optional[str] = Field(default=None, description="Ошибка импорта")
+    finished_at: Optional[datetime] = Field(default=None, description="Время окончания")
+
+
+class StatementLineStatus(str, Enum):
+    """Статусы строки очереди разбора"""
+    PENDING = "pending"
+    POSTED = "posted"
+    DISMISSED = "dismissed"
+
+
+class StatementLine(SQLModel, table=True):
+    """Строка выписки без совпавшего правила или с ошибкой разбора (очередь разбора)"""
+
+    __tablename__ = "statement_lines"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    import_id: int = Field(foreign_key="statement_imports.id", index=True, description="ID импорта")
+    line_number: int = Field(description="Номер строки файла")
+    date: Optional[datetime] = Field(default=None, description="Дата операции")
+    description: str = Field(default="", description="Описание операции")
+    amount: Optional[Decimal] = Field(default=None, description="Сумма со знаком (приход > 0)")
+    wallet: Optional[str] = Field(default=None, max_length=255, description="Адрес кошелька")
+    error: Optional[str] = Field(default=None, description="Ошибка разбора строки")
+    status: StatementLineStatus = Field(default=StatementLineStatus.PENDING, index=True, description="Статус")
+    transaction_id: Optional[int] = Field(default=None, description="ID проведенной транзакции")
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+# Схемы для API
+class ImportRuleCreate(SQLModel):
+    """Схема для создания правила"""
+    name: str
+    priority: int = 100
+    pattern: Optional[str] = None
+    is_regex: bool = False
+    amount_min: Optional[Decimal] = None
+    amount_max: Optional[Decimal] = None
+    direction: Optional[str] = None
+    wallet: Optional[str] = None
+    category_id: Optional[int] = None
+    counterparty_id: Optional[int] = None
+    project_id: Optional[int] = None
+    account_id: Optional[int] = None
+
+
+class ImportRuleUpdate(SQLModel):
+    """Схема для обновления правила"""
+    name: Optional[str] = None
+    priority: Optional[int] = None
+    is_active: Optional[bool] = None
+    pattern: Optional[str] = None
+    is_regex: Optional[bool] = None
+    amount_min: Optional[Decimal] = None
+    amount_max: Optional[Decimal] = None
+    direction: Optional[str] = None
+    wallet: Optional[str] = None
+    category_id: Optional[int] = None
+    counterparty_id: Optional[int] = None
+    project_id: Optional[int] = None
+    account_id: Optional[int] = None
+
+
+class ImportRuleRead(SQLModel):
+    """Схема для чтения правила"""
+    id: int
+    name: str
+    priority: int
+    is_active: bool
+    pattern: Optional[str]
+    is_regex: bool
+    amount_min: Optional[Decimal]
+    amount_max: Optional[Decimal]
+    direction: Optional[str]
+    wallet: Optional[str]
+    category_id: Optional[int]
+    counterparty_id: Optional[int]
+    project_id: Optional[int]
+    account_id: Optional[int]
+    created_at: datetime
+    updated_at: Optional[datetime]
+
+
+class StatementColumns(SQLModel):
+    """Формат CSV выписки: названия колонок и разбор значений"""
+    date_column: str = "date"
+    description_column: str = "description"
+    amount_column: str = "amount"  # сумма со знаком или приход, если задан outflow_column
+    outflow_column: Optional[str] = None  # расход отдельной колонкой
+    wallet_column: Optional[str] = None
+    delimiter: str = ","
+    date_format: Optional[str] = None  # формат strptime, по умолчанию ISO 8601
+    decimal_comma: bool = False  # 1.234,56
+
+
+class StatementImportRead(SQLModel):
+    """Схема для чтения импорта"""
+    id: int
+    filename: str
+    bank_account_id: int
+    income_account_id: int
+    expense_account_id: int
+    status: StatementImportStatus
+    lines_total: int
+    lines_posted: int
+    lines_queued: int
+    error: Optional[str]
+    created_at: datetime
+    finished_at: Optional[datetime]
+
+
+class StatementLineRead(SQLModel):
+    """Схема для чтения строки очереди разбора"""
+    id: int
+    import_id: int
+    line_number: int
+    date: Optional[datetime]
+    description: str
+    amount: Optional[Decimal]
+    wallet: Optional[str]
+    error: Optional[str]
+    status: StatementLineStatus
+    transaction_id: Optional[int]
+    created_at: datetime
+
+
+class StatementLinesPost(SQLModel):
+    """Схема для проведения строк очереди с ручным назначением"""
+    line_ids: List[int]
+    category_id: Optional[int] = None
+    counterparty_id: Optional[int] = None
+    project_id: Optional[int] = None
+    account_id: Optional[int] = None
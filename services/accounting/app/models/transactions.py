@@ -41,6 +41,10 @@ class Transaction(BaseModel, table=True):
     category_id: Optional[int] = Field(default=None, foreign_key="categories.id", description="ID категории")
     counterparty_id: Optional[int] = Field(default=None, foreign_key="counterparties.id", description="ID контрагента")
     
+    # Сторно: транзакция-сторно ссылается на исходную, исходная хранит время сторнирования
+    reversal_of_id: Optional[int] = Field(default=None, index=True, description="ID сторнируемой транзакции")
+    reversed_at: Optional[datetime] = Field(default=None, description="Когда транзакция сторнирована")
+    
     # Связи (временно отключены)
     # project: Optional["Project"] = Relationship(back_populates="transactions")
     # category: Optional["Category"] = Relationship(back_populates="transactions")
@@ -59,6 +63,10 @@ class TransactionEntry(BaseModel, table=True):
     amount: Decimal = Field(description="Сумма проводки")
     direction: str = Field(max_length=10, description="Направление (DEBIT/CREDIT)")
     description: Optional[str] = Field(default=None, description="Описание проводки")
+    transaction_date: Optional[datetime] = Field(
+        default=None, description="Дата транзакции (ключ секционирования)"
+    )
+    reversal_of_id: Optional[int] = Field(default=None, description="ID сторнируемой проводки")
     
     # Связи (временно отключены)
     # transaction: Transaction = Relationship(back_populates="entries")
@@ -121,5 +129,7 @@ class TransactionRead(SQLModel):
     project_id: Optional[int]
     category_id: Optional[int]
     counterparty_id: Optional[int]
+    reversal_of_id: Optional[int] = None
+    reversed_at: Optional[datetime] = None
     created_at: datetime
     updated_at: Optional[datetime]
@@ -11,6 +11,45 @@ from .crypto import (
     CryptoAccountSummary,
     CryptoTransactionValidationResult
 )
+from .reconciliation import (
+    ReconciliationStatus,
+    ReconciliationItem,
+    ReconciliationSummary,
+    ReconciliationReport
+)
+from .dashboard import (
+    DashboardAccount,
+    DashboardProject,
+    DashboardSummary
+)
+from .search import (
+    SearchMatch,
+    TransactionHit,
+    NamedHit,
+    SearchResults,
+    Suggestion
+)
+from .counterparties import (
+    CounterpartyStatsSort,
+    CounterpartyStatsRead,
+    CounterpartyLeaderboard
+)
+from .integrity import (
+    TransactionIssueKind,
+    TransactionIssue,
+    BalanceDrift,
+    IntegrityReport
+)
+from .budgets import (
+    ProjectBudgetRead,
+    BudgetOverview
+)
+from .reports import (
+    ProjectRoi,
+    ProjectRoiReport,
+    CategoryRollupRow,
+    CategoryRollupReport
+)
 
 __all__ = [
     'CryptoTransactionDetailRead',
@@ -19,5 +58,30 @@ __all__ = [
     'CryptoCurrencyInfo',
     'WalletValidationResponse',
     'CryptoAccountSummary',
-    'CryptoTransactionValidationResult'
+    'CryptoTransactionValidationResult',
+    'ReconciliationStatus',
+    'ReconciliationItem',
+    'ReconciliationSummary',
+    'ReconciliationReport',
+    'ProjectRoi',
+    'ProjectRoiReport',
+    'CategoryRollupRow',
+    'CategoryRollupReport',
+    'DashboardAccount',
+    'DashboardProject',
+    'DashboardSummary',
+    'SearchMatch',
+    'TransactionHit',
+    'NamedHit',
+    'SearchResults',
+    'Suggestion',
+    'CounterpartyStatsSort',
+    'CounterpartyStatsRead',
+    'CounterpartyLeaderboard',
+    'TransactionIssueKind',
+    'TransactionIssue',
+    'BalanceDrift',
+    'IntegrityReport',
+    'ProjectBudgetRead',
+    'BudgetOverview'
 ]
@@ -0,0 +1,30 @@
+"""
+Схемы бюджетов проектов
+"""
+
+from datetime import datetime
+from decimal import Decimal
+from typing import List, Optional
+from pydantic import BaseModel
+
+from app.models.projects import ProjectStatus
+
+
+class ProjectBudgetRead(BaseModel):
+    """Расходы проекта относительно бюджета"""
+    project_id: int
+    name: str
+    status: ProjectStatus
+    currency: str
+    budget: Optional[Decimal] = None
+    spent: Decimal
+    remaining: Optional[Decimal] = None  # бюджет - расходы
+    used_pct: Optional[Decimal] = None  # расходы, % бюджета
+    transaction_count: int
+    last_expense_at: Optional[datetime] = None
+
+
+class BudgetOverview(BaseModel):
+    """Страница обзора бюджетов"""
+    total: int
+    items: List[ProjectBudgetRead]
@@ -0,0 +1,43 @@
+"""
+Схемы оборотов и рейтингов контрагентов
+"""
+
+from datetime import datetime
+from decimal import Decimal
+from enum import Enum
+from typing import List, Optional
+from pydantic import BaseModel
+
+from app.models.counterparties import CounterpartyType
+
+
+class CounterpartyStatsSort(str, Enum):
+    """Поле сортировки рейтинга"""
+    TOTAL_PAID = "total_paid"
+    TOTAL_RECEIVED = "total_received"
+    TURNOVER = "turnover"
+    NET = "net"
+    TRANSACTION_COUNT = "transaction_count"
+    LAST_ACTIVITY = "last_activity_at"
+
+
+class CounterpartyStatsRead(BaseModel):
+    """Обороты контрагента"""
+    counterparty_id: int
+    name: str
+    type: CounterpartyType
+    is_active: bool
+    total_paid: Decimal
+    total_received: Decimal
+    turnover: Decimal  # получено + оплачено
+    net: Decimal  # получено - оплачено
+    transaction_count: int
+    first_activity_at: Optional[datetime] = None
+    last_activity_at: Optional[datetime] = None
+
+
+class CounterpartyLeaderboard(BaseModel):
+    """Страница рейтинга контрагентов"""
+    sort: CounterpartyStatsSort
+    total: int
+    items: List[CounterpartyStatsRead]
@@ -0,0 +1,44 @@
+"""
+Схемы сводки для главной панели
+"""
+
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, List
+from pydantic import BaseModel
+
+from app.models.accounts import AccountType
+from app.models.transactions import TransactionRead
+
+
+class DashboardAccount(BaseModel):
+    """Счет с текущим балансом"""
+    id: int
+    name: str
+    type: AccountType
+    currency: str
+    balance: Decimal
+
+
+class DashboardProject(BaseModel):
+    """Итоги проекта за период сводки"""
+    project_id: int
+    name: str
+    income: Decimal
+    expense: Decimal
+    profit: Decimal
+    transaction_count: int
+
+
+class DashboardSummary(BaseModel):
+    """Данные главной панели одним ответом"""
+    generated_at: datetime
+    currency: str  # базовая валюта сумм
+    period_start: datetime  # начало периода доходов, расходов и итогов проектов
+    total_balance: Decimal
+    income: Decimal
+    expense: Decimal
+    accounts: List[DashboardAccount]
+    recent_transactions: List[TransactionRead]
+    projects: List[DashboardProject]
+    rates: Dict[str, Decimal]  # курсы валют к базовой
@@ -0,0 +1,51 @@
+"""
+Схемы проверки целостности книги
+"""
+
+from datetime import datetime
+from decimal import Decimal
+from enum import Enum
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+class TransactionIssueKind(str, Enum):
+    """Вид нарушения в транзакции"""
+    UNBALANCED = "unbalanced"  # дебет != кредит
+    AMOUNT_MISMATCH = "amount_mismatch"  # дебет != сумма транзакции
+    MISSING_ENTRIES = "missing_entries"  # нет проводок с датой транзакции
+    ORPHAN_ENTRIES = "orphan_entries"  # проводки без транзакции с той же датой
+
+
+class TransactionIssue(BaseModel):
+    """Нарушение двойной записи в транзакции"""
+    transaction_id: int
+    kind: TransactionIssueKind
+    date: Optional[datetime] = None
+    amount: Optional[Decimal] = None
+    debit: Optional[Decimal] = None
+    credit: Optional[Decimal] = None
+
+
+class BalanceDrift(BaseModel):
+    """Расхождение сохраненного баланса счета с суммой проводок"""
+    account_id: int
+    name: str
+    stored: Decimal
+    computed: Decimal
+    difference: Decimal  # stored - computed
+    repaired: bool = False
+
+
+class IntegrityReport(BaseModel):
+    """Итоги проверки книги"""
+    started_at: datetime
+    duration_seconds: float
+    chunks: int
+    transactions_checked: int
+    entries_checked: int
+    accounts_checked: int
+    drift: List[BalanceDrift]
+    issues: List[TransactionIssue]
+    issues_truncated: bool  # в части диапазонов найдено больше INTEGRITY_MAX_ISSUES нарушений
+    ok: bool
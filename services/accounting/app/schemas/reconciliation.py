@@ -0,0 +1,55 @@
+"""
+Схемы сверки расходов на трафик с бухгалтерией
+"""
+
+from datetime import date
+from decimal import Decimal
+from enum import Enum
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+class ReconciliationStatus(str, Enum):
+    """Результат сверки дня"""
+    MATCHED = "matched"
+    DISCREPANCY = "discrepancy"
+    UNMATCHED_TRAFFIC = "unmatched_traffic"  # расход в аналитике без проводки
+    UNMATCHED_LEDGER = "unmatched_ledger"  # проводка без расхода в аналитике
+
+
+class ReconciliationItem(BaseModel):
+    """Пара (расход трафика, расходы по книге) за день проекта"""
+    project_id: int
+    status: ReconciliationStatus
+    traffic_date: Optional[date] = None
+    ledger_date: Optional[date] = None
+    traffic_spend: Optional[Decimal] = None
+    ledger_amount: Optional[Decimal] = None
+    difference: Optional[Decimal] = None  # ledger_amount - traffic_spend
+    transaction_count: int = 0
+
+
+class ReconciliationSummary(BaseModel):
+    """Итоги сверки"""
+    matched: int
+    discrepancies: int
+    unmatched_traffic: int
+    unmatched_ledger: int
+    traffic_total: Decimal
+    ledger_total: Decimal
+    difference: Decimal
+
+
+class ReconciliationReport(BaseModel):
+    """Отчет сверки за период"""
+    start: date
+    end: date
+    amount_tolerance: Decimal
+    amount_tolerance_pct: Decimal
+    date_tolerance_days: int
+    summary: ReconciliationSummary
+    matched: List[ReconciliationItem]
+    discrepancies: List[ReconciliationItem]
+    unmatched_traffic: List[ReconciliationItem]
+    unmatched_ledger: List[ReconciliationItem]
+    unmapped_campaigns: List[str]  # кампании с расходом, не привязанные к проектам
@@ -0,0 +1,56 @@
+"""
+Схемы отчетов по проектам
+"""
+
+from datetime import date
+from decimal import Decimal
+from typing import List, Optional
+from pydantic import BaseModel
+
+from app.models.transactions import TransactionType
+
+
+class ProjectRoi(BaseModel):
+    """P&L и ROI проекта за период"""
+    project_id: int
+    project_name: str
+    currency: str  # валюта отчета
+    income: Decimal
+    expense: Decimal
+    profit: Decimal  # income - expense
+    roi: Optional[Decimal] = None  # profit / expense
+    clicks: int
+    conversions: int
+    traffic_spend: Decimal
+    traffic_payout: Decimal
+    cost_per_click: Optional[Decimal] = None  # expense / clicks
+    cost_per_conversion: Optional[Decimal] = None  # expense / conversions
+    campaigns: List[str]
+
+
+class ProjectRoiReport(BaseModel):
+    """Отчет ROI по проектам за период"""
+    start: date
+    end: date
+    currency: str
+    projects: List[ProjectRoi]
+
+
+class CategoryRollupRow(BaseModel):
+    """Итог категории вместе со всеми подкатегориями"""
+    category_id: int
+    name: str
+    parent_id: Optional[int] = None
+    total: Decimal  # категория и все потомки
+    own_total: Decimal  # только транзакции самой категории
+    transaction_count: int
+
+
+class CategoryRollupReport(BaseModel):
+    """Отчет по поддеревьям категорий за период"""
+    start: date
+    end: date
+    root_id: Optional[int] = None
+    type: Optional[TransactionType] = None
+    currency: str
+    rows: List[CategoryRollupRow]
@@ -0,0 +1,56 @@
+"""
+Схемы полнотекстового поиска по книге
+"""
+
+from datetime import datetime
+from decimal import Decimal
+from enum import Enum
+from typing import List, Optional
+from pydantic import BaseModel
+
+from app.models.transactions import TransactionStatus, TransactionType
+
+
+class SearchMatch(str, Enum):
+    """Поле, по которому найдена транзакция"""
+    DESCRIPTION = "description"
+    ENTRY = "entry"
+    COUNTERPARTY = "counterparty"
+    WALLET = "wallet"
+
+
+class TransactionHit(BaseModel):
+    """Найденная транзакция"""
+    id: int
+    description: str
+    type: TransactionType
+    status: TransactionStatus
+    amount: Decimal
+    date: datetime
+    project_id: Optional[int] = None
+    category_id: Optional[int] = None
+    counterparty_id: Optional[int] = None
+    score: float  # похожесть 0..1, по ней упорядочены результаты
+    matched: List[SearchMatch]
+
+
+class NamedHit(BaseModel):
+    """Найденный контрагент или счет"""
+    id: int
+    name: str
+    score: float
+
+
+class SearchResults(BaseModel):
+    """Результаты поиска"""
+    query: str
+    transactions: List[TransactionHit]
+    counterparties: List[NamedHit]
+    accounts: List[NamedHit]
+
+
+class Suggestion(BaseModel):
+    """Вариант автодополнения"""
+    kind: str  # counterparty, account, description
+    value: str
+    id: Optional[int] = None
@@ -0,0 +1,275 @@
+"""
+Сервис расходов и бюджетов проектов
+"""
+
+import logging
+from decimal import Decimal
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import case, delete, func, insert, or_, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, select
+
+from app.core.live import BUDGETS_CHANNEL, publish
+from app.models.projects import (
+    BudgetAlert, BudgetAlertRead, BudgetAlertRule, BudgetAlertRuleCreate, Project, ProjectSpend,
+    ProjectStatus
+)
+from app.models.transactions import Transaction, TransactionStatus, TransactionType
+from app.schemas.budgets import BudgetOverview, ProjectBudgetRead
+from app.services.currency import to_money
+
+logger = logging.getLogger(__name__)
+
+
+def publish_alerts(alerts: List[BudgetAlert]) -> None:
+    """Публикация зафиксированных событий порогов в канал live:budgets"""
+    if not alerts:
+        return
+    for alert in alerts:
+        logger.warning(
+            "Project %s crossed %s%% of budget: spent %s of %s",
+            alert.project_id, alert.threshold_pct, alert.spent, alert.budget
+        )
+    publish(BUDGETS_CHANNEL, {
+        "alerts": [BudgetAlertRead.model_validate(alert).model_dump(mode="json") for alert in alerts]
+    })
+
+
+class ProjectBudgetService:
+    """
+    Расходы проектов (таблица project_spend) и пороги бюджета
+
+    apply() вызывается при проведении до фиксации: расход проекта
+    меняется атомарным upsert, который возвращает новое значение,
+    поэтому пересечение порога снизу вверх определяется по значениям
+    до и после изменения ровно одной транзакцией даже при
+    одновременных проведениях. Событие пересечения записывается в
+    budget_alerts вместе с проводкой и публикуется после фиксации
+    (publish_alerts).
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.dialect = db.get_bind().dialect.name
+
+    def apply(self, transaction: Transaction) -> List[BudgetAlert]:
+        """Учет проведенной транзакции (сторно — с отрицательной суммой)"""
+        if transaction.project_id is None or transaction.type != TransactionType.EXPENSE:
+            return []
+        return self._apply(
+            transaction.project_id,
+            Decimal(transaction.amount),
+            count=-1 if transaction.reversal_of_id else 1,
+            date=transaction.date,
+            transaction_id=transaction.id,
+        )
+
+    def apply_batch(self, transactions: Iterable[Transaction]) -> List[BudgetAlert]:
+        """
+        Учет пакета транзакций одним upsert на проект; событие порога
+        ссылается на последнюю транзакцию проекта в пакете
+        """
+        totals: Dict[int, Tuple[Decimal, int, datetime, int]] = {}
+        for transaction in transactions:
+            if transaction.project_id is None or transaction.type != TransactionType.EXPENSE:
+                continue
+            amount, count, date, _ = totals.get(
+                transaction.project_id, (Decimal("0"), 0, transaction.date, transaction.id)
+            )
+            totals[transaction.project_id] = (
+                amount + Decimal(transaction.amount),
+                count + (-1 if transaction.reversal_of_id else 1),
+                max(date, transaction.date),
+                transaction.id,
+            )
+        alerts = []
+        for project_id in sorted(totals):
+            amount, count, date, transaction_id = totals[project_id]
+            alerts += self._apply(project_id, amount, count, date, transaction_id)
+        return alerts
+
+    def apply_reversals(self, transaction_ids: List[int], date: datetime) -> None:
+        """Учет сторно транзакций transaction_ids: по одному upsert на проект"""
+        rows = self.db.execute(
+            select(Transaction.project_id, func.sum(Transaction.amount), func.count(Transaction.id))
+            .where(
+                Transaction.id.in_(transaction_ids),
+                Transaction.project_id.is_not(None),
+                Transaction.type == TransactionType.EXPENSE,
+            )
+            .group_by(Transaction.project_id)
+        ).all()
+        for project_id, amount, count in rows:
+            self._apply(project_id, -Decimal(amount or 0), -count, date, None)
+
+    def _apply(
+        self,
+        project_id: int,
+        amount: Decimal,
+        count: int,
+        date: datetime,
+        transaction_id: Optional[int],
+    ) -> List[BudgetAlert]:
+        table = ProjectSpend.__table__
+        dialect = sqlite if self.dialect == "sqlite" else postgresql
+        statement = dialect.insert(table).values(
+            project_id=project_id,
+            spent=amount,
+            transaction_count=count,
+            last_expense_at=date,
+        )
+        greatest = func.max if self.dialect == "sqlite" else func.greatest
+        excluded = statement.excluded
+        spent = self.db.execute(
+            statement.on_conflict_do_update(
+                index_elements=[table.c.project_id],
+                set_={
+                    "spent": table.c.spent + excluded.spent,
+                    "transaction_count": table.c.transaction_count + excluded.transaction_count,
+                    "last_expense_at": greatest(table.c.last_expense_at, excluded.last_expense_at),
+                },
+            ).returning(table.c.spent)
+        ).scalar_one()
+
+        if amount <= 0:
+            return []
+        budget = self.db.exec(select(Project.budget).where(Project.id == project_id)).one()
+        if not budget or budget <= 0:
+            return []
+
+        spent = Decimal(spent)
+        budget = Decimal(str(budget))
+        before = spent - amount
+        alerts = []
+        for rule_id, threshold_pct in self._thresholds(project_id):
+            threshold = budget * threshold_pct / 100
+            if before < threshold <= spent:
+                alert = BudgetAlert(
+                    project_id=project_id,
+                    rule_id=rule_id,
+                    threshold_pct=threshold_pct,
+                    budget=budget,
+                    spent=spent,
+                    transaction_id=transaction_id,
+                )
+                self.db.add(alert)
+                alerts.append(alert)
+        if alerts:
+            self.db.flush()
+        return alerts
+
+    def _thresholds(self, project_id: int) -> List[Tuple[int, Decimal]]:
+        """Активные пороги проекта; правило проекта заменяет общее с тем же порогом"""
+        rules = self.db.exec(
+            select(BudgetAlertRule.id, BudgetAlertRule.threshold_pct, BudgetAlertRule.project_id)
+            .where(
+                BudgetAlertRule.is_active == True,  # noqa: E712
+                or_(BudgetAlertRule.project_id.is_(None), BudgetAlertRule.project_id == project_id),
+            )
+            .order_by(BudgetAlertRule.project_id.is_(None), BudgetAlertRule.id)
+        ).all()
+        thresholds: Dict[Decimal, int] = {}
+        for rule_id, threshold_pct, _ in rules:
+            thresholds.setdefault(Decimal(threshold_pct), rule_id)
+        return sorted((rule_id, pct) for pct, rule_id in thresholds.items())
+
+    def rebuild(self) -> int:
+        """Пересчет расходов по проведенным транзакциям; возвращает число проектов"""
+        if self.dialect == "postgresql":
+            # Проведения ждут окончания пересчета и не теряются между
+            # удалением и вставкой
+            self.db.execute(text("LOCK TABLE project_spend IN EXCLUSIVE MODE"))
+
+        count = case((Transaction.reversal_of_id.is_(None), 1), else_=-1)
+        totals = (
+            select(
+                Transaction.project_id,
+                func.coalesce(func.sum(Transaction.amount), 0),
+                func.sum(count),
+                func.max(Transaction.date),
+            )
+            .where(
+                Transaction.project_id.is_not(None),
+                Transaction.type == TransactionType.EXPENSE,
+                Transaction.status == TransactionStatus.COMPLETED,
+            )
+            .group_by(Transaction.project_id)
+        )
+        self.db.execute(delete(ProjectSpend))
+        result = self.db.execute(insert(ProjectSpend).from_select(
+            ["project_id", "spent", "transaction_count", "last_expense_at"], totals
+        ))
+        self.db.commit()
+        return result.rowcount
+
+    def create_rule(self, rule_data: BudgetAlertRuleCreate) -> BudgetAlertRule:
+        if rule_data.threshold_pct <= 0:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Threshold must be positive"
+            )
+        if rule_data.project_id and not self.db.get(Project, rule_data.project_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Project {rule_data.project_id} not found"
+            )
+        rule = BudgetAlertRule(**rule_data.model_dump())
+        self.db.add(rule)
+        self.db.commit()
+        self.db.refresh(rule)
+        return rule
+
+    def overview(
+        self,
+        status: Optional[ProjectStatus] = None,
+        min_used_pct: Optional[Decimal] = None,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> BudgetOverview:
+        """Расходы проектов относительно бюджета, самые израсходованные первыми"""
+        spent = func.coalesce(ProjectSpend.spent, 0)
+        used_pct = case(
+            (Project.budget > 0, spent * 100 / Project.budget), else_=None
+        )
+        conditions = []
+        if status:
+            conditions.append(Project.status == status)
+        if min_used_pct is not None:
+            conditions.append(used_pct >= min_used_pct)
+
+        base = select(Project).outerjoin(ProjectSpend, ProjectSpend.project_id == Project.id)
+        total = self.db.execute(
+            select(func.count()).select_from(base.where(*conditions).subquery())
+        ).scalar_one()
+        rows = self.db.execute(
+            select(Project, ProjectSpend)
+            .outerjoin(ProjectSpend, ProjectSpend.project_id == Project.id)
+            .where(*conditions)
+            .order_by(used_pct.desc().nulls_last(), spent.desc(), Project.id)
+            .offset(skip)
+            .limit(limit)
+        ).all()
+        return BudgetOverview(
+            total=total,
+            items=[self._read(project, stats) for project, stats in rows],
+        )
+
+    @staticmethod
+    def _read(project: Project, stats: Optional[ProjectSpend]) -> ProjectBudgetRead:
+        spent = to_money(stats.spent if stats else 0)
+        budget = to_money(project.budget) if project.budget is not None else None
+        return ProjectBudgetRead(
+            project_id=project.id,
+            name=project.name,
+            status=project.status,
+            currency=project.currency,
+            budget=budget,
+            spent=spent,
+            remaining=budget - spent if budget is not None else None,
+            used_pct=round(spent * 100 / budget, 2) if budget else None,
+            transaction_count=stats.transaction_count if stats else 0,
+            last_expense_at=stats.last_expense_at if stats else None,
+        )
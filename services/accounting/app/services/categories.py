@@ -0,0 +1,208 @@
+"""
+Сервис дерева категорий: таблица замыкания и кэш дерева
+"""
+
+import threading
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, func, insert, literal, select as sa_select, true
+from sqlmodel import Session, select
+
+from app.core.cache import CATEGORIES_DATASET, bump_data_version, get_data_version
+from app.models.categories import Category, CategoryClosure, CategoryTreeNode
+
+# Дерево для выбора категории: (версия данных, узлы верхнего уровня)
+_tree_cache: Optional[tuple] = None
+_tree_lock = threading.Lock()
+
+
+def invalidate_category_tree() -> None:
+    """Сброс кэша дерева во всех процессах"""
+    global _tree_cache
+    _tree_cache = None
+    bump_data_version(CATEGORIES_DATASET)
+
+
+class CategoryTreeService:
+    """
+    Поддержка таблицы замыкания category_closure
+
+    Все операции выполняются множественными INSERT ... SELECT
+    и DELETE в той же транзакции, что и изменение категории;
+    фиксирует транзакцию вызывающий код.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def add_node(self, category: Category) -> None:
+        """Связи новой категории: с собой и со всеми предками родителя"""
+        closure = CategoryClosure.__table__
+        ancestors = sa_select(
+            closure.c.ancestor_id,
+            literal(category.id),
+            closure.c.depth + 1,
+        ).where(closure.c.descendant_id == category.parent_id)
+
+        self.db.execute(insert(closure).values(
+            ancestor_id=category.id, descendant_id=category.id, depth=0
+        ))
+        if category.parent_id is not None:
+            self.db.execute(insert(closure).from_select(
+                ["ancestor_id", "descendant_id", "depth"], ancestors
+            ))
+
+    def validate_parent(self, parent_id: Optional[int], category_id: Optional[int] = None) -> None:
+        """Проверка, что родитель существует и не лежит в поддереве категории"""
+        if parent_id is None:
+            return
+        if not self.db.get(Category, parent_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Parent category not found"
+            )
+        if category_id is None:
+            return
+        cycle = self.db.exec(
+            select(CategoryClosure).where(
+                CategoryClosure.ancestor_id == category_id,
+                CategoryClosure.descendant_id == parent_id,
+            )
+        ).first()
+        if cycle:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Category cannot be moved into its own subtree"
+            )
+
+    def move_node(self, category: Category, new_parent_id: Optional[int]) -> None:
+        """
+        Перенос поддерева под нового родителя
+
+        Удаляются связи поддерева со старыми предками, затем поддерево
+        соединяется со всеми предками нового родителя (декартово
+        произведение предков и потомков).
+        """
+        closure = CategoryClosure.__table__
+        subtree = sa_select(closure.c.descendant_id).where(
+            closure.c.ancestor_id == category.id
+        )
+
+        self.db.execute(
+            delete(closure).where(
+                closure.c.descendant_id.in_(subtree.scalar_subquery()),
+                closure.c.ancestor_id.not_in(subtree.scalar_subquery()),
+            )
+        )
+
+        if new_parent_id is not None:
+            parents = closure.alias("parents")
+            children = closure.alias("children")
+            links = sa_select(
+                parents.c.ancestor_id,
+                children.c.descendant_id,
+                parents.c.depth + children.c.depth + 1,
+            ).select_from(
+                parents.join(children, true())
+            ).where(
+                parents.c.descendant_id == new_parent_id,
+                children.c.ancestor_id == category.id,
+            )
+            self.db.execute(insert(closure).from_select(
+                ["ancestor_id", "descendant_id", "depth"], links
+            ))
+
+    def remove_node(self, category: Category) -> None:
+        """Удаление связей листовой категории"""
+        has_children = self.db.exec(
+            select(Category.id).where(Category.parent_id == category.id)
+        ).first()
+        if has_children:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Category has subcategories"
+            )
+        self.db.execute(
+            delete(CategoryClosure.__table__).where(
+                CategoryClosure.descendant_id == category.id
+            )
+        )
+
+    def rebuild(self) -> int:
+        """
+        Полное построение таблицы замыкания по parent_id
+
+        Нужно для категорий, созданных до появления таблицы.
+        Возвращает число связей.
+        """
+        categories = self.db.exec(select(Category.id, Category.parent_id)).all()
+        parents = dict(categories)
+
+        rows = []
+        for category_id in parents:
+            ancestor, depth, seen = category_id, 0, set()
+            while ancestor is not None and ancestor not in seen:
+                seen.add(ancestor)
+                rows.append({"ancestor_id": ancestor, "descendant_id": category_id, "depth": depth})
+                ancestor, depth = parents.get(ancestor), depth + 1
+
+        closure = CategoryClosure.__table__
+        self.db.execute(delete(closure))
+        if rows:
+            self.db.execute(insert(closure), rows)
+        self.db.commit()
+        invalidate_category_tree()
+        return len(rows)
+
+    def ensure_closure(self) -> None:
+        """Построение таблицы, если категории есть, а связей нет"""
+        linked = self.db.exec(select(func.count()).select_from(CategoryClosure)).one()
+        total = self.db.exec(select(func.count()).select_from(Category)).one()
+        if total and linked < total:
+            self.rebuild()
+
+    def get_tree(self) -> List[CategoryTreeNode]:
+        """
+        Дерево категорий для выбора в интерфейсе
+
+        Хранится в памяти процесса и перестраивается при изменении
+        версии категорий в Redis (изменение в любом процессе сервиса).
+        Без Redis кэш сбрасывают только изменения в этом процессе.
+        """
+        global _tree_cache
+        version = get_data_version(CATEGORIES_DATASET)
+        cached = _tree_cache
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        with _tree_lock:
+            tree = self._build_tree()
+            _tree_cache = (version, tree)
+        return tree
+
+    def _build_tree(self) -> List[CategoryTreeNode]:
+        """Сборка дерева за один запрос"""
+        categories = self.db.exec(select(Category).order_by(Category.name)).all()
+
+        nodes: Dict[int, CategoryTreeNode] = {
+            category.id: CategoryTreeNode(
+                id=category.id,
+                name=category.name,
+                type=category.type,
+                is_active=category.is_active,
+                color=category.color,
+                icon=category.icon,
+                children=[],
+            )
+            for category in categories
+        }
+
+        roots = []
+        for category in categories:
+            parent = nodes.get(category.parent_id) if category.parent_id else None
+            if parent:
+                parent.children.append(nodes[category.id])
+            else:
+                roots.append(nodes[category.id])
+        return roots
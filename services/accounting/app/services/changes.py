@@ -0,0 +1,206 @@
+"""
+Лента изменений книги для инкрементальной синхронизации клиентов
+"""
+
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, Optional
+
+from fastapi import HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, func, insert, literal, text
+from sqlalchemy.sql import Select
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models.changes import (
+    ChangeEntity, ChangeFeed, ChangeLogEntry, ChangeOperation, ChangeRead
+)
+
+logger = logging.getLogger(__name__)
+
+# Ключ pg_advisory_xact_lock, упорядочивающего записи ленты
+CHANGE_LOG_LOCK = 0x63686C67
+# Задержка переподключения браузера к потоку SSE
+SSE_RETRY_MS = 3000
+
+
+def record_change(
+    db: Session,
+    entity: ChangeEntity,
+    entity_id: int,
+    operation: ChangeOperation,
+    data: Optional[Dict[str, Any]] = None,
+) -> None:
+    """
+    Запись изменения в ленту в текущей транзакции БД
+
+    Вызывается непосредственно перед commit: запись фиксируется
+    вместе с самим изменением или не фиксируется вовсе. В PostgreSQL
+    транзакционная advisory-блокировка до commit гарантирует, что
+    seq фиксируются в порядке возрастания и клиент, прочитавший
+    ленту до seq N, не пропустит позже зафиксированное меньшее seq.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": CHANGE_LOG_LOCK})
+    db.add(ChangeLogEntry(
+        entity=entity,
+        entity_id=entity_id,
+        operation=operation,
+        data=data,
+    ))
+
+
+def record_changes(
+    db: Session, entity: ChangeEntity, operation: ChangeOperation, ids: Select
+) -> None:
+    """
+    Изменения сущностей с ID из запроса ids одним INSERT ... SELECT
+
+    Для массовых операций: записи без данных, клиенты перечитывают
+    измененные сущности. Гарантии порядка те же, что у record_change.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": CHANGE_LOG_LOCK})
+    columns = ChangeLogEntry.__table__.c
+    db.execute(insert(ChangeLogEntry.__table__).from_select(
+        ["entity", "entity_id", "operation", "created_at"],
+        ids.with_only_columns(
+            literal(entity, columns.entity.type),
+            *ids.selected_columns,
+            literal(operation, columns.operation.type),
+            literal(datetime.utcnow(), columns.created_at.type),
+        ),
+    ))
+
+
+class ChangeFeedService:
+    """Чтение и очистка ленты изменений"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def latest_seq(self) -> int:
+        """Последний курсор ленты (0 для пустой ленты)"""
+        return self.db.exec(select(func.max(ChangeLogEntry.seq))).one() or 0
+
+    def read(self, since: int = 0, limit: int = 500) -> ChangeFeed:
+        """
+        Изменения с курсором больше since
+
+        Raises:
+            HTTPException 410: изменения после since уже удалены из ленты,
+            клиенту нужна полная синхронизация
+        """
+        changes = self.db.exec(
+            select(ChangeLogEntry)
+            .where(ChangeLogEntry.seq > since)
+            .order_by(ChangeLogEntry.seq)
+            .limit(limit + 1)
+        ).all()
+
+        if since > 0 and (not changes or changes[0].seq > since + 1):
+            oldest = self.db.exec(select(func.min(ChangeLogEntry.seq))).one()
+            if oldest is not None and oldest > since + 1:
+                raise HTTPException(
+                    status_code=status.HTTP_410_GONE,
+                    detail=f"Cursor {since} is older than the retained change feed"
+                )
+
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+        return ChangeFeed(
+            changes=[ChangeRead.model_validate(change) for change in changes],
+            cursor=changes[-1].seq if changes else max(since, 0),
+            has_more=has_more,
+        )
+
+    def prune(self, retention_days: Optional[int] = None) -> int:
+        """
+        Удаление изменений старше срока хранения
+
+        Последняя запись сохраняется всегда, чтобы курсор ленты
+        не начинался заново после очистки.
+
+        Returns:
+            Количество удаленных записей
+        """
+        if retention_days is None:
+            retention_days = settings.CHANGE_FEED_RETENTION_DAYS
+        latest = self.latest_seq()
+        cutoff = datetime.utcnow() - timedelta(days=retention_days)
+        result = self.db.execute(
+            delete(ChangeLogEntry).where(
+                ChangeLogEntry.created_at < cutoff,
+                ChangeLogEntry.seq < latest,
+            )
+        )
+        self.db.commit()
+        if result.rowcount:
+            logger.info(f"Pruned {result.rowcount} change feed entries")
+        return result.rowcount
+
+
+def _read_changes(since: int, limit: int) -> ChangeFeed:
+    """Чтение ленты в отдельной короткой сессии (не держит соединение при ожидании)"""
+    with Session(engine) as db:
+        return ChangeFeedService(db).read(since, limit)
+
+
+async def wait_for_changes(since: int, limit: int, timeout: float) -> ChangeFeed:
+    """Длинный опрос: ожидание изменений после since не дольше timeout секунд"""
+    deadline = time.monotonic() + timeout
+    while True:
+        feed = await run_in_threadpool(_read_changes, since, limit)
+        if feed.changes or time.monotonic() >= deadline:
+            return feed
+        await asyncio.sleep(
+            min(settings.CHANGE_FEED_POLL_INTERVAL, max(deadline - time.monotonic(), 0))
+        )
+
+
+def _sse(event: str, data: Any, event_id: Optional[int] = None) -> str:
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def stream_changes(request: Request, since: int, limit: int = 500) -> AsyncIterator[str]:
+    """
+    Поток изменений Server-Sent Events
+
+    id события — курсор изменения, поэтому браузер при переподключении
+    передает его в Last-Event-ID и поток продолжается без пропусков.
+    Если курсор устарел, отправляется событие reset и поток закрывается.
+    """
+    cursor = since
+    last_sent = time.monotonic()
+    yield f"retry: {SSE_RETRY_MS}\n\n"
+
+    while not await request.is_disconnected():
+        try:
+            feed = await run_in_threadpool(_read_changes, cursor, limit)
+        except HTTPException as e:
+            yield _sse("reset", {"detail": e.detail})
+            return
+
+        for change in feed.changes:
+            yield _sse("change", change.model_dump(mode="json"), change.seq)
+        cursor = feed.cursor
+
+        if feed.changes:
+            last_sent = time.monotonic()
+        elif time.monotonic() - last_sent >= settings.CHANGE_FEED_HEARTBEAT_SECONDS:
+            # Комментарий SSE не дает прокси закрыть простаивающее соединение
+            yield ": keepalive\n\n"
+            last_sent = time.monotonic()
+
+        if not feed.has_more:
+            await asyncio.sleep(settings.CHANGE_FEED_POLL_INTERVAL)
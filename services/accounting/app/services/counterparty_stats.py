@@ -0,0 +1,231 @@
+"""
+Сервис оборотов контрагентов
+"""
+
+from decimal import Decimal
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import case, delete, func, insert, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, select
+
+from app.models.counterparties import Counterparty, CounterpartyStats, CounterpartyType
+from app.models.transactions import Transaction, TransactionStatus, TransactionType
+from app.schemas.counterparties import (
+    CounterpartyLeaderboard, CounterpartyStatsRead, CounterpartyStatsSort
+)
+
+
+class CounterpartyStatsService:
+    """
+    Обороты контрагентов (оплачено, получено, количество и даты
+    транзакций) в таблице counterparty_stats
+
+    apply() вызывается при проведении транзакции до фиксации, поэтому
+    обороты всегда согласованы с книгой; rebuild() пересчитывает
+    таблицу по всем проведенным транзакциям.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.dialect = db.get_bind().dialect.name
+
+    def apply(self, transaction: Transaction) -> None:
+        """Учет проведенной транзакции (сторно — с отрицательной суммой) одним атомарным upsert"""
+        if transaction.counterparty_id is None:
+            return
+
+        amount = Decimal(transaction.amount)
+        zero = Decimal("0")
+        self._upsert(
+            transaction.counterparty_id,
+            paid=amount if transaction.type == TransactionType.EXPENSE else zero,
+            received=amount if transaction.type == TransactionType.INCOME else zero,
+            count=-1 if transaction.reversal_of_id else 1,
+            date=transaction.date,
+        )
+
+    def apply_reversals(self, transaction_ids: List[int], date: datetime) -> None:
+        """Учет сторно транзакций transaction_ids: по одному upsert на контрагента"""
+        rows = self.db.execute(
+            select(
+                Transaction.counterparty_id,
+                func.sum(self._paid()),
+                func.sum(self._received()),
+                func.count(Transaction.id),
+            )
+            .where(
+                Transaction.id.in_(transaction_ids),
+                Transaction.counterparty_id.is_not(None),
+            )
+            .group_by(Transaction.counterparty_id)
+        ).all()
+        for counterparty_id, paid, received, count in rows:
+            self._upsert(
+                counterparty_id,
+                paid=-Decimal(paid or 0),
+                received=-Decimal(received or 0),
+                count=-count,
+                date=date,
+            )
+
+    def _upsert(
+        self, counterparty_id: int, paid: Decimal, received: Decimal, count: int, date: datetime
+    ) -> None:
+        table = CounterpartyStats.__table__
+        dialect = sqlite if self.dialect == "sqlite" else postgresql
+        statement = dialect.insert(table).values(
+            counterparty_id=counterparty_id,
+            total_paid=paid,
+            total_received=received,
+            transaction_count=count,
+            first_activity_at=date,
+            last_activity_at=date,
+        )
+        # Скалярные min/max в SQLite соответствуют least/greatest PostgreSQL
+        least, greatest = (func.min, func.max) if self.dialect == "sqlite" else (func.least, func.greatest)
+        excluded = statement.excluded
+        self.db.execute(statement.on_conflict_do_update(
+            index_elements=[table.c.counterparty_id],
+            set_={
+                "total_paid": table.c.total_paid + excluded.total_paid,
+                "total_received": table.c.total_received + excluded.total_received,
+                "transaction_count": table.c.transaction_count + excluded.transaction_count,
+                "first_activity_at": least(table.c.first_activity_at, excluded.first_activity_at),
+                "last_activity_at": greatest(table.c.last_activity_at, excluded.last_activity_at),
+            },
+        ))
+
+    @staticmethod
+    def _paid():
+        return case((Transaction.type == TransactionType.EXPENSE, Transaction.amount), else_=0)
+
+    @staticmethod
+    def _received():
+        return case((Transaction.type == TransactionType.INCOME, Transaction.amount), else_=0)
+
+    def rebuild(self) -> int:
+        """Пересчет таблицы по проведенным транзакциям; возвращает число контрагентов"""
+        if self.dialect == "postgresql":
+            # Проведения ждут окончания пересчета и не теряются между
+            # удалением и вставкой
+            self.db.execute(text("LOCK TABLE counterparty_stats IN EXCLUSIVE MODE"))
+
+        # Сторно уменьшает количество транзакций, суммы — своим знаком
+        count = case((Transaction.reversal_of_id.is_(None), 1), else_=-1)
+        totals = (
+            select(
+                Transaction.counterparty_id,
+                func.coalesce(func.sum(self._paid()), 0),
+                func.coalesce(func.sum(self._received()), 0),
+                func.sum(count),
+                func.min(Transaction.date),
+                func.max(Transaction.date),
+            )
+            .where(
+                Transaction.counterparty_id.is_not(None),
+                Transaction.status == TransactionStatus.COMPLETED,
+            )
+            .group_by(Transaction.counterparty_id)
+        )
+        self.db.execute(delete(CounterpartyStats))
+        result = self.db.execute(insert(CounterpartyStats).from_select(
+            [
+                "counterparty_id", "total_paid", "total_received", "transaction_count",
+                "first_activity_at", "last_activity_at",
+            ],
+            totals,
+        ))
+        self.db.commit()
+        return result.rowcount
+
+    def get(self, counterparty_id: int) -> CounterpartyStatsRead:
+        """Обороты контрагента (нулевые, если транзакций еще не было)"""
+        counterparty = self.db.get(Counterparty, counterparty_id)
+        if not counterparty:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Counterparty not found"
+            )
+        stats = self.db.get(CounterpartyStats, counterparty_id) or CounterpartyStats(
+            counterparty_id=counterparty_id
+        )
+        return self._read(counterparty.name, counterparty.type, counterparty.is_active, stats)
+
+    def leaderboard(
+        self,
+        sort: CounterpartyStatsSort = CounterpartyStatsSort.TURNOVER,
+        descending: bool = True,
+        type: Optional[CounterpartyType] = None,
+        active_only: bool = False,
+        active_since: Optional[datetime] = None,
+        min_transactions: int = 0,
+        skip: int = 0,
+        limit: int = 50,
+    ) -> CounterpartyLeaderboard:
+        """Рейтинг контрагентов с оборотами, отсортированный по sort"""
+        stats = CounterpartyStats
+        order_by = {
+            CounterpartyStatsSort.TOTAL_PAID: stats.total_paid,
+            CounterpartyStatsSort.TOTAL_RECEIVED: stats.total_received,
+            CounterpartyStatsSort.TURNOVER: stats.total_received + stats.total_paid,
+            CounterpartyStatsSort.NET: stats.total_received - stats.total_paid,
+            CounterpartyStatsSort.TRANSACTION_COUNT: stats.transaction_count,
+            CounterpartyStatsSort.LAST_ACTIVITY: stats.last_activity_at,
+        }[sort]
+
+        conditions = []
+        if type:
+            conditions.append(Counterparty.type == type)
+        if active_only:
+            conditions.append(Counterparty.is_active == True)  # noqa: E712
+        if active_since:
+            conditions.append(stats.last_activity_at >= active_since)
+        if min_transactions:
+            conditions.append(stats.transaction_count >= min_transactions)
+
+        total = self.db.execute(
+            select(func.count())
+            .select_from(stats)
+            .join(Counterparty, Counterparty.id == stats.counterparty_id)
+            .where(*conditions)
+        ).scalar_one()
+        rows = self.db.execute(
+            select(stats, Counterparty.name, Counterparty.type, Counterparty.is_active)
+            .join(Counterparty, Counterparty.id == stats.counterparty_id)
+            .where(*conditions)
+            .order_by(
+                (order_by.desc() if descending else order_by.asc()).nulls_last(),
+                stats.counterparty_id,
+            )
+            .offset(skip)
+            .limit(limit)
+        ).all()
+
+        return CounterpartyLeaderboard(
+            sort=sort,
+            total=total,
+            items=[self._read(name, type, is_active, row) for row, name, type, is_active in rows],
+        )
+
+    @staticmethod
+    def _read(
+        name: str, type: CounterpartyType, is_active: bool, stats: CounterpartyStats
+    ) -> CounterpartyStatsRead:
+        paid = Decimal(stats.total_paid or 0)
+        received = Decimal(stats.total_received or 0)
+        return CounterpartyStatsRead(
+            counterparty_id=stats.counterparty_id,
+            name=name,
+            type=type,
+            is_active=is_active,
+            total_paid=paid,
+            total_received=received,
+            turnover=received + paid,
+            net=received - paid,
+            transaction_count=stats.transaction_count or 0,
+            first_activity_at=stats.first_activity_at,
+            last_activity_at=stats.last_activity_at,
+        )
@@ -0,0 +1,232 @@
+"""
+Сервис курсов валют и пересчета отчетов в валюту отчета
+"""
+
+from bisect import bisect_right
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Dict, List, Optional, Sequence
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, case, func, or_
+from sqlmodel import Session, select
+
+from app.core.cache import RATES_DATASET, bump_data_version
+from app.core.config import settings
+from app.models.currencies import ExchangeRate, ExchangeRateCreate
+
+MONEY_PRECISION = Decimal("0.01")
+
+
+def normalize_currency(currency: Optional[str]) -> str:
+    """Код валюты отчета (по умолчанию базовая валюта книги)"""
+    code = (currency or settings.DEFAULT_CURRENCY).upper()
+    if code not in settings.SUPPORTED_CURRENCIES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported currency: {code}"
+        )
+    return code
+
+
+def is_base_currency(currency: str) -> bool:
+    """Суммы книги хранятся в базовой валюте, пересчет не нужен"""
+    return currency == settings.DEFAULT_CURRENCY
+
+
+class CurrencyService:
+    """
+    Курсы валют и пересчет сумм книги
+
+    Суммы транзакций хранятся в базовой валюте (USD). Курс
+    действует с effective_date до даты следующего курса той же
+    валюты; пересчет выполняется в SQL соединением дневных сумм
+    с интервалами действия курсов, без запроса курса на каждую строку.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def set_rate(self, rate_data: ExchangeRateCreate) -> ExchangeRate:
+        """Создание или замена курса на дату"""
+        currency = normalize_currency(rate_data.currency)
+        if is_base_currency(currency):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Base currency rate is always 1"
+            )
+
+        rate = self.db.exec(
+            select(ExchangeRate).where(
+                ExchangeRate.currency == currency,
+                ExchangeRate.effective_date == rate_data.effective_date,
+            )
+        ).first()
+        if rate:
+            rate.rate_to_usd = rate_data.rate_to_usd
+            rate.source = rate_data.source
+            rate.updated_at = datetime.utcnow()
+        else:
+            rate = ExchangeRate(
+                currency=currency,
+                rate_to_usd=rate_data.rate_to_usd,
+                effective_date=rate_data.effective_date,
+                source=rate_data.source,
+            )
+        self.db.add(rate)
+        self.db.commit()
+        self.db.refresh(rate)
+
+        bump_data_version(RATES_DATASET)
+        return rate
+
+    def list_rates(
+        self,
+        currency: Optional[str] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> List[ExchangeRate]:
+        """Список курсов, новые первыми"""
+        statement = select(ExchangeRate)
+        if currency:
+            statement = statement.where(ExchangeRate.currency == normalize_currency(currency))
+        if start:
+            statement = statement.where(ExchangeRate.effective_date >= start)
+        if end:
+            statement = statement.where(ExchangeRate.effective_date <= end)
+        statement = statement.order_by(
+            ExchangeRate.effective_date.desc(), ExchangeRate.currency
+        ).offset(skip).limit(limit)
+        return self.db.exec(statement).all()
+
+    def latest_rates(self) -> Dict[str, Decimal]:
+        """Последние сохраненные курсы валют к USD"""
+        latest = (
+            select(
+                ExchangeRate.currency,
+                func.max(ExchangeRate.effective_date).label("effective_date"),
+            )
+            .group_by(ExchangeRate.currency)
+            .subquery()
+        )
+        rows = self.db.exec(
+            select(ExchangeRate.currency, ExchangeRate.rate_to_usd).join(
+                latest,
+                and_(
+                    ExchangeRate.currency == latest.c.currency,
+                    ExchangeRate.effective_date == latest.c.effective_date,
+                ),
+            )
+        ).all()
+        return {currency: rate for currency, rate in rows}
+
+    @staticmethod
+    def rate_periods(currency: str):
+        """Интервалы действия курсов валюты: [valid_from, valid_to)"""
+        valid_to = func.lead(ExchangeRate.effective_date).over(
+            partition_by=ExchangeRate.currency,
+            order_by=ExchangeRate.effective_date,
+        )
+        return (
+            select(
+                ExchangeRate.rate_to_usd.label("rate"),
+                ExchangeRate.effective_date.label("valid_from"),
+                valid_to.label("valid_to"),
+            )
+            .where(ExchangeRate.currency == currency)
+            .subquery("rate_periods")
+        )
+
+    def convert_daily(
+        self,
+        daily,
+        currency: str,
+        keys: Sequence[str],
+        amounts: Sequence[str],
+        extra: Sequence = (),
+    ) -> list:
+        """
+        Пересчет дневных сумм в валюту отчета
+
+        Args:
+            daily: Подзапрос с колонками keys, day (дата) и amounts
+            keys: Колонки группировки результата
+            amounts: Колонки сумм в базовой валюте
+            extra: Дополнительные агрегаты над daily (например, количество)
+
+        Returns:
+            Строки (keys..., amounts..., extra...) в валюте отчета
+
+        Raises:
+            HTTPException 400, если на какой-либо день нет курса
+        """
+        periods = self.rate_periods(currency)
+        day = daily.c.day
+        matched = and_(
+            periods.c.valid_from <= day,
+            or_(periods.c.valid_to.is_(None), day < periods.c.valid_to),
+        )
+        group = [daily.c[key] for key in keys]
+        statement = (
+            select(
+                *group,
+                *[func.sum(daily.c[amount] / periods.c.rate) for amount in amounts],
+                *extra,
+                func.min(case((periods.c.rate.is_(None), day))),
+            )
+            .select_from(daily.outerjoin(periods, matched))
+            .group_by(*group)
+        )
+
+        rows = []
+        for row in self.db.exec(statement).all():
+            missing_day = row[-1]
+            if missing_day is not None:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"No {currency} exchange rate effective on {str(missing_day)[:10]}"
+                )
+            rows.append(tuple(row[:-1]))
+        return rows
+
+    def rates_by_day(self, currency: str, start: date, end: date) -> Dict[date, Decimal]:
+        """
+        Курс на каждый день периода [start, end]
+
+        Один запрос: курсы, действующие в периоде, плюс последний
+        курс до его начала. Дни без курса в результат не попадают.
+        """
+        latest_before = (
+            select(func.max(ExchangeRate.effective_date))
+            .where(ExchangeRate.currency == currency, ExchangeRate.effective_date <= start)
+            .scalar_subquery()
+        )
+        rows = self.db.exec(
+            select(ExchangeRate.effective_date, ExchangeRate.rate_to_usd)
+            .where(
+                ExchangeRate.currency == currency,
+                ExchangeRate.effective_date <= end,
+                or_(
+                    ExchangeRate.effective_date >= start,
+                    ExchangeRate.effective_date == latest_before,
+                ),
+            )
+            .order_by(ExchangeRate.effective_date)
+        ).all()
+
+        starts = [effective_date for effective_date, _ in rows]
+        rates: Dict[date, Decimal] = {}
+        day = start
+        while day <= end:
+            position = bisect_right(starts, day) - 1
+            if position >= 0:
+                rates[day] = Decimal(str(rows[position][1]))
+            day += timedelta(days=1)
+        return rates
+
+
+def to_money(value) -> Decimal:
+    """Сумма из результата запроса с округлением до центов"""
+    return Decimal(str(value or 0)).quantize(MONEY_PRECISION)
@@ -0,0 +1,165 @@
+"""
+Сервис сводки для главной панели
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Callable, Dict, List, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import case, func
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, select
+
+from app.core.cache import (
+    LEDGER_DATASET, RATES_DATASET, cache_get, cache_set, versioned_key
+)
+from app.core.config import settings
+from app.core.database import engine
+from app.models.accounts import Account
+from app.models.projects import Project
+from app.models.transactions import (
+    Transaction, TransactionRead, TransactionStatus, TransactionType
+)
+from app.schemas.dashboard import DashboardAccount, DashboardProject, DashboardSummary
+from app.services.crypto import CryptoService
+from app.services.currency import CurrencyService, is_base_currency, to_money
+
+
+class DashboardService:
+    """
+    Сводка главной панели: счета, последние транзакции, итоги
+    периода по проектам и курсы валют
+
+    Каждая часть — один set-based запрос в собственной сессии,
+    запросы выполняются параллельно в пуле потоков.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.bind: Engine = db.get_bind()
+
+    async def summary(self, user_id: int) -> dict:
+        """Сводка с кэшем на пользователя (DASHBOARD_CACHE_TTL секунд)"""
+        key = versioned_key(
+            "dashboard_summary", [LEDGER_DATASET, RATES_DATASET], {"user": user_id}
+        )
+        hit = cache_get(key)
+        if hit is not None:
+            return hit
+
+        # Реплика может отставать от версии книги в ключе, поэтому
+        # промах кэша считается на основной БД и результат кэшируется
+        if self.db.info.get("replica"):
+            with Session(engine) as primary:
+                return await DashboardService(primary).summary(user_id)
+
+        now = datetime.utcnow()
+        period_start = now - timedelta(days=settings.DASHBOARD_PERIOD_DAYS)
+        accounts, recent, (totals, projects), rates = await asyncio.gather(
+            self._run(self._accounts),
+            self._run(self._recent_transactions),
+            self._run(self._period_totals, period_start),
+            self._run(self._rates),
+        )
+
+        missing = [
+            currency for currency in settings.SUPPORTED_CURRENCIES
+            if not is_base_currency(currency) and currency not in rates
+        ]
+        if missing:
+            # Курсы еще не сохранялись: текущие курсы внешнего источника
+            live = await CryptoService(self.db).update_crypto_rates()
+            rates.update({currency: live[currency] for currency in missing if currency in live})
+
+        summary = DashboardSummary(
+            generated_at=now,
+            currency=settings.DEFAULT_CURRENCY,
+            period_start=period_start,
+            total_balance=to_money(sum((account.balance for account in accounts), Decimal("0"))),
+            income=to_money(totals.get(TransactionType.INCOME, 0)),
+            expense=to_money(totals.get(TransactionType.EXPENSE, 0)),
+            accounts=accounts,
+            recent_transactions=recent,
+            projects=projects,
+            rates=rates,
+        ).model_dump(mode="json")
+
+        cache_set(key, summary, ttl=settings.DASHBOARD_CACHE_TTL)
+        return summary
+
+    async def _run(self, query: Callable, *args):
+        """Запрос в отдельной сессии того же движка (основной БД или реплики)"""
+        def run():
+            with Session(self.bind) as db:
+                return query(db, *args)
+        return await run_in_threadpool(run)
+
+    @staticmethod
+    def _accounts(db: Session) -> List[DashboardAccount]:
+        rows = db.exec(
+            select(Account.id, Account.name, Account.type, Account.currency, Account.balance)
+            .where(Account.is_active == True)  # noqa: E712
+            .order_by(Account.id)
+        ).all()
+        return [
+            DashboardAccount(id=id, name=name, type=type, currency=currency, balance=balance)
+            for id, name, type, currency, balance in rows
+        ]
+
+    @staticmethod
+    def _recent_transactions(db: Session) -> List[TransactionRead]:
+        transactions = db.exec(
+            select(Transaction)
+            .order_by(Transaction.date.desc())
+            .limit(settings.DASHBOARD_RECENT_TRANSACTIONS)
+        ).all()
+        return [TransactionRead.model_validate(transaction) for transaction in transactions]
+
+    @staticmethod
+    def _period_totals(
+        db: Session, period_start: datetime
+    ) -> Tuple[Dict[TransactionType, Decimal], List[DashboardProject]]:
+        """Доходы и расходы периода: итоги по проектам и общие одним запросом"""
+        income = case((Transaction.type == TransactionType.INCOME, Transaction.amount), else_=0)
+        expense = case((Transaction.type == TransactionType.EXPENSE, Transaction.amount), else_=0)
+        rows = db.exec(
+            select(
+                Transaction.project_id,
+                func.sum(income),
+                func.sum(expense),
+                func.count(Transaction.id),
+            )
+            .where(
+                Transaction.status == TransactionStatus.COMPLETED,
+                Transaction.date >= period_start,
+            )
+            .group_by(Transaction.project_id)
+        ).all()
+
+        names = dict(db.exec(select(Project.id, Project.name)).all())
+        totals = {TransactionType.INCOME: Decimal("0"), TransactionType.EXPENSE: Decimal("0")}
+        projects = []
+        for project_id, project_income, project_expense, count in rows:
+            project_income = Decimal(project_income or 0)
+            project_expense = Decimal(project_expense or 0)
+            totals[TransactionType.INCOME] += project_income
+            totals[TransactionType.EXPENSE] += project_expense
+            if project_id is None:
+                continue
+            projects.append(DashboardProject(
+                project_id=project_id,
+                name=names.get(project_id, ""),
+                income=to_money(project_income),
+                expense=to_money(project_expense),
+                profit=to_money(project_income - project_expense),
+                transaction_count=count,
+            ))
+
+        projects.sort(key=lambda project: project.profit, reverse=True)
+        return totals, projects
+
+    @staticmethod
+    def _rates(db: Session) -> Dict[str, Decimal]:
+        return CurrencyService(db).latest_rates()
@@ -0,0 +1,283 @@
+"""
+Сервис проверки целостности книги
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, List, NamedTuple, Optional
+
+from sqlalchemy import case, exists, func, null, or_, union_all, update
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, select
+
+from app.core.cache import LEDGER_DATASET, bump_data_version
+from app.core.config import settings
+from app.core.live import BALANCES_CHANNEL, publish
+from app.models.accounts import Account, AccountRead
+from app.models.changes import ChangeEntity, ChangeOperation
+from app.models.transactions import Transaction, TransactionEntry
+from app.schemas.integrity import (
+    BalanceDrift, IntegrityReport, TransactionIssue, TransactionIssueKind
+)
+from app.services.changes import record_change
+from app.services.partitions import month_start, next_month
+
+logger = logging.getLogger(__name__)
+
+# Допуск сравнения сумм: меньше половины минимальной денежной единицы
+TOLERANCE = Decimal("0.005")
+
+SIGNED_AMOUNT = case(
+    (TransactionEntry.direction == 'DEBIT', TransactionEntry.amount),
+    else_=-TransactionEntry.amount,
+)
+
+
+class Chunk(NamedTuple):
+    """Диапазон дат [start, end); без границ — открытый, null — проводки без даты"""
+    start: Optional[datetime]
+    end: Optional[datetime]
+    null: bool = False
+
+
+class ChunkResult(NamedTuple):
+    """Итоги диапазона"""
+    balances: Dict[int, Decimal]
+    transactions: int
+    entries: int
+    issues: List[TransactionIssue]
+    truncated: bool
+
+
+class LedgerIntegrityService:
+    """
+    Проверка книги: баланс каждого счета равен сумме его проводок,
+    в каждой транзакции дебет равен кредиту и сумме транзакции
+
+    Книга делится на месячные диапазоны дат — те же, что секции
+    transactions и transaction_entries, поэтому каждый диапазон
+    читает одну пару секций, а вся книга читается один раз.
+    Диапазоны проверяются параллельно (INTEGRITY_WORKERS сессий).
+    Счета с расхождением перепроверяются точным запросом под
+    блокировкой строк, чтобы проведения во время проверки не давали
+    ложных расхождений; при repair их баланс исправляется.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.bind: Engine = db.get_bind()
+
+    def verify(self, repair: bool = False, workers: Optional[int] = None) -> IntegrityReport:
+        started_at = datetime.utcnow()
+        started = time.perf_counter()
+        chunks = self._chunks()
+
+        balances: Dict[int, Decimal] = {}
+        issues: List[TransactionIssue] = []
+        transactions = entries = 0
+        truncated = False
+        with ThreadPoolExecutor(max_workers=workers or settings.INTEGRITY_WORKERS) as pool:
+            for result in pool.map(self._run_chunk, chunks):
+                for account_id, amount in result.balances.items():
+                    balances[account_id] = balances.get(account_id, Decimal("0")) + amount
+                transactions += result.transactions
+                entries += result.entries
+                issues += result.issues
+                truncated = truncated or result.truncated
+
+        accounts = self.db.exec(select(Account.id, Account.balance)).all()
+        suspects = [
+            account_id for account_id, stored in accounts
+            if abs(Decimal(stored) - balances.get(account_id, Decimal("0"))) > TOLERANCE
+        ]
+        drift = self._recheck(suspects, repair) if suspects else []
+        issues.sort(key=lambda issue: (issue.date or datetime.min, issue.transaction_id))
+
+        return IntegrityReport(
+            started_at=started_at,
+            duration_seconds=round(time.perf_counter() - started, 3),
+            chunks=len(chunks),
+            transactions_checked=transactions,
+            entries_checked=entries,
+            accounts_checked=len(accounts),
+            drift=drift,
+            issues=issues,
+            issues_truncated=truncated,
+            ok=not drift and not issues,
+        )
+
+    def _chunks(self) -> List[Chunk]:
+        """
+        Месячные диапазоны от первой до последней транзакции; крайние
+        диапазоны открыты, чтобы захватить проводки с датой вне них
+        """
+        first, last = self.db.exec(select(func.min(Transaction.date), func.max(Transaction.date))).one()
+        if first is None:
+            return [Chunk(None, None), Chunk(None, None, null=True)]
+
+        bounds: List[date] = []
+        month = next_month(month_start(first))
+        while month <= month_start(last):
+            bounds.append(month)
+            month = next_month(month)
+
+        edges = [None] + [datetime.combine(bound, datetime.min.time()) for bound in bounds] + [None]
+        chunks = [Chunk(start, end) for start, end in zip(edges, edges[1:])]
+        chunks.append(Chunk(None, None, null=True))
+        return chunks
+
+    def _run_chunk(self, chunk: Chunk) -> ChunkResult:
+        with Session(self.bind) as db:
+            return self._check_chunk(db, chunk)
+
+    @staticmethod
+    def _range(column, chunk: Chunk) -> list:
+        if chunk.null:
+            return [column.is_(None)]
+        conditions = []
+        if chunk.start:
+            conditions.append(column >= chunk.start)
+        if chunk.end:
+            conditions.append(column < chunk.end)
+        return conditions
+
+    def _check_chunk(self, db: Session, chunk: Chunk) -> ChunkResult:
+        limit = settings.INTEGRITY_MAX_ISSUES
+        entry_range = self._range(TransactionEntry.transaction_date, chunk)
+
+        rows = db.exec(
+            select(TransactionEntry.account_id, func.sum(SIGNED_AMOUNT), func.count())
+            .where(*entry_range)
+            .group_by(TransactionEntry.account_id)
+        ).all()
+        balances = {account_id: Decimal(total or 0) for account_id, total, _ in rows}
+        entries = sum(count for _, _, count in rows)
+
+        # Итоги проводок по транзакциям; CTE используется обеими частями
+        # запроса нарушений и вычисляется один раз
+        totals = (
+            select(
+                TransactionEntry.transaction_id,
+                func.sum(case(
+                    (TransactionEntry.direction == 'DEBIT', TransactionEntry.amount), else_=0
+                )).label("debit"),
+                func.sum(case(
+                    (TransactionEntry.direction == 'CREDIT', TransactionEntry.amount), else_=0
+                )).label("credit"),
+            )
+            .where(*entry_range)
+            .group_by(TransactionEntry.transaction_id)
+            .cte("totals")
+        )
+
+        # Проводки, транзакция которых отсутствует или лежит в другом
+        # диапазоне (transaction_date не совпадает с датой транзакции);
+        # проводки без даты — всегда
+        orphans = select(
+            totals.c.transaction_id.label("id"), null().label("date"), null().label("amount"),
+            totals.c.debit, totals.c.credit
+        )
+        transactions = 0
+        if chunk.null:
+            statement = orphans
+        else:
+            transaction_range = self._range(Transaction.date, chunk)
+            transactions = db.exec(
+                select(func.count()).select_from(Transaction).where(*transaction_range)
+            ).one()
+            statement = union_all(
+                select(
+                    Transaction.id, Transaction.date, Transaction.amount,
+                    totals.c.debit, totals.c.credit
+                )
+                .outerjoin(totals, totals.c.transaction_id == Transaction.id)
+                .where(
+                    *transaction_range,
+                    or_(
+                        totals.c.transaction_id.is_(None),
+                        func.abs(totals.c.debit - totals.c.credit) > TOLERANCE,
+                        func.abs(totals.c.debit - Transaction.amount) > TOLERANCE,
+                    )
+                ),
+                orphans.where(~exists().where(
+                    Transaction.id == totals.c.transaction_id, *transaction_range
+                )),
+            )
+        rows = db.execute(statement.limit(limit + 1)).all()
+
+        issues = []
+        for transaction_id, transaction_date, amount, debit, credit in rows[:limit]:
+            if transaction_date is None:
+                kind = TransactionIssueKind.ORPHAN_ENTRIES
+            elif debit is None:
+                kind = TransactionIssueKind.MISSING_ENTRIES
+            elif abs(Decimal(debit) - Decimal(credit)) > TOLERANCE:
+                kind = TransactionIssueKind.UNBALANCED
+            else:
+                kind = TransactionIssueKind.AMOUNT_MISMATCH
+            issues.append(TransactionIssue(
+                transaction_id=transaction_id, kind=kind, date=transaction_date,
+                amount=amount, debit=debit, credit=credit
+            ))
+        truncated = len(rows) > limit
+
+        return ChunkResult(balances, transactions, entries, issues, truncated)
+
+    def _recheck(self, account_ids: List[int], repair: bool) -> List[BalanceDrift]:
+        """
+        Точная сверка счетов под блокировкой: проведения меняют баланс
+        атомарным UPDATE, поэтому под блокировкой строки сохраненный
+        баланс и зафиксированные проводки согласованы
+        """
+        accounts = self.db.exec(
+            select(Account)
+            .where(Account.id.in_(account_ids))
+            .order_by(Account.id)
+            .with_for_update(read=not repair)
+        ).all()
+        computed = dict(self.db.exec(
+            select(TransactionEntry.account_id, func.sum(SIGNED_AMOUNT))
+            .where(TransactionEntry.account_id.in_(account_ids))
+            .group_by(TransactionEntry.account_id)
+        ).all())
+
+        drift = []
+        for account in accounts:
+            total = Decimal(computed.get(account.id) or 0)
+            difference = Decimal(account.balance) - total
+            if abs(difference) <= TOLERANCE:
+                continue
+            drift.append(BalanceDrift(
+                account_id=account.id, name=account.name, stored=account.balance,
+                computed=total, difference=difference, repaired=repair
+            ))
+
+        if not repair or not drift:
+            self.db.rollback()
+            return drift
+
+        updates = []
+        for item in drift:
+            self.db.execute(
+                update(Account)
+                .where(Account.id == item.account_id)
+                .values(balance=item.computed, updated_at=datetime.utcnow())
+                .execution_options(synchronize_session="fetch")
+            )
+            account = self.db.get(Account, item.account_id)
+            record_change(
+                self.db, ChangeEntity.ACCOUNT, account.id, ChangeOperation.UPDATE,
+                AccountRead.model_validate(account).model_dump(mode="json")
+            )
+            updates.append({"id": account.id, "delta": str(-item.difference), "balance": str(account.balance)})
+        self.db.commit()
+        logger.warning(
+            "Repaired balance drift on accounts %s", [item.account_id for item in drift]
+        )
+
+        bump_data_version(LEDGER_DATASET)
+        publish(BALANCES_CHANNEL, {"transaction": None, "accounts": updates})
+        return drift
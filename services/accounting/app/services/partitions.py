@@ -0,0 +1,250 @@
+"""
+Сервис месячных секций книги (PostgreSQL)
+"""
+
+import logging
+from datetime import date, datetime
+from typing import Dict, List, NamedTuple, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import text
+from sqlmodel import Session
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Секционированные таблицы и их ключи секционирования
+PARTITIONED_TABLES: Dict[str, str] = {
+    "transactions": "date",
+    "transaction_entries": "transaction_date",
+}
+ARCHIVE_SCHEMA = "archive"
+
+
+class PartitionInfo(NamedTuple):
+    """Секция таблицы"""
+    table: str
+    name: str
+    month: Optional[date]  # None для секции по умолчанию
+    estimated_rows: int
+
+
+def month_start(value) -> date:
+    """Первый день месяца"""
+    if isinstance(value, datetime):
+        value = value.date()
+    return value.replace(day=1)
+
+
+def next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    """Имя месячной секции: transactions_y2024m01"""
+    return f"{table}_y{month.year}m{month.month:02d}"
+
+
+def default_partition_name(table: str) -> str:
+    return f"{table}_default"
+
+
+class PartitionManager:
+    """
+    Создание, подключение, отключение и архивирование месячных секций
+
+    transactions секционирована по date, transaction_entries — по
+    transaction_date (копия даты транзакции), поэтому секции обеих
+    таблиц за один месяц обслуживаются вместе. Строки вне созданных
+    месяцев попадают в секцию по умолчанию; при создании секции
+    они переносятся из нее в новую секцию.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    @property
+    def enabled(self) -> bool:
+        """Таблицы книги секционированы (миграция применена)"""
+        if self.db.get_bind().dialect.name != "postgresql":
+            return False
+        return bool(self.db.execute(text(
+            "SELECT count(*) FROM pg_partitioned_table "
+            "WHERE partrelid = 'public.transactions'::regclass"
+        )).scalar())
+
+    def _require_enabled(self) -> None:
+        if not self.enabled:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Ledger tables are not partitioned"
+            )
+
+    def list_partitions(self) -> List[PartitionInfo]:
+        """Подключенные секции таблиц книги"""
+        self._require_enabled()
+        rows = self.db.execute(text("""
+            SELECT parent.relname, child.relname, child.reltuples::bigint
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = ANY(:tables)
+            ORDER BY parent.relname, child.relname
+        """), {"tables": list(PARTITIONED_TABLES)}).all()
+
+        partitions = []
+        for table, name, estimated_rows in rows:
+            suffix = name[len(table) + 1:]
+            month = datetime.strptime(suffix, "y%Ym%m").date() if suffix != "default" else None
+            partitions.append(PartitionInfo(table, name, month, max(estimated_rows, 0)))
+        return partitions
+
+    def ensure_partitions(
+        self, months_ahead: Optional[int] = None, since: Optional[date] = None
+    ) -> List[str]:
+        """
+        Создание недостающих секций с месяца since (по умолчанию
+        текущего) на months_ahead месяцев вперед
+
+        Returns:
+            Имена созданных секций
+        """
+        if not self.enabled:
+            return []
+        if months_ahead is None:
+            months_ahead = settings.PARTITION_PREMAKE_MONTHS
+
+        existing = {partition.name for partition in self.list_partitions()}
+        month = month_start(since or date.today())
+        last = add_months(month_start(date.today()), months_ahead)
+
+        created = []
+        while month <= last:
+            for table in PARTITIONED_TABLES:
+                name = partition_name(table, month)
+                # Отключенные и архивные секции подключаются только явно
+                if name not in existing and self._table_schema(name) is None:
+                    created.append(self._create_partition(table, month))
+            month = next_month(month)
+        self.db.commit()
+
+        if created:
+            logger.info(f"Created ledger partitions: {', '.join(created)}")
+        return created
+
+    def detach(self, month: date) -> List[str]:
+        """Отключение секций месяца от таблиц (данные остаются в отдельных таблицах)"""
+        self._require_enabled()
+        names = []
+        # Сначала проводки, затем транзакции
+        for table in reversed(list(PARTITIONED_TABLES)):
+            name = partition_name(table, month)
+            if not self._is_attached(table, name):
+                continue
+            self.db.execute(text(f'ALTER TABLE "{table}" DETACH PARTITION "{name}"'))
+            names.append(name)
+        self.db.commit()
+        return names
+
+    def attach(self, month: date) -> List[str]:
+        """Подключение ранее отключенных или архивных секций месяца"""
+        self._require_enabled()
+        names = []
+        for table, key in PARTITIONED_TABLES.items():
+            name = partition_name(table, month)
+            if self._is_attached(table, name):
+                continue
+            schema = self._table_schema(name)
+            if schema is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Partition table {name} not found"
+                )
+            if schema != "public":
+                self.db.execute(text(f'ALTER TABLE "{schema}"."{name}" SET SCHEMA public'))
+            self._move_from_default(table, key, name, month)
+            self.db.execute(text(
+                f'ALTER TABLE "{table}" ATTACH PARTITION "{name}" '
+                f"FOR VALUES FROM ('{month}') TO ('{next_month(month)}')"
+            ))
+            names.append(name)
+        self.db.commit()
+        return names
+
+    def archive(self, before: date) -> List[str]:
+        """
+        Архивирование секций месяцев до before (не включая его месяц)
+
+        Секции отключаются и переносятся в схему archive: данные
+        остаются доступны для выгрузки и могут быть подключены
+        обратно, но отчеты и обслуживание (vacuum) их не затрагивают.
+        """
+        self._require_enabled()
+        cutoff = month_start(before)
+        months = sorted({
+            partition.month
+            for partition in self.list_partitions()
+            if partition.month is not None and partition.month < cutoff
+        })
+
+        self.db.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{ARCHIVE_SCHEMA}"'))
+        archived = []
+        for month in months:
+            for name in self.detach(month):
+                self.db.execute(text(f'ALTER TABLE "{name}" SET SCHEMA "{ARCHIVE_SCHEMA}"'))
+                archived.append(f"{ARCHIVE_SCHEMA}.{name}")
+        self.db.commit()
+        return archived
+
+    def _create_partition(self, table: str, month: date) -> str:
+        """
+        Создание секции месяца
+
+        Секция создается отдельной таблицей, в нее переносятся строки
+        месяца из секции по умолчанию, после чего она подключается
+        (индексы родительской таблицы создаются при подключении).
+        """
+        name = partition_name(table, month)
+        self.db.execute(text(
+            f'CREATE TABLE "{name}" (LIKE "{table}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+        ))
+        self._move_from_default(table, PARTITIONED_TABLES[table], name, month)
+        self.db.execute(text(
+            f'ALTER TABLE "{table}" ATTACH PARTITION "{name}" '
+            f"FOR VALUES FROM ('{month}') TO ('{next_month(month)}')"
+        ))
+        return name
+
+    def _move_from_default(self, table: str, key: str, name: str, month: date) -> None:
+        """Перенос строк месяца из секции по умолчанию"""
+        default = default_partition_name(table)
+        if not self._is_attached(table, default):
+            return
+        self.db.execute(text(f"""
+            WITH moved AS (
+                DELETE FROM "{default}"
+                WHERE "{key}" >= :start AND "{key}" < :end
+                RETURNING *
+            )
+            INSERT INTO "{name}" SELECT * FROM moved
+        """), {"start": month, "end": next_month(month)})
+
+    def _is_attached(self, table: str, name: str) -> bool:
+        return bool(self.db.execute(text("""
+            SELECT count(*)
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = :table AND child.relname = :name
+        """), {"table": table, "name": name}).scalar())
+
+    def _table_schema(self, name: str) -> Optional[str]:
+        return self.db.execute(text(
+            "SELECT schemaname FROM pg_tables WHERE tablename = :name"
+        ), {"name": name}).scalar()
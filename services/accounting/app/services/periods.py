@@ -0,0 +1,227 @@
+"""
+Сервис закрытия периодов и балансов на дату
+"""
+
+import logging
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import case, delete, func, insert, text
+from sqlmodel import Session, select
+
+from app.models.accounts import Account
+from app.models.periods import AccountBalanceAt, BalanceCheckpoint, ClosedPeriod
+from app.models.transactions import Transaction, TransactionEntry
+from app.services.integrity import SIGNED_AMOUNT
+from app.services.partitions import month_start, next_month
+
+logger = logging.getLogger(__name__)
+
+# Ключ advisory-блокировки периодов: проведения берут ее разделяемой,
+# закрытие и открытие — исключительной
+PERIOD_LOCK = 0x70657264
+
+
+def _month_datetime(month: date) -> datetime:
+    return datetime.combine(month, time())
+
+
+def open_from(db: Session) -> Optional[datetime]:
+    """Начало первого открытого месяца (None — закрытых месяцев нет)"""
+    last = db.exec(select(func.max(ClosedPeriod.month))).one()
+    return _month_datetime(next_month(last)) if last else None
+
+
+def ensure_open(db: Session, dates: Iterable[datetime]) -> None:
+    """
+    Проверка, что даты проводок не попадают в закрытый период
+
+    Вызывается в транзакции проведения до вставки проводок. В
+    PostgreSQL разделяемая advisory-блокировка до commit не дает
+    закрыть период, пока проведение не зафиксировано, поэтому
+    контрольные точки закрытия учитывают все проводки месяца.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("SELECT pg_advisory_xact_lock_shared(:key)"), {"key": PERIOD_LOCK})
+    boundary = open_from(db)
+    earliest = min(dates, default=None)
+    if boundary is not None and earliest is not None and earliest < boundary:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Period is closed: postings must be dated {boundary:%Y-%m-%d} or later"
+        )
+
+
+class PeriodService:
+    """
+    Закрытие месяцев с контрольными точками балансов
+
+    При закрытии для каждого счета сохраняется баланс на конец месяца
+    (прошлая точка плюс обороты месяца — один сгруппированный запрос
+    по секции месяца). Баланс на дату — точка последнего закрытого
+    месяца до даты плюс сумма проводок открытого хвоста по индексу
+    (account_id, transaction_date), без просмотра всей истории.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.postgres = db.get_bind().dialect.name == "postgresql"
+
+    def close(self, month: date, user_id: Optional[int] = None) -> List[ClosedPeriod]:
+        """Закрытие всех еще открытых месяцев по month включительно"""
+        month = month_start(month)
+        if next_month(month) > datetime.utcnow().date():
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Only finished months can be closed"
+            )
+
+        self._lock()
+        last = self.db.exec(select(func.max(ClosedPeriod.month))).one()
+        if last and month <= last:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Periods are closed through {last:%Y-%m}"
+            )
+
+        if last:
+            start = next_month(last)
+            balances = dict(self.db.exec(
+                select(BalanceCheckpoint.account_id, BalanceCheckpoint.balance)
+                .where(BalanceCheckpoint.month == last)
+            ).all())
+        else:
+            first = self.db.exec(select(func.min(Transaction.date))).one()
+            start = min(month_start(first), month) if first else month
+            balances = {}
+        account_ids = self.db.exec(select(Account.id).order_by(Account.id)).all()
+
+        periods = []
+        checkpoints = []
+        current = start
+        while current <= month:
+            # Первое закрытие захватывает и проводки раньше первой транзакции
+            turnovers = self._turnovers(current, from_start=current == start and not last)
+            for account_id in account_ids:
+                debit, credit = turnovers.get(account_id, (Decimal("0"), Decimal("0")))
+                balances[account_id] = balances.get(account_id, Decimal("0")) + debit - credit
+                checkpoints.append({
+                    "account_id": account_id,
+                    "month": current,
+                    "balance": balances[account_id],
+                    "debit": debit,
+                    "credit": credit,
+                })
+            periods.append(ClosedPeriod(month=current, closed_by=user_id))
+            current = next_month(current)
+
+        self.db.add_all(periods)
+        self.db.flush()
+        if checkpoints:
+            self.db.execute(insert(BalanceCheckpoint), checkpoints)
+        self.db.commit()
+        for period in periods:
+            self.db.refresh(period)
+        logger.info("Closed periods %s through %s", start, month)
+        return periods
+
+    def reopen(self, month: date) -> int:
+        """Открытие month и всех последующих закрытых месяцев"""
+        month = month_start(month)
+        self._lock()
+        self.db.execute(delete(BalanceCheckpoint).where(BalanceCheckpoint.month >= month))
+        reopened = self.db.execute(delete(ClosedPeriod).where(ClosedPeriod.month >= month)).rowcount
+        if not reopened:
+            self.db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Period {month:%Y-%m} is not closed"
+            )
+        self.db.commit()
+        logger.info("Reopened %s periods from %s", reopened, month)
+        return reopened
+
+    def balance_as_of(self, account_id: int, at: datetime) -> AccountBalanceAt:
+        """Баланс счета с учетом проводок по at включительно"""
+        if not self.db.get(Account, account_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Account {account_id} not found"
+            )
+        checkpoint = self._checkpoint_month(at)
+        base = Decimal("0")
+        if checkpoint:
+            base = self.db.exec(
+                select(BalanceCheckpoint.balance).where(
+                    BalanceCheckpoint.account_id == account_id,
+                    BalanceCheckpoint.month == checkpoint,
+                )
+            ).first() or Decimal("0")
+        tail = self.db.exec(
+            select(func.coalesce(func.sum(SIGNED_AMOUNT), 0))
+            .where(TransactionEntry.account_id == account_id, *self._tail(checkpoint, at))
+        ).one()
+        return AccountBalanceAt(
+            account_id=account_id, at=at, balance=base + Decimal(tail), checkpoint=checkpoint
+        )
+
+    def balances_as_of(self, at: datetime) -> List[AccountBalanceAt]:
+        """Балансы всех счетов на at: точки закрытого месяца и один запрос по хвосту"""
+        checkpoint = self._checkpoint_month(at)
+        balances: Dict[int, Decimal] = {
+            account_id: Decimal("0")
+            for account_id in self.db.exec(select(Account.id).order_by(Account.id)).all()
+        }
+        if checkpoint:
+            balances.update(self.db.exec(
+                select(BalanceCheckpoint.account_id, BalanceCheckpoint.balance)
+                .where(BalanceCheckpoint.month == checkpoint)
+            ).all())
+        for account_id, tail in self.db.exec(
+            select(TransactionEntry.account_id, func.sum(SIGNED_AMOUNT))
+            .where(*self._tail(checkpoint, at))
+            .group_by(TransactionEntry.account_id)
+        ).all():
+            balances[account_id] = balances.get(account_id, Decimal("0")) + Decimal(tail or 0)
+        return [
+            AccountBalanceAt(account_id=account_id, at=at, balance=balance, checkpoint=checkpoint)
+            for account_id, balance in sorted(balances.items())
+        ]
+
+    def _checkpoint_month(self, at: datetime) -> Optional[date]:
+        """Последний закрытый месяц, целиком лежащий до at"""
+        return self.db.exec(
+            select(func.max(ClosedPeriod.month)).where(ClosedPeriod.month < month_start(at))
+        ).one()
+
+    @staticmethod
+    def _tail(checkpoint: Optional[date], at: datetime) -> list:
+        conditions = [TransactionEntry.transaction_date <= at]
+        if checkpoint:
+            conditions.append(TransactionEntry.transaction_date >= _month_datetime(next_month(checkpoint)))
+        return conditions
+
+    def _turnovers(self, month: date, from_start: bool = False) -> Dict[int, Tuple[Decimal, Decimal]]:
+        """Дебетовые и кредитовые обороты счетов за месяц (from_start — от начала книги)"""
+        conditions = [TransactionEntry.transaction_date < _month_datetime(next_month(month))]
+        if not from_start:
+            conditions.append(TransactionEntry.transaction_date >= _month_datetime(month))
+        rows = self.db.exec(
+            select(
+                TransactionEntry.account_id,
+                func.sum(case((TransactionEntry.direction == 'DEBIT', TransactionEntry.amount), else_=0)),
+                func.sum(case((TransactionEntry.direction == 'CREDIT', TransactionEntry.amount), else_=0)),
+            )
+            .where(*conditions)
+            .group_by(TransactionEntry.account_id)
+        ).all()
+        return {
+            account_id: (Decimal(debit or 0), Decimal(credit or 0))
+            for account_id, debit, credit in rows
+        }
+
+    def _lock(self) -> None:
+        if self.postgres:
+            self.db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": PERIOD_LOCK})
@@ -0,0 +1,281 @@
+"""
+Сервис сверки расходов на трафик с расходными транзакциями
+"""
+
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import func
+from sqlmodel import Session, select
+
+from app.models.projects import ProjectCampaign
+from app.models.transactions import Transaction, TransactionStatus, TransactionType
+from app.schemas.reconciliation import (
+    ReconciliationItem, ReconciliationReport, ReconciliationStatus, ReconciliationSummary
+)
+from app.services.traffic import TrafficAnalyticsClient
+
+
+class DailyAmount(NamedTuple):
+    """Сумма за день проекта"""
+    project_id: int
+    day: date
+    amount: Decimal
+    count: int
+
+
+def _as_date(value) -> date:
+    """Дата из результата func.date (строка в SQLite, date в PostgreSQL)"""
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+
+class ReconciliationService:
+    """
+    Сверка дневного расхода из аналитики трафика с проводками
+
+    Обе стороны загружаются пакетно: один запрос агрегатов в Traffic
+    Analytics за весь период и один сгруппированный запрос к транзакциям.
+    Сопоставление — слиянием отсортированных по (проект, день) списков
+    с допусками по дате и сумме.
+    """
+
+    def __init__(self, db: Session, traffic_client: Optional[TrafficAnalyticsClient] = None):
+        self.db = db
+        self.traffic_client = traffic_client or TrafficAnalyticsClient()
+
+    async def reconcile(
+        self,
+        start: date,
+        end: date,
+        project_id: Optional[int] = None,
+        amount_tolerance: Decimal = Decimal("1"),
+        amount_tolerance_pct: Decimal = Decimal("0.01"),
+        date_tolerance_days: int = 1,
+    ) -> ReconciliationReport:
+        """
+        Сверка за период [start, end] (включительно)
+
+        Args:
+            amount_tolerance: Допустимое абсолютное расхождение суммы
+            amount_tolerance_pct: Допустимое относительное расхождение (доля)
+            date_tolerance_days: Допустимый сдвиг даты проводки в днях
+        """
+        if end < start:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Period end must not be before start"
+            )
+
+        period_start = datetime.combine(start, datetime.min.time())
+        period_end = datetime.combine(end + timedelta(days=1), datetime.min.time())
+
+        campaigns = self._campaign_projects(project_id)
+        rows = await self.traffic_client.get_daily_campaign_metrics(period_start, period_end)
+        traffic, unmapped = self._traffic_daily(rows, campaigns)
+        ledger = self._ledger_daily(period_start, period_end, project_id)
+
+        tolerance = (amount_tolerance, amount_tolerance_pct, date_tolerance_days)
+        items = self._merge(traffic, ledger, tolerance)
+
+        by_status: Dict[ReconciliationStatus, List[ReconciliationItem]] = defaultdict(list)
+        for item in items:
+            by_status[item.status].append(item)
+
+        traffic_total = sum((day.amount for day in traffic), Decimal("0"))
+        ledger_total = sum((day.amount for day in ledger), Decimal("0"))
+
+        return ReconciliationReport(
+            start=start,
+            end=end,
+            amount_tolerance=amount_tolerance,
+            amount_tolerance_pct=amount_tolerance_pct,
+            date_tolerance_days=date_tolerance_days,
+            summary=ReconciliationSummary(
+                matched=len(by_status[ReconciliationStatus.MATCHED]),
+                discrepancies=len(by_status[ReconciliationStatus.DISCREPANCY]),
+                unmatched_traffic=len(by_status[ReconciliationStatus.UNMATCHED_TRAFFIC]),
+                unmatched_ledger=len(by_status[ReconciliationStatus.UNMATCHED_LEDGER]),
+                traffic_total=traffic_total,
+                ledger_total=ledger_total,
+                difference=ledger_total - traffic_total,
+            ),
+            matched=by_status[ReconciliationStatus.MATCHED],
+            discrepancies=by_status[ReconciliationStatus.DISCREPANCY],
+            unmatched_traffic=by_status[ReconciliationStatus.UNMATCHED_TRAFFIC],
+            unmatched_ledger=by_status[ReconciliationStatus.UNMATCHED_LEDGER],
+            unmapped_campaigns=sorted(unmapped),
+        )
+
+    def _campaign_projects(self, project_id: Optional[int]) -> Dict[str, int]:
+        """Соответствие кампания -> проект"""
+        statement = select(ProjectCampaign.campaign, ProjectCampaign.project_id)
+        if project_id is not None:
+            statement = statement.where(ProjectCampaign.project_id == project_id)
+        return dict(self.db.exec(statement).all())
+
+    @staticmethod
+    def _traffic_daily(
+        rows: List[dict], campaigns: Dict[str, int]
+    ) -> Tuple[List[DailyAmount], Set[str]]:
+        """Расход трафика по (проект, день), отсортированный"""
+        totals: Dict[Tuple[int, date], Decimal] = defaultdict(Decimal)
+        counts: Dict[Tuple[int, date], int] = defaultdict(int)
+        unmapped: Set[str] = set()
+
+        for row in rows:
+            spend = Decimal(str(row["spend"]))
+            if not spend:
+                continue
+            project_id = campaigns.get(row["campaign"])
+            if project_id is None:
+                unmapped.add(row["campaign"])
+                continue
+            key = (project_id, datetime.fromisoformat(row["bucket"]).date())
+            totals[key] += spend
+            counts[key] += 1
+
+        days = [
+            DailyAmount(project_id, day, amount, counts[(project_id, day)])
+            for (project_id, day), amount in totals.items()
+        ]
+        days.sort()
+        return days, unmapped
+
+    def _ledger_daily(
+        self, start: datetime, end: datetime, project_id: Optional[int]
+    ) -> List[DailyAmount]:
+        """Расходные транзакции по (проект, день) одним сгруппированным запросом"""
+        day = func.date(Transaction.date)
+        statement = (
+            select(
+                Transaction.project_id,
+                day,
+                func.sum(Transaction.amount),
+                func.count(Transaction.id),
+            )
+            .where(
+                Transaction.type == TransactionType.EXPENSE,
+                Transaction.status == TransactionStatus.COMPLETED,
+                Transaction.date >= start,
+                Transaction.date < end,
+            )
+            .group_by(Transaction.project_id, day)
+            .order_by(Transaction.project_id, day)
+        )
+        if project_id is not None:
+            statement = statement.where(Transaction.project_id == project_id)
+        else:
+            statement = statement.where(Transaction.project_id.is_not(None))
+
+        return [
+            DailyAmount(row_project, _as_date(row_day), Decimal(str(amount)), count)
+            for row_project, row_day, amount, count in self.db.exec(statement).all()
+        ]
+
+    @classmethod
+    def _merge(
+        cls,
+        traffic: List[DailyAmount],
+        ledger: List[DailyAmount],
+        tolerance: Tuple[Decimal, Decimal, int],
+    ) -> List[ReconciliationItem]:
+        """Слияние отсортированных списков по проектам"""
+        traffic_by_project: Dict[int, List[DailyAmount]] = defaultdict(list)
+        ledger_by_project: Dict[int, List[DailyAmount]] = defaultdict(list)
+        for day in traffic:
+            traffic_by_project[day.project_id].append(day)
+        for day in ledger:
+            ledger_by_project[day.project_id].append(day)
+
+        items: List[ReconciliationItem] = []
+        for project_id in sorted(set(traffic_by_project) | set(ledger_by_project)):
+            items.extend(cls._merge_project(
+                traffic_by_project[project_id], ledger_by_project[project_id], tolerance
+            ))
+        return items
+
+    @staticmethod
+    def _merge_project(
+        traffic: List[DailyAmount],
+        ledger: List[DailyAmount],
+        tolerance: Tuple[Decimal, Decimal, int],
+    ) -> List[ReconciliationItem]:
+        """
+        Сопоставление дней одного проекта
+
+        Для каждого дня трафика рассматриваются еще не сопоставленные
+        дни книги в окне ±date_tolerance_days. Предпочтение — сумма
+        в допуске, затем ближайшая дата, затем меньшее расхождение.
+        Кандидат вне допуска по сумме дает расхождение (discrepancy).
+        """
+        amount_tolerance, amount_tolerance_pct, date_tolerance_days = tolerance
+        window = timedelta(days=date_tolerance_days)
+
+        def within(traffic_amount: Decimal, ledger_amount: Decimal) -> bool:
+            allowed = max(
+                amount_tolerance,
+                amount_tolerance_pct * max(abs(traffic_amount), abs(ledger_amount)),
+            )
+            return abs(ledger_amount - traffic_amount) <= allowed
+
+        def item(status_, spend: Optional[DailyAmount], booked: Optional[DailyAmount]):
+            return ReconciliationItem(
+                project_id=(spend or booked).project_id,
+                status=status_,
+                traffic_date=spend.day if spend else None,
+                ledger_date=booked.day if booked else None,
+                traffic_spend=spend.amount if spend else None,
+                ledger_amount=booked.amount if booked else None,
+                difference=(booked.amount - spend.amount) if spend and booked else None,
+                transaction_count=booked.count if booked else 0,
+            )
+
+        items = []
+        used = [False] * len(ledger)
+        position = 0
+
+        for spend in traffic:
+            # Дни книги левее окна уже не могут быть сопоставлены
+            while position < len(ledger) and ledger[position].day < spend.day - window:
+                if not used[position]:
+                    items.append(item(ReconciliationStatus.UNMATCHED_LEDGER, None, ledger[position]))
+                position += 1
+
+            best, best_key = None, None
+            candidate = position
+            while candidate < len(ledger) and ledger[candidate].day <= spend.day + window:
+                if not used[candidate]:
+                    booked = ledger[candidate]
+                    key = (
+                        not within(spend.amount, booked.amount),
+                        abs((booked.day - spend.day).days),
+                        abs(booked.amount - spend.amount),
+                    )
+                    if best_key is None or key < best_key:
+                        best, best_key = candidate, key
+                candidate += 1
+
+            if best is None:
+                items.append(item(ReconciliationStatus.UNMATCHED_TRAFFIC, spend, None))
+                continue
+
+            used[best] = True
+            matched = not best_key[0]
+            items.append(item(
+                ReconciliationStatus.MATCHED if matched else ReconciliationStatus.DISCREPANCY,
+                spend,
+                ledger[best],
+            ))
+
+        for index in range(position, len(ledger)):
+            if not used[index]:
+                items.append(item(ReconciliationStatus.UNMATCHED_LEDGER, None, ledger[index]))
+
+        return items
@@ -0,0 +1,465 @@
+"""
+Сервис повторяющихся транзакций и их планировщик
+"""
+
+import ast
+import logging
+import operator
+from calendar import monthrange
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, List, Optional, Tuple
+
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.triggers.cron import CronTrigger
+from fastapi import HTTPException, status
+from sqlalchemy import bindparam, text, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models.accounts import Account
+from app.models.recurring import (
+    RecurringAmountMode, RecurringOccurrence, RecurringTemplate, RecurringTemplateCreate,
+    RecurringTemplateUpdate
+)
+from app.models.transactions import Transaction, TransactionCreate
+from app.services.currency import to_money
+from app.services.periods import open_from
+from app.services.transactions import TransactionService
+
+logger = logging.getLogger(__name__)
+
+# Ключ pg_try_advisory_xact_lock: одновременно работает один запуск
+RECURRING_LOCK = 0x72637572
+# Наступлений в одном INSERT ... ON CONFLICT
+CLAIM_BATCH_SIZE = 1000
+# Наибольший показатель степени в формуле
+MAX_EXPONENT = 12
+
+_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+    ast.USub: operator.neg,
+    ast.UAdd: operator.pos,
+}
+_FUNCTIONS = {
+    "min": min,
+    "max": max,
+    "abs": abs,
+    "round": lambda value, digits=Decimal(0): round(value, int(digits)),
+}
+
+# Переменные формулы суммы
+FORMULA_VARIABLES = (
+    "amount",  # сумма шаблона (база)
+    "previous",  # сумма предыдущего наступления (для первого — amount)
+    "debit_balance",  # баланс счета дебета на момент запуска
+    "credit_balance",  # баланс счета кредита на момент запуска
+    "year", "month", "day", "days_in_month",  # дата наступления
+)
+
+
+def evaluate_formula(formula: str, variables: Dict[str, Decimal]) -> Decimal:
+    """
+    Значение формулы суммы
+
+    Допускаются числа, переменные FORMULA_VARIABLES, операции
+    + - * / % **, скобки и функции min, max, abs, round.
+    """
+    def visit(node: ast.AST) -> Decimal:
+        if isinstance(node, ast.Expression):
+            return visit(node.body)
+        if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+            return Decimal(str(node.value))
+        if isinstance(node, ast.Name):
+            if node.id not in variables:
+                raise ValueError(f"Unknown variable: {node.id}")
+            return variables[node.id]
+        if isinstance(node, ast.BinOp) and type(node.op) in _OPERATORS:
+            left, right = visit(node.left), visit(node.right)
+            if isinstance(node.op, ast.Pow) and abs(right) > MAX_EXPONENT:
+                raise ValueError("Exponent is too large")
+            return _OPERATORS[type(node.op)](left, right)
+        if isinstance(node, ast.UnaryOp) and type(node.op) in _OPERATORS:
+            return _OPERATORS[type(node.op)](visit(node.operand))
+        if (
+            isinstance(node, ast.Call)
+            and isinstance(node.func, ast.Name)
+            and node.func.id in _FUNCTIONS
+            and not node.keywords
+        ):
+            return Decimal(_FUNCTIONS[node.func.id](*(visit(arg) for arg in node.args)))
+        raise ValueError(f"Unsupported expression: {type(node).__name__}")
+
+    try:
+        return visit(ast.parse(formula, mode="eval"))
+    except SyntaxError as e:
+        raise ValueError(f"Invalid formula: {e.msg}")
+    except (ArithmeticError, InvalidOperation, TypeError) as e:
+        raise ValueError(f"Formula evaluation failed: {e}")
+
+
+def _trigger(schedule: str) -> CronTrigger:
+    try:
+        return CronTrigger.from_crontab(schedule, timezone=timezone.utc)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid schedule: {e}"
+        )
+
+
+def _next_occurrence(trigger: CronTrigger, moment: datetime) -> datetime:
+    """Первое наступление не раньше moment (naive UTC, как даты книги)"""
+    fire_time = trigger.get_next_fire_time(None, moment.replace(tzinfo=timezone.utc))
+    return fire_time.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _after(trigger: CronTrigger, moment: datetime, end_at: Optional[datetime]) -> Optional[datetime]:
+    """Следующее наступление после moment в пределах срока действия"""
+    occurrence = _next_occurrence(trigger, moment + timedelta(microseconds=1))
+    return occurrence if end_at is None or occurrence <= end_at else None
+
+
+class RecurringService:
+    """
+    Шаблоны повторяющихся транзакций
+
+    run() проводит все наступившие и пропущенные наступления активных
+    шаблонов одной пакетной операцией. Наступления сначала занимаются
+    вставкой в recurring_occurrences с уникальностью (шаблон, время),
+    затем проводятся в той же транзакции БД, поэтому повторный или
+    параллельный запуск не проводит наступление дважды.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.dialect = db.get_bind().dialect.name
+
+    def create_template(self, template_data: RecurringTemplateCreate) -> RecurringTemplate:
+        """Создание шаблона"""
+        data = template_data.model_dump(exclude_unset=True)
+        if data.get("start_at") is None:
+            data.pop("start_at", None)
+        template = RecurringTemplate(**data)
+        self._validate(template)
+        template.next_occurrence_at = self._first_occurrence(template)
+
+        self.db.add(template)
+        self.db.commit()
+        self.db.refresh(template)
+        return template
+
+    def update_template(
+        self, template_id: int, template_data: RecurringTemplateUpdate
+    ) -> RecurringTemplate:
+        """Обновление шаблона; новое расписание действует после последнего наступления"""
+        template = self.get_template(template_id)
+        for field, value in template_data.model_dump(exclude_unset=True).items():
+            setattr(template, field, value)
+        self._validate(template)
+
+        if template.last_occurrence_at:
+            template.next_occurrence_at = _after(
+                _trigger(template.schedule), template.last_occurrence_at, template.end_at
+            )
+        else:
+            template.next_occurrence_at = self._first_occurrence(template)
+        template.updated_at = datetime.utcnow()
+
+        self.db.add(template)
+        self.db.commit()
+        self.db.refresh(template)
+        return template
+
+    def get_template(self, template_id: int) -> RecurringTemplate:
+        template = self.db.get(RecurringTemplate, template_id)
+        if not template:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Recurring template not found"
+            )
+        return template
+
+    def preview(self, template_id: int, count: int = 12) -> List[datetime]:
+        """Ближайшие непроведенные наступления"""
+        template = self.get_template(template_id)
+        trigger = _trigger(template.schedule)
+        occurrences = []
+        occurrence = template.next_occurrence_at
+        while occurrence is not None and len(occurrences) < count:
+            occurrences.append(occurrence)
+            occurrence = _after(trigger, occurrence, template.end_at)
+        return occurrences
+
+    def run(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Проведение наступивших наступлений всех активных шаблонов
+
+        Пропущенные периоды (простой сервиса) проводятся своими датами,
+        не больше RECURRING_MAX_CATCHUP наступлений шаблона за запуск.
+        """
+        now = now or datetime.utcnow()
+        if self.dialect == "postgresql" and not self.db.execute(
+            text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": RECURRING_LOCK}
+        ).scalar():
+            return {"templates": 0, "posted": 0, "skipped": 0, "busy": True}
+
+        templates = self.db.exec(
+            select(RecurringTemplate)
+            .where(
+                RecurringTemplate.is_active == True,  # noqa: E712
+                RecurringTemplate.next_occurrence_at.is_not(None),
+                RecurringTemplate.next_occurrence_at <= now,
+            )
+            .order_by(RecurringTemplate.id)
+        ).all()
+        if not templates:
+            self.db.rollback()
+            return {"templates": 0, "posted": 0, "skipped": 0, "busy": False}
+
+        # Наступления в закрытых периодах не проводятся: иначе один такой
+        # шаблон отклонял бы весь пакет при каждом запуске
+        boundary = open_from(self.db)
+        due = []
+        for template in templates:
+            try:
+                due += self._due_occurrences(template, now, boundary)
+            except (HTTPException, ValueError):
+                # Ошибочный шаблон не останавливает проведение остальных
+                logger.exception("Recurring template %s skipped", template.id)
+
+        claimed = self._claim(due)
+        items = [
+            (
+                TransactionCreate(
+                    description=f"{template.description} ({occurrence:%Y-%m-%d})"[:500],
+                    type=template.type,
+                    amount=amount,
+                    date=occurrence,
+                    project_id=template.project_id,
+                    category_id=template.category_id,
+                    counterparty_id=template.counterparty_id
+                ),
+                [
+                    (template.debit_account_id, amount, 'DEBIT'),
+                    (template.credit_account_id, amount, 'CREDIT'),
+                ],
+            )
+            for template, occurrence, amount in due
+            if (template.id, occurrence) in claimed
+        ]
+        occurrence_ids = [
+            claimed[(template.id, occurrence)]
+            for template, occurrence, _ in due
+            if (template.id, occurrence) in claimed
+        ]
+
+        def link(transactions: List[Transaction]) -> None:
+            if transactions:
+                table = RecurringOccurrence.__table__
+                self.db.execute(
+                    update(table)
+                    .where(table.c.id == bindparam("occurrence_id"))
+                    .values(transaction_id=bindparam("transaction_id")),
+                    [
+                        {"occurrence_id": occurrence_id, "transaction_id": transaction.id}
+                        for occurrence_id, transaction in zip(occurrence_ids, transactions)
+                    ],
+                )
+
+        if items:
+            TransactionService(self.db).post_batch(items, before_commit=link)
+        else:
+            self.db.commit()
+
+        logger.info(
+            "Recurring run: %s templates, %s occurrences posted, %s already posted",
+            len(templates), len(items), len(due) - len(items)
+        )
+        return {
+            "templates": len(templates),
+            "posted": len(items),
+            "skipped": len(due) - len(items),
+            "busy": False,
+        }
+
+    def _validate(self, template: RecurringTemplate) -> None:
+        _trigger(template.schedule)
+
+        for account_id in (template.debit_account_id, template.credit_account_id):
+            if not self.db.get(Account, account_id):
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Account {account_id} not found"
+                )
+        if template.debit_account_id == template.credit_account_id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Debit and credit accounts must differ"
+            )
+
+        if template.amount_mode == RecurringAmountMode.FIXED:
+            if template.amount is None or template.amount <= 0:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Fixed amount must be positive"
+                )
+        else:
+            if not template.formula:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Formula is required"
+                )
+            try:
+                evaluate_formula(
+                    template.formula, {name: Decimal("1") for name in FORMULA_VARIABLES}
+                )
+            except ValueError as e:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=str(e)
+                )
+
+    @staticmethod
+    def _first_occurrence(template: RecurringTemplate) -> Optional[datetime]:
+        occurrence = _next_occurrence(_trigger(template.schedule), template.start_at)
+        return occurrence if template.end_at is None or occurrence <= template.end_at else None
+
+    def _due_occurrences(
+        self, template: RecurringTemplate, now: datetime, boundary: Optional[datetime] = None
+    ) -> List[Tuple[RecurringTemplate, datetime, Decimal]]:
+        """
+        Наступления шаблона до now с суммами; сдвигает курсор шаблона
+
+        Наступления раньше boundary (начала открытого периода)
+        пропускаются.
+        """
+        trigger = _trigger(template.schedule)
+        previous = self.db.exec(
+            select(RecurringOccurrence.amount)
+            .where(RecurringOccurrence.template_id == template.id)
+            .order_by(RecurringOccurrence.occurrence_at.desc())
+            .limit(1)
+        ).first()
+        if previous is None:
+            previous = template.amount or Decimal("0")
+
+        due = []
+        occurrence = template.next_occurrence_at
+        if occurrence is not None and boundary is not None and occurrence < boundary:
+            logger.warning(
+                "Recurring template %s: occurrences from %s in closed periods skipped",
+                template.id, occurrence
+            )
+            occurrence = _next_occurrence(trigger, boundary)
+            if template.end_at is not None and occurrence > template.end_at:
+                occurrence = None
+        while (
+            occurrence is not None
+            and occurrence <= now
+            and len(due) < settings.RECURRING_MAX_CATCHUP
+        ):
+            amount = self._amount(template, occurrence, previous)
+            if amount > 0:
+                due.append((template, occurrence, amount))
+                previous = amount
+            else:
+                logger.warning(
+                    "Recurring template %s: non-positive amount %s at %s skipped",
+                    template.id, amount, occurrence
+                )
+            template.last_occurrence_at = occurrence
+            occurrence = _after(trigger, occurrence, template.end_at)
+
+        template.next_occurrence_at = occurrence
+        self.db.add(template)
+        return due
+
+    def _amount(self, template: RecurringTemplate, occurrence: datetime, previous: Decimal) -> Decimal:
+        if template.amount_mode == RecurringAmountMode.FIXED:
+            return to_money(template.amount)
+
+        debit = self.db.get(Account, template.debit_account_id)
+        credit = self.db.get(Account, template.credit_account_id)
+        return to_money(evaluate_formula(template.formula, {
+            "amount": Decimal(template.amount or 0),
+            "previous": Decimal(previous),
+            "debit_balance": Decimal(debit.balance),
+            "credit_balance": Decimal(credit.balance),
+            "year": Decimal(occurrence.year),
+            "month": Decimal(occurrence.month),
+            "day": Decimal(occurrence.day),
+            "days_in_month": Decimal(monthrange(occurrence.year, occurrence.month)[1]),
+        }))
+
+    def _claim(
+        self, due: List[Tuple[RecurringTemplate, datetime, Decimal]]
+    ) -> Dict[Tuple[int, datetime], int]:
+        """
+        Вставка наступлений, еще не проведенных ранее
+
+        Returns:
+            (ID шаблона, время наступления) -> ID записи для вставленных
+        """
+        dialect = sqlite if self.dialect == "sqlite" else postgresql
+        table = RecurringOccurrence.__table__
+        now = datetime.utcnow()
+        claimed = {}
+        for start in range(0, len(due), CLAIM_BATCH_SIZE):
+            rows = [
+                {
+                    "template_id": template.id,
+                    "occurrence_at": occurrence,
+                    "amount": amount,
+                    "created_at": now,
+                }
+                for template, occurrence, amount in due[start:start + CLAIM_BATCH_SIZE]
+            ]
+            result = self.db.execute(
+                dialect.insert(table)
+                .values(rows)
+                .on_conflict_do_nothing(index_elements=["template_id", "occurrence_at"])
+                .returning(table.c.id, table.c.template_id, table.c.occurrence_at)
+            )
+            claimed.update({
+                (template_id, occurrence_at): occurrence_id
+                for occurrence_id, template_id, occurrence_at in result
+            })
+        return claimed
+
+
+def run_due_templates() -> None:
+    """Задание планировщика: проведение наступивших шаблонов"""
+    with Session(engine) as db:
+        try:
+            RecurringService(db).run()
+        except Exception:
+            logger.exception("Recurring run failed")
+
+
+def start_scheduler() -> BackgroundScheduler:
+    """
+    Фоновый планировщик процесса сервиса
+
+    Запуски в нескольких процессах безопасны: лишние пропускаются
+    advisory-блокировкой, наступления проводятся один раз.
+    """
+    scheduler = BackgroundScheduler(timezone=timezone.utc)
+    scheduler.add_job(
+        run_due_templates,
+        "interval",
+        seconds=settings.RECURRING_INTERVAL_SECONDS,
+        id="recurring_templates",
+        max_instances=1,
+        coalesce=True,
+        next_run_time=datetime.now(timezone.utc),
+    )
+    scheduler.start()
+    return scheduler
@@ -0,0 +1,370 @@
+"""
+Сервис агрегированных отчетов
+"""
+
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import case, func
+from sqlmodel import Session, select
+
+from app.core.cache import (
+    EVENTS_DATASET, LEDGER_DATASET, RATES_DATASET, cache_get, cache_set, versioned_key
+)
+from app.core.database import engine
+from app.models.categories import Category, CategoryClosure
+from app.models.projects import Project, ProjectCampaign
+from app.models.transactions import Transaction, TransactionStatus, TransactionType
+from app.schemas.reports import (
+    CategoryRollupReport, CategoryRollupRow, ProjectRoi, ProjectRoiReport
+)
+from app.services.currency import (
+    CurrencyService, is_base_currency, normalize_currency, to_money
+)
+from app.services.traffic import TrafficAnalyticsClient
+
+RATIO_PRECISION = Decimal("0.0001")
+
+
+def _ratio(numerator: Decimal, denominator) -> Optional[Decimal]:
+    """Отношение с округлением, None при нулевом знаменателе"""
+    if not denominator:
+        return None
+    return (Decimal(numerator) / Decimal(denominator)).quantize(RATIO_PRECISION)
+
+
+def _period_bounds(start: date, end: date) -> tuple:
+    """Границы [start, end] (включительно) как полуинтервал datetime"""
+    if end < start:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Period end must not be before start"
+        )
+    return (
+        datetime.combine(start, datetime.min.time()),
+        datetime.combine(end + timedelta(days=1), datetime.min.time()),
+    )
+
+
+class ReportService:
+    """Сервис агрегированных отчетов по книге и аналитике трафика"""
+
+    def __init__(self, db: Session, traffic_client: Optional[TrafficAnalyticsClient] = None):
+        self.db = db
+        self.traffic_client = traffic_client or TrafficAnalyticsClient()
+        self.currency_service = CurrencyService(db)
+
+    async def project_roi(
+        self,
+        start: date,
+        end: date,
+        project_id: Optional[int] = None,
+        currency: Optional[str] = None,
+    ) -> dict:
+        """
+        P&L и ROI проектов за период [start, end] (включительно)
+
+        Доходы и расходы считаются одним сгруппированным запросом
+        к транзакциям, клики и конверсии — одним запросом к агрегатам
+        Traffic Analytics. Результат кэшируется по (проект, период)
+        с версиями книги, событий трафика и курсов, поэтому новая
+        транзакция, завершенный импорт или новый курс сразу делают
+        его неактуальным. Суммы пересчитываются в валюту отчета
+        по курсам на дату каждой транзакции (и каждого дня трафика).
+        """
+        period_start, period_end = _period_bounds(start, end)
+        currency = normalize_currency(currency)
+        if project_id is not None and not self.db.get(Project, project_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Project not found"
+            )
+
+        key = versioned_key(
+            "project_roi",
+            [LEDGER_DATASET, EVENTS_DATASET, RATES_DATASET],
+            {
+                "project_id": project_id,
+                "start": start.isoformat(),
+                "end": end.isoformat(),
+                "currency": currency,
+            },
+        )
+        hit = cache_get(key)
+        if hit is not None:
+            return hit
+
+        # Реплика может отставать от версии книги в ключе, поэтому
+        # промах кэша считается на основной БД и результат кэшируется
+        if self.db.info.get("replica"):
+            with Session(engine) as primary:
+                return await ReportService(primary, self.traffic_client).project_roi(
+                    start, end, project_id, currency
+                )
+
+        statement = select(Project).order_by(Project.id)
+        if project_id is not None:
+            statement = statement.where(Project.id == project_id)
+        projects = self.db.exec(statement).all()
+
+        ledger = self._ledger_totals(period_start, period_end, project_id, currency)
+        campaigns = self._project_campaigns(project_id)
+        traffic = await self._traffic_totals(period_start, period_end, campaigns, currency)
+
+        report = ProjectRoiReport(
+            start=start,
+            end=end,
+            currency=currency,
+            projects=[
+                self._project_roi(
+                    project, ledger, traffic, campaigns.get(project.id, []), currency
+                )
+                for project in projects
+            ],
+        ).model_dump(mode="json")
+
+        cache_set(key, report)
+        return report
+
+    def category_rollup(
+        self,
+        start: date,
+        end: date,
+        root_id: Optional[int] = None,
+        transaction_type: Optional[TransactionType] = None,
+        currency: Optional[str] = None,
+    ) -> CategoryRollupReport:
+        """
+        Суммы транзакций по поддеревьям категорий за период
+
+        Один запрос: транзакции соединяются с таблицей замыкания по
+        категории-потомку и группируются по предку, поэтому каждая
+        категория получает сумму всего своего поддерева. С root_id
+        в отчет попадает только поддерево указанной категории.
+        В валюте, отличной от базовой, суммы сначала группируются
+        по дням и пересчитываются соединением с курсами.
+        """
+        period_start, period_end = _period_bounds(start, end)
+        currency = normalize_currency(currency)
+        if root_id is not None and not self.db.get(Category, root_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Category not found"
+            )
+
+        own_amount = case((CategoryClosure.depth == 0, Transaction.amount), else_=0)
+        conditions = [
+            Transaction.status == TransactionStatus.COMPLETED,
+            Transaction.date >= period_start,
+            Transaction.date < period_end,
+        ]
+        if transaction_type is not None:
+            conditions.append(Transaction.type == transaction_type)
+        if root_id is not None:
+            subtree = select(CategoryClosure.descendant_id).where(
+                CategoryClosure.ancestor_id == root_id
+            )
+            conditions.append(Category.id.in_(subtree))
+
+        group = [Category.id, Category.name, Category.parent_id]
+        if is_base_currency(currency):
+            statement = (
+                select(
+                    *group,
+                    func.sum(Transaction.amount),
+                    func.sum(own_amount),
+                    func.count(Transaction.id),
+                )
+                .join(CategoryClosure, CategoryClosure.ancestor_id == Category.id)
+                .join(Transaction, Transaction.category_id == CategoryClosure.descendant_id)
+                .where(*conditions)
+                .group_by(*group)
+            )
+            result = self.db.exec(statement).all()
+        else:
+            day = func.date(Transaction.date)
+            daily = (
+                select(
+                    Category.id.label("category_id"),
+                    Category.name.label("name"),
+                    Category.parent_id.label("parent_id"),
+                    day.label("day"),
+                    func.sum(Transaction.amount).label("total"),
+                    func.sum(own_amount).label("own_total"),
+                    func.count(Transaction.id).label("transaction_count"),
+                )
+                .join(CategoryClosure, CategoryClosure.ancestor_id == Category.id)
+                .join(Transaction, Transaction.category_id == CategoryClosure.descendant_id)
+                .where(*conditions)
+                .group_by(*group, day)
+                .subquery("daily")
+            )
+            result = self.currency_service.convert_daily(
+                daily,
+                currency,
+                keys=["category_id", "name", "parent_id"],
+                amounts=["total", "own_total"],
+                extra=[func.sum(daily.c.transaction_count)],
+            )
+
+        rows = [
+            CategoryRollupRow(
+                category_id=category_id,
+                name=name,
+                parent_id=parent_id,
+                total=to_money(total),
+                own_total=to_money(own_total),
+                transaction_count=count,
+            )
+            for category_id, name, parent_id, total, own_total, count
+            in sorted(result, key=lambda row: row[0])
+        ]
+        return CategoryRollupReport(
+            start=start,
+            end=end,
+            root_id=root_id,
+            type=transaction_type,
+            currency=currency,
+            rows=rows,
+        )
+
+    def _ledger_totals(
+        self, start: datetime, end: datetime, project_id: Optional[int], currency: str
+    ) -> Dict[int, Dict[TransactionType, Decimal]]:
+        """Суммы доходов и расходов по проектам в валюте отчета"""
+        conditions = [
+            Transaction.type.in_([TransactionType.INCOME, TransactionType.EXPENSE]),
+            Transaction.status == TransactionStatus.COMPLETED,
+            Transaction.date >= start,
+            Transaction.date < end,
+        ]
+        if project_id is not None:
+            conditions.append(Transaction.project_id == project_id)
+        else:
+            conditions.append(Transaction.project_id.is_not(None))
+
+        if is_base_currency(currency):
+            statement = (
+                select(Transaction.project_id, Transaction.type, func.sum(Transaction.amount))
+                .where(*conditions)
+                .group_by(Transaction.project_id, Transaction.type)
+            )
+            result = self.db.exec(statement).all()
+        else:
+            day = func.date(Transaction.date)
+            daily = (
+                select(
+                    Transaction.project_id.label("project_id"),
+                    Transaction.type.label("type"),
+                    day.label("day"),
+                    func.sum(Transaction.amount).label("amount"),
+                )
+                .where(*conditions)
+                .group_by(Transaction.project_id, Transaction.type, day)
+                .subquery("daily")
+            )
+            result = self.currency_service.convert_daily(
+                daily, currency, keys=["project_id", "type"], amounts=["amount"]
+            )
+
+        totals: Dict[int, Dict[TransactionType, Decimal]] = defaultdict(dict)
+        for row_project, row_type, amount in result:
+            totals[row_project][TransactionType(row_type)] = to_money(amount)
+        return totals
+
+    def _project_campaigns(self, project_id: Optional[int]) -> Dict[int, List[str]]:
+        """Кампании трафика по проектам"""
+        statement = select(ProjectCampaign.project_id, ProjectCampaign.campaign)
+        if project_id is not None:
+            statement = statement.where(ProjectCampaign.project_id == project_id)
+
+        campaigns: Dict[int, List[str]] = defaultdict(list)
+        for row_project, campaign in self.db.exec(statement).all():
+            campaigns[row_project].append(campaign)
+        return campaigns
+
+    async def _traffic_totals(
+        self,
+        start: datetime,
+        end: datetime,
+        campaigns: Dict[int, List[str]],
+        currency: str,
+    ) -> Dict[int, Dict[str, Decimal]]:
+        """
+        Метрики трафика по проектам (без запроса, если кампаний нет)
+
+        Для валюты, отличной от базовой, берутся дневные агрегаты,
+        курс на каждый день периода загружается одним запросом.
+        """
+        if not campaigns:
+            return {}
+
+        project_by_campaign = {
+            campaign: row_project
+            for row_project, names in campaigns.items()
+            for campaign in names
+        }
+        if is_base_currency(currency):
+            rows = await self.traffic_client.get_campaign_totals(start, end)
+            rates = None
+        else:
+            rows = await self.traffic_client.get_daily_campaign_metrics(start, end)
+            rates = self.currency_service.rates_by_day(
+                currency, start.date(), (end - timedelta(days=1)).date()
+            )
+
+        totals: Dict[int, Dict[str, Decimal]] = defaultdict(lambda: defaultdict(Decimal))
+        for row in rows:
+            row_project = project_by_campaign.get(row["campaign"])
+            if row_project is None:
+                continue
+            rate = Decimal("1")
+            if rates is not None:
+                day = datetime.fromisoformat(row["bucket"]).date()
+                if day not in rates:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"No {currency} exchange rate effective on {day.isoformat()}"
+                    )
+                rate = rates[day]
+            for metric in ("clicks", "conversions"):
+                totals[row_project][metric] += Decimal(str(row[metric]))
+            for metric in ("payout", "spend"):
+                totals[row_project][metric] += Decimal(str(row[metric])) / rate
+        return totals
+
+    @staticmethod
+    def _project_roi(
+        project: Project,
+        ledger: Dict[int, Dict[TransactionType, Decimal]],
+        traffic: Dict[int, Dict[str, Decimal]],
+        campaigns: List[str],
+        currency: str,
+    ) -> ProjectRoi:
+        amounts = ledger.get(project.id, {})
+        metrics = traffic.get(project.id, {})
+
+        income = amounts.get(TransactionType.INCOME, Decimal("0"))
+        expense = amounts.get(TransactionType.EXPENSE, Decimal("0"))
+        clicks = int(metrics.get("clicks", 0))
+        conversions = int(metrics.get("conversions", 0))
+
+        return ProjectRoi(
+            project_id=project.id,
+            project_name=project.name,
+            currency=currency,
+            income=income,
+            expense=expense,
+            profit=income - expense,
+            roi=_ratio(income - expense, expense),
+            clicks=clicks,
+            conversions=conversions,
+            traffic_spend=to_money(metrics.get("spend")),
+            traffic_payout=to_money(metrics.get("payout")),
+            cost_per_click=_ratio(expense, clicks),
+            cost_per_conversion=_ratio(expense, conversions),
+            campaigns=sorted(campaigns),
+        )
@@ -0,0 +1,249 @@
+"""
+Сервис поиска по книге (pg_trgm)
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, literal, or_, text
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.models.accounts import Account
+from app.models.counterparties import Counterparty
+from app.models.transactions import CryptoTransactionDetail, Transaction, TransactionEntry
+from app.schemas.search import NamedHit, SearchMatch, SearchResults, Suggestion, TransactionHit
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class SearchService:
+    """
+    Поиск транзакций по описаниям, проводкам, контрагентам и адресам
+    кошельков
+
+    В PostgreSQL используются GiST-индексы pg_trgm (миграция 0009):
+    строки с похожими словами (<%) читаются из индекса сразу в
+    порядке расстояния <<-> (KNN), поэтому для ранжирования не
+    оцениваются все совпадения; совпадения подстроки (ILIKE)
+    берутся без упорядочения. Каждый источник читает не больше
+    SEARCH_CANDIDATES строк каждого вида, поэтому время ответа не
+    растет с размером книги и частотой слова. В других СУБД — поиск
+    подстроки без ранжирования.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.postgres = db.get_bind().dialect.name == "postgresql"
+
+    def match(self, column, query: str):
+        """Условие совпадения колонки с запросом"""
+        contains = column.ilike(f"%{_escape_like(query)}%", escape="\\")
+        if not self.postgres:
+            return contains
+        return or_(contains, literal(query).op("<%")(column))
+
+    def score(self, column, query: str):
+        """Похожесть запроса на слова колонки (0..1)"""
+        if not self.postgres:
+            return literal(1.0)
+        return func.coalesce(func.word_similarity(query, column), 0)
+
+    def _ranked(
+        self, columns: list, column, query: str, conditions: list, limit: int, order=None
+    ) -> List[tuple]:
+        """
+        До limit лучших совпадений колонки с запросом: строки (*columns, score)
+
+        order — упорядочение совпадений подстроки вне PostgreSQL.
+        """
+        contains = column.ilike(f"%{_escape_like(query)}%", escape="\\")
+        if not self.postgres:
+            statement = select(*columns, literal(1.0)).where(contains, *conditions)
+            if order is not None:
+                statement = statement.order_by(order)
+            return self.db.execute(statement.limit(limit)).all()
+
+        score = self.score(column, query)
+        similar = self.db.execute(
+            select(*columns, score)
+            .where(literal(query).op("<%")(column), *conditions)
+            .order_by(literal(query).op("<<->")(column))
+            .limit(limit)
+        ).all()
+        substring = self.db.execute(
+            select(*columns, score).where(contains, *conditions).limit(limit)
+        ).all()
+
+        best: Dict[tuple, tuple] = {}
+        for row in (*similar, *substring):
+            key = tuple(row[:-1])
+            if key not in best or row[-1] > best[key][-1]:
+                best[key] = row
+        return sorted(best.values(), key=lambda row: row[-1], reverse=True)[:limit]
+
+    def search(
+        self,
+        query: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        limit: int = 50,
+    ) -> SearchResults:
+        """Транзакции, контрагенты и счета по запросу; транзакции — за период [start, end)"""
+        query = self._normalize(query)
+        if self.postgres:
+            self.db.execute(
+                text("SELECT set_config('pg_trgm.word_similarity_threshold', :threshold, true)"),
+                {"threshold": str(settings.SEARCH_SIMILARITY_THRESHOLD)},
+            )
+
+        counterparties = self._named(Counterparty, query, limit)
+        accounts = self._named(Account, query, limit)
+
+        hits: Dict[int, Tuple[float, List[SearchMatch]]] = {}
+        for match, rows in (
+            (SearchMatch.DESCRIPTION, self._by_description(query, start, end)),
+            (SearchMatch.ENTRY, self._by_entries(query, start, end)),
+            (SearchMatch.COUNTERPARTY, self._by_counterparties(counterparties, start, end)),
+            (SearchMatch.WALLET, self._by_wallets(query)),
+        ):
+            for transaction_id, score in rows:
+                best, matched = hits.get(transaction_id, (0.0, []))
+                if match not in matched:
+                    matched = matched + [match]
+                hits[transaction_id] = (max(best, float(score)), matched)
+
+        return SearchResults(
+            query=query,
+            transactions=self._transactions(hits, start, end, limit),
+            counterparties=counterparties,
+            accounts=accounts,
+        )
+
+    def autocomplete(self, prefix: str, limit: int = 10) -> List[Suggestion]:
+        """
+        Варианты по префиксу: контрагенты, счета и частые описания
+        транзакций за последние SEARCH_SUGGEST_DAYS дней (до limit
+        вариантов каждого вида)
+        """
+        prefix = self._normalize(prefix, min_length=1)
+        pattern = f"{_escape_like(prefix)}%"
+
+        suggestions = []
+        for kind, model in (("counterparty", Counterparty), ("account", Account)):
+            rows = self.db.execute(
+                select(model.id, model.name)
+                .where(model.name.ilike(pattern, escape="\\"))
+                .order_by(model.name)
+                .limit(limit)
+            ).all()
+            suggestions += [Suggestion(kind=kind, value=name, id=id) for id, name in rows]
+
+        since = datetime.utcnow() - timedelta(days=settings.SEARCH_SUGGEST_DAYS)
+        rows = self.db.execute(
+            select(Transaction.description)
+            .where(
+                Transaction.description.ilike(pattern, escape="\\"),
+                Transaction.date >= since,
+            )
+            .group_by(Transaction.description)
+            .order_by(func.count().desc(), Transaction.description)
+            .limit(limit)
+        ).all()
+        suggestions += [Suggestion(kind="description", value=description) for description, in rows]
+        return suggestions
+
+    @staticmethod
+    def _normalize(query: str, min_length: int = 2) -> str:
+        query = " ".join(query.split())
+        if len(query) < min_length:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Search query must be at least {min_length} characters"
+            )
+        return query
+
+    @staticmethod
+    def _period(column, start: Optional[datetime], end: Optional[datetime]) -> list:
+        conditions = []
+        if start:
+            conditions.append(column >= start)
+        if end:
+            conditions.append(column < end)
+        return conditions
+
+    def _named(self, model, query: str, limit: int) -> List[NamedHit]:
+        rows = self._ranked([model.id, model.name], model.name, query, [], limit, model.name)
+        rows = sorted(rows, key=lambda row: (-row[2], row[1]))
+        return [NamedHit(id=id, name=name, score=float(score)) for id, name, score in rows]
+
+    def _by_description(self, query, start, end) -> Iterable[Tuple[int, float]]:
+        return self._ranked(
+            [Transaction.id], Transaction.description, query,
+            self._period(Transaction.date, start, end),
+            settings.SEARCH_CANDIDATES, Transaction.date.desc(),
+        )
+
+    def _by_entries(self, query, start, end) -> Iterable[Tuple[int, float]]:
+        return self._ranked(
+            [TransactionEntry.transaction_id], TransactionEntry.description, query,
+            self._period(TransactionEntry.transaction_date, start, end),
+            settings.SEARCH_CANDIDATES, TransactionEntry.transaction_date.desc(),
+        )
+
+    def _by_counterparties(
+        self, counterparties: List[NamedHit], start, end
+    ) -> Iterable[Tuple[int, float]]:
+        """Последние транзакции найденных контрагентов со скором контрагента"""
+        scores = {hit.id: hit.score for hit in counterparties}
+        if not scores:
+            return []
+        rows = self.db.execute(
+            select(Transaction.id, Transaction.counterparty_id)
+            .where(
+                Transaction.counterparty_id.in_(scores),
+                *self._period(Transaction.date, start, end),
+            )
+            .order_by(Transaction.date.desc())
+            .limit(settings.SEARCH_CANDIDATES)
+        ).all()
+        return [(transaction_id, scores[counterparty_id]) for transaction_id, counterparty_id in rows]
+
+    def _by_wallets(self, query) -> Iterable[Tuple[int, float]]:
+        """Адреса кошельков (подстрока или похожесть) и префикс хеша транзакции"""
+        details = CryptoTransactionDetail
+        rows = self.db.execute(
+            select(details.transaction_id, literal(1.0))
+            .where(details.tx_hash.like(f"{_escape_like(query)}%", escape="\\"))
+            .limit(settings.SEARCH_CANDIDATES)
+        ).all()
+        for column in (details.wallet_from, details.wallet_to):
+            rows += self._ranked(
+                [details.transaction_id], column, query, [], settings.SEARCH_CANDIDATES
+            )
+        return rows
+
+    def _transactions(
+        self, hits: Dict[int, Tuple[float, List[SearchMatch]]], start, end, limit: int
+    ) -> List[TransactionHit]:
+        if not hits:
+            return []
+        transactions = self.db.exec(
+            select(Transaction).where(
+                Transaction.id.in_(hits),
+                *self._period(Transaction.date, start, end),
+            )
+        ).all()
+        results = [
+            TransactionHit(
+                **transaction.model_dump(include=set(TransactionHit.model_fields)),
+                score=round(hits[transaction.id][0], 4),
+                matched=hits[transaction.id][1],
+            )
+            for transaction in transactions
+        ]
+        results.sort(key=lambda hit: (hit.score, hit.date), reverse=True)
+        return results[:limit]
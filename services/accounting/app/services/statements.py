@@ -0,0 +1,563 @@
+"""
+Сервис импорта выписок с автокатегоризацией по правилам
+"""
+
+import csv
+import hashlib
+import io
+import logging
+import re
+from collections import deque
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Iterable, List, NamedTuple, Optional, Pattern, Set, Tuple
+
+from fastapi import HTTPException, UploadFile, status
+from sqlalchemy import update
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.models.accounts import Account
+from app.models.statements import (
+    ImportRule, ImportRuleCreate, ImportRuleUpdate, StatementColumns, StatementImport,
+    StatementImportStatus, StatementLine, StatementLineStatus, StatementLinesPost
+)
+from app.models.transactions import Transaction, TransactionCreate, TransactionType
+from app.services.periods import open_from
+from app.services.transactions import TransactionService
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+logger = logging.getLogger(__name__)
+
+# Блок чтения файла при подсчете хеша
+HASH_CHUNK_SIZE = 1024 * 1024
+DIRECTIONS = (TransactionType.INCOME.value, TransactionType.EXPENSE.value)
+# Короче этого обязательный литерал регулярного выражения не используется как фильтр
+MIN_LITERAL_LENGTH = 3
+# Ошибка строки с датой в закрытом периоде: проводится вручную после открытия периода
+PERIOD_CLOSED_ERROR = "Period is closed"
+
+
+def _required_literal(pattern: str) -> str:
+    """
+    Самая длинная последовательность символов, которая входит в любое
+    совпадение выражения (литералы верхнего уровня подряд), или ""
+    """
+    longest = current = ""
+    for op, value in sre_parse.parse(pattern, re.IGNORECASE):
+        if op is sre_parse.LITERAL:
+            current += chr(value)
+            longest = max(longest, current, key=len)
+        else:
+            current = ""
+    return longest.lower()
+
+
+class _Automaton:
+    """Автомат Ахо — Корасик: все вхождения набора подстрок за один проход по тексту"""
+
+    def __init__(self, patterns: Dict[str, List[int]]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[List[int]] = [[]]
+
+        for pattern, rule_ids in patterns.items():
+            state = 0
+            for char in pattern:
+                if char not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                    self.goto[state][char] = len(self.goto) - 1
+                state = self.goto[state][char]
+            self.output[state].extend(rule_ids)
+
+        # Ссылки неудач обходом в ширину; выход состояния включает выходы суффиксов
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self.goto[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0) if state else 0
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+
+    def search(self, text: str) -> Set[int]:
+        found = set()
+        state = 0
+        for char in text:
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            if self.output[state]:
+                found.update(self.output[state])
+        return found
+
+
+class _Conditions(NamedTuple):
+    """Условия правила, прочитанные из модели один раз на импорт"""
+    order: Tuple[int, int]
+    amount_min: Optional[Decimal]
+    amount_max: Optional[Decimal]
+    direction: Optional[str]
+    wallet: Optional[str]
+
+    def met(self, amount: Decimal, direction: str, wallet: Optional[str]) -> bool:
+        if self.amount_min is not None and abs(amount) < self.amount_min:
+            return False
+        if self.amount_max is not None and abs(amount) > self.amount_max:
+            return False
+        if self.direction and self.direction != direction:
+            return False
+        if self.wallet and self.wallet != wallet:
+            return False
+        return True
+
+
+class RuleMatcher:
+    """
+    Активные правила, скомпилированные для проверки строки за один проход
+
+    Подстроки всех правил собраны в автомат Ахо — Корасик вместе с
+    обязательными литералами регулярных выражений: выражение
+    проверяется, только если его литерал нашелся в описании,
+    кошельки собраны в словарь. Выражения без такого литерала
+    скомпилированы по отдельности и проверяются в порядке приоритета
+    лишь до лучшего уже найденного кандидата, причем условия суммы,
+    направления и кошелька проверяются до выражения. Побеждает
+    правило с наименьшим priority, все условия которого выполняются.
+    """
+
+    def __init__(self, rules: Iterable[ImportRule]):
+        self.rules = {rule.id: rule for rule in rules}
+        self.conditions: Dict[int, _Conditions] = {}
+        substrings: Dict[str, List[int]] = {}
+        self.filtered: Dict[int, Pattern] = {}
+        self.unfiltered: List[Tuple[int, str, Pattern]] = []
+        self.wallets: Dict[str, List[int]] = {}
+        self.unconditional: List[int] = []
+
+        for rule in sorted(self.rules.values(), key=lambda rule: (rule.priority, rule.id)):
+            self.conditions[rule.id] = _Conditions(
+                (rule.priority, rule.id), rule.amount_min, rule.amount_max, rule.direction,
+                rule.wallet.lower() if rule.wallet else None,
+            )
+            if rule.pattern and rule.is_regex:
+                expression = re.compile(rule.pattern, re.IGNORECASE)
+                literal = _required_literal(rule.pattern)
+                if len(literal) >= MIN_LITERAL_LENGTH:
+                    self.filtered[rule.id] = expression
+                    substrings.setdefault(literal, []).append(rule.id)
+                else:
+                    self.unfiltered.append((rule.id, rule.pattern, expression))
+            elif rule.pattern:
+                substrings.setdefault(rule.pattern.lower(), []).append(rule.id)
+            elif rule.wallet:
+                self.wallets.setdefault(rule.wallet.lower(), []).append(rule.id)
+            else:
+                self.unconditional.append(rule.id)
+
+        self.automaton = _Automaton(substrings) if substrings else None
+
+    def match(self, description: str, amount: Decimal, wallet: Optional[str]) -> Optional[ImportRule]:
+        """Правило с наименьшим priority, все условия которого выполняются"""
+        wallet = wallet.lower() if wallet else None
+        candidates = set(self.unconditional)
+        if self.automaton:
+            candidates.update(
+                rule_id for rule_id in self.automaton.search(description.lower())
+                if rule_id not in self.filtered or self.filtered[rule_id].search(description)
+            )
+        if wallet:
+            candidates.update(self.wallets.get(wallet, ()))
+
+        direction = TransactionType.INCOME.value if amount > 0 else TransactionType.EXPENSE.value
+        best = None
+        for rule_id in candidates:
+            conditions = self.conditions[rule_id]
+            if (best is None or conditions.order < best.order) and conditions.met(amount, direction, wallet):
+                best = conditions
+
+        # Одинаковые выражения разных правил проверяются один раз
+        searched: Dict[str, bool] = {}
+        for rule_id, pattern, expression in self.unfiltered:
+            conditions = self.conditions[rule_id]
+            if best is not None and conditions.order >= best.order:
+                break
+            if not conditions.met(amount, direction, wallet):
+                continue
+            if pattern not in searched:
+                searched[pattern] = expression.search(description) is not None
+            if searched[pattern]:
+                best = conditions
+                break
+        return self.rules[best.order[1]] if best else None
+
+
+class StatementService:
+    """
+    Импорт CSV выписок банков и бирж
+
+    Файл читается потоково блоками по STATEMENT_BATCH_SIZE строк.
+    Строки с совпавшим правилом проводятся пакетом на блок
+    (TransactionService.post_batch), остальные попадают в очередь
+    разбора, откуда проводятся вручную.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    # Правила
+
+    def create_rule(self, rule_data: ImportRuleCreate) -> ImportRule:
+        rule = ImportRule(**rule_data.model_dump())
+        self._validate_rule(rule)
+        self.db.add(rule)
+        self.db.commit()
+        self.db.refresh(rule)
+        return rule
+
+    def update_rule(self, rule_id: int, rule_data: ImportRuleUpdate) -> ImportRule:
+        rule = self.get_rule(rule_id)
+        for field, value in rule_data.model_dump(exclude_unset=True).items():
+            setattr(rule, field, value)
+        self._validate_rule(rule)
+        rule.updated_at = datetime.utcnow()
+        self.db.add(rule)
+        self.db.commit()
+        self.db.refresh(rule)
+        return rule
+
+    def get_rule(self, rule_id: int) -> ImportRule:
+        rule = self.db.get(ImportRule, rule_id)
+        if not rule:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Import rule not found"
+            )
+        return rule
+
+    def matcher(self) -> RuleMatcher:
+        """Скомпилированные активные правила"""
+        return RuleMatcher(self.db.exec(
+            select(ImportRule).where(ImportRule.is_active == True)  # noqa: E712
+        ).all())
+
+    # Импорт
+
+    def import_statement(
+        self,
+        upload: UploadFile,
+        bank_account_id: int,
+        income_account_id: int,
+        expense_account_id: int,
+        columns: StatementColumns,
+    ) -> StatementImport:
+        """
+        Потоковый импорт выписки
+
+        Повторная загрузка импортированного файла отклоняется, файла
+        с прерванным импортом — продолжает его.
+        """
+        for account_id in (bank_account_id, income_account_id, expense_account_id):
+            if not self.db.get(Account, account_id):
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Account {account_id} not found"
+                )
+
+        file_hash = self._hash(upload)
+        previous = self.db.exec(
+            select(StatementImport)
+            .where(StatementImport.file_hash == file_hash)
+            .order_by(StatementImport.id.desc())
+        ).first()
+        # RUNNING остается после аварийной остановки процесса: такой
+        # импорт продолжается так же, как FAILED
+        if previous and previous.status == StatementImportStatus.COMPLETED:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Statement already imported (import {previous.id})"
+            )
+
+        reader = csv.DictReader(
+            io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline=""),
+            delimiter=columns.delimiter,
+        )
+        required = [columns.date_column, columns.description_column, columns.amount_column]
+        required += [column for column in (columns.outflow_column, columns.wallet_column) if column]
+        missing = [column for column in required if column not in (reader.fieldnames or [])]
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Missing columns: {', '.join(missing)}"
+            )
+
+        # Правила компилируются до записи импорта: ошибка компиляции не
+        # оставляет импорт в статусе RUNNING
+        matcher = self.matcher()
+
+        # Счетчики фиксируются вместе с каждым блоком, поэтому повторная
+        # загрузка после сбоя продолжает импорт со следующей строки
+        statement_import = previous or StatementImport(filename="", file_hash=file_hash)
+        processed = statement_import.lines_total if previous else 0
+        statement_import.filename = upload.filename or "statement.csv"
+        statement_import.bank_account_id = bank_account_id
+        statement_import.income_account_id = income_account_id
+        statement_import.expense_account_id = expense_account_id
+        statement_import.status = StatementImportStatus.RUNNING
+        statement_import.error = None
+        statement_import.finished_at = None
+        self.db.add(statement_import)
+        self.db.commit()
+        self.db.refresh(statement_import)
+
+        try:
+            # Номер строки файла: заголовок — строка 1
+            batch: List[Tuple[int, dict]] = []
+            for line_number, row in enumerate(reader, start=2):
+                if line_number - 2 < processed:
+                    continue
+                batch.append((line_number, row))
+                if len(batch) >= settings.STATEMENT_BATCH_SIZE:
+                    self._process_batch(statement_import, matcher, columns, batch)
+                    batch = []
+            if batch:
+                self._process_batch(statement_import, matcher, columns, batch)
+        except Exception as e:
+            self.db.rollback()
+            logger.exception("Statement import %s failed", statement_import.id)
+            statement_import.status = StatementImportStatus.FAILED
+            statement_import.error = str(getattr(e, "detail", e))
+        else:
+            statement_import.status = StatementImportStatus.COMPLETED
+
+        statement_import.finished_at = datetime.utcnow()
+        self.db.add(statement_import)
+        self.db.commit()
+        self.db.refresh(statement_import)
+        return statement_import
+
+    def _process_batch(
+        self,
+        statement_import: StatementImport,
+        matcher: RuleMatcher,
+        columns: StatementColumns,
+        batch: List[Tuple[int, dict]],
+    ) -> None:
+        """
+        Проведение совпавших строк блока одним пакетом и запись остальных
+        в очередь; строки с датой в закрытом периоде тоже идут в очередь,
+        иначе post_batch отклонил бы весь блок
+        """
+        boundary = open_from(self.db)
+        items = []
+        for line_number, row in batch:
+            description = (row.get(columns.description_column) or "").strip()
+            try:
+                date, amount, wallet = self._parse(row, columns)
+            except ValueError as e:
+                self.db.add(StatementLine(
+                    import_id=statement_import.id,
+                    line_number=line_number,
+                    description=description,
+                    error=str(e),
+                ))
+                continue
+
+            closed = boundary is not None and date < boundary
+            rule = matcher.match(description, amount, wallet) if amount and not closed else None
+            if rule is None:
+                self.db.add(StatementLine(
+                    import_id=statement_import.id,
+                    line_number=line_number,
+                    date=date,
+                    description=description,
+                    amount=amount,
+                    wallet=wallet,
+                    error=PERIOD_CLOSED_ERROR if closed else None,
+                ))
+                continue
+
+            items.append(self._item(
+                statement_import, date, description, amount,
+                rule.category_id, rule.counterparty_id, rule.project_id, rule.account_id
+            ))
+
+        statement_import.lines_total += len(batch)
+        statement_import.lines_posted += len(items)
+        statement_import.lines_queued += len(batch) - len(items)
+        self.db.add(statement_import)
+        if items:
+            TransactionService(self.db).post_batch(items)
+        else:
+            self.db.commit()
+
+    @staticmethod
+    def _item(
+        statement_import: StatementImport,
+        date: datetime,
+        description: str,
+        amount: Decimal,
+        category_id: Optional[int],
+        counterparty_id: Optional[int],
+        project_id: Optional[int],
+        account_id: Optional[int],
+    ) -> Tuple[TransactionCreate, List[Tuple[int, Decimal, str]]]:
+        """Транзакция по строке: приход — доход на счет выписки, списание — расход"""
+        value = abs(amount)
+        transaction_data = TransactionCreate(
+            description=description[:500] or "Statement line",
+            type=TransactionType.INCOME if amount > 0 else TransactionType.EXPENSE,
+            amount=value,
+            date=date,
+            project_id=project_id,
+            category_id=category_id,
+            counterparty_id=counterparty_id
+        )
+        if amount > 0:
+            entries = [
+                (statement_import.bank_account_id, value, 'DEBIT'),
+                (account_id or statement_import.income_account_id, value, 'CREDIT'),
+            ]
+        else:
+            entries = [
+                (account_id or statement_import.expense_account_id, value, 'DEBIT'),
+                (statement_import.bank_account_id, value, 'CREDIT'),
+            ]
+        return transaction_data, entries
+
+    # Очередь разбора
+
+    def post_lines(self, lines_data: StatementLinesPost) -> List[Transaction]:
+        """Проведение строк очереди с назначенными вручную категорией, контрагентом и проектом"""
+        lines = self.db.exec(
+            select(StatementLine).where(
+                StatementLine.id.in_(lines_data.line_ids),
+                StatementLine.status == StatementLineStatus.PENDING,
+            ).order_by(StatementLine.id)
+        ).all()
+        if len(lines) != len(set(lines_data.line_ids)):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Some lines are not found or already processed"
+            )
+        # Строки закрытого периода проводятся после его открытия (иначе 409)
+        invalid = [
+            line.id for line in lines
+            if not line.amount or (line.error and line.error != PERIOD_CLOSED_ERROR)
+        ]
+        if invalid:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Lines without date or amount cannot be posted: {invalid}"
+            )
+
+        imports = {
+            statement_import.id: statement_import
+            for statement_import in self.db.exec(
+                select(StatementImport).where(
+                    StatementImport.id.in_({line.import_id for line in lines})
+                )
+            ).all()
+        }
+        items = [
+            self._item(
+                imports[line.import_id], line.date, line.description, line.amount,
+                lines_data.category_id, lines_data.counterparty_id, lines_data.project_id,
+                lines_data.account_id
+            )
+            for line in lines
+        ]
+
+        def link(transactions: List[Transaction]) -> None:
+            for line, transaction in zip(lines, transactions):
+                line.status = StatementLineStatus.POSTED
+                line.transaction_id = transaction.id
+                self.db.add(line)
+
+        return TransactionService(self.db).post_batch(items, before_commit=link)
+
+    def dismiss_lines(self, line_ids: List[int]) -> int:
+        """Исключение строк из очереди без проведения"""
+        dismissed = self.db.execute(
+            update(StatementLine)
+            .where(
+                StatementLine.id.in_(line_ids),
+                StatementLine.status == StatementLineStatus.PENDING,
+            )
+            .values(status=StatementLineStatus.DISMISSED)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        self.db.commit()
+        return dismissed
+
+    # Разбор
+
+    @staticmethod
+    def _hash(upload: UploadFile) -> str:
+        digest = hashlib.sha256()
+        while True:
+            block = upload.file.read(HASH_CHUNK_SIZE)
+            if not block:
+                break
+            digest.update(block)
+        upload.file.seek(0)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _parse(row: dict, columns: StatementColumns) -> Tuple[datetime, Decimal, Optional[str]]:
+        """Дата, сумма со знаком и кошелек строки"""
+        value = (row.get(columns.date_column) or "").strip()
+        try:
+            date = (
+                datetime.strptime(value, columns.date_format)
+                if columns.date_format else datetime.fromisoformat(value)
+            )
+        except ValueError:
+            raise ValueError(f"Invalid date: {value!r}")
+
+        amount = StatementService._amount(row.get(columns.amount_column), columns)
+        if columns.outflow_column:
+            amount -= StatementService._amount(row.get(columns.outflow_column), columns)
+
+        wallet = (row.get(columns.wallet_column) or "").strip() if columns.wallet_column else ""
+        return date, amount, wallet or None
+
+    @staticmethod
+    def _amount(value: Optional[str], columns: StatementColumns) -> Decimal:
+        value = (value or "").strip().replace(" ", "").replace(" ", "")
+        if not value:
+            return Decimal("0")
+        if columns.decimal_comma:
+            value = value.replace(".", "").replace(",", ".")
+        try:
+            return Decimal(value)
+        except InvalidOperation:
+            raise ValueError(f"Invalid amount: {value!r}")
+
+    def _validate_rule(self, rule: ImportRule) -> None:
+        if rule.pattern and rule.is_regex:
+            try:
+                re.compile(rule.pattern)
+            except re.error as e:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Invalid regular expression: {e}"
+                )
+        if rule.direction is not None and rule.direction not in DIRECTIONS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Direction must be one of: {', '.join(DIRECTIONS)}"
+            )
+        if rule.account_id is not None and not self.db.get(Account, rule.account_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Account {rule.account_id} not found"
+            )
@@ -0,0 +1,64 @@
+"""
+Клиент Traffic Analytics Service
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import httpx
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+
+
+class TrafficAnalyticsClient:
+    """
+    Пакетные выгрузки метрик трафика
+
+    Каждый метод делает один запрос к агрегатам за весь период,
+    построчных обращений к сервису нет.
+    """
+
+    def __init__(self, base_url: Optional[str] = None):
+        self.base_url = (base_url or settings.TRAFFIC_ANALYTICS_SERVICE_URL).rstrip("/")
+
+    async def _get(self, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            async with httpx.AsyncClient(timeout=settings.SERVICE_TIMEOUT) as client:
+                response = await client.get(f"{self.base_url}{endpoint}", params=params)
+                response.raise_for_status()
+                return response.json()
+        except httpx.HTTPError as e:
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail=f"Traffic analytics service error: {e}"
+            )
+
+    async def get_daily_campaign_metrics(
+        self, start: datetime, end: datetime
+    ) -> List[Dict[str, Any]]:
+        """Метрики по кампаниям и дням за период [start, end)"""
+        data = await self._get(
+            "/api/analytics/breakdown",
+            {
+                "start": start.isoformat(),
+                "end": end.isoformat(),
+                "group_by": "campaign",
+                "granularity": "day",
+            },
+        )
+        return data["rows"]
+
+    async def get_campaign_totals(
+        self, start: datetime, end: datetime
+    ) -> List[Dict[str, Any]]:
+        """Итоговые метрики по кампаниям за период [start, end)"""
+        data = await self._get(
+            "/api/analytics/breakdown",
+            {
+                "start": start.isoformat(),
+                "end": end.isoformat(),
+                "group_by": "campaign",
+            },
+        )
+        return data["rows"]
@@ -4,19 +4,30 @@
 
 from decimal import Decimal
 from datetime import datetime
-from typing import List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from sqlalchemy import String, case, cast, func, insert, literal, update
 from sqlmodel import Session, select
 from fastapi import HTTPException, status
 
+from app.core.cache import LEDGER_DATASET, bump_data_version
+from app.core.live import BALANCES_CHANNEL, publish
+from app.services.changes import record_change, record_changes
+from app.services.budgets import ProjectBudgetService, publish_alerts
+from app.services.counterparty_stats import CounterpartyStatsService
+from app.services.periods import ensure_open
 from app.models.transactions import (
     Transaction, TransactionEntry, TransactionType, TransactionStatus,
-    TransactionCreate, CryptoTransactionDetail
+    TransactionCreate, TransactionRead, CryptoTransactionDetail
 )
-from app.models.accounts import Account
+from app.models.accounts import Account, AccountRead
+from app.models.changes import ChangeEntity, ChangeOperation
 from app.models.projects import Project
 from app.models.categories import Category
 from app.models.counterparties import Counterparty
 
+# Транзакций на один набор INSERT ... SELECT массового сторно
+REVERSAL_BATCH_SIZE = 5000
+
 
 class TransactionService:
     """Сервис для работы с транзакциями и двойной записью"""
@@ -46,13 +57,17 @@ class TransactionService:
         # Проверяем существование связанных объектов
         self._validate_related_objects(transaction_data)
         
+        # Закрытые периоды не принимают проводок
+        date = transaction_data.date or datetime.utcnow()
+        ensure_open(self.db, [date])
+        
         # Создаем транзакцию
         transaction = Transaction(
             description=transaction_data.description,
             type=transaction_data.type,
             status=TransactionStatus.PENDING,
             amount=transaction_data.amount,
-            date=transaction_data.date or datetime.utcnow(),
+            date=date,
             project_id=transaction_data.project_id,
             category_id=transaction_data.category_id,
             counterparty_id=transaction_data.counterparty_id
@@ -80,7 +95,8 @@ class TransactionService:
                 account_id=account_id,
                 amount=amount,
                 direction=direction,
-                description=f"{direction} - {transaction.description}"
+                description=f"{direction} - {transaction.description}",
+                transaction_date=transaction.date
             )
             
             self.db.add(entry)
@@ -104,9 +120,26 @@ class TransactionService:
         # Обновляем балансы счетов
         self._update_account_balances(entries)
         
+        # Обороты контрагента фиксируются вместе с проводками
+        CounterpartyStatsService(self.db).apply(transaction)
+        
+        # Расход проекта и пересеченные пороги бюджета — тоже
+        alerts = ProjectBudgetService(self.db).apply(transaction)
+        
+        # Лента изменений фиксируется вместе с проводками
+        self._record_changes(transaction, entries)
+        balance_update = self._balance_update(transaction, entries)
+        
         self.db.commit()
         self.db.refresh(transaction)
         
+        # Закэшированные отчеты по книге больше не актуальны
+        bump_data_version(LEDGER_DATASET)
+        
+        # Подписчики (Dashboard) получают новые балансы без опроса
+        publish(BALANCES_CHANNEL, balance_update)
+        publish_alerts(alerts)
+        
         return transaction
     
     def create_income_transaction(
@@ -198,15 +231,347 @@ class TransactionService:
         
         return self.create_transaction(transaction_data, entries)
     
+    def reverse_transaction(
+        self, transaction_id: int, date: Optional[datetime] = None
+    ) -> Transaction:
+        """
+        Сторно проведенной транзакции
+        
+        Создает транзакцию-сторно с отрицательной суммой и зеркальными
+        проводками (те же счета и направления, суммы с обратным знаком),
+        связанными с исходными, поэтому балансы и отчеты по книге
+        возвращаются к состоянию без исходной транзакции. Исходная
+        транзакция остается в книге с отметкой reversed_at.
+        
+        Args:
+            transaction_id: ID исходной транзакции
+            date: Дата сторно (по умолчанию — текущая)
+        
+        Returns:
+            Транзакция-сторно
+        """
+        original = self.db.get(Transaction, transaction_id)
+        if not original:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Transaction not found"
+            )
+        if original.reversal_of_id is not None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="A reversal cannot be reversed"
+            )
+        if original.status != TransactionStatus.COMPLETED:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Only completed transactions can be reversed"
+            )
+        
+        # Сторно проводится в открытом периоде, исходная транзакция
+        # может лежать в закрытом
+        now = datetime.utcnow()
+        ensure_open(self.db, [date or now])
+        
+        # Условная отметка не дает сторнировать транзакцию дважды
+        # при одновременных запросах
+        marked = self.db.execute(
+            update(Transaction)
+            .where(
+                Transaction.id == transaction_id,
+                Transaction.date == original.date,
+                Transaction.reversed_at.is_(None),
+            )
+            .values(reversed_at=now, updated_at=now)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if not marked:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Transaction already reversed"
+            )
+        self.db.refresh(original)
+        
+        original_entries = self.db.exec(
+            select(TransactionEntry).where(
+                TransactionEntry.transaction_id == transaction_id,
+                TransactionEntry.transaction_date == original.date
+            ).order_by(TransactionEntry.id)
+        ).all()
+        
+        reversal = Transaction(
+            description=f"Reversal of #{original.id}: {original.description}"[:500],
+            type=original.type,
+            status=TransactionStatus.COMPLETED,
+            amount=-original.amount,
+            date=date or now,
+            project_id=original.project_id,
+            category_id=original.category_id,
+            counterparty_id=original.counterparty_id,
+            reversal_of_id=original.id
+        )
+        self.db.add(reversal)
+        self.db.flush()
+        
+        entries = []
+        for original_entry in original_entries:
+            self.db.add(TransactionEntry(
+                transaction_id=reversal.id,
+                account_id=original_entry.account_id,
+                amount=-original_entry.amount,
+                direction=original_entry.direction,
+                description=f"Reversal: {original_entry.description or ''}",
+                transaction_date=reversal.date,
+                reversal_of_id=original_entry.id
+            ))
+            entries.append((original_entry.account_id, -original_entry.amount, original_entry.direction))
+        
+        self._apply_balance_deltas(self._balance_deltas(entries))
+        CounterpartyStatsService(self.db).apply(reversal)
+        ProjectBudgetService(self.db).apply(reversal)
+        
+        record_change(
+            self.db, ChangeEntity.TRANSACTION, original.id, ChangeOperation.UPDATE,
+            TransactionRead.model_validate(original).model_dump(mode="json")
+        )
+        self._record_changes(reversal, entries)
+        balance_update = self._balance_update(reversal, entries)
+        
+        self.db.commit()
+        self.db.refresh(reversal)
+        
+        bump_data_version(LEDGER_DATASET)
+        publish(BALANCES_CHANNEL, balance_update)
+        
+        return reversal
+    
+    def reverse_transactions(self, conditions: list, date: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Массовое сторно проведенных транзакций, отобранных условиями
+        
+        Транзакции отмечаются одним UPDATE ... RETURNING, сторно и
+        зеркальные проводки создаются INSERT ... SELECT пачками по
+        REVERSAL_BATCH_SIZE, балансы счетов и обороты контрагентов
+        меняются агрегированными дельтами. Все выполняется в одной
+        транзакции БД.
+        
+        Args:
+            conditions: Условия отбора по колонкам Transaction
+            date: Дата сторно (по умолчанию — текущая)
+        
+        Returns:
+            Количество сторнированных транзакций и изменения балансов
+        """
+        now = datetime.utcnow()
+        date = date or now
+        ensure_open(self.db, [date])
+        
+        original_ids = self.db.execute(
+            update(Transaction)
+            .where(
+                *conditions,
+                Transaction.status == TransactionStatus.COMPLETED,
+                Transaction.reversal_of_id.is_(None),
+                Transaction.reversed_at.is_(None),
+            )
+            .values(reversed_at=now, updated_at=now)
+            .returning(Transaction.id)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+        if not original_ids:
+            self.db.rollback()
+            return {"reversed": 0, "accounts": []}
+        
+        transactions = Transaction.__table__
+        entries = TransactionEntry.__table__
+        reversals = transactions.alias("reversal")
+        status_type = transactions.c.status.type
+        deltas: Dict[int, Decimal] = {}
+        stats = CounterpartyStatsService(self.db)
+        budgets = ProjectBudgetService(self.db)
+        
+        for start in range(0, len(original_ids), REVERSAL_BATCH_SIZE):
+            batch = original_ids[start:start + REVERSAL_BATCH_SIZE]
+            
+            self.db.execute(insert(transactions).from_select(
+                [
+                    "description", "type", "status", "amount", "date", "project_id",
+                    "category_id", "counterparty_id", "reversal_of_id", "created_at",
+                ],
+                select(
+                    func.substr(
+                        literal("Reversal of #") + cast(transactions.c.id, String)
+                        + literal(": ") + transactions.c.description,
+                        1, 500
+                    ),
+                    transactions.c.type,
+                    literal(TransactionStatus.COMPLETED, status_type),
+                    -transactions.c.amount,
+                    literal(date, transactions.c.date.type),
+                    transactions.c.project_id,
+                    transactions.c.category_id,
+                    transactions.c.counterparty_id,
+                    transactions.c.id,
+                    literal(now, transactions.c.created_at.type),
+                ).where(transactions.c.id.in_(batch)),
+            ))
+            
+            self.db.execute(insert(entries).from_select(
+                [
+                    "transaction_id", "account_id", "amount", "direction", "description",
+                    "transaction_date", "reversal_of_id", "created_at",
+                ],
+                select(
+                    reversals.c.id,
+                    entries.c.account_id,
+                    -entries.c.amount,
+                    entries.c.direction,
+                    literal("Reversal: ") + func.coalesce(entries.c.description, ""),
+                    reversals.c.date,
+                    entries.c.id,
+                    literal(now, entries.c.created_at.type),
+                )
+                .select_from(entries)
+                .join(reversals, reversals.c.reversal_of_id == entries.c.transaction_id)
+                .where(
+                    entries.c.transaction_id.in_(batch),
+                    reversals.c.reversal_of_id.in_(batch),
+                    reversals.c.date == date,
+                ),
+            ))
+            
+            signed = case((entries.c.direction == 'DEBIT', entries.c.amount), else_=-entries.c.amount)
+            for account_id, delta in self.db.execute(
+                select(entries.c.account_id, func.sum(signed))
+                .where(entries.c.transaction_id.in_(batch))
+                .group_by(entries.c.account_id)
+            ).all():
+                deltas[account_id] = deltas.get(account_id, Decimal('0')) - Decimal(delta)
+            
+            stats.apply_reversals(batch, date)
+            budgets.apply_reversals(batch, date)
+            
+            record_changes(
+                self.db, ChangeEntity.TRANSACTION, ChangeOperation.UPDATE,
+                select(transactions.c.id).where(transactions.c.id.in_(batch))
+            )
+            record_changes(
+                self.db, ChangeEntity.TRANSACTION, ChangeOperation.INSERT,
+                select(reversals.c.id).where(
+                    reversals.c.reversal_of_id.in_(batch), reversals.c.date == date
+                )
+            )
+        
+        accounts = self._apply_bulk_balances(deltas)
+        
+        self.db.commit()
+        
+        bump_data_version(LEDGER_DATASET)
+        # Без транзакции в сообщении клиенты перечитывают данные целиком
+        publish(BALANCES_CHANNEL, {"transaction": None, "accounts": accounts})
+        
+        return {"reversed": len(original_ids), "accounts": accounts}
+    
+    def post_batch(
+        self,
+        items: List[Tuple[TransactionCreate, List[Tuple[int, Decimal, str]]]],
+        before_commit: Optional[Callable[[List[Transaction]], None]] = None
+    ) -> List[Transaction]:
+        """
+        Проведение набора транзакций одной фиксацией
+        
+        Транзакции и проводки вставляются пакетными INSERT, балансы
+        счетов меняются одной агрегированной дельтой на счет.
+        
+        Args:
+            items: Пары (данные транзакции, проводки)
+            before_commit: Вызывается с созданными транзакциями перед
+                фиксацией, в той же транзакции БД
+        
+        Returns:
+            Проведенные транзакции в порядке items
+        """
+        now = datetime.utcnow()
+        account_ids = set()
+        for transaction_data, entries in items:
+            self._validate_double_entry(entries)
+            self._validate_related_objects(transaction_data)
+            account_ids.update(account_id for account_id, _, _ in entries)
+        ensure_open(self.db, [transaction_data.date or now for transaction_data, _ in items])
+        
+        missing = account_ids - set(self.db.exec(
+            select(Account.id).where(Account.id.in_(account_ids))
+        ).all())
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Account {min(missing)} not found"
+            )
+        
+        transactions = [
+            Transaction(
+                description=transaction_data.description,
+                type=transaction_data.type,
+                status=TransactionStatus.COMPLETED,
+                amount=transaction_data.amount,
+                date=transaction_data.date or now,
+                project_id=transaction_data.project_id,
+                category_id=transaction_data.category_id,
+                counterparty_id=transaction_data.counterparty_id
+            )
+            for transaction_data, _ in items
+        ]
+        self.db.add_all(transactions)
+        self.db.flush()
+        
+        deltas: Dict[int, Decimal] = {}
+        for transaction, (_, entries) in zip(transactions, items):
+            self.db.add_all(
+                TransactionEntry(
+                    transaction_id=transaction.id,
+                    account_id=account_id,
+                    amount=amount,
+                    direction=direction,
+                    description=f"{direction} - {transaction.description}",
+                    transaction_date=transaction.date
+                )
+                for account_id, amount, direction in entries
+            )
+            for account_id, delta in self._balance_deltas(entries).items():
+                deltas[account_id] = deltas.get(account_id, Decimal('0')) + delta
+        
+        stats = CounterpartyStatsService(self.db)
+        for transaction in transactions:
+            stats.apply(transaction)
+        alerts = ProjectBudgetService(self.db).apply_batch(transactions)
+        
+        self.db.flush()
+        record_changes(
+            self.db, ChangeEntity.TRANSACTION, ChangeOperation.INSERT,
+            select(Transaction.id).where(Transaction.id.in_([t.id for t in transactions]))
+        )
+        accounts = self._apply_bulk_balances(deltas)
+        
+        if before_commit:
+            before_commit(transactions)
+        
+        self.db.commit()
+        
+        bump_data_version(LEDGER_DATASET)
+        publish(BALANCES_CHANNEL, {"transaction": None, "accounts": accounts})
+        publish_alerts(alerts)
+        
+        return transactions
+    
     def get_transaction_with_entries(self, transaction_id: int) -> Optional[Transaction]:
         """Получение транзакции с проводками"""
         statement = select(Transaction).where(Transaction.id == transaction_id)
         transaction = self.db.exec(statement).first()
         
         if transaction:
-            # Получаем проводки
+            # Получаем проводки (условие по дате выбирает одну секцию)
             entries_statement = select(TransactionEntry).where(
-                TransactionEntry.transaction_id == transaction_id
+                TransactionEntry.transaction_id == transaction_id,
+                TransactionEntry.transaction_date == transaction.date
             )
             entries = self.db.exec(entries_statement).all()
             # Добавляем проводки к транзакции (временно для возврата)
@@ -278,3 +643,67 @@ class TransactionService:
                     account.balance -= amount
                 
                 self.db.add(account)
+    
+    @staticmethod
+    def _balance_deltas(entries: List[Tuple[int, Decimal, str]]) -> Dict[int, Decimal]:
+        """Изменение баланса каждого счета по проводкам"""
+        deltas: Dict[int, Decimal] = {}
+        for account_id, amount, direction in entries:
+            signed = amount if direction == 'DEBIT' else -amount
+            deltas[account_id] = deltas.get(account_id, Decimal('0')) + signed
+        return deltas
+    
+    def _apply_balance_deltas(self, deltas: Dict[int, Decimal]):
+        """Атомарное изменение балансов (balance = balance + delta) в порядке ID счетов"""
+        for account_id in sorted(deltas):
+            self.db.execute(
+                update(Account)
+                .where(Account.id == account_id)
+                .values(balance=Account.balance + deltas[account_id])
+                .execution_options(synchronize_session="fetch")
+            )
+    
+    def _apply_bulk_balances(self, deltas: Dict[int, Decimal]) -> List[Dict[str, str]]:
+        """Изменение балансов массовой операцией с записью счетов в ленту изменений"""
+        self._apply_balance_deltas(deltas)
+        accounts = []
+        for account_id, delta in sorted(deltas.items()):
+            account = self.db.get(Account, account_id)
+            record_change(
+                self.db, ChangeEntity.ACCOUNT, account_id, ChangeOperation.UPDATE,
+                AccountRead.model_validate(account).model_dump(mode="json")
+            )
+            accounts.append({"id": account_id, "delta": str(delta), "balance": str(account.balance)})
+        return accounts
+    
+    def _record_changes(self, transaction: Transaction, entries: List[Tuple[int, Decimal, str]]):
+        """Запись транзакции и новых балансов затронутых счетов в ленту изменений"""
+        self.db.flush()
+        record_change(
+            self.db, ChangeEntity.TRANSACTION, transaction.id, ChangeOperation.INSERT,
+            TransactionRead.model_validate(transaction).model_dump(mode="json")
+        )
+        for account_id in dict.fromkeys(account_id for account_id, _, _ in entries):
+            account = self.db.get(Account, account_id)
+            record_change(
+                self.db, ChangeEntity.ACCOUNT, account_id, ChangeOperation.UPDATE,
+                AccountRead.model_validate(account).model_dump(mode="json")
+            )
+    
+    def _balance_update(
+        self, transaction: Transaction, entries: List[Tuple[int, Decimal, str]]
+    ) -> Dict[str, Any]:
+        """Изменения балансов счетов по транзакции для живых обновлений"""
+        deltas = self._balance_deltas(entries)
+        
+        return {
+            "transaction": TransactionRead.model_validate(transaction).model_dump(mode="json"),
+            "accounts": [
+                {
+                    "id": account_id,
+                    "delta": str(delta),
+                    "balance": str(self.db.get(Account, account_id).balance),
+                }
+                for account_id, delta in deltas.items()
+            ],
+        }
@@ -0,0 +1,489 @@
+"""
+Бенчмарк книги: проведение, списки, балансы, отчеты, криптооперации,
+сериализация страниц списков
+
+Сценарии выполняются через HTTP API приложения (TestClient) на базе
+из DATABASE_URL, заполненной benchmarks.ledger_data. Внешние
+провайдеры (курсы CoinGecko, TronScan, Traffic Analytics) заменены
+заглушками с фиксированными ответами, поэтому результаты
+воспроизводимы. Сценарии проведения добавляют транзакции в базу.
+
+Запуск из каталога сервиса:
+    DATABASE_URL=sqlite:///ledger_bench.db python -m benchmarks.bench_ledger \\
+        --iterations 200 --output results.json --baseline previous.json
+"""
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from sqlalchemy import case, func, select
+from sqlmodel import Session
+
+from app.core.cache import LEDGER_DATASET, bump_data_version
+from app.core.database import engine
+from app.core.responses import rows_response, schema_columns
+from app.models import (
+    Account, AccountType, Category, Counterparty, CryptoTransactionDetail, Project,
+    ProjectCampaign, Transaction, TransactionEntry, TransactionRead, User,
+)
+from app.services.crypto import CryptoService
+from app.services.traffic import TrafficAnalyticsClient
+
+# Транзакций в одной выборке сценария пакетного проведения
+BULK_SIZE = 100
+# Строк в странице сценариев пропускной способности списков
+LIST_PAGE_SIZE = 1000
+
+SCENARIOS: Dict[str, Callable] = {}
+
+
+def scenario(name: str):
+    """Регистрация сценария"""
+    def decorator(func):
+        SCENARIOS[name] = func
+        return func
+    return decorator
+
+
+class Bench:
+    """Контекст сценариев: клиент API, справочники книги, генератор случайных данных"""
+
+    def __init__(self, client: TestClient, seed: int):
+        self.client = client
+        self.rng = random.Random(seed)
+        with Session(engine) as db:
+            self.accounts = db.exec(select(Account.id).order_by(Account.id)).scalars().all()
+            self.crypto_accounts = db.exec(
+                select(Account.id).where(Account.type == AccountType.CRYPTO)
+            ).scalars().all()
+            self.projects = db.exec(select(Project.id)).scalars().all()
+            self.categories = db.exec(select(Category.id)).scalars().all()
+            self.counterparties = db.exec(select(Counterparty.id)).scalars().all()
+            self.transactions = db.exec(select(func.count(Transaction.id))).scalar_one()
+            self.period = db.exec(select(func.min(Transaction.date), func.max(Transaction.date))).one()
+        if len(self.accounts) < 2 or not self.transactions:
+            raise SystemExit("Ledger is empty, run benchmarks.ledger_data first")
+
+    def pick(self, values: List[int]) -> Optional[int]:
+        return self.rng.choice(values) if values else None
+
+    def two_accounts(self) -> tuple:
+        return tuple(self.rng.sample(self.accounts, 2))
+
+    def amount(self) -> str:
+        return str(Decimal(self.rng.randint(100, 500_000)) / 100)
+
+    def request(self, method: str, url: str, **kwargs) -> dict:
+        response = self.client.request(method, url, **kwargs)
+        if response.status_code >= 400:
+            raise RuntimeError(f"{method} {url}: {response.status_code} {response.text}")
+        return response.json()
+
+
+class Timer:
+    """Замеры одной операции сценария"""
+
+    def __init__(self):
+        self.samples: List[float] = []
+
+    def measure(self, operation: Callable, *args, **kwargs):
+        started = time.perf_counter()
+        result = operation(*args, **kwargs)
+        self.samples.append(time.perf_counter() - started)
+        return result
+
+
+# Сценарии: (bench, timer, iterations) -> операций в одном замере
+
+@scenario("post_single")
+def post_single(bench: Bench, timer: Timer, iterations: int) -> int:
+    """Задержка проведения одной расходной транзакции"""
+    for _ in range(iterations):
+        expense_account, bank_account = bench.two_accounts()
+        timer.measure(bench.request, "POST", "/api/transactions/expense", json={
+            "amount": bench.amount(),
+            "description": "Benchmark expense",
+            "expense_account_id": expense_account,
+            "bank_account_id": bank_account,
+            "project_id": bench.pick(bench.projects),
+            "category_id": bench.pick(bench.categories),
+            "counterparty_id": bench.pick(bench.counterparties),
+        })
+    return 1
+
+
+@scenario("post_bulk")
+def post_bulk(bench: Bench, timer: Timer, iterations: int) -> int:
+    """Пропускная способность проведения пакета составных транзакций"""
+    def post_batch(batch: List[dict]):
+        for payload in batch:
+            bench.request("POST", "/api/transactions/complex", json=payload)
+
+    for _ in range(max(iterations // 10, 1)):
+        batch = []
+        for _ in range(BULK_SIZE):
+            debit_account, credit_account = bench.two_accounts()
+            amount = bench.amount()
+            batch.append({
+                "description": "Benchmark batch posting",
+                "type": "expense",
+                "amount": amount,
+                "entries": [
+                    {"account_id": debit_account, "amount": amount, "direction": "DEBIT"},
+                    {"account_id": credit_account, "amount": amount, "direction": "CREDIT"},
+                ],
+                "project_id": bench.pick(bench.projects),
+            })
+        timer.measure(post_batch, batch)
+    return BULK_SIZE
+
+
+@scenario("list_first_page")
+def list_first_page(bench: Bench, timer: Timer, iterations: int) -> int:
+    """Первая страница списка транзакций"""
+    for _ in range(iterations):
+        timer.measure(bench.request, "GET", "/api/transactions/", params={"limit": 100})
+    return 1
+
+
+@scenario("list_deep_page")
+def list_deep_page(bench: Bench, timer: Timer, iterations: int) -> int:
+    """Случайная страница в глубине списка (OFFSET)"""
+    pages = max(bench.transactions // 100, 1)
+    for _ in range(iterations):
+        skip = bench.rng.randrange(pages) * 100
+        timer.measure(
+            bench.request, "GET", "/api/transactions/", params={"skip": skip, "limit": 100}
+        )
+    return 1
+
+
+@scenario("list_filtered")
+def list_filtered(bench: Bench, timer: Timer, iterations: int) -> int:
+    """Страница транзакций проекта с фильтром по типу"""
+    for _ in range(iterations):
+        timer.measure(bench.request, "GET", "/api/transactions/", params={
+            "project_id": bench.pick(bench.projects),
+            "type": "expense",
+            "limit": 100,
+        })
+    return 1
+
+
+@scenario("list_large_page")
+def list_large_page(bench: Bench, timer: Timer, iterations: int) -> int:
+    """Пропускная способность списка транзакций: строк в секунду по HTTP"""
+    pages = max(bench.transactions // LIST_PAGE_SIZE, 1)
+    for _ in range(iterations):
+        skip = bench.rng.randrange(pages) * LIST_PAGE_SIZE
+        timer.measure(bench.request, "GET", "/api/transactions/", params={
+            "skip": skip, "limit": LIST_PAGE_SIZE,
+        })
+    return LIST_PAGE_SIZE
+
+
+@scenario("list_accounts")
+def list_accounts(bench: Bench, timer: Timer, iterations: int) -> int:
+    """Список счетов с балансами"""
+    for _ in range(iterations):
+        timer.measure(bench.request, "GET", "/api/accounts/", params={"limit": 1000})
+    return 1
+
+
+def _page_statement(skip: int):
+    return select(Transaction).order_by(Transaction.date.desc()).offset(skip).limit(LIST_PAGE_SIZE)
+
+
+@scenario("serialize_orm_page")
+def serialize_orm_page(bench: Bench, timer: Timer, iterations: int) -> int:
+    """Страница списка через ORM-объекты, схему ответа и стандартный JSON"""
+    def render(skip: int) -> bytes:
+        with Session(engine) as db:
+            transactions = db.exec(_page_statement(skip)).scalars().all()
+            content = jsonable_encoder([
+                TransactionRead.model_validate(transaction) for transaction in transactions
+            ])
+        return JSONResponse(content).body
+
+    pages = max(bench.transactions // LIST_PAGE_SIZE, 1)
+    for _ in range(iterations):
+        timer.measure(render, bench.rng.randrange(pages) * LIST_PAGE_SIZE)
+    return LIST_PAGE_SIZE
+
+
+@scenario("serialize_rows_page")
+def serialize_rows_page(bench: Bench, timer: Timer, iterations: int) -> int:
+    """Та же страница строками запроса через orjson (путь списков API)"""
+    columns = schema_columns(Transaction, TransactionRead)
+
+    def render(skip: int) -> bytes:
+        statement = select(*columns).order_by(Transaction.date.desc()).offset(skip).limit(LIST_PAGE_SIZE)
+        with Session(engine) as db:
+            return rows_response(db.execute(statement).mappings()).body
+
+    pages = max(bench.transactions // LIST_PAGE_SIZE, 1)
+    for _ in range(iterations):
+        timer.measure(render, bench.rng.randrange(pages) * LIST_PAGE_SIZE)
+    return LIST_PAGE_SIZE
+
+
+@scenario("account_balance")
+def account_balance(bench: Bench, timer: Timer, iterations: int) -> int:
+    """Текущий баланс счета"""
+    for _ in range(iterations):
+        account_id = bench.pick(bench.accounts)
+        timer.measure(bench.request, "GET", f"/api/transactions/accounts/{account_id}/balance")
+    return 1
+
+
+@scenario("account_balance_from_entries")
+def account_balance_from_entries(bench: Bench, timer: Timer, iterations: int) -> int:
+    """Баланс счета, посчитанный по проводкам (полная история счета)"""
+    signed = case(
+        (TransactionEntry.direction == "DEBIT", TransactionEntry.amount),
+        else_=-TransactionEntry.amount,
+    )
+
+    def ledger_balance(account_id: int):
+        with Session(engine) as db:
+            return db.exec(
+                select(func.sum(signed)).where(TransactionEntry.account_id == account_id)
+            ).scalar_one()
+
+    for _ in range(iterations):
+        timer.measure(ledger_balance, bench.pick(bench.accounts))
+    return 1
+
+
+@scenario("report_category_rollup")
+def report_category_rollup(bench: Bench, timer: Timer, iterations: int) -> int:
+    """Отчет по поддеревьям категорий за весь период книги"""
+    start, end = bench.period
+    for _ in range(iterations):
+        timer.measure(bench.request, "GET", "/api/reports/categories/rollup", params={
+            "start": start.date().isoformat(), "end": end.date().isoformat(),
+        })
+    return 1
+
+
+@scenario("report_project_roi")
+def report_project_roi(bench: Bench, timer: Timer, iterations: int) -> int:
+    """ROI всех проектов без кэша (версия книги сбрасывается перед замером)"""
+    start, end = bench.period
+    for _ in range(iterations):
+        bump_data_version(LEDGER_DATASET)
+        timer.measure(bench.request, "GET", "/api/reports/projects/roi", params={
+            "start": start.date().isoformat(), "end": end.date().isoformat(),
+        })
+    return 1
+
+
+@scenario("crypto_income")
+def crypto_income(bench: Bench, timer: Timer, iterations: int) -> int:
+    """Проведение крипто-дохода с проверкой хеша (провайдеры — заглушки)"""
+    for _ in range(iterations):
+        crypto_account = bench.pick(bench.crypto_accounts or bench.accounts)
+        usd_account = bench.pick([account for account in bench.accounts if account != crypto_account])
+        timer.measure(bench.request, "POST", "/api/crypto/income", json={
+            "amount_crypto": bench.amount(),
+            "currency": bench.rng.choice(["TRX", "USDT"]),
+            "description": "Benchmark crypto income",
+            "crypto_account_id": crypto_account,
+            "usd_account_id": usd_account,
+            "tx_hash": "%064x" % bench.rng.getrandbits(256),
+            "project_id": bench.pick(bench.projects),
+        })
+    return 1
+
+
+def install_stubs() -> None:
+    """Заглушки внешних провайдеров"""
+
+    async def trx_rate(self) -> Decimal:
+        return Decimal("0.10")
+
+    async def usdt_rate(self) -> Decimal:
+        return Decimal("1.00")
+
+    async def tron_transaction(self, tx_hash: str) -> dict:
+        return {
+            "hash": tx_hash,
+            "success": True,
+            "block_number": 60_000_000,
+            "timestamp": int(time.time() * 1000),
+            "confirmations": True,
+        }
+
+    with Session(engine) as db:
+        campaigns = db.exec(select(ProjectCampaign.campaign)).scalars().all()
+
+    async def traffic_breakdown(self, endpoint: str, params: dict) -> dict:
+        rng = random.Random(0)
+        rows = []
+        for campaign in campaigns:
+            clicks = rng.randint(10_000, 1_000_000)
+            conversions = clicks // rng.randint(20, 200)
+            rows.append({
+                "campaign": campaign,
+                "clicks": clicks,
+                "conversions": conversions,
+                "payout": round(conversions * rng.uniform(1, 20), 2),
+                "spend": round(clicks * rng.uniform(0.01, 0.3), 2),
+            })
+        return {"rows": rows}
+
+    CryptoService.get_trx_to_usd_rate = trx_rate
+    CryptoService.get_usdt_to_usd_rate = usdt_rate
+    CryptoService.validate_tron_transaction = tron_transaction
+    TrafficAnalyticsClient._get = traffic_breakdown
+
+
+def create_client() -> TestClient:
+    """Клиент API с пользователем бенчмарка вместо аутентификации"""
+    from app.core.auth import current_active_user
+    from app.main import app
+
+    bench_user = User(id=0, email="bench@example.com", hashed_password="", is_active=True)
+    app.dependency_overrides[current_active_user] = lambda: bench_user
+    return TestClient(app)
+
+
+def summarize(name: str, samples: List[float], operations: int) -> dict:
+    """Статистика замеров в миллисекундах"""
+    ordered = sorted(samples)
+
+    def percentile(share: float) -> float:
+        return ordered[min(int(round(share * (len(ordered) - 1))), len(ordered) - 1)]
+
+    total = sum(samples)
+    return {
+        "scenario": name,
+        "samples": len(samples),
+        "operations_per_sample": operations,
+        "mean_ms": round(statistics.fmean(samples) * 1000, 3),
+        "p50_ms": round(percentile(0.50) * 1000, 3),
+        "p95_ms": round(percentile(0.95) * 1000, 3),
+        "p99_ms": round(percentile(0.99) * 1000, 3),
+        "min_ms": round(ordered[0] * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+        "ops_per_sec": round(len(samples) * operations / total, 1) if total else None,
+    }
+
+
+def run_scenarios(names: List[str], iterations: int, warmup: int, seed: int) -> dict:
+    """Выполнение сценариев, результат в формате JSON"""
+    install_stubs()
+    client = create_client()
+    bench = Bench(client, seed)
+
+    results = []
+    for name in names:
+        if warmup:
+            SCENARIOS[name](bench, Timer(), warmup)
+        timer = Timer()
+        operations = SCENARIOS[name](bench, timer, iterations)
+        results.append(summarize(name, timer.samples, operations))
+
+    with Session(engine) as db:
+        counts = {
+            "transactions": db.exec(select(func.count(Transaction.id))).scalar_one(),
+            "entries": db.exec(select(func.count(TransactionEntry.id))).scalar_one(),
+            "crypto_details": db.exec(select(func.count(CryptoTransactionDetail.id))).scalar_one(),
+        }
+
+    return {
+        "meta": {
+            "started_at": datetime.utcnow().isoformat(),
+            "database": engine.dialect.name,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "git_commit": git_commit(),
+            "iterations": iterations,
+            "seed": seed,
+            "ledger": counts,
+        },
+        "results": results,
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report: dict, baseline: dict, threshold: float) -> List[dict]:
+    """Сценарии, у которых p50 вырос больше чем на threshold (доля)"""
+    previous = {result["scenario"]: result for result in baseline["results"]}
+    regressions = []
+    for result in report["results"]:
+        before = previous.get(result["scenario"])
+        if not before or not before["p50_ms"]:
+            continue
+        change = result["p50_ms"] / before["p50_ms"] - 1
+        if change > threshold:
+            regressions.append({
+                "scenario": result["scenario"],
+                "baseline_p50_ms": before["p50_ms"],
+                "p50_ms": result["p50_ms"],
+                "change": round(change, 3),
+            })
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ledger benchmark")
+    parser.add_argument("--scenarios", default=None, help="Список сценариев через запятую")
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None, help="Файл для результатов JSON")
+    parser.add_argument("--baseline", default=None, help="Результаты предыдущего запуска")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Допустимый рост p50 (доля)")
+    parser.add_argument("--list", action="store_true", help="Показать сценарии")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, func in SCENARIOS.items():
+            print(f"{name:32} {func.__doc__}")
+        return
+
+    names = args.scenarios.split(",") if args.scenarios else list(SCENARIOS)
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+
+    report = run_scenarios(names, args.iterations, args.warmup, args.seed)
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            report["regressions"] = compare(report, json.load(handle), args.threshold)
+        exit_code = 1 if report["regressions"] else 0
+
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(payload)
+    print(payload)
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+"""
+Генератор синтетической книги для бенчмарков
+
+Справочники создаются через ORM, транзакции, проводки и детали
+криптоопераций — пакетными INSERT по chunk строк. Балансы счетов
+пересчитываются из проводок одним UPDATE. Данные детерминированы
+значением seed.
+
+Запуск из каталога сервиса (база берется из DATABASE_URL):
+    DATABASE_URL=sqlite:///ledger_bench.db python -m benchmarks.ledger_data --transactions 1000000
+"""
+
+import argparse
+import json
+import random
+import string
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Dict, List
+
+from sqlalchemy import case, func, insert, select, text, update
+from sqlmodel import Session, SQLModel
+
+from app.models import (
+    Account, AccountType, Category, CategoryType, Counterparty, CounterpartyType,
+    CryptoTransactionDetail, Project, ProjectCampaign, Transaction, TransactionEntry,
+    TransactionStatus, TransactionType,
+)
+from app.services.categories import CategoryTreeService
+from app.services.partitions import PartitionManager
+
+BASE58 = "".join(
+    char for char in string.ascii_letters + string.digits if char not in "0OIl"
+)
+CRYPTO_CURRENCIES = {"TRX": Decimal("0.10"), "USDT": Decimal("1.00")}
+CAMPAIGNS_PER_PROJECT = 5
+
+# Доли типов транзакций; составные — расход, разнесенный на несколько счетов
+TYPE_WEIGHTS = [
+    (TransactionType.EXPENSE, 0.55),
+    (TransactionType.INCOME, 0.30),
+    (TransactionType.TRANSFER, 0.10),
+    ("complex", 0.05),
+]
+
+
+def wallet_address(rng: random.Random) -> str:
+    """Адрес в формате TRON (T + 33 символа base58)"""
+    return "T" + "".join(rng.choice(BASE58) for _ in range(33))
+
+
+def campaign_name(project_id: int, index: int) -> str:
+    return f"bench_{project_id:04d}_{index:02d}"
+
+
+def _reference_data(db: Session, rng: random.Random, options: dict) -> Dict[str, List[int]]:
+    """Счета, проекты с кампаниями, дерево категорий и контрагенты"""
+    accounts = []
+    for index in range(options["accounts"]):
+        if index % 5 == 0:
+            currency = "TRX" if index % 10 == 0 else "USDT"
+            account = Account(name=f"Crypto {currency} {index}", type=AccountType.CRYPTO, currency=currency)
+        else:
+            account_type = rng.choice([AccountType.BANK, AccountType.CASH, AccountType.INVESTMENT])
+            account = Account(name=f"{account_type.value.title()} {index}", type=account_type)
+        accounts.append(account)
+    db.add_all(accounts)
+
+    projects = [
+        Project(name=f"Bench project {index}", budget=float(rng.randint(10, 500) * 1000))
+        for index in range(options["projects"])
+    ]
+    db.add_all(projects)
+
+    counterparties = [
+        Counterparty(
+            name=f"Counterparty {index:05d}",
+            type=rng.choice(list(CounterpartyType)),
+            email=f"partner{index}@example.com",
+        )
+        for index in range(options["counterparties"])
+    ]
+    db.add_all(counterparties)
+    db.flush()
+
+    db.add_all(
+        ProjectCampaign(project_id=project.id, campaign=campaign_name(project.id, index))
+        for project in projects
+        for index in range(CAMPAIGNS_PER_PROJECT)
+    )
+
+    # Дерево категорий: каждая четвертая — корневая
+    categories: List[Category] = []
+    for index in range(options["categories"]):
+        parent = rng.choice(categories) if categories and index % 4 else None
+        category = Category(
+            name=f"Category {index}",
+            type=parent.type if parent else rng.choice([CategoryType.INCOME, CategoryType.EXPENSE]),
+            parent_id=parent.id if parent else None,
+        )
+        db.add(category)
+        db.flush()
+        categories.append(category)
+    db.commit()
+
+    CategoryTreeService(db).rebuild()
+
+    return {
+        "accounts": [account.id for account in accounts],
+        "crypto_accounts": [account.id for account in accounts if account.type == AccountType.CRYPTO],
+        "projects": [project.id for project in projects],
+        "categories": [category.id for category in categories],
+        "counterparties": [counterparty.id for counterparty in counterparties],
+    }
+
+
+def _next_id(db: Session, model) -> int:
+    return (db.exec(select(func.max(model.id))).one()[0] or 0) + 1
+
+
+def _money(rng: random.Random) -> Decimal:
+    """Сумма с логнормальным распределением (много мелких, мало крупных)"""
+    return Decimal(str(round(min(rng.lognormvariate(4.0, 1.3), 250_000.0), 2))) + Decimal("0.01")
+
+
+def _chunk_rows(
+    rng: random.Random,
+    refs: Dict[str, List[int]],
+    position: int,
+    count: int,
+    ids: Dict[str, int],
+    options: dict,
+) -> tuple:
+    """Строки транзакций, проводок и деталей криптоопераций для одного пакета"""
+    start, span = options["start"], options["days"] * 86400
+    total = options["transactions"]
+    kinds = [kind for kind, _ in TYPE_WEIGHTS]
+    weights = [weight for _, weight in TYPE_WEIGHTS]
+
+    transactions, entries, details = [], [], []
+    for offset in range(count):
+        transaction_id = ids["transactions"]
+        ids["transactions"] += 1
+        # Даты растут вместе с ID, как при обычной работе
+        moment = start + timedelta(
+            seconds=((position + offset) / total) * span + rng.uniform(-3600, 3600)
+        )
+        kind = rng.choices(kinds, weights)[0]
+        amount = _money(rng)
+        is_crypto = rng.random() < options["crypto_share"]
+        money_account = rng.choice(refs["crypto_accounts" if is_crypto else "accounts"])
+        other_account = rng.choice([account for account in refs["accounts"] if account != money_account])
+
+        if kind == TransactionType.INCOME:
+            legs = [(money_account, amount, "DEBIT"), (other_account, amount, "CREDIT")]
+        elif kind == TransactionType.TRANSFER:
+            legs = [(other_account, amount, "DEBIT"), (money_account, amount, "CREDIT")]
+        elif kind == TransactionType.EXPENSE:
+            legs = [(other_account, amount, "DEBIT"), (money_account, amount, "CREDIT")]
+        else:
+            part = (amount / 3).quantize(Decimal("0.01"))
+            third = rng.choice([account for account in refs["accounts"] if account != money_account])
+            legs = [
+                (other_account, amount - part, "DEBIT"),
+                (third, part, "DEBIT"),
+                (money_account, amount, "CREDIT"),
+            ]
+            kind = TransactionType.EXPENSE
+
+        description = f"{kind.value.title()} #{transaction_id}"
+        is_transfer = kind == TransactionType.TRANSFER
+        transactions.append({
+            "id": transaction_id,
+            "description": description,
+            "type": kind,
+            "status": TransactionStatus.COMPLETED,
+            "amount": amount,
+            "date": moment,
+            "project_id": None if is_transfer else rng.choice(refs["projects"]),
+            "category_id": None if is_transfer else rng.choice(refs["categories"]),
+            "counterparty_id": None if is_transfer else rng.choice(refs["counterparties"]),
+            "created_at": moment,
+        })
+        for account_id, leg_amount, direction in legs:
+            entries.append({
+                "id": ids["entries"],
+                "transaction_id": transaction_id,
+                "account_id": account_id,
+                "amount": leg_amount,
+                "direction": direction,
+                "description": f"{direction} - {description}",
+                "transaction_date": moment,
+                "created_at": moment,
+            })
+            ids["entries"] += 1
+
+        if is_crypto:
+            currency = rng.choice(list(CRYPTO_CURRENCIES))
+            rate = CRYPTO_CURRENCIES[currency]
+            details.append({
+                "id": ids["details"],
+                "transaction_id": transaction_id,
+                "currency": currency,
+                "amount_crypto": (amount / rate).quantize(Decimal("0.000001")),
+                "rate_to_usd": rate,
+                "tx_hash": "%064x" % rng.getrandbits(256),
+                "network": "TRON",
+                "wallet_from": wallet_address(rng),
+                "wallet_to": wallet_address(rng),
+                "confirmation_count": 1,
+                "created_at": moment,
+            })
+            ids["details"] += 1
+
+    return transactions, entries, details
+
+
+def recalculate_balances(db: Session) -> None:
+    """Балансы счетов из проводок одним UPDATE"""
+    signed = case(
+        (TransactionEntry.direction == "DEBIT", TransactionEntry.amount),
+        else_=-TransactionEntry.amount,
+    )
+    balance = (
+        select(func.coalesce(func.sum(signed), 0))
+        .where(TransactionEntry.account_id == Account.id)
+        .scalar_subquery()
+    )
+    db.execute(update(Account).values(balance=balance))
+    db.commit()
+
+
+def _sync_sequences(db: Session) -> None:
+    """Последовательности PostgreSQL после вставки с явными ID"""
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    for table in ("transactions", "transaction_entries", "crypto_transaction_details"):
+        db.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+            f"COALESCE((SELECT max(id) FROM {table}), 1))"
+        ))
+    db.commit()
+
+
+def generate_ledger(
+    engine,
+    transactions: int,
+    seed: int = 42,
+    accounts: int = 40,
+    projects: int = 25,
+    categories: int = 60,
+    counterparties: int = 2000,
+    crypto_share: float = 0.1,
+    days: int = 365,
+    chunk: int = 20_000,
+    start: datetime = datetime(2024, 1, 1),
+) -> dict:
+    """
+    Заполнение базы синтетической книгой
+
+    Returns:
+        Сводка: число созданных строк и время генерации
+    """
+    started = time.perf_counter()
+    rng = random.Random(seed)
+    options = {
+        "accounts": accounts,
+        "projects": projects,
+        "categories": categories,
+        "counterparties": counterparties,
+        "transactions": transactions,
+        "crypto_share": crypto_share,
+        "days": days,
+        "start": start,
+    }
+    SQLModel.metadata.create_all(engine)
+
+    counts = {"transactions": 0, "entries": 0, "crypto_details": 0}
+    with Session(engine) as db:
+        # Месячные секции на весь период (если книга секционирована)
+        PartitionManager(db).ensure_partitions(since=start)
+        refs = _reference_data(db, rng, options)
+        ids = {
+            "transactions": _next_id(db, Transaction),
+            "entries": _next_id(db, TransactionEntry),
+            "details": _next_id(db, CryptoTransactionDetail),
+        }
+
+        for first in range(0, transactions, chunk):
+            rows = _chunk_rows(rng, refs, first, min(chunk, transactions - first), ids, options)
+            for model, batch, key in zip(
+                (Transaction, TransactionEntry, CryptoTransactionDetail),
+                rows,
+                ("transactions", "entries", "crypto_details"),
+            ):
+                if batch:
+                    db.execute(insert(model.__table__), batch)
+                    counts[key] += len(batch)
+            db.commit()
+
+        recalculate_balances(db)
+        _sync_sequences(db)
+
+    counts.update({
+        "accounts": accounts,
+        "projects": projects,
+        "categories": categories,
+        "counterparties": counterparties,
+        "seed": seed,
+        "seconds": round(time.perf_counter() - started, 2),
+    })
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic ledger generator")
+    parser.add_argument("--transactions", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--accounts", type=int, default=40)
+    parser.add_argument("--projects", type=int, default=25)
+    parser.add_argument("--categories", type=int, default=60)
+    parser.add_argument("--counterparties", type=int, default=2000)
+    parser.add_argument("--crypto-share", type=float, default=0.1, help="Доля криптоопераций")
+    parser.add_argument("--days", type=int, default=365, help="Период книги в днях")
+    parser.add_argument("--chunk", type=int, default=20_000, help="Транзакций в пакете INSERT")
+    args = parser.parse_args()
+
+    from app.core.database import engine
+
+    summary = generate_ledger(
+        engine,
+        transactions=args.transactions,
+        seed=args.seed,
+        accounts=args.accounts,
+        projects=args.projects,
+        categories=args.categories,
+        counterparties=args.counterparties,
+        crypto_share=args.crypto_share,
+        days=args.days,
+        chunk=args.chunk,
+    )
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Обслуживание месячных секций книги
+
+    python manage_partitions.py list
+    python manage_partitions.py ensure [--months-ahead 3] [--since 2024-01]
+    python manage_partitions.py detach 2023-01
+    python manage_partitions.py attach 2023-01
+    python manage_partitions.py archive --before 2024-01
+"""
+
+import argparse
+from datetime import datetime
+
+from fastapi import HTTPException
+from sqlmodel import Session
+
+from app.core.database import engine
+from app.services.partitions import PartitionManager
+
+
+def parse_month(value: str):
+    """Месяц из строки YYYY-MM"""
+    return datetime.strptime(value, "%Y-%m").date()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ledger partition maintenance")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="Подключенные секции")
+    ensure = commands.add_parser("ensure", help="Создание недостающих секций")
+    ensure.add_argument("--months-ahead", type=int, default=None)
+    ensure.add_argument("--since", type=parse_month, default=None, help="Первый месяц YYYY-MM")
+    for name, help_text in (("detach", "Отключение секций месяца"), ("attach", "Подключение секций месяца")):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("month", type=parse_month, help="Месяц YYYY-MM")
+    archive = commands.add_parser("archive", help="Перенос старых секций в схему archive")
+    archive.add_argument("--before", type=parse_month, required=True, help="Первый неархивируемый месяц YYYY-MM")
+    args = parser.parse_args()
+
+    with Session(engine) as db:
+        manager = PartitionManager(db)
+        try:
+            if args.command == "list":
+                for partition in manager.list_partitions():
+                    month = partition.month.strftime("%Y-%m") if partition.month else "default"
+                    print(f"{partition.table:24} {month:8} {partition.name:40} ~{partition.estimated_rows} rows")
+                return
+            if args.command == "ensure":
+                names = manager.ensure_partitions(args.months_ahead, args.since)
+            elif args.command == "detach":
+                names = manager.detach(args.month)
+            elif args.command == "attach":
+                names = manager.attach(args.month)
+            else:
+                names = manager.archive(args.before)
+        except HTTPException as e:
+            parser.exit(1, f"{e.detail}\n")
+
+    print("\n".join(names) if names else "Nothing to do")
+
+
+if __name__ == "__main__":
+    main()
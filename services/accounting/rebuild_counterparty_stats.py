@@ -0,0 +1,27 @@
+"""
+Пересчет оборотов контрагентов по всем проведенным транзакциям
+
+    python rebuild_counterparty_stats.py
+
+Нужен после загрузки данных в обход TransactionService или при
+расхождении counterparty_stats с книгой; проведения во время
+пересчета ждут его окончания.
+"""
+
+import time
+
+from sqlmodel import Session
+
+from app.core.database import engine
+from app.services.counterparty_stats import CounterpartyStatsService
+
+
+def main():
+    started = time.perf_counter()
+    with Session(engine) as db:
+        count = CounterpartyStatsService(db).rebuild()
+    print(f"Rebuilt stats for {count} counterparties in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
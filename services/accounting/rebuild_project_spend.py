@@ -0,0 +1,27 @@
+"""
+Пересчет расходов проектов по всем проведенным транзакциям
+
+    python rebuild_project_spend.py
+
+Нужен после загрузки данных в обход TransactionService или при
+расхождении project_spend с книгой; проведения во время пересчета
+ждут его окончания. События порогов при пересчете не создаются.
+"""
+
+import time
+
+from sqlmodel import Session
+
+from app.core.database import engine
+from app.services.budgets import ProjectBudgetService
+
+
+def main():
+    started = time.perf_counter()
+    with Session(engine) as db:
+        count = ProjectBudgetService(db).rebuild()
+    print(f"Rebuilt spend for {count} projects in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""
+Проведение наступивших повторяющихся транзакций
+
+    python run_recurring.py
+
+Для запуска внешним cron при RECURRING_SCHEDULER_ENABLED=false;
+повторный запуск ничего не проводит дважды.
+"""
+
+from sqlmodel import Session
+
+from app.core.database import engine
+from app.services.recurring import RecurringService
+
+
+def main():
+    with Session(engine) as db:
+        result = RecurringService(db).run()
+    if result["busy"]:
+        print("Another run is in progress")
+    else:
+        print(
+            f"{result['templates']} templates: {result['posted']} occurrences posted, "
+            f"{result['skipped']} already posted"
+        )
+
+
+if __name__ == "__main__":
+    main()
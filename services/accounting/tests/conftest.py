@@ -0,0 +1,9 @@
+"""
+Общие настройки тестов: локальные SQLite вместо PostgreSQL
+"""
+
+import os
+
+# До импорта app: настройки читаются при импорте модулей
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("REDIS_URL", "redis://127.0.0.1:1")
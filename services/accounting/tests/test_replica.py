@@ -0,0 +1,174 @@
+"""
+Маршрутизация чтения между основной БД и репликой
+
+Две локальные базы SQLite: в каждой таблица origin с именем базы,
+поэтому ответ маршрута показывает, откуда шло чтение.
+"""
+
+import time
+
+import pytest
+import redis
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlmodel import Session, create_engine
+
+from app.core import database, replica
+from app.core.config import settings
+
+TOKEN = {"Authorization": "Bearer client-a"}
+OTHER_TOKEN = {"Authorization": "Bearer client-b"}
+
+
+class MemoryRedis:
+    """Минимальный Redis в памяти: set с ex и exists"""
+
+    def __init__(self):
+        self.values = {}
+
+    def set(self, key, value, ex=None):
+        self.values[key] = (value, time.monotonic() + ex if ex else None)
+
+    def exists(self, key):
+        value = self.values.get(key)
+        return int(value is not None and (value[1] is None or value[1] > time.monotonic()))
+
+
+class DownRedis:
+    def set(self, *args, **kwargs):
+        raise redis.ConnectionError("down")
+
+    def exists(self, *args):
+        raise redis.ConnectionError("down")
+
+
+def _database(path, name):
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE origin (name TEXT)"))
+        connection.execute(text("INSERT INTO origin VALUES (:name)"), {"name": name})
+    return engine
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = MemoryRedis()
+    monkeypatch.setattr(replica, "get_redis", lambda: store)
+    return store
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch, store):
+    monkeypatch.setattr(database, "engine", _database(tmp_path / "primary.db", "primary"))
+    monkeypatch.setattr(database, "replica_engine", _database(tmp_path / "replica.db", "replica"))
+    monkeypatch.setattr(settings, "REPLICA_LAG_CHECK_INTERVAL", 0.0)
+    monkeypatch.setattr(settings, "REPLICA_MAX_LAG_SECONDS", 5.0)
+    monkeypatch.setattr(settings, "REPLICA_STICKY_SECONDS", 15)
+    monkeypatch.setattr(replica, "_local_writes", {})
+    monkeypatch.setattr(replica, "_lag", None)
+    monkeypatch.setattr(replica, "_lag_checked_at", 0.0)
+
+    app = FastAPI()
+    app.middleware("http")(database.track_writes)
+
+    @app.get("/origin")
+    def read_origin(db: Session = Depends(database.get_read_session)):
+        return {
+            "name": db.exec(text("SELECT name FROM origin")).scalar_one(),
+            "replica": bool(db.info.get("replica")),
+        }
+
+    @app.post("/write")
+    def write(db: Session = Depends(database.get_session)):
+        return {"ok": True}
+
+    @app.post("/fail")
+    def fail():
+        raise HTTPException(status_code=400, detail="Rejected")
+
+    return TestClient(app)
+
+
+def origin(client, headers=TOKEN):
+    response = client.get("/origin", headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_reads_go_to_replica(client):
+    assert origin(client) == {"name": "replica", "replica": True}
+
+
+def test_reads_use_primary_without_replica(client, monkeypatch):
+    monkeypatch.setattr(database, "replica_engine", None)
+    assert origin(client) == {"name": "primary", "replica": False}
+
+
+def test_client_sticks_to_primary_after_write(client, store):
+    assert client.post("/write", headers=TOKEN).status_code == 200
+    assert len(store.values) == 1
+
+    assert origin(client)["name"] == "primary"
+    # Привязка касается только писавшего клиента
+    assert origin(client, OTHER_TOKEN)["name"] == "replica"
+
+
+def test_stickiness_is_shared_through_redis(client):
+    client.post("/write", headers=TOKEN)
+    # Другой процесс сервиса: отметки в памяти нет, есть в Redis
+    replica._local_writes.clear()
+    assert origin(client)["name"] == "primary"
+
+
+def test_stickiness_expires(client, monkeypatch):
+    monkeypatch.setattr(settings, "REPLICA_STICKY_SECONDS", 1)
+    client.post("/write", headers=TOKEN)
+    assert origin(client)["name"] == "primary"
+
+    time.sleep(1.1)
+    assert origin(client)["name"] == "replica"
+
+
+def test_reads_and_failed_writes_do_not_stick(client, store):
+    origin(client)
+    assert client.post("/fail", headers=TOKEN).status_code == 400
+    assert not store.values
+    assert not replica._local_writes
+    assert origin(client)["name"] == "replica"
+
+
+def test_lagging_replica_falls_back_to_primary(client, monkeypatch):
+    monkeypatch.setattr(replica, "LOCAL_LAG_SQL", "SELECT 30")
+    assert origin(client) == {"name": "primary", "replica": False}
+
+    monkeypatch.setattr(replica, "LOCAL_LAG_SQL", "SELECT 2")
+    assert origin(client)["name"] == "replica"
+
+
+def test_unavailable_replica_falls_back_to_primary(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        database, "replica_engine", create_engine(f"sqlite:///{tmp_path}/missing/replica.db")
+    )
+    assert origin(client) == {"name": "primary", "replica": False}
+
+
+def test_lag_is_checked_once_per_interval(client, monkeypatch):
+    monkeypatch.setattr(settings, "REPLICA_LAG_CHECK_INTERVAL", 60.0)
+    assert origin(client)["name"] == "replica"
+
+    # Отставание выросло, но до следующей проверки используется прошлое значение
+    monkeypatch.setattr(replica, "LOCAL_LAG_SQL", "SELECT 30")
+    assert origin(client)["name"] == "replica"
+
+    monkeypatch.setattr(replica, "_lag_checked_at", 0.0)
+    assert origin(client)["name"] == "primary"
+
+
+def test_redis_down_reads_from_primary(client, monkeypatch):
+    monkeypatch.setattr(replica, "get_redis", lambda: DownRedis())
+    # Без Redis записи других процессов не видны: чтение с основной БД
+    assert origin(client)["name"] == "primary"
+    # Запись без Redis все равно отмечается в памяти процесса
+    assert client.post("/write", headers=TOKEN).status_code == 200
+    assert replica._local_writes
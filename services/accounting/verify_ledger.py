@@ -0,0 +1,53 @@
+"""
+Проверка целостности книги
+
+    python verify_ledger.py [--repair] [--workers 8]
+
+Сверяет балансы счетов с суммой проводок и двойную запись в каждой
+транзакции; с --repair исправляет расхождения балансов. Код выхода
+1 — найдены нарушения (после --repair — только в транзакциях).
+"""
+
+import argparse
+
+from sqlmodel import Session
+
+from app.core.database import engine
+from app.services.integrity import LedgerIntegrityService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ledger integrity verification")
+    parser.add_argument("--repair", action="store_true", help="Исправить расхождения балансов")
+    parser.add_argument("--workers", type=int, default=None, help="Параллельных диапазонов")
+    args = parser.parse_args()
+
+    with Session(engine) as db:
+        report = LedgerIntegrityService(db).verify(repair=args.repair, workers=args.workers)
+
+    print(
+        f"Checked {report.transactions_checked} transactions, {report.entries_checked} entries, "
+        f"{report.accounts_checked} accounts in {report.chunks} chunks, {report.duration_seconds:.2f}s"
+    )
+    for drift in report.drift:
+        action = "repaired" if drift.repaired else "drift"
+        print(
+            f"account {drift.account_id} ({drift.name}): stored {drift.stored}, "
+            f"entries {drift.computed}, difference {drift.difference} [{action}]"
+        )
+    for issue in report.issues:
+        print(
+            f"transaction {issue.transaction_id}: {issue.kind.value} "
+            f"(amount {issue.amount}, debit {issue.debit}, credit {issue.credit})"
+        )
+    if report.issues_truncated:
+        print("Issue list truncated")
+
+    failed = report.issues or any(not drift.repaired for drift in report.drift)
+    if failed:
+        parser.exit(1)
+    print("OK" if report.ok else "Balances repaired")
+
+
+if __name__ == "__main__":
+    main()
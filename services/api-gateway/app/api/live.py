@@ -0,0 +1,76 @@
+"""
+Живые обновления для frontend (Server-Sent Events)
+"""
+
+import asyncio
+import json
+
+import httpx
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+
+from app.core.broadcast import RESYNC, Broadcaster
+from app.core.config import settings
+
+router = APIRouter()
+
+# Канал изменений балансов, публикуемых Accounting Service
+BALANCES_CHANNEL = "live:balances"
+balances = Broadcaster(BALANCES_CHANNEL)
+
+
+async def _authorize(token: str) -> None:
+    """Проверка токена в Accounting Service (EventSource не передает заголовки)"""
+    try:
+        async with httpx.AsyncClient(timeout=settings.SERVICE_TIMEOUT) as client:
+            response = await client.get(
+                f"{settings.ACCOUNTING_SERVICE_URL}/api/auth/me",
+                headers={"Authorization": f"Bearer {token}"},
+            )
+    except httpx.RequestError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Accounting service unavailable: {str(e)}"
+        )
+    if response.status_code != 200:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token"
+        )
+
+
+async def _events(request: Request):
+    # ready: клиент перечитывает данные, пропущенные до подключения
+    yield "retry: 3000\n\nevent: ready\ndata: {}\n\n"
+    async with balances.subscribe() as queue:
+        while not await request.is_disconnected():
+            try:
+                message = await asyncio.wait_for(
+                    queue.get(), timeout=settings.LIVE_HEARTBEAT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                # Комментарий SSE не дает прокси закрыть простаивающее соединение
+                yield ": keepalive\n\n"
+                continue
+
+            if message == RESYNC:
+                yield f"event: resync\ndata: {json.dumps({})}\n\n"
+            else:
+                yield f"event: balances\ndata: {message}\n\n"
+
+
+@router.get("/balances")
+async def stream_balances(request: Request, token: str = Query(...)):
+    """
+    Поток изменений балансов счетов и новых транзакций
+
+    События: balances — проведенная транзакция и новые балансы ее
+    счетов; ready и resync — клиенту нужно перечитать счета и
+    транзакции (подключение или пропуск сообщений).
+    """
+    await _authorize(token)
+    return StreamingResponse(
+        _events(request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,75 @@
+"""
+Рассылка сообщений Redis pub/sub подключенным клиентам
+"""
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional, Set
+
+import redis
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Сообщение клиентам: часть обновлений могла быть пропущена,
+# данные нужно перечитать
+RESYNC = "__resync__"
+
+
+class Broadcaster:
+    """
+    Одна подписка на канал Redis на процесс и очереди клиентов
+
+    Сервисы публикуют изменения в Redis, каждый процесс шлюза
+    подписан на канал один раз и раскладывает сообщения по очередям
+    своих подключений. Медленный клиент с переполненной очередью
+    получает RESYNC вместо накопления сообщений.
+    """
+
+    def __init__(self, channel: str):
+        self.channel = channel
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    @asynccontextmanager
+    async def subscribe(self) -> AsyncIterator[asyncio.Queue]:
+        """Очередь сообщений канала на время подключения клиента"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._listen())
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=settings.LIVE_QUEUE_SIZE)
+        self._subscribers.add(queue)
+        try:
+            yield queue
+        finally:
+            self._subscribers.discard(queue)
+
+    async def _listen(self) -> None:
+        while True:
+            client = aioredis.from_url(settings.REDIS_URL)
+            pubsub = client.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self._fan_out(message["data"].decode())
+            except (redis.RedisError, OSError) as e:
+                logger.warning(f"Subscription to {self.channel} lost: {e}")
+                # Сообщения за время переподключения потеряны
+                self._fan_out(RESYNC)
+                await asyncio.sleep(settings.LIVE_RECONNECT_SECONDS)
+            finally:
+                await pubsub.close()
+                await client.close()
+
+    def _fan_out(self, data: str) -> None:
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(data)
+            except asyncio.QueueFull:
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESYNC)
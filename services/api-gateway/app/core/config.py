@@ -25,6 +25,11 @@ class Settings(BaseSettings):
     REDIS_URL: str = "redis://localhost:6379"
     CACHE_TTL: int = 300  # 5 минут
     
+    # Живые обновления (SSE)
+    LIVE_HEARTBEAT_SECONDS: int = 15
+    LIVE_QUEUE_SIZE: int = 100  # Сообщений в очереди клиента до RESYNC
+    LIVE_RECONNECT_SECONDS: float = 2.0
+    
     # Timeout для запросов к сервисам
     SERVICE_TIMEOUT: int = 30
     
@@ -9,6 +9,7 @@ from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.responses import JSONResponse
 import httpx
 
+from app.api import live
 from app.core.config import settings
 
 # Создание FastAPI приложения
@@ -35,6 +36,9 @@ app.add_middleware(
     allowed_hosts=settings.ALLOWED_HOSTS
 )
 
+# Живые обновления для frontend
+app.include_router(live.router, prefix="/api/live", tags=["live"])
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():
@@ -55,7 +59,8 @@ async def root():
         "docs": "/docs",
         "services": {
             "accounting": "/api/accounting",
-            "traffic-analytics": "/api/traffic-analytics"
+            "traffic-analytics": "/api/traffic-analytics",
+            "live": "/api/live"
         }
     }
 
@@ -0,0 +1,70 @@
+"""
+API роуты для аналитических запросов по агрегатам трафика
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional
+from fastapi import APIRouter, Depends, Query
+from sqlmodel import Session
+
+from app.core.database import get_session
+from app.schemas.analytics import (
+    BreakdownResponse, Dimension, Granularity, Metric, TimeseriesResponse
+)
+from app.services.analytics import AnalyticsService
+
+router = APIRouter()
+
+
+def _filters(
+    campaign: Optional[str] = None,
+    source: Optional[str] = None,
+    sub_id: Optional[str] = None,
+    geo: Optional[str] = None,
+) -> Dict[str, str]:
+    """Фильтры по измерениям из query параметров"""
+    values = {"campaign": campaign, "source": source, "sub_id": sub_id, "geo": geo}
+    return {name: value for name, value in values.items() if value is not None}
+
+
+@router.get("/timeseries", response_model=TimeseriesResponse)
+def get_timeseries(
+    start: datetime,
+    end: datetime,
+    granularity: Optional[Granularity] = None,
+    filters: Dict[str, str] = Depends(_filters),
+    db: Session = Depends(get_session)
+):
+    """Временной ряд метрик (часовой или дневной шаг)"""
+    return AnalyticsService(db).timeseries(start, end, granularity, filters)
+
+
+@router.get("/breakdown", response_model=BreakdownResponse)
+def get_breakdown(
+    start: datetime,
+    end: datetime,
+    group_by: List[Dimension] = Query(...),
+    order_by: Optional[Metric] = None,
+    limit: Optional[int] = Query(None, ge=1, le=10000),
+    granularity: Optional[Granularity] = None,
+    filters: Dict[str, str] = Depends(_filters),
+    db: Session = Depends(get_session)
+):
+    """Разбивка метрик по одному или нескольким измерениям (с granularity — по корзинам)"""
+    return AnalyticsService(db).breakdown(
+        start, end, group_by, filters, order_by, limit, granularity
+    )
+
+
+@router.get("/top", response_model=BreakdownResponse)
+def get_top(
+    start: datetime,
+    end: datetime,
+    dimension: Dimension,
+    metric: Metric = Metric.SPEND,
+    limit: int = Query(10, ge=1, le=1000),
+    filters: Dict[str, str] = Depends(_filters),
+    db: Session = Depends(get_session)
+):
+    """Top-N значений измерения по метрике"""
+    return AnalyticsService(db).breakdown(start, end, [dimension], filters, metric, limit)
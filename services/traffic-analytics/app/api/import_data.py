@@ -0,0 +1,68 @@
+"""
+API роуты для импорта CSV файлов
+"""
+
+from typing import List
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
+from sqlmodel import Session, select
+
+from app.core.database import get_session
+from app.models.imports import ImportJob, ImportJobRead
+from app.models.jobs import JobKind
+from app.services.importer import ImportService
+from app.services.jobs import JobService
+
+router = APIRouter()
+
+
+def _job_read(job: ImportJob) -> ImportJobRead:
+    """Преобразование задачи в схему ответа"""
+    return ImportJobRead(**job.model_dump(), progress=job.progress)
+
+
+@router.post("/csv", response_model=ImportJobRead, status_code=status.HTTP_202_ACCEPTED)
+def import_csv(
+    file: UploadFile = File(...),
+    db: Session = Depends(get_session)
+):
+    """Загрузка CSV файла и постановка импорта в очередь фоновых задач"""
+    job = ImportService(db).create_job(file)
+
+    background_job = JobService(db).enqueue(
+        JobKind.IMPORT,
+        {"import_job_id": job.id},
+        units_total=job.file_size,
+        unit="bytes",
+    )
+    job.job_id = background_job.id
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return _job_read(job)
+
+
+@router.get("/jobs", response_model=List[ImportJobRead])
+def get_import_jobs(
+    skip: int = 0,
+    limit: int = 50,
+    db: Session = Depends(get_session)
+):
+    """Получение списка задач импорта"""
+    statement = select(ImportJob).order_by(ImportJob.id.desc()).offset(skip).limit(limit)
+    jobs = db.exec(statement).all()
+    return [_job_read(job) for job in jobs]
+
+
+@router.get("/jobs/{job_id}", response_model=ImportJobRead)
+def get_import_job(
+    job_id: int,
+    db: Session = Depends(get_session)
+):
+    """Получение прогресса задачи импорта"""
+    job = db.get(ImportJob, job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Import job not found"
+        )
+    return _job_read(job)
@@ -0,0 +1,66 @@
+"""
+API роуты для фоновых задач
+"""
+
+from typing import List, Optional
+from fastapi import APIRouter, Depends, status
+from sqlmodel import Session
+
+from app.core.database import get_session
+from app.models.jobs import Job, JobKind, JobRead, JobStatus
+from app.schemas.jobs import BackfillRequest, ReportRequest
+from app.services.jobs import JobService
+
+router = APIRouter()
+
+
+def _job_read(job: Job) -> JobRead:
+    """Преобразование задачи в схему ответа"""
+    return JobRead(
+        **job.model_dump(),
+        progress=job.progress,
+        throughput=job.throughput,
+        eta_seconds=job.eta_seconds,
+    )
+
+
+@router.get("/", response_model=List[JobRead])
+def get_jobs(
+    kind: Optional[JobKind] = None,
+    job_status: Optional[JobStatus] = None,
+    skip: int = 0,
+    limit: int = 50,
+    db: Session = Depends(get_session)
+):
+    """Получение списка фоновых задач"""
+    jobs = JobService(db).list_jobs(kind, job_status, skip, limit)
+    return [_job_read(job) for job in jobs]
+
+
+@router.get("/{job_id}", response_model=JobRead)
+def get_job(
+    job_id: int,
+    db: Session = Depends(get_session)
+):
+    """Статус задачи: прогресс, скорость и оценка времени завершения"""
+    return _job_read(JobService(db).get_job(job_id))
+
+
+@router.post("/backfill", response_model=JobRead, status_code=status.HTTP_202_ACCEPTED)
+def create_backfill(
+    request: BackfillRequest,
+    db: Session = Depends(get_session)
+):
+    """Постановка пересчета агрегатов за период"""
+    job = JobService(db).enqueue(JobKind.BACKFILL, request.model_dump(mode="json"), unit="days")
+    return _job_read(job)
+
+
+@router.post("/report", response_model=JobRead, status_code=status.HTTP_202_ACCEPTED)
+def create_report(
+    request: ReportRequest,
+    db: Session = Depends(get_session)
+):
+    """Постановка построения тяжелого отчета"""
+    job = JobService(db).enqueue(JobKind.REPORT, request.model_dump(mode="json"), unit="reports")
+    return _job_read(job)
@@ -0,0 +1,94 @@
+"""
+Кэш результатов запросов в Redis с версионированием данных
+"""
+
+import hashlib
+import json
+import logging
+from typing import Any, Callable, Dict, Optional
+
+import redis
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Наборы данных, версии которых учитываются в ключах кэша
+EVENTS_DATASET = "events"
+
+_client: Optional[redis.Redis] = None
+
+
+def get_redis() -> redis.Redis:
+    """Общий клиент Redis"""
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=settings.CACHE_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.CACHE_SOCKET_TIMEOUT,
+        )
+    return _client
+
+
+def version_key(dataset: str) -> str:
+    """Ключ счетчика версии набора данных"""
+    return f"data_version:{dataset}"
+
+
+def get_data_version(dataset: str) -> int:
+    """Текущая версия набора данных"""
+    value = get_redis().get(version_key(dataset))
+    return int(value) if value else 0
+
+
+def bump_data_version(dataset: str) -> None:
+    """
+    Увеличение версии набора данных
+
+    Ключи кэша содержат версию, поэтому после увеличения все
+    закэшированные результаты по набору перестают использоваться
+    и истекают по TTL.
+    """
+    try:
+        get_redis().incr(version_key(dataset))
+    except redis.RedisError as e:
+        logger.warning(f"Failed to bump data version for {dataset}: {e}")
+
+
+def cache_key(namespace: str, dataset: str, version: int, params: Dict[str, Any]) -> str:
+    """Ключ кэша по нормализованным параметрам запроса"""
+    normalized = json.dumps(params, sort_keys=True, separators=(",", ":"), default=str)
+    digest = hashlib.sha256(normalized.encode()).hexdigest()
+    return f"cache:{namespace}:{dataset}:v{version}:{digest}"
+
+
+def cached(
+    namespace: str,
+    dataset: str,
+    params: Dict[str, Any],
+    compute: Callable[[], Any],
+    ttl: Optional[int] = None,
+) -> Any:
+    """
+    Результат запроса из кэша или вычисление с сохранением
+
+    compute должен возвращать JSON-совместимое значение. При недоступности
+    Redis результат вычисляется без кэширования.
+    """
+    try:
+        client = get_redis()
+        key = cache_key(namespace, dataset, get_data_version(dataset), params)
+        hit = client.get(key)
+        if hit is not None:
+            return json.loads(hit)
+    except redis.RedisError as e:
+        logger.warning(f"Cache lookup failed: {e}")
+        return compute()
+
+    result = compute()
+    try:
+        client.set(key, json.dumps(result), ex=ttl or settings.CACHE_TTL)
+    except redis.RedisError as e:
+        logger.warning(f"Cache store failed: {e}")
+    return result
@@ -27,13 +27,31 @@ class Settings(BaseSettings):
     CELERY_BROKER_URL: str = "redis://localhost:6379/0"
     CELERY_RESULT_BACKEND: str = "redis://localhost:6379/0"
     
+    # Фоновые задачи
+    JOB_BACKEND: str = "celery"  # celery или local (пул процессов без Redis)
+    JOB_WORKERS: int = 2  # Процессов в пуле local
+    JOB_STALE_SECONDS: int = 300  # Без heartbeat дольше — задача считается прерванной
+    JOB_PROGRESS_INTERVAL: float = 1.0  # Минимальный интервал сохранения прогресса
+    JOB_HEARTBEAT_SECONDS: int = 30  # Интервал heartbeat выполняющейся задачи
+    JOB_SWEEP_SECONDS: int = 60  # Интервал повторной передачи зависших задач
+    
     # Файлы
     UPLOAD_DIR: str = "/app/uploads"
     MAX_FILE_SIZE: int = 100 * 1024 * 1024  # 100MB
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024  # 1MB
+    
+    # Импорт
+    IMPORT_CHUNK_ROWS: int = 100_000
+    IMPORT_WORKERS: int = 1  # 1 — последовательно, 0 — по числу ядер
+    IMPORT_BLOCK_BYTES: int = 8 * 1024 * 1024  # Блок для параллельного разбора
+    DEDUP_BLOOM_CAPACITY: int = 20_000_000  # Ключей до перестроения фильтра
+    DEDUP_BLOOM_ERROR_RATE: float = 0.01
     
     # Аналитика
     DEFAULT_TIMEZONE: str = "UTC"
     CACHE_TTL: int = 3600  # 1 час
+    CACHE_SOCKET_TIMEOUT: float = 0.5  # Недоступный Redis не блокирует запросы
+    HOURLY_ROLLUP_MAX_DAYS: int = 7  # Длиннее — дневные агрегаты
     
     class Config:
         env_file = ".env"
@@ -0,0 +1,24 @@
+"""
+Настройки базы данных
+"""
+
+from sqlmodel import create_engine, Session
+from sqlalchemy.orm import sessionmaker
+from app.core.config import settings
+
+# Создание синхронного движка базы данных
+engine = create_engine(
+    settings.DATABASE_URL,
+    echo=settings.DEBUG,  # Логирование SQL запросов в debug режиме
+    pool_pre_ping=True,   # Проверка соединения перед использованием
+    pool_recycle=300,     # Переподключение каждые 5 минут
+)
+
+# Создание синхронного SessionLocal для создания сессий
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def get_session():
+    """Получение синхронной сессии базы данных"""
+    with Session(engine) as session:
+        yield session
@@ -0,0 +1,121 @@
+"""
+Инициализация схемы TimescaleDB
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from app.models import Base
+
+# Hypertable для сырых событий, чанки по 7 дней
+HYPERTABLE_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS timescaledb",
+    """
+    SELECT create_hypertable(
+        'analytics_events', 'event_time',
+        chunk_time_interval => INTERVAL '7 days',
+        if_not_exists => TRUE,
+        migrate_data => TRUE
+    )
+    """,
+]
+
+# Имена представлений с агрегатами
+HOURLY_VIEW = "analytics_events_hourly"
+DAILY_VIEW = "analytics_events_daily"
+
+# Непрерывные агрегаты: часовой по сырым событиям, дневной поверх часового.
+# materialized_only = false: незакрытый хвост после watermark
+# досчитывается из сырых данных при запросе (real-time aggregation).
+CONTINUOUS_AGGREGATES_DDL = [
+    f"""
+    CREATE MATERIALIZED VIEW IF NOT EXISTS {HOURLY_VIEW}
+    WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+    SELECT
+        time_bucket(INTERVAL '1 hour', event_time) AS bucket,
+        campaign, source, sub_id, geo,
+        sum(clicks)::bigint AS clicks,
+        sum(conversions)::bigint AS conversions,
+        sum(payout) AS payout,
+        sum(spend) AS spend,
+        count(*) AS events
+    FROM analytics_events
+    GROUP BY bucket, campaign, source, sub_id, geo
+    WITH NO DATA
+    """,
+    f"""
+    CREATE MATERIALIZED VIEW IF NOT EXISTS {DAILY_VIEW}
+    WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+    SELECT
+        time_bucket(INTERVAL '1 day', bucket) AS bucket,
+        campaign, source, sub_id, geo,
+        sum(clicks)::bigint AS clicks,
+        sum(conversions)::bigint AS conversions,
+        sum(payout) AS payout,
+        sum(spend) AS spend,
+        sum(events)::bigint AS events
+    FROM {HOURLY_VIEW}
+    GROUP BY 1, campaign, source, sub_id, geo
+    WITH NO DATA
+    """,
+    f"""
+    SELECT add_continuous_aggregate_policy('{HOURLY_VIEW}',
+        start_offset => INTERVAL '3 days',
+        end_offset => INTERVAL '1 hour',
+        schedule_interval => INTERVAL '30 minutes',
+        if_not_exists => TRUE
+    )
+    """,
+    f"""
+    SELECT add_continuous_aggregate_policy('{DAILY_VIEW}',
+        start_offset => INTERVAL '35 days',
+        end_offset => INTERVAL '1 day',
+        schedule_interval => INTERVAL '1 hour',
+        if_not_exists => TRUE
+    )
+    """,
+]
+
+
+def init_db(engine: Engine) -> None:
+    """Создание таблиц, hypertable и непрерывных агрегатов"""
+    Base.create_all(bind=engine)
+
+    if engine.dialect.name != "postgresql":
+        return
+
+    with engine.begin() as connection:
+        for statement in HYPERTABLE_DDL + CONTINUOUS_AGGREGATES_DDL:
+            connection.execute(text(statement))
+
+
+def refresh_rollups(engine: Engine, start: Optional[datetime], end: Optional[datetime]) -> None:
+    """
+    Пересчет агрегатов за период (например, после импорта старых данных)
+
+    Политики обновляют только последние дни, поэтому импорт задним
+    числом требует явного пересчета затронутого диапазона. Границы
+    расширяются до целых суток, иначе крайние корзины не пересчитаются.
+    """
+    if engine.dialect.name != "postgresql" or start is None or end is None:
+        return
+
+    # Дневные корзины выровнены по UTC
+    start = start.astimezone(timezone.utc) if start.tzinfo else start.replace(tzinfo=timezone.utc)
+    end = end.astimezone(timezone.utc) if end.tzinfo else end.replace(tzinfo=timezone.utc)
+    window_start = datetime(start.year, start.month, start.day, tzinfo=timezone.utc)
+    window_end = datetime(end.year, end.month, end.day, tzinfo=timezone.utc) + timedelta(days=1)
+
+    # refresh_continuous_aggregate нельзя вызывать внутри транзакции
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        for view in (HOURLY_VIEW, DAILY_VIEW):
+            connection.execute(
+                text(
+                    "CALL refresh_continuous_aggregate("
+                    ":view, CAST(:start AS timestamptz), CAST(:end AS timestamptz))"
+                ),
+                {"view": view, "start": window_start, "end": window_end},
+            )
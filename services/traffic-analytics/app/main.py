@@ -8,6 +8,12 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 
 from app.core.config import settings
+from app.core.database import engine
+from app.db.timescale import init_db
+from app.services.jobs import recover_jobs, start_stale_job_sweeper
+
+# Создание таблиц и hypertable
+init_db(engine)
 
 # Создание FastAPI приложения
 app = FastAPI(
@@ -53,9 +59,24 @@ async def root():
         "docs": "/docs"
     }
 
-# Импорт API роутов (будут добавлены позже)
-# from app.api import analytics, import_data, campaigns
+# Локальный исполнитель работает в процессе API: незавершенные
+# задачи передаются ему заново при старте, зависшие — периодически
+# (в режиме celery — worker'у и планировщиком celery beat)
+@app.on_event("startup")
+def recover_jobs_on_startup():
+    """Восстановление фоновых задач после перезапуска"""
+    if settings.JOB_BACKEND == "local":
+        recover_jobs()
+        start_stale_job_sweeper()
+
+# Импорт API роутов
+from app.api import analytics, import_data, jobs
+
+# Включение роутов
+app.include_router(import_data.router, prefix="/api/import", tags=["import"])
+app.include_router(analytics.router, prefix="/api/analytics", tags=["analytics"])
+app.include_router(jobs.router, prefix="/api/jobs", tags=["jobs"])
 
-# app.include_router(analytics.router, prefix="/api/analytics", tags=["analytics"])
-# app.include_router(import_data.router, prefix="/api/import", tags=["import"])
+# Будут добавлены позже
+# from app.api import campaigns
 # app.include_router(campaigns.router, prefix="/api/campaigns", tags=["campaigns"])
@@ -1 +1,10 @@
 # Database models
+
+from sqlmodel import SQLModel
+from app.models.base import BaseModel
+from app.models.events import AnalyticsEvent, EventFingerprint
+from app.models.imports import ImportJob, ImportStatus, ImportJobRead
+from app.models.jobs import Job, JobKind, JobStatus, JobRead
+
+# Создание базовой таблицы для всех моделей
+Base = SQLModel.metadata
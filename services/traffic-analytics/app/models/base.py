@@ -0,0 +1,18 @@
+"""
+Базовые модели для аналитики трафика
+"""
+
+from datetime import datetime
+from typing import Optional
+from sqlmodel import SQLModel, Field
+
+
+class BaseModel(SQLModel):
+    """Базовая модель с общими полями"""
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: Optional[datetime] = Field(default=None)
+    
+    class Config:
+        from_attributes = True
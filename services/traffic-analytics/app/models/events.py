@@ -0,0 +1,78 @@
+"""
+Модели для событий трафика (TimescaleDB hypertable)
+"""
+
+from decimal import Decimal
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import BigInteger, Column, DateTime, Identity, Numeric
+from sqlmodel import SQLModel, Field
+
+
+class AnalyticsEvent(SQLModel, table=True):
+    """Строка статистики партнерской программы (hypertable по event_time)"""
+    
+    __tablename__ = "analytics_events"
+    
+    # Hypertable требует, чтобы колонка времени входила в первичный ключ
+    id: Optional[int] = Field(
+        default=None,
+        sa_column=Column(BigInteger, Identity(), primary_key=True),
+    )
+    event_time: datetime = Field(
+        sa_column=Column(DateTime(timezone=True), primary_key=True),
+        description="Время события",
+    )
+    
+    campaign: str = Field(max_length=255, description="Кампания")
+    source: str = Field(default="", max_length=255, description="Источник трафика")
+    sub_id: str = Field(default="", max_length=255, description="Sub ID")
+    geo: str = Field(default="", max_length=8, description="Гео (код страны)")
+    
+    clicks: int = Field(default=0, description="Клики")
+    conversions: int = Field(default=0, description="Конверсии")
+    payout: Decimal = Field(
+        default=Decimal("0"),
+        sa_column=Column(Numeric(18, 6), nullable=False, default=0),
+        description="Выплата партнера",
+    )
+    spend: Decimal = Field(
+        default=Decimal("0"),
+        sa_column=Column(Numeric(18, 6), nullable=False, default=0),
+        description="Расход на трафик",
+    )
+    
+    import_job_id: Optional[int] = Field(default=None, index=True, description="ID задачи импорта")
+    row_key: Optional[int] = Field(
+        default=None,
+        sa_column=Column(BigInteger, index=True),
+        description="Хэш естественного ключа строки",
+    )
+
+
+class EventFingerprint(SQLModel, table=True):
+    """
+    Отпечаток загруженной строки для дедупликации импорта
+
+    Ключ — хэш (event_time, campaign, source, sub_id, geo), row_hash —
+    хэш всей строки вместе с метриками. Совпадение ключа при другом
+    row_hash означает обновленную партнером статистику.
+    """
+    
+    __tablename__ = "event_fingerprints"
+    
+    key_hash: int = Field(
+        sa_column=Column(BigInteger, primary_key=True, autoincrement=False),
+        description="Хэш естественного ключа",
+    )
+    # Порядковый номер для инкрементальной загрузки в Bloom фильтр
+    seq: Optional[int] = Field(
+        default=None,
+        sa_column=Column(BigInteger, Identity(), nullable=False, unique=True),
+    )
+    row_hash: int = Field(sa_column=Column(BigInteger, nullable=False), description="Хэш строки")
+    event_time: datetime = Field(
+        sa_column=Column(DateTime(timezone=True), nullable=False),
+        description="Время события",
+    )
+    import_job_id: Optional[int] = Field(default=None, description="ID последнего импорта строки")
@@ -0,0 +1,72 @@
+"""
+Модели для задач импорта CSV
+"""
+
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+from sqlmodel import SQLModel, Field
+from app.models.base import BaseModel
+
+
+class ImportStatus(str, Enum):
+    """Статусы задачи импорта"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class ImportJob(BaseModel, table=True):
+    """Задача импорта CSV файла"""
+    
+    __tablename__ = "import_jobs"
+    
+    filename: str = Field(max_length=255, description="Исходное имя файла")
+    file_path: str = Field(max_length=1024, description="Путь к файлу на диске")
+    file_size: int = Field(default=0, description="Размер файла в байтах")
+    status: ImportStatus = Field(default=ImportStatus.QUEUED, description="Статус импорта")
+    
+    # Прогресс
+    bytes_processed: int = Field(default=0, description="Обработано байт")
+    rows_processed: int = Field(default=0, description="Прочитано строк")
+    rows_imported: int = Field(default=0, description="Загружено строк")
+    rows_inserted: int = Field(default=0, description="Новых строк")
+    rows_updated: int = Field(default=0, description="Обновленных строк")
+    rows_skipped: int = Field(default=0, description="Пропущенных дубликатов")
+    rows_rejected: int = Field(default=0, description="Отклонено строк")
+    
+    job_id: Optional[int] = Field(default=None, description="ID фоновой задачи")
+    error: Optional[str] = Field(default=None, description="Текст ошибки")
+    started_at: Optional[datetime] = Field(default=None, description="Время начала")
+    finished_at: Optional[datetime] = Field(default=None, description="Время окончания")
+    
+    @property
+    def progress(self) -> float:
+        """Доля обработанного файла (0..1)"""
+        if self.status == ImportStatus.COMPLETED:
+            return 1.0
+        if not self.file_size:
+            return 0.0
+        return min(self.bytes_processed / self.file_size, 1.0)
+
+
+class ImportJobRead(SQLModel):
+    """Схема для чтения задачи импорта"""
+    id: int
+    filename: str
+    file_size: int
+    status: ImportStatus
+    bytes_processed: int
+    rows_processed: int
+    rows_imported: int
+    rows_inserted: int
+    rows_updated: int
+    rows_skipped: int
+    rows_rejected: int
+    progress: float
+    job_id: Optional[int]
+    error: Optional[str]
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+    created_at: datetime
@@ -0,0 +1,108 @@
+"""
+Модели фоновых задач (импорт, отчеты, пересчет агрегатов)
+"""
+
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, Optional
+from sqlalchemy import JSON, Column
+from sqlmodel import SQLModel, Field
+from app.models.base import BaseModel
+
+
+class JobKind(str, Enum):
+    """Типы фоновых задач"""
+    IMPORT = "import"
+    REPORT = "report"
+    BACKFILL = "backfill"
+
+
+class JobStatus(str, Enum):
+    """Статусы фоновой задачи"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class Job(BaseModel, table=True):
+    """
+    Фоновая задача
+
+    Таблица — источник истины о задачах: брокер только доставляет
+    идентификаторы, поэтому после перезапуска незавершенные задачи
+    восстанавливаются из БД.
+    """
+    
+    __tablename__ = "jobs"
+    
+    kind: JobKind = Field(index=True, description="Тип задачи")
+    status: JobStatus = Field(default=JobStatus.QUEUED, index=True, description="Статус")
+    payload: Dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSON, nullable=False))
+    result: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSON))
+    
+    # Прогресс в единицах задачи (байты файла, дни периода и т.п.)
+    units_done: int = Field(default=0, description="Выполнено единиц")
+    units_total: Optional[int] = Field(default=None, description="Всего единиц")
+    unit: str = Field(default="items", max_length=32, description="Единица прогресса")
+    
+    attempts: int = Field(default=0, description="Число запусков")
+    worker: Optional[str] = Field(default=None, max_length=255, description="Исполнитель")
+    error: Optional[str] = Field(default=None, description="Текст ошибки")
+    started_at: Optional[datetime] = Field(default=None, description="Время начала")
+    finished_at: Optional[datetime] = Field(default=None, description="Время окончания")
+    heartbeat_at: Optional[datetime] = Field(default=None, description="Последний сигнал от исполнителя")
+    
+    def elapsed_seconds(self, now: Optional[datetime] = None) -> Optional[float]:
+        """Время выполнения в секундах"""
+        if not self.started_at:
+            return None
+        end = self.finished_at or now or datetime.utcnow()
+        return max((end - self.started_at).total_seconds(), 0.0)
+    
+    @property
+    def progress(self) -> float:
+        """Доля выполнения (0..1)"""
+        if self.status == JobStatus.COMPLETED:
+            return 1.0
+        if not self.units_total:
+            return 0.0
+        return min(self.units_done / self.units_total, 1.0)
+    
+    @property
+    def throughput(self) -> Optional[float]:
+        """Единиц в секунду"""
+        elapsed = self.elapsed_seconds()
+        if not elapsed or not self.units_done:
+            return None
+        return self.units_done / elapsed
+    
+    @property
+    def eta_seconds(self) -> Optional[float]:
+        """Оценка оставшегося времени"""
+        if self.status != JobStatus.RUNNING or not self.units_total:
+            return None
+        throughput = self.throughput
+        if not throughput:
+            return None
+        return max(self.units_total - self.units_done, 0) / throughput
+
+
+class JobRead(SQLModel):
+    """Схема для чтения фоновой задачи"""
+    id: int
+    kind: JobKind
+    status: JobStatus
+    payload: Dict[str, Any]
+    result: Optional[Dict[str, Any]]
+    units_done: int
+    units_total: Optional[int]
+    unit: str
+    progress: float
+    throughput: Optional[float]
+    eta_seconds: Optional[float]
+    attempts: int
+    error: Optional[str]
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+    created_at: datetime
@@ -1 +1,33 @@
-# Pydantic schemas
+"""
+Схемы для валидации данных API
+"""
+
+from .analytics import (
+    Granularity,
+    Metric,
+    Dimension,
+    MetricValues,
+    TimeseriesPoint,
+    TimeseriesResponse,
+    BreakdownRow,
+    BreakdownResponse,
+)
+from .jobs import (
+    PeriodRequest,
+    BackfillRequest,
+    ReportRequest,
+)
+
+__all__ = [
+    'Granularity',
+    'Metric',
+    'Dimension',
+    'MetricValues',
+    'TimeseriesPoint',
+    'TimeseriesResponse',
+    'BreakdownRow',
+    'BreakdownResponse',
+    'PeriodRequest',
+    'BackfillRequest',
+    'ReportRequest',
+]
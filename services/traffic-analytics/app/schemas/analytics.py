@@ -0,0 +1,74 @@
+"""
+Схемы ответов аналитических запросов
+"""
+
+from datetime import datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Dict, List, Optional
+from pydantic import BaseModel
+
+
+class Granularity(str, Enum):
+    """Шаг временного ряда"""
+    HOUR = "hour"
+    DAY = "day"
+
+
+class Metric(str, Enum):
+    """Метрики агрегатов"""
+    CLICKS = "clicks"
+    CONVERSIONS = "conversions"
+    PAYOUT = "payout"
+    SPEND = "spend"
+
+
+class Dimension(str, Enum):
+    """Измерения агрегатов"""
+    CAMPAIGN = "campaign"
+    SOURCE = "source"
+    SUB_ID = "sub_id"
+    GEO = "geo"
+
+
+class MetricValues(BaseModel):
+    """Значения метрик"""
+    clicks: int = 0
+    conversions: int = 0
+    payout: Decimal = Decimal("0")
+    spend: Decimal = Decimal("0")
+
+
+class TimeseriesPoint(MetricValues):
+    """Точка временного ряда"""
+    bucket: datetime
+
+
+class TimeseriesResponse(BaseModel):
+    """Временной ряд метрик"""
+    start: datetime
+    end: datetime
+    granularity: Granularity
+    filters: Dict[str, str] = {}
+    points: List[TimeseriesPoint]
+
+
+class BreakdownRow(MetricValues):
+    """Строка разбивки по измерениям"""
+    bucket: Optional[datetime] = None
+    campaign: Optional[str] = None
+    source: Optional[str] = None
+    sub_id: Optional[str] = None
+    geo: Optional[str] = None
+
+
+class BreakdownResponse(BaseModel):
+    """Разбивка или top-N по измерениям"""
+    start: datetime
+    end: datetime
+    group_by: List[Dimension]
+    granularity: Optional[Granularity] = None
+    filters: Dict[str, str] = {}
+    order_by: Optional[Metric] = None
+    totals: MetricValues
+    rows: List[BreakdownRow]
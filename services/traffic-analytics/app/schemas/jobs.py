@@ -0,0 +1,33 @@
+"""
+Схемы запросов на постановку фоновых задач
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional
+from pydantic import BaseModel, Field, model_validator
+
+from .analytics import Dimension, Metric
+
+
+class PeriodRequest(BaseModel):
+    """Период [start, end)"""
+    start: datetime
+    end: datetime
+
+    @model_validator(mode="after")
+    def validate_period(self):
+        if self.end <= self.start:
+            raise ValueError("Period end must be after start")
+        return self
+
+
+class BackfillRequest(PeriodRequest):
+    """Пересчет агрегатов за период"""
+
+
+class ReportRequest(PeriodRequest):
+    """Построение отчета-разбивки"""
+    group_by: List[Dimension] = Field(min_length=1)
+    filters: Dict[str, str] = {}
+    order_by: Optional[Metric] = None
+    limit: Optional[int] = Field(default=None, ge=1, le=100000)
@@ -0,0 +1,127 @@
+"""
+Сервис аналитических запросов с кэшированием результатов
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlmodel import Session
+
+from app.core.cache import EVENTS_DATASET, cached
+from app.schemas.analytics import (
+    BreakdownResponse, Dimension, Granularity, Metric, TimeseriesResponse
+)
+from app.services.rollups import METRICS, RollupService, pick_granularity
+
+
+def _as_utc(moment: datetime) -> datetime:
+    """Наивное время считается UTC"""
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+
+def _fill_metrics(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Пустые суммы (нет данных) заменяются нулями"""
+    for metric in METRICS:
+        if row.get(metric) is None:
+            row[metric] = 0
+    return row
+
+
+class AnalyticsService:
+    """
+    Запросы временных рядов, разбивок и top-N по агрегатам
+
+    Результаты кэшируются в Redis по нормализованным параметрам запроса
+    и версии набора данных events, которую увеличивает каждый
+    завершенный импорт.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.rollups = RollupService(db)
+
+    def timeseries(
+        self,
+        start: datetime,
+        end: datetime,
+        granularity: Optional[Granularity] = None,
+        filters: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Any]:
+        """Временной ряд метрик"""
+        start, end = _as_utc(start), _as_utc(end)
+        params = {
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "granularity": (granularity.value if granularity else pick_granularity(start, end)),
+            "filters": filters or {},
+        }
+
+        def compute():
+            points = self.rollups.query(
+                start, end,
+                filters=filters,
+                granularity=params["granularity"],
+            )
+            return TimeseriesResponse(
+                start=start,
+                end=end,
+                granularity=params["granularity"],
+                filters=params["filters"],
+                points=[_fill_metrics(point) for point in points],
+            ).model_dump(mode="json")
+
+        return cached("timeseries", EVENTS_DATASET, params, compute)
+
+    def breakdown(
+        self,
+        start: datetime,
+        end: datetime,
+        group_by: List[Dimension],
+        filters: Optional[Dict[str, str]] = None,
+        order_by: Optional[Metric] = None,
+        limit: Optional[int] = None,
+        granularity: Optional[Granularity] = None,
+    ) -> Dict[str, Any]:
+        """
+        Разбивка метрик по измерениям, с order_by и limit — top-N
+
+        С granularity строки дополнительно разбиваются по временным корзинам.
+        """
+        start, end = _as_utc(start), _as_utc(end)
+        # Порядок измерений не влияет на результат
+        dimensions = sorted({dimension.value for dimension in group_by})
+        params = {
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "group_by": dimensions,
+            "filters": filters or {},
+            "order_by": order_by.value if order_by else None,
+            "limit": limit,
+            "granularity": granularity.value if granularity else None,
+        }
+
+        def compute():
+            rows = self.rollups.query(
+                start, end,
+                group_by=dimensions,
+                filters=filters,
+                granularity=params["granularity"],
+                bucketed=granularity is not None,
+                order_by=params["order_by"],
+                limit=limit,
+            )
+            totals = self.rollups.query(start, end, filters=filters, bucketed=False)
+            return BreakdownResponse(
+                start=start,
+                end=end,
+                group_by=dimensions,
+                granularity=granularity,
+                filters=params["filters"],
+                order_by=order_by,
+                totals=_fill_metrics(totals[0] if totals else {}),
+                rows=[_fill_metrics(row) for row in rows],
+            ).model_dump(mode="json")
+
+        return cached("breakdown", EVENTS_DATASET, params, compute)
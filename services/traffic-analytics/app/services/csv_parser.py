@@ -0,0 +1,308 @@
+"""
+Разбор CSV файлов партнерских программ: последовательный и параллельный режимы
+"""
+
+import csv
+import io
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Порядок колонок в COPY
+COPY_COLUMNS = [
+    "event_time", "campaign", "source", "sub_id", "geo",
+    "clicks", "conversions", "payout", "spend", "import_job_id", "row_key",
+]
+
+# Естественный ключ строки и колонки отпечатка ее содержимого
+KEY_COLUMNS = ["event_time", "campaign", "source", "sub_id", "geo"]
+METRIC_COLUMNS = ["clicks", "conversions", "payout", "spend"]
+HASH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+# Синонимы заголовков в выгрузках разных партнеров
+COLUMN_ALIASES = {
+    "event_time": ["event_time", "date", "datetime", "time", "timestamp", "day", "hour"],
+    "campaign": ["campaign", "campaign_name", "campaign_id", "offer"],
+    "source": ["source", "traffic_source", "network", "publisher"],
+    "sub_id": ["sub_id", "subid", "sub1", "sub_id1", "placement"],
+    "geo": ["geo", "country", "country_code"],
+    "clicks": ["clicks", "click"],
+    "conversions": ["conversions", "conversion", "installs", "leads"],
+    "payout": ["payout", "revenue", "income"],
+    "spend": ["spend", "cost", "expense"],
+}
+
+REQUIRED_COLUMNS = ("event_time", "campaign")
+STRING_COLUMNS = {"campaign": 255, "source": 255, "sub_id": 255, "geo": 8}
+INTEGER_COLUMNS = ("clicks", "conversions")
+DECIMAL_COLUMNS = ("payout", "spend")
+CSV_SPECIAL_CHARS = (",", '"', "\n", "\r")
+CSV_SPECIAL = re.compile(r'[,"\n\r]')
+
+# Колонка, склеенная через \x00, в которой каждое значение пустое или число
+INTEGER_COLUMN = re.compile(r"(?:\d{0,9}\x00)*")
+DECIMAL_COLUMN = re.compile(r"(?:(?:-?(?:\d{1,12}(?:\.\d*)?|\.\d+))?\x00)*")
+
+# Границы типов колонок analytics_events (INTEGER, NUMERIC(18, 6))
+MAX_INTEGER = 2 ** 31 - 1
+MAX_DECIMAL = 10 ** 12
+
+
+class ParsedBlock(NamedTuple):
+    """Разобранный блок файла, готовый к COPY"""
+    lines: List[str]  # строки COPY для валидных записей
+    keys: np.ndarray  # хэш естественного ключа (int64)
+    hashes: np.ndarray  # хэш содержимого строки (int64)
+    event_times: List[str]
+    rows_processed: int
+    rows_rejected: int
+    offset: int  # позиция в файле после блока
+
+    @property
+    def rows_valid(self) -> int:
+        return len(self.lines)
+
+
+def resolve_columns(header: List[str]) -> Dict[int, str]:
+    """Сопоставление колонок файла с каноническими именами"""
+    lookup = {
+        alias: canonical
+        for canonical, aliases in COLUMN_ALIASES.items()
+        for alias in aliases
+    }
+
+    columns: Dict[int, str] = {}
+    for index, name in enumerate(header):
+        canonical = lookup.get(name.strip().lower().replace(" ", "_"))
+        if canonical and canonical not in columns.values():
+            columns[index] = canonical
+
+    missing = [column for column in REQUIRED_COLUMNS if column not in columns.values()]
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(missing)}")
+
+    return columns
+
+
+def read_header(handle: BinaryIO) -> List[str]:
+    """Чтение строки заголовка из бинарного файла"""
+    line = handle.readline().decode("utf-8-sig")
+    return next(csv.reader([line]), [])
+
+
+def _read_csv(source: BinaryIO, columns: Dict[int, str], chunk_rows: Optional[int] = None):
+    """Чтение CSV без заголовка только с нужными колонками"""
+    return pd.read_csv(
+        source,
+        header=None,
+        usecols=list(columns),
+        dtype=str,
+        chunksize=chunk_rows,
+        encoding="utf-8",
+        on_bad_lines="skip",
+    )
+
+
+def _clean_strings(values: List[str], max_length: int) -> List[str]:
+    """
+    Обрезка строк и экранирование для CSV формата COPY
+
+    Проверки выполняются по склеенной колонке, поэтому поэлементная
+    обработка запускается только если в колонке есть что исправлять.
+    """
+    joined = "\x00" + "\x00".join(values) + "\x00"
+
+    if any(f"\x00{char}" in joined or f"{char}\x00" in joined for char in " \t"):
+        values = [value.strip() for value in values]
+    if values and max(map(len, values)) > max_length:
+        values = [value[:max_length] for value in values]
+    if any(char in joined for char in CSV_SPECIAL_CHARS):
+        values = [
+            '"' + value.replace('"', '""') + '"' if CSV_SPECIAL.search(value) else value
+            for value in values
+        ]
+
+    return values
+
+
+def coerce_chunk(chunk: pd.DataFrame) -> Tuple[pd.DataFrame, int]:
+    """
+    Приведение блока к типизированным колонкам
+
+    Значения проверяются векторно и возвращаются уже в текстовом
+    представлении COPY, чтобы не форматировать строки повторно.
+
+    Returns:
+        (валидные строки в порядке COPY_COLUMNS без import_job_id, число отклоненных строк)
+    """
+    frame = pd.DataFrame(index=chunk.index)
+
+    event_time = pd.to_datetime(
+        chunk["event_time"], utc=True, errors="coerce", format="ISO8601"
+    )
+    valid = event_time.notna()
+    frame["event_time"] = np.datetime_as_string(
+        event_time.values.astype("datetime64[s]"), timezone="UTC"
+    )
+
+    for column, max_length in STRING_COLUMNS.items():
+        if column in chunk:
+            frame[column] = _clean_strings(chunk[column].fillna("").tolist(), max_length)
+        else:
+            frame[column] = ""
+    valid &= frame["campaign"] != ""
+
+    for column in INTEGER_COLUMNS + DECIMAL_COLUMNS:
+        if column not in chunk:
+            frame[column] = "0"
+            continue
+        raw = chunk[column]
+
+        # Быстрый путь: вся колонка уже в каноническом числовом виде
+        pattern = INTEGER_COLUMN if column in INTEGER_COLUMNS else DECIMAL_COLUMN
+        if pattern.fullmatch("\x00".join(raw.fillna("").tolist()) + "\x00"):
+            frame[column] = raw.fillna("0")
+            continue
+
+        values = pd.to_numeric(raw, errors="coerce")
+        # Пустая ячейка — это ноль, нечисловое значение — ошибка строки
+        valid &= (values.notna() & np.isfinite(values)) | raw.isna()
+
+        if column in INTEGER_COLUMNS:
+            values = values.fillna(0)
+            valid &= (values >= 0) & (values <= MAX_INTEGER)
+            frame[column] = values.where(valid, 0).round().astype("int64").astype(str)
+        else:
+            valid &= values.fillna(0).abs() < MAX_DECIMAL
+            frame[column] = raw.fillna("0")
+
+    rejected = int((~valid).sum())
+    return frame[valid], rejected
+
+
+def fingerprint(frame: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Хэши естественного ключа и содержимого строк
+
+    Хэшируется каноническое текстовое представление колонок, поэтому
+    одна и та же строка дает один и тот же отпечаток при любом
+    форматировании даты в исходном файле.
+
+    Returns:
+        (хэши ключей, хэши содержимого) как int64 для колонок BIGINT
+    """
+    keys = pd.util.hash_pandas_object(frame[KEY_COLUMNS], index=False).values
+    metrics = pd.util.hash_pandas_object(frame[METRIC_COLUMNS], index=False).values
+    # Хэш строки — комбинация уже посчитанного ключа и метрик
+    hashes = (keys * HASH_MULTIPLIER) ^ metrics
+    return keys.view(np.int64), hashes.view(np.int64)
+
+
+def to_copy_lines(frame: pd.DataFrame) -> List[str]:
+    """Сериализация блока (текстовые колонки) в строки CSV для COPY"""
+    rows = zip(*(frame[column].tolist() for column in COPY_COLUMNS))
+    return [",".join(row) + "\n" for row in rows]
+
+
+def parse_frame(chunk: pd.DataFrame, job_id: int, offset: int) -> ParsedBlock:
+    """Валидация блока и подготовка данных для COPY"""
+    frame, rejected = coerce_chunk(chunk)
+    keys, hashes = fingerprint(frame)
+    lines = to_copy_lines(frame.assign(import_job_id=str(job_id), row_key=keys.astype(str)))
+    return ParsedBlock(
+        lines, keys, hashes, frame["event_time"].tolist(), len(chunk), rejected, offset
+    )
+
+
+def iter_blocks(
+    handle: BinaryIO,
+    columns: Dict[int, str],
+    job_id: int,
+    chunk_rows: int,
+) -> Iterator[ParsedBlock]:
+    """Последовательный разбор файла блоками по chunk_rows строк (заголовок уже прочитан)"""
+    try:
+        reader = _read_csv(handle, columns, chunk_rows)
+    except pd.errors.EmptyDataError:
+        return
+
+    for chunk in reader:
+        yield parse_frame(chunk.rename(columns=columns), job_id, handle.tell())
+
+
+def split_ranges(path: str, start: int, block_bytes: int) -> List[Tuple[int, int]]:
+    """
+    Разбиение файла на диапазоны байт по границам записей
+
+    Граница записи — перевод строки, поэтому файлы с переводами строк
+    внутри значений в кавычках в параллельном режиме не поддерживаются.
+    """
+    size = os.path.getsize(path)
+    ranges = []
+
+    with open(path, "rb") as handle:
+        position = start
+        while position < size:
+            handle.seek(min(position + block_bytes, size))
+            handle.readline()  # дочитываем текущую запись до конца
+            end = min(handle.tell(), size)
+            ranges.append((position, end))
+            position = end
+
+    return ranges
+
+
+def parse_range(path: str, start: int, end: int, columns: Dict[int, str], job_id: int) -> ParsedBlock:
+    """Разбор диапазона байт файла (выполняется в процессе пула)"""
+    with open(path, "rb") as handle:
+        handle.seek(start)
+        data = handle.read(end - start)
+
+    try:
+        chunk = _read_csv(io.BytesIO(data), columns)
+    except pd.errors.EmptyDataError:
+        return ParsedBlock([], np.empty(0, np.int64), np.empty(0, np.int64), [], 0, 0, end)
+
+    return parse_frame(chunk.rename(columns=columns), job_id, end)
+
+
+def iter_parallel_blocks(
+    path: str,
+    start: int,
+    columns: Dict[int, str],
+    job_id: int,
+    workers: int,
+    block_bytes: int,
+) -> Iterator[ParsedBlock]:
+    """
+    Параллельный разбор файла в пуле процессов
+
+    Блоки возвращаются строго в порядке следования в файле. Число блоков
+    в работе ограничено, чтобы память не зависела от размера файла.
+    """
+    ranges = split_ranges(path, start, block_bytes)
+    max_pending = workers * 2
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for range_start, range_end in ranges:
+            pending.append(
+                executor.submit(parse_range, path, range_start, range_end, columns, job_id)
+            )
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+
+
+def import_workers(configured: int) -> int:
+    """Число процессов разбора: 0 — по числу ядер"""
+    if configured <= 0:
+        return os.cpu_count() or 1
+    return configured
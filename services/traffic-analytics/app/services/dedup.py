@@ -0,0 +1,206 @@
+"""
+Дедупликация строк импорта по отпечаткам: Bloom фильтр и индекс в БД
+"""
+
+import io
+import math
+from typing import NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.core.config import settings
+from app.services.csv_parser import ParsedBlock
+
+# Ключ advisory-блокировки: импорты с дедупликацией выполняются по одному
+IMPORT_LOCK_ID = 7_300_001
+
+FINGERPRINT_COPY_SQL = (
+    "COPY event_fingerprints (key_hash, row_hash, event_time, import_job_id) "
+    "FROM STDIN WITH (FORMAT csv)"
+)
+
+LOOKUP_SQL = "SELECT key_hash, row_hash FROM event_fingerprints WHERE key_hash = ANY(%s)"
+
+UPDATE_SQL = """
+    UPDATE event_fingerprints AS f
+    SET row_hash = v.row_hash, import_job_id = %s
+    FROM unnest(%s::bigint[], %s::bigint[]) AS v(key_hash, row_hash)
+    WHERE f.key_hash = v.key_hash
+"""
+
+DELETE_REPLACED_SQL = """
+    DELETE FROM analytics_events AS e
+    USING unnest(%s::bigint[], %s::timestamptz[]) AS v(row_key, event_time)
+    WHERE e.row_key = v.row_key AND e.event_time = v.event_time
+"""
+
+
+class BloomFilter:
+    """
+    Bloom фильтр по 64-битным хэшам
+
+    Позиции битов считаются двойным хэшированием из уже готового
+    хэша ключа, поэтому проверка блока выполняется векторно.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.size = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 64)
+        self.hash_count = max(int(round(self.size / capacity * math.log(2))), 1)
+        self.bits = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+        self.count = 0
+
+    def _positions(self, keys: np.ndarray) -> np.ndarray:
+        """Позиции битов: массив (hash_count, len(keys))"""
+        h1 = keys.view(np.uint64)
+        h2 = (h1 >> np.uint64(32)) | np.uint64(1)
+        steps = np.arange(self.hash_count, dtype=np.uint64)[:, None]
+        return (h1 + steps * h2) % np.uint64(self.size)
+
+    def add(self, keys: np.ndarray) -> None:
+        """Добавление ключей"""
+        if not len(keys):
+            return
+        positions = self._positions(keys).ravel()
+        masks = np.left_shift(np.uint8(1), (positions & np.uint64(7)).astype(np.uint8))
+        np.bitwise_or.at(self.bits, positions >> np.uint64(3), masks)
+        self.count += len(keys)
+
+    def might_contain(self, keys: np.ndarray) -> np.ndarray:
+        """Маска ключей, которые могут присутствовать (False — точно отсутствуют)"""
+        if not len(keys):
+            return np.zeros(0, dtype=bool)
+        positions = self._positions(keys)
+        shifts = (positions & np.uint64(7)).astype(np.uint8)
+        bits = (self.bits[positions >> np.uint64(3)] >> shifts) & 1
+        return bits.all(axis=0)
+
+
+class DedupResult(NamedTuple):
+    """Результат дедупликации блока"""
+    load_mask: np.ndarray  # строки блока для загрузки в analytics_events
+    inserted: int
+    updated: int
+    skipped: int
+
+
+class FingerprintIndex:
+    """
+    Индекс отпечатков загруженных строк
+
+    Постоянный индекс — таблица event_fingerprints. Bloom фильтр
+    в памяти процесса отсекает заведомо новые ключи, запрос к БД
+    выполняется только для возможных совпадений. Фильтр догружается
+    инкрементально по seq, ложноположительные срабатывания лишь
+    приводят к лишней проверке в БД.
+    """
+
+    def __init__(self):
+        self.bloom = self._new_bloom(settings.DEDUP_BLOOM_CAPACITY)
+        self.last_seq = 0
+
+    @staticmethod
+    def _new_bloom(capacity: int) -> BloomFilter:
+        return BloomFilter(capacity, settings.DEDUP_BLOOM_ERROR_RATE)
+
+    def lock(self, cursor) -> None:
+        """Блокировка на время транзакции импорта"""
+        cursor.execute("SELECT pg_advisory_xact_lock(%s)", (IMPORT_LOCK_ID,))
+
+    def sync(self, connection) -> None:
+        """Догрузка в фильтр ключей, добавленных другими импортами"""
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT count(*) FROM event_fingerprints")
+            total = cursor.fetchone()[0]
+
+        # Фильтр переполнен: точность падает, перестраиваем с запасом
+        if total > self.bloom.capacity:
+            self.bloom = self._new_bloom(total * 2)
+            self.last_seq = 0
+
+        with connection.cursor(name="fingerprint_sync") as cursor:
+            cursor.itersize = 1_000_000
+            cursor.execute(
+                "SELECT seq, key_hash FROM event_fingerprints WHERE seq > %s ORDER BY seq",
+                (self.last_seq,),
+            )
+            while True:
+                rows = cursor.fetchmany(cursor.itersize)
+                if not rows:
+                    break
+                batch = np.array(rows, dtype=np.int64)
+                self.bloom.add(batch[:, 1])
+                self.last_seq = int(batch[-1, 0])
+
+    def process(self, cursor, block: ParsedBlock, job_id: int) -> DedupResult:
+        """
+        Классификация строк блока и обновление индекса
+
+        Новые ключи вставляются, ключи с другим содержимым заменяют
+        ранее загруженную строку, полные совпадения пропускаются.
+        При повторе ключа внутри блока учитывается последнее вхождение.
+        """
+        keys, hashes = block.keys, block.hashes
+        total = len(keys)
+        if not total:
+            return DedupResult(np.zeros(0, dtype=bool), 0, 0, 0)
+
+        # Последнее вхождение каждого ключа в блоке
+        _, reversed_index = np.unique(keys[::-1], return_index=True)
+        latest = np.zeros(total, dtype=bool)
+        latest[total - 1 - reversed_index] = True
+
+        candidates = np.flatnonzero(latest & self.bloom.might_contain(keys))
+        stored = pd.Series(dtype=np.float64)
+        if len(candidates):
+            cursor.execute(LOOKUP_SQL, (keys[candidates].tolist(),))
+            rows = cursor.fetchall()
+            if rows:
+                found = np.array(rows, dtype=np.int64)
+                stored = pd.Series(found[:, 1], index=found[:, 0])
+
+        exists = latest & pd.Series(keys).isin(stored.index).values
+        inserted = latest & ~exists
+        changed = np.zeros(total, dtype=bool)
+        if exists.any():
+            positions = np.flatnonzero(exists)
+            previous = stored.reindex(keys[positions]).values.astype(np.int64)
+            changed[positions[previous != hashes[positions]]] = True
+
+        if changed.any():
+            positions = np.flatnonzero(changed)
+            event_times = [block.event_times[position] for position in positions]
+            cursor.execute(DELETE_REPLACED_SQL, (keys[positions].tolist(), event_times))
+            cursor.execute(
+                UPDATE_SQL, (job_id, keys[positions].tolist(), hashes[positions].tolist())
+            )
+
+        if inserted.any():
+            positions = np.flatnonzero(inserted)
+            payload = "".join(
+                f"{keys[position]},{hashes[position]},{block.event_times[position]},{job_id}\n"
+                for position in positions
+            )
+            cursor.copy_expert(FINGERPRINT_COPY_SQL, io.StringIO(payload))
+            self.bloom.add(keys[positions])
+
+        inserted_count = int(inserted.sum())
+        updated_count = int(changed.sum())
+        return DedupResult(
+            inserted | changed,
+            inserted_count,
+            updated_count,
+            total - inserted_count - updated_count,
+        )
+
+
+_index: Optional[FingerprintIndex] = None
+
+
+def get_fingerprint_index() -> FingerprintIndex:
+    """Индекс отпечатков процесса (фильтр переиспользуется между импортами)"""
+    global _index
+    if _index is None:
+        _index = FingerprintIndex()
+    return _index
@@ -0,0 +1,186 @@
+"""
+Сервис потокового импорта CSV файлов партнерских программ
+"""
+
+import io
+import logging
+import os
+import uuid
+from datetime import datetime
+from typing import Callable, Optional
+
+import numpy as np
+from fastapi import HTTPException, UploadFile, status
+from sqlalchemy import func
+from sqlmodel import Session, select
+
+from app.core.cache import EVENTS_DATASET, bump_data_version
+from app.core.config import settings
+from app.db.timescale import refresh_rollups
+from app.models.events import AnalyticsEvent
+from app.models.imports import ImportJob, ImportStatus
+from app.services.csv_parser import (
+    COPY_COLUMNS, import_workers, iter_blocks, iter_parallel_blocks,
+    read_header, resolve_columns
+)
+from app.services.dedup import get_fingerprint_index
+
+logger = logging.getLogger(__name__)
+
+COPY_SQL = (
+    f"COPY analytics_events ({', '.join(COPY_COLUMNS)}) "
+    "FROM STDIN WITH (FORMAT csv)"
+)
+
+
+class ImportService:
+    """Сервис импорта CSV в hypertable analytics_events"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create_job(self, upload: UploadFile) -> ImportJob:
+        """Потоковое сохранение загруженного файла на диск и создание задачи"""
+        os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
+        file_path = os.path.join(settings.UPLOAD_DIR, f"{uuid.uuid4().hex}.csv")
+
+        file_size = 0
+        try:
+            with open(file_path, "wb") as destination:
+                while True:
+                    block = upload.file.read(settings.UPLOAD_CHUNK_SIZE)
+                    if not block:
+                        break
+                    file_size += len(block)
+                    if file_size > settings.MAX_FILE_SIZE:
+                        raise HTTPException(
+                            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                            detail=f"File exceeds {settings.MAX_FILE_SIZE} bytes"
+                        )
+                    destination.write(block)
+        except Exception:
+            os.remove(file_path)
+            raise
+
+        job = ImportJob(
+            filename=upload.filename or os.path.basename(file_path),
+            file_path=file_path,
+            file_size=file_size,
+        )
+        self.db.add(job)
+        self.db.commit()
+        self.db.refresh(job)
+        return job
+
+    def run_import(
+        self, job_id: int, on_progress: Optional[Callable[[int], None]] = None
+    ) -> ImportJob:
+        """
+        Импорт файла задачи: блочный парсинг и загрузка через COPY
+
+        Все блоки загружаются в одной транзакции БД, прогресс задачи
+        фиксируется отдельно после каждого блока. При IMPORT_WORKERS > 1
+        разбор выполняется в пуле процессов, а COPY получает блоки
+        в исходном порядке. Строки, уже загруженные ранее с тем же
+        содержимым, пропускаются, измененные — заменяются.
+        """
+        job = self.db.get(ImportJob, job_id)
+        if not job:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Import job {job_id} not found"
+            )
+
+        # Повторный запуск (после перезапуска worker'а) начинает с нуля
+        job.status = ImportStatus.RUNNING
+        job.started_at = datetime.utcnow()
+        job.error = None
+        job.bytes_processed = job.rows_processed = job.rows_rejected = 0
+        job.rows_imported = job.rows_inserted = job.rows_updated = job.rows_skipped = 0
+        self._save_progress(job)
+
+        index = get_fingerprint_index()
+        connection = self.db.get_bind().raw_connection()
+        try:
+            with open(job.file_path, "rb") as handle:
+                columns = resolve_columns(read_header(handle))
+                cursor = connection.cursor()
+                index.lock(cursor)
+                index.sync(connection)
+
+                workers = import_workers(settings.IMPORT_WORKERS)
+                if workers > 1:
+                    blocks = iter_parallel_blocks(
+                        job.file_path, handle.tell(), columns, job.id,
+                        workers, settings.IMPORT_BLOCK_BYTES
+                    )
+                else:
+                    blocks = iter_blocks(handle, columns, job.id, settings.IMPORT_CHUNK_ROWS)
+
+                for block in blocks:
+                    result = index.process(cursor, block, job.id)
+                    if result.inserted or result.updated:
+                        payload = "".join(
+                            block.lines[position] for position in np.flatnonzero(result.load_mask)
+                        )
+                        cursor.copy_expert(COPY_SQL, io.StringIO(payload))
+
+                    job.rows_processed += block.rows_processed
+                    job.rows_inserted += result.inserted
+                    job.rows_updated += result.updated
+                    job.rows_skipped += result.skipped
+                    job.rows_imported = job.rows_inserted + job.rows_updated
+                    job.rows_rejected += block.rows_rejected
+                    job.bytes_processed = block.offset
+                    self._save_progress(job)
+                    if on_progress:
+                        on_progress(job.bytes_processed)
+
+            connection.commit()
+        except Exception as e:
+            connection.rollback()
+            logger.error(f"Import job {job.id} failed: {e}")
+            job.status = ImportStatus.FAILED
+            job.error = str(e)
+            job.rows_imported = job.rows_inserted = job.rows_updated = job.rows_skipped = 0
+            job.finished_at = datetime.utcnow()
+            self._save_progress(job)
+            return job
+        finally:
+            connection.close()
+
+        if job.rows_imported:
+            self._refresh_rollups(job)
+            # Закэшированные аналитические запросы больше не актуальны
+            bump_data_version(EVENTS_DATASET)
+
+        job.status = ImportStatus.COMPLETED
+        job.bytes_processed = job.file_size
+        job.finished_at = datetime.utcnow()
+        self._save_progress(job)
+
+        logger.info(
+            f"Import job {job.id} completed: {job.rows_inserted} inserted, "
+            f"{job.rows_updated} updated, {job.rows_skipped} skipped, "
+            f"{job.rows_rejected} rejected"
+        )
+        return job
+
+    def _refresh_rollups(self, job: ImportJob):
+        """Пересчет агрегатов за период, затронутый импортом"""
+        statement = select(
+            func.min(AnalyticsEvent.event_time), func.max(AnalyticsEvent.event_time)
+        ).where(AnalyticsEvent.import_job_id == job.id)
+        start, end = self.db.exec(statement).one()
+        try:
+            refresh_rollups(self.db.get_bind(), start, end)
+        except Exception as e:
+            # Данные уже загружены, диапазон можно пересчитать повторно
+            logger.warning(f"Rollup refresh for import job {job.id} failed: {e}")
+
+    def _save_progress(self, job: ImportJob):
+        """Фиксация прогресса задачи"""
+        job.updated_at = datetime.utcnow()
+        self.db.add(job)
+        self.db.commit()
+        self.db.refresh(job)
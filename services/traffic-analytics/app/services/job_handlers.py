@@ -0,0 +1,68 @@
+"""
+Обработчики фоновых задач
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Dict
+
+from sqlmodel import Session
+
+from app.core.cache import EVENTS_DATASET, bump_data_version
+from app.db.timescale import refresh_rollups
+from app.models.imports import ImportStatus
+from app.models.jobs import Job, JobKind
+from app.schemas.analytics import Dimension, Metric
+from app.services.analytics import AnalyticsService
+from app.services.importer import ImportService
+from app.services.jobs import JobProgress, job_handler
+
+
+@job_handler(JobKind.IMPORT)
+def run_import(db: Session, job: Job, progress: JobProgress) -> Dict[str, Any]:
+    """Импорт CSV файла, прогресс в байтах файла"""
+    service = ImportService(db)
+    import_job = service.run_import(job.payload["import_job_id"], on_progress=progress.update)
+    if import_job.status == ImportStatus.FAILED:
+        raise RuntimeError(import_job.error)
+
+    return {
+        "import_job_id": import_job.id,
+        "rows_inserted": import_job.rows_inserted,
+        "rows_updated": import_job.rows_updated,
+        "rows_skipped": import_job.rows_skipped,
+        "rows_rejected": import_job.rows_rejected,
+    }
+
+
+@job_handler(JobKind.BACKFILL)
+def run_backfill(db: Session, job: Job, progress: JobProgress) -> Dict[str, Any]:
+    """Пересчет агрегатов за период по дням"""
+    start = datetime.fromisoformat(job.payload["start"])
+    end = datetime.fromisoformat(job.payload["end"])
+
+    days = max((end - start).days, 1)
+    progress.set_total(days, unit="days")
+
+    for day in range(days):
+        window_start = start + timedelta(days=day)
+        refresh_rollups(db.get_bind(), window_start, min(window_start + timedelta(days=1), end))
+        progress.update(day + 1)
+
+    bump_data_version(EVENTS_DATASET)
+    return {"days": days}
+
+
+@job_handler(JobKind.REPORT)
+def run_report(db: Session, job: Job, progress: JobProgress) -> Dict[str, Any]:
+    """Построение отчета-разбивки; результат также попадает в кэш запросов"""
+    payload = job.payload
+    progress.set_total(1, unit="reports")
+
+    return AnalyticsService(db).breakdown(
+        datetime.fromisoformat(payload["start"]),
+        datetime.fromisoformat(payload["end"]),
+        [Dimension(dimension) for dimension in payload["group_by"]],
+        payload.get("filters") or {},
+        Metric(payload["order_by"]) if payload.get("order_by") else None,
+        payload.get("limit"),
+    )
@@ -0,0 +1,318 @@
+"""
+Сервис фоновых задач: постановка в очередь, исполнение, восстановление
+"""
+
+import logging
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from multiprocessing import get_context
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import or_, update
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models.jobs import Job, JobKind, JobStatus
+
+logger = logging.getLogger(__name__)
+
+# Обработчики задач по типам, регистрируются в app.services.job_handlers
+HANDLERS: Dict[JobKind, Callable[[Session, Job, "JobProgress"], Optional[Dict[str, Any]]]] = {}
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def job_handler(kind: JobKind):
+    """Регистрация обработчика задач указанного типа"""
+    def decorator(func):
+        HANDLERS[kind] = func
+        return func
+    return decorator
+
+
+class JobProgress:
+    """
+    Отчет о прогрессе задачи из обработчика
+
+    Сохранение в БД не чаще JOB_PROGRESS_INTERVAL, каждое сохранение
+    обновляет heartbeat задачи. Долгие операции без прогресса (пересчет
+    агрегатов, один запрос отчета) выполняются под keepalive().
+    """
+
+    def __init__(self, db: Session, job: Job):
+        self.db = db
+        self.job = job
+        self._saved_at = 0.0
+
+    def set_total(self, total: int, unit: Optional[str] = None) -> None:
+        """Общий объем работы"""
+        self.job.units_total = total
+        if unit:
+            self.job.unit = unit
+        self.save()
+
+    def update(self, done: int, force: bool = False) -> None:
+        """Выполненный объем работы"""
+        self.job.units_done = done
+        if force or time.monotonic() - self._saved_at >= settings.JOB_PROGRESS_INTERVAL:
+            self.save()
+
+    @contextmanager
+    def keepalive(self) -> Iterator[None]:
+        """
+        Heartbeat задачи каждые JOB_HEARTBEAT_SECONDS из отдельного потока
+        и собственной сессии, пока выполняется блок
+        """
+        stopped = threading.Event()
+        job_id, attempt = self.job.id, self.job.attempts
+        bind = self.db.get_bind()
+
+        def beat():
+            while not stopped.wait(settings.JOB_HEARTBEAT_SECONDS):
+                try:
+                    with Session(bind) as db:
+                        # Только текущая попытка: захваченную заново задачу не трогаем
+                        db.exec(
+                            update(Job)
+                            .where(
+                                Job.id == job_id,
+                                Job.attempts == attempt,
+                                Job.status == JobStatus.RUNNING,
+                            )
+                            .values(heartbeat_at=datetime.utcnow())
+                        )
+                        db.commit()
+                except Exception as e:
+                    logger.warning(f"Heartbeat of job {job_id} failed: {e}")
+
+        thread = threading.Thread(target=beat, name=f"job-{job_id}-heartbeat", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stopped.set()
+            thread.join()
+
+    def save(self) -> None:
+        now = datetime.utcnow()
+        self.job.heartbeat_at = now
+        self.job.updated_at = now
+        self.db.add(self.job)
+        self.db.commit()
+        self.db.refresh(self.job)
+        self._saved_at = time.monotonic()
+
+
+class JobService:
+    """Сервис для работы с фоновыми задачами"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def enqueue(
+        self,
+        kind: JobKind,
+        payload: Dict[str, Any],
+        units_total: Optional[int] = None,
+        unit: str = "items",
+    ) -> Job:
+        """Создание задачи и передача ее исполнителям"""
+        job = Job(kind=kind, payload=payload, units_total=units_total, unit=unit)
+        self.db.add(job)
+        self.db.commit()
+        self.db.refresh(job)
+
+        dispatch(job.id)
+        return job
+
+    def get_job(self, job_id: int) -> Job:
+        """Получение задачи по ID"""
+        job = self.db.get(Job, job_id)
+        if not job:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Job {job_id} not found"
+            )
+        return job
+
+    def list_jobs(
+        self,
+        kind: Optional[JobKind] = None,
+        job_status: Optional[JobStatus] = None,
+        skip: int = 0,
+        limit: int = 50,
+    ) -> List[Job]:
+        """Список задач, новые первыми"""
+        statement = select(Job)
+        if kind:
+            statement = statement.where(Job.kind == kind)
+        if job_status:
+            statement = statement.where(Job.status == job_status)
+        statement = statement.order_by(Job.id.desc()).offset(skip).limit(limit)
+        return self.db.exec(statement).all()
+
+
+def _stale_before() -> datetime:
+    return datetime.utcnow() - timedelta(seconds=settings.JOB_STALE_SECONDS)
+
+
+def _stale_condition():
+    """Выполняющаяся задача, исполнитель которой перестал обновлять heartbeat"""
+    return (Job.status == JobStatus.RUNNING) & (Job.heartbeat_at < _stale_before())
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    """Пул процессов локального исполнителя"""
+    global _executor
+    if _executor is None:
+        # spawn: дочерние процессы создают собственные подключения к БД
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.JOB_WORKERS, mp_context=get_context("spawn")
+        )
+    return _executor
+
+
+def dispatch(job_id: int) -> None:
+    """
+    Передача задачи исполнителю
+
+    Ошибка доставки не теряет задачу: она остается в очереди
+    в БД и будет передана повторно при восстановлении.
+    """
+    try:
+        if settings.JOB_BACKEND == "local":
+            _get_executor().submit(execute_job, job_id)
+        else:
+            from app.worker import execute
+            execute.delay(job_id)
+    except Exception as e:
+        logger.error(f"Failed to dispatch job {job_id}: {e}")
+
+
+def claim_job(db: Session, job_id: int) -> Optional[Job]:
+    """
+    Атомарный захват задачи исполнителем
+
+    Захватывается задача в очереди или зависшая задача, исполнитель
+    которой перестал обновлять heartbeat. Повторная доставка уже
+    выполняющейся задачи ничего не делает.
+    """
+    now = datetime.utcnow()
+    statement = (
+        update(Job)
+        .where(
+            Job.id == job_id,
+            or_(
+                Job.status == JobStatus.QUEUED,
+                _stale_condition(),
+            ),
+        )
+        .values(
+            status=JobStatus.RUNNING,
+            started_at=now,
+            heartbeat_at=now,
+            finished_at=None,
+            error=None,
+            units_done=0,
+            attempts=Job.attempts + 1,
+            worker=f"{socket.gethostname()}:{os.getpid()}",
+        )
+    )
+    claimed = db.exec(statement).rowcount
+    db.commit()
+    if not claimed:
+        return None
+    return db.get(Job, job_id)
+
+
+def execute_job(job_id: int) -> None:
+    """Выполнение задачи в процессе исполнителя"""
+    # Регистрация обработчиков
+    from app.services import job_handlers  # noqa: F401
+
+    with Session(engine) as db:
+        job = claim_job(db, job_id)
+        if not job:
+            return
+
+        progress = JobProgress(db, job)
+        try:
+            with progress.keepalive():
+                result = HANDLERS[job.kind](db, job, progress)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Job {job_id} ({job.kind.value}) failed: {e}")
+            job = db.get(Job, job_id)
+            job.status = JobStatus.FAILED
+            job.error = str(e)
+            job.finished_at = datetime.utcnow()
+            progress.job = job
+            progress.save()
+            return
+
+        job.status = JobStatus.COMPLETED
+        job.result = result
+        if job.units_total is not None:
+            job.units_done = job.units_total
+        job.finished_at = datetime.utcnow()
+        progress.save()
+
+
+def _redispatch(condition) -> List[int]:
+    """Повторная передача задач, удовлетворяющих условию"""
+    with Session(engine) as db:
+        job_ids = db.exec(select(Job.id).where(condition).order_by(Job.id)).all()
+
+    for job_id in job_ids:
+        dispatch(job_id)
+    return job_ids
+
+
+def recover_jobs() -> int:
+    """
+    Повторная передача незавершенных задач после перезапуска
+
+    Returns:
+        Число переданных задач
+    """
+    job_ids = _redispatch(or_(Job.status == JobStatus.QUEUED, _stale_condition()))
+    if job_ids:
+        logger.info(f"Recovered {len(job_ids)} unfinished jobs")
+    return len(job_ids)
+
+
+def sweep_stale_jobs() -> int:
+    """
+    Повторная передача зависших задач
+
+    Выполняется периодически: задачи исполнителя, перезапущенного
+    раньше JOB_STALE_SECONDS, при старте еще не считаются зависшими,
+    а повторная доставка celery до этого момента ничего не делает.
+
+    Returns:
+        Число переданных задач
+    """
+    job_ids = _redispatch(_stale_condition())
+    if job_ids:
+        logger.warning(f"Re-dispatched {len(job_ids)} stale jobs: {job_ids}")
+    return len(job_ids)
+
+
+def start_stale_job_sweeper() -> None:
+    """Периодическая передача зависших задач локальному исполнителю (поток процесса API)"""
+    def sweep():
+        while True:
+            time.sleep(settings.JOB_SWEEP_SECONDS)
+            try:
+                sweep_stale_jobs()
+            except Exception as e:
+                logger.error(f"Stale job sweep failed: {e}")
+
+    threading.Thread(target=sweep, name="stale-job-sweeper", daemon=True).start()
@@ -0,0 +1,135 @@
+"""
+Запросы метрик трафика по непрерывным агрегатам
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence
+
+from fastapi import HTTPException, status
+from sqlalchemy import column, func, select, table
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.db.timescale import DAILY_VIEW, HOURLY_VIEW
+
+# Измерения и метрики агрегатов
+DIMENSIONS = ("campaign", "source", "sub_id", "geo")
+METRICS = ("clicks", "conversions", "payout", "spend")
+
+GRANULARITIES = {
+    "hour": (HOURLY_VIEW, timedelta(hours=1)),
+    "day": (DAILY_VIEW, timedelta(days=1)),
+}
+
+
+def rollup_view(granularity: str):
+    """Описание представления агрегата для построения запросов"""
+    view_name, _ = GRANULARITIES[granularity]
+    return table(
+        view_name,
+        column("bucket"),
+        *(column(dimension) for dimension in DIMENSIONS),
+        *(column(metric) for metric in METRICS),
+    )
+
+
+def pick_granularity(start: datetime, end: datetime) -> str:
+    """Часовые агрегаты для коротких периодов, дневные — для длинных"""
+    if end - start <= timedelta(days=settings.HOURLY_ROLLUP_MAX_DAYS):
+        return "hour"
+    return "day"
+
+
+def floor_to_bucket(moment: datetime, granularity: str) -> datetime:
+    """Выравнивание начала периода по границе корзины"""
+    if granularity == "day":
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+class RollupService:
+    """
+    Сервис запросов к агрегатам analytics_events
+
+    Запросы читают только часовые/дневные агрегаты. Незакрытая корзина
+    после watermark досчитывается TimescaleDB из сырых событий
+    (real-time aggregation), поэтому сырые данные сканируются только
+    для самого свежего интервала.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def query(
+        self,
+        start: datetime,
+        end: datetime,
+        group_by: Sequence[str] = (),
+        filters: Optional[Dict[str, str]] = None,
+        granularity: Optional[str] = None,
+        bucketed: bool = True,
+        order_by: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Агрегированные метрики за период [start, end)
+
+        Args:
+            group_by: Измерения для группировки
+            filters: Фильтры по измерениям (точное совпадение)
+            granularity: "hour" или "day", по умолчанию по длине периода
+            bucketed: Группировать ли по временным корзинам
+            order_by: Метрика для сортировки по убыванию (для top-N)
+            limit: Ограничение числа строк
+        """
+        if end <= start:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Period end must be after start"
+            )
+
+        granularity = granularity or pick_granularity(start, end)
+        if granularity not in GRANULARITIES:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unsupported granularity: {granularity}"
+            )
+
+        for dimension in list(group_by) + list(filters or {}):
+            if dimension not in DIMENSIONS:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Unknown dimension: {dimension}"
+                )
+        if order_by and order_by not in METRICS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown metric: {order_by}"
+            )
+
+        view = rollup_view(granularity)
+
+        keys = [view.c.bucket] if bucketed else []
+        keys += [view.c[dimension] for dimension in group_by]
+        aggregates = [func.sum(view.c[metric]).label(metric) for metric in METRICS]
+
+        statement = select(*keys, *aggregates).where(
+            view.c.bucket >= floor_to_bucket(start, granularity),
+            view.c.bucket < end,
+        )
+        for dimension, value in (filters or {}).items():
+            statement = statement.where(view.c[dimension] == value)
+
+        if keys:
+            statement = statement.group_by(*keys)
+
+        if order_by:
+            statement = statement.order_by(func.sum(view.c[order_by]).desc())
+        elif bucketed:
+            statement = statement.order_by(view.c.bucket)
+
+        if limit:
+            statement = statement.limit(limit)
+
+        rows = self.db.exec(statement).mappings().all()
+        return [dict(row) for row in rows]
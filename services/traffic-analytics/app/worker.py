@@ -0,0 +1,51 @@
+"""
+Celery worker для фоновых задач
+
+Запуск (-B: планировщик периодической передачи зависших задач):
+    celery -A app.worker worker -B --loglevel=info --concurrency=4
+"""
+
+from celery import Celery
+from celery.signals import worker_ready
+
+from app.core.config import settings
+from app.services.jobs import execute_job, recover_jobs, sweep_stale_jobs
+
+celery_app = Celery(
+    "traffic_analytics",
+    broker=settings.CELERY_BROKER_URL,
+    backend=settings.CELERY_RESULT_BACKEND,
+)
+
+celery_app.conf.update(
+    # Подтверждение после выполнения: задача прерванного worker'а доставляется повторно
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    worker_prefetch_multiplier=1,
+    # Результат и прогресс хранятся в таблице jobs
+    task_ignore_result=True,
+    beat_schedule={
+        "sweep-stale-jobs": {
+            "task": "jobs.sweep_stale",
+            "schedule": settings.JOB_SWEEP_SECONDS,
+        },
+    },
+)
+
+
+@celery_app.task(name="jobs.execute")
+def execute(job_id: int) -> None:
+    """Выполнение фоновой задачи"""
+    execute_job(job_id)
+
+
+@celery_app.task(name="jobs.sweep_stale")
+def sweep_stale() -> None:
+    """Повторная передача задач с истекшим heartbeat"""
+    sweep_stale_jobs()
+
+
+@worker_ready.connect
+def recover_unfinished_jobs(**kwargs):
+    """Передача задач, не завершенных до перезапуска"""
+    recover_jobs()
@@ -0,0 +1,119 @@
+"""
+Бенчмарк разбора CSV: строк в секунду в зависимости от числа процессов
+
+Запуск из каталога сервиса:
+    python -m benchmarks.bench_import --rows 1000000 --workers 1,2,4,8
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from app.services.csv_parser import (
+    iter_blocks, iter_parallel_blocks, read_header, resolve_columns
+)
+
+PARTNER_HEADER = "Date,Campaign,Source,Sub ID,Country,Clicks,Installs,Revenue,Cost\n"
+GEOS = ["US", "DE", "FR", "BR", "IN", "ID", "MX", "TR", "PL", "GB"]
+SOURCES = ["facebook", "google", "tiktok", "moloco", "unity", "applovin"]
+
+
+def generate_partner_csv(path: str, rows: int, seed: int = 42) -> int:
+    """Генерация файла в формате выгрузки партнера, возвращает размер в байтах"""
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    campaigns = [f"campaign_{index:04d}" for index in range(500)]
+
+    with open(path, "w", encoding="utf-8") as handle:
+        handle.write(PARTNER_HEADER)
+        lines = []
+        for index in range(rows):
+            moment = start + timedelta(minutes=index % (365 * 24 * 60))
+            clicks = rng.randint(0, 5000)
+            installs = rng.randint(0, clicks // 10 + 1)
+            lines.append(
+                f"{moment:%Y-%m-%d %H:%M:%S},{rng.choice(campaigns)},{rng.choice(SOURCES)},"
+                f"sub_{rng.randint(1, 2000)},{rng.choice(GEOS)},{clicks},{installs},"
+                f"{installs * rng.uniform(0.5, 4.0):.2f},{clicks * rng.uniform(0.01, 0.2):.2f}\n"
+            )
+            if len(lines) >= 50_000:
+                handle.writelines(lines)
+                lines.clear()
+        handle.writelines(lines)
+
+    return os.path.getsize(path)
+
+
+def run_parse(path: str, workers: int, chunk_rows: int, block_bytes: int) -> dict:
+    """Полный проход разбора файла без загрузки в БД"""
+    started = time.perf_counter()
+    rows = 0
+    payload_bytes = 0
+
+    with open(path, "rb") as handle:
+        columns = resolve_columns(read_header(handle))
+        if workers > 1:
+            blocks = iter_parallel_blocks(path, handle.tell(), columns, 0, workers, block_bytes)
+        else:
+            blocks = iter_blocks(handle, columns, 0, chunk_rows)
+
+        for block in blocks:
+            rows += block.rows_valid
+            payload_bytes += sum(map(len, block.lines))
+
+    elapsed = time.perf_counter() - started
+    return {
+        "workers": workers,
+        "rows": rows,
+        "seconds": round(elapsed, 3),
+        "rows_per_sec": round(rows / elapsed) if elapsed else None,
+        "copy_payload_mb": round(payload_bytes / 1024 / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CSV import parsing benchmark")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Строк в сгенерированном файле")
+    parser.add_argument("--workers", default=None, help="Список числа процессов, например 1,2,4")
+    parser.add_argument("--chunk-rows", type=int, default=100_000)
+    parser.add_argument("--block-mb", type=int, default=8)
+    parser.add_argument("--file", default=None, help="Использовать существующий файл")
+    parser.add_argument("--json", action="store_true", help="Вывод в формате JSON")
+    args = parser.parse_args()
+
+    if args.workers:
+        worker_counts = [int(value) for value in args.workers.split(",")]
+    else:
+        cpu_count = os.cpu_count() or 1
+        worker_counts = sorted({1, 2, 4, cpu_count} & set(range(1, cpu_count + 1)))
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = args.file or os.path.join(directory, "partner.csv")
+        if not args.file:
+            generate_partner_csv(path, args.rows)
+        file_mb = os.path.getsize(path) / 1024 / 1024
+
+        results = [
+            run_parse(path, workers, args.chunk_rows, args.block_mb * 1024 * 1024)
+            for workers in worker_counts
+        ]
+
+    if args.json:
+        print(json.dumps({"file_mb": round(file_mb, 1), "results": results}, indent=2))
+        return
+
+    print(f"File: {file_mb:.1f} MB")
+    print(f"{'workers':>8} {'rows':>10} {'seconds':>9} {'rows/sec':>12}")
+    for result in results:
+        print(
+            f"{result['workers']:>8} {result['rows']:>10} "
+            f"{result['seconds']:>9} {result['rows_per_sec']:>12}"
+        )
+
+
+if __name__ == "__main__":
+    main()